@@ -0,0 +1,57 @@
+"""claude_code の各操作を計測するワーカー（run.py から起動する）。
+
+    PYTHONPATH=claude_code/todo_cli/src python benchmarks/bench_claude_code.py <件数> <作業ディレクトリ>
+
+更新系と一覧・検索は CLI の1コマンドと同じく、毎回新しい TaskService で実行する。
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import harness
+from todo_cli.models import Priority, Task
+from todo_cli.repository import TaskRepository
+from todo_cli.service import SortKey, TaskService
+
+_PRIORITIES = (Priority.HIGH, Priority.MEDIUM, Priority.LOW)
+
+
+def _setup(
+    size: int, workdir: Path, variant: str
+) -> tuple[list[Path], dict[str, Optional[Callable[[], Any]]]]:
+    path = workdir / "tasks.json"
+    today = date.today()
+    tasks = []
+    for row in harness.synthetic_rows(size):
+        due = today + timedelta(days=row.due_in_days) if row.due_in_days is not None else None
+        task = Task.create(row.title, _PRIORITIES[row.priority], due, row.category)
+        task.done = row.done
+        tasks.append(task)
+    TaskRepository(path).save(tasks)
+    ids = [t.id for t in tasks]
+    loaded = TaskRepository(path).load()
+    rng = random.Random(1)
+
+    def service() -> TaskService:
+        return TaskService(TaskRepository(path))
+
+    return [path], {
+        "load": lambda: TaskRepository(path).load(),
+        "save": lambda: TaskRepository(path).save(loaded),
+        "add": lambda: service().add_task("bench add", Priority.HIGH, today, harness.LIST_CATEGORY),
+        "complete": lambda: service().complete_task(rng.choice(ids)),
+        "edit": lambda: service().edit_task(rng.choice(ids), title="bench edit"),
+        "list": lambda: service().list_tasks(
+            done=False, priority=Priority.HIGH, category=harness.LIST_CATEGORY
+        ),
+        "sort": lambda: service().list_tasks(done=False, sort=SortKey.DUE_DATE),
+        "search": lambda: service().search_tasks(harness.SEARCH_WORD),
+    }
+
+
+if __name__ == "__main__":
+    harness.run_worker("claude_code", _setup)
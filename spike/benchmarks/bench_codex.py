@@ -0,0 +1,74 @@
+"""codex の各操作を計測するワーカー（run.py から起動する）。
+
+    PYTHONPATH=codex/todo_cli python benchmarks/bench_codex.py <件数> <作業ディレクトリ>
+
+コマンド関数はどれもストアのパスを受け取り、呼び出しごとに読み込む。
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import harness
+from todo_cli.commands.add import add_task
+from todo_cli.commands.done import mark_done
+from todo_cli.commands.edit import edit_task
+from todo_cli.commands.list import list_tasks
+from todo_cli.commands.search import search_tasks
+from todo_cli.models import Task
+from todo_cli.storage import load_tasks, save_tasks
+
+_PRIORITIES = ("high", "medium", "low")
+
+
+def _setup(
+    size: int, workdir: Path, variant: str
+) -> tuple[list[Path], dict[str, Optional[Callable[[], Any]]]]:
+    path = workdir / "tasks.json"
+    today = date.today()
+    tasks = [
+        Task(
+            id=str(uuid.uuid4()),
+            title=row.title,
+            description=None,
+            priority=_PRIORITIES[row.priority],  # type: ignore[arg-type]
+            due_date=(
+                (today + timedelta(days=row.due_in_days)).isoformat()
+                if row.due_in_days is not None
+                else None
+            ),
+            categories=[row.category],
+            status="done" if row.done else "open",
+            created_at="2026-01-01T00:00:00Z",
+            completed_at="2026-01-02T00:00:00Z" if row.done else None,
+        )
+        for row in harness.synthetic_rows(size)
+    ]
+    save_tasks(path, tasks)
+    ids = [t.id for t in tasks]
+    loaded = load_tasks(path)
+    rng = random.Random(1)
+
+    return [path], {
+        "load": lambda: load_tasks(path),
+        "save": lambda: save_tasks(path, loaded),
+        "add": lambda: add_task(
+            path, "bench add", priority="high", due_date=today.isoformat(),
+            categories=[harness.LIST_CATEGORY],
+        ),
+        "complete": lambda: mark_done(path, rng.choice(ids)),
+        "edit": lambda: edit_task(path, rng.choice(ids), title="bench edit"),
+        "list": lambda: list_tasks(
+            path, status="open", priority="high", category=harness.LIST_CATEGORY
+        ),
+        "sort": lambda: list_tasks(path, status="open", sort="due"),
+        "search": lambda: search_tasks(path, harness.SEARCH_WORD),
+    }
+
+
+if __name__ == "__main__":
+    harness.run_worker("codex", _setup)
@@ -0,0 +1,60 @@
+"""gemini の各操作を計測するワーカー（run.py から起動する）。
+
+    PYTHONPATH=gemini/todo_cli/src python benchmarks/bench_gemini.py <件数> <作業ディレクトリ>
+
+CLI と同じく、毎回 lazy=True の新しい TaskManager で実行する。gemini の一覧はカテゴリでしか
+絞り込めないので、list はカテゴリ指定のみ。
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import harness
+from todo.database import load_tasks, save_tasks
+from todo.manager import TaskManager
+from todo.models import Task
+
+_PRIORITIES = (1, 3, 5)
+
+
+def _setup(
+    size: int, workdir: Path, variant: str
+) -> tuple[list[Path], dict[str, Optional[Callable[[], Any]]]]:
+    path = workdir / "tasks.json"
+    today = date.today()
+    tasks = [
+        Task(
+            id=row.index + 1,
+            title=row.title,
+            priority=_PRIORITIES[row.priority],
+            due_date=today + timedelta(days=row.due_in_days) if row.due_in_days is not None else None,
+            category=row.category,
+            is_completed=row.done,
+        )
+        for row in harness.synthetic_rows(size)
+    ]
+    save_tasks(tasks, path, next_id=size + 1)
+    loaded = load_tasks(path)
+    rng = random.Random(1)
+
+    def manager() -> TaskManager:
+        return TaskManager(db_path=path, lazy=True)
+
+    return [path], {
+        "load": lambda: load_tasks(path),
+        "save": lambda: save_tasks(loaded, path, next_id=size + 1),
+        "add": lambda: manager().add_task("bench add", 1, today, harness.LIST_CATEGORY),
+        "complete": lambda: manager().complete_task(rng.randint(1, size)),
+        "edit": lambda: manager().edit_task(rng.randint(1, size), title="bench edit"),
+        "list": lambda: manager().list_tasks(category=harness.LIST_CATEGORY),
+        "sort": lambda: manager().list_tasks(sort_by="due-date"),
+        "search": lambda: manager().search_tasks(harness.SEARCH_WORD),
+    }
+
+
+if __name__ == "__main__":
+    harness.run_worker("gemini", _setup)
@@ -0,0 +1,50 @@
+"""spec-kit-with-codex の各操作を計測するワーカー（run.py から起動する）。
+
+    PYTHONPATH=spec-kit-with-codex/src python benchmarks/bench_spec_kit.py <件数> <作業ディレクトリ> --variant json
+
+--variant でバックエンド（json/sqlite/binary/mmap）を選ぶ。CLI と同じく、毎回新しい
+TodoApp で実行する。spec-kit には並べ替えと検索がないので、sort と search は null になる。
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+import harness
+from todo_cli.app import TodoApp, create_repository
+from todo_cli.models import Task, TaskCollection
+from todo_cli.mmap_repository import heap_path
+
+SUFFIXES = {"json": ".json", "sqlite": ".db", "binary": ".bin", "mmap": ".rec"}
+
+
+def _setup(
+    size: int, workdir: Path, variant: str
+) -> tuple[list[Path], dict[str, Optional[Callable[[], Any]]]]:
+    path = workdir / f"tasks{SUFFIXES[variant]}"
+    tasks = [
+        Task(id=uuid4(), title=row.title, is_completed=row.done)
+        for row in harness.synthetic_rows(size)
+    ]
+    collection = TaskCollection(tasks=tasks)
+    create_repository(path).save_collection(collection)
+    ids = [str(t.id) for t in tasks]
+    rng = random.Random(1)
+
+    return [path, heap_path(path)], {
+        "load": lambda: create_repository(path).load_collection(),
+        "save": lambda: create_repository(path).save_collection(collection),
+        "add": lambda: TodoApp(path).add_task("bench add"),
+        "complete": lambda: TodoApp(path).complete_task(rng.choice(ids)),
+        "edit": lambda: TodoApp(path).edit_task_title(rng.choice(ids), "bench edit"),
+        "list": lambda: TodoApp(path).list_tasks(),
+        "sort": None,
+        "search": None,
+    }
+
+
+if __name__ == "__main__":
+    harness.run_worker("spec_kit", _setup)
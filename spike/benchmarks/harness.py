@@ -0,0 +1,172 @@
+"""各スパイクのワーカーが共有する計測処理。
+
+ワーカーは1つの実装・1つの件数につき1プロセスで動き、合成したストアに対して各操作を
+計測し、結果の JSON を標準出力に書く。スパイクごとにパッケージ名（todo_cli）が衝突する
+ので、実装どうしを同じプロセスに読み込まない。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import resource
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+# 操作の一覧と、スループットの単位（load/save は1回でストア全体を扱う）
+OPERATIONS = ("load", "save", "add", "complete", "edit", "list", "sort", "search")
+BULK_OPERATIONS = frozenset({"load", "save"})
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike "
+    "november oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu"
+).split()
+CATEGORIES = [f"cat{i}" for i in range(20)]
+# 絞り込み一覧と検索で使う条件。どのスパイクでも同じ割合のタスクが該当する
+LIST_CATEGORY = "cat3"
+SEARCH_WORD = "kilo"
+
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+_STATUS = Path("/proc/self/status")
+
+
+@dataclass(frozen=True)
+class Row:
+    """スパイクに依存しない合成タスク。各ワーカーが自分のモデルに変換する。"""
+
+    index: int
+    title: str
+    priority: int  # 0=高 1=中 2=低
+    due_in_days: Optional[int]  # 基準日からの日数。None は期限なし
+    category: str
+    done: bool
+
+
+def synthetic_rows(size: int, seed: int = 0) -> Iterator[Row]:
+    """件数と seed が同じなら、どのスパイクにも同じ内容のタスクを生成する。"""
+    rng = random.Random(seed)
+    for i in range(size):
+        yield Row(
+            index=i,
+            title=" ".join(rng.choice(WORDS) for _ in range(3)) + f" #{i}",
+            priority=rng.randrange(3),
+            due_in_days=rng.randint(-30, 60) if rng.random() < 0.8 else None,
+            category=rng.choice(CATEGORIES),
+            done=rng.random() < 0.3,
+        )
+
+
+def _reset_peak_rss() -> bool:
+    # Linux は clear_refs に 5 を書くとピーク RSS（VmHWM）を現在値に戻せる
+    try:
+        _CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb() -> float:
+    try:
+        for line in _STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # プロセス開始以降のピークしか取れない（Linux は KiB、macOS はバイト）
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    # 最近順位法。回数が 100 未満なら p99 は最大値になる
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def measure(
+    op: Callable[[], Any], *, items: int, budget: float, min_runs: int, max_runs: int
+) -> dict[str, Any]:
+    """op を min_runs 回以上、予算の秒数か max_runs 回に達するまで繰り返し計測する。
+
+    op の戻り値は計時を止めてから解放するので、後片付けの時間は含まない。
+    """
+    per_op_peak = _reset_peak_rss()
+    samples: list[float] = []
+    started = time.perf_counter()
+    while len(samples) < max_runs and (
+        len(samples) < min_runs or time.perf_counter() - started < budget
+    ):
+        start = time.perf_counter()
+        result = op()
+        samples.append(time.perf_counter() - start)
+        del result
+    ordered = sorted(samples)
+    mean = sum(samples) / len(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": _percentile(ordered, 0.50) * 1e3,
+        "p99_ms": _percentile(ordered, 0.99) * 1e3,
+        "mean_ms": mean * 1e3,
+        "throughput_per_s": items / mean if mean > 0 else None,
+        "throughput_unit": "tasks" if items > 1 else "ops",
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_scope": "operation" if per_op_peak else "process",
+    }
+
+
+def _store_bytes(paths: list[Path]) -> int:
+    return sum(p.stat().st_size for p in paths if p.exists())
+
+
+def run_worker(
+    spike: str,
+    setup: Callable[[int, Path, str], tuple[list[Path], dict[str, Optional[Callable[[], Any]]]]],
+) -> None:
+    """ワーカーの main。setup(件数, 作業ディレクトリ, 形式) がストアを作り、操作を返す。
+
+    setup が None を返した操作はその実装にない機能として結果に null を記録する。
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("size", type=int)
+    parser.add_argument("workdir", type=Path)
+    parser.add_argument("--variant", default="json")
+    parser.add_argument("--budget", type=float, default=2.0)
+    parser.add_argument("--min-runs", type=int, default=3)
+    parser.add_argument("--max-runs", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths, operations = setup(args.size, args.workdir, args.variant)
+    setup_seconds = time.perf_counter() - start
+    store_bytes = _store_bytes(paths)
+
+    results: dict[str, Optional[dict[str, Any]]] = {}
+    for name in OPERATIONS:
+        op = operations.get(name)
+        if op is None:
+            results[name] = None
+            continue
+        print(f"  {spike}/{args.variant} {args.size:,} {name}", file=sys.stderr, flush=True)
+        results[name] = measure(
+            op,
+            items=args.size if name in BULK_OPERATIONS else 1,
+            budget=args.budget,
+            min_runs=args.min_runs,
+            max_runs=args.max_runs,
+        )
+
+    json.dump(
+        {
+            "spike": spike,
+            "variant": args.variant,
+            "size": args.size,
+            "store_bytes": store_bytes,
+            "setup_seconds": setup_seconds,
+            "operations": results,
+        },
+        sys.stdout,
+    )
@@ -0,0 +1,192 @@
+"""全スパイクのホットパスを同じ条件で計測するベンチマーク。
+
+    python benchmarks/run.py [--sizes 1000,10000] [--spikes codex,gemini] [--baseline 前回.json]
+
+件数ごとに合成したタスクストアを作り、load/save/add/complete/edit/list（絞り込み）/
+sort/search の所要時間を計測する。各操作の結果には、スループット、p50/p99 レイテンシ、
+その操作中のピーク RSS が入る。実装（スパイク・バックエンド）と件数の組み合わせごとに
+別プロセスで計測し、結果は benchmarks/results/ に JSON で書き出す。--baseline に
+以前の結果を渡すと、p50 の変化率を並べて表示する。
+
+continue は models.py しかなく計測できる操作がないので対象外。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from harness import OPERATIONS
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# p50 がこの割合を超えて遅くなった操作を --baseline との比較で目立たせる
+REGRESSION_RATIO = 1.2
+
+
+@dataclass(frozen=True)
+class Spike:
+    worker: str
+    source: Path  # PYTHONPATH に入れるディレクトリ
+    variants: tuple[str, ...] = ("json",)
+
+
+SPIKES = {
+    "claude_code": Spike("bench_claude_code.py", ROOT / "claude_code" / "todo_cli" / "src"),
+    "codex": Spike("bench_codex.py", ROOT / "codex" / "todo_cli"),
+    "gemini": Spike("bench_gemini.py", ROOT / "gemini" / "todo_cli" / "src"),
+    "spec_kit": Spike(
+        "bench_spec_kit.py",
+        ROOT / "spec-kit-with-codex" / "src",
+        ("json", "sqlite", "binary", "mmap"),
+    ),
+}
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(s.replace("_", "")) for s in _csv(v)],
+        default=list(DEFAULT_SIZES),
+        help="タスク数（カンマ区切り）",
+    )
+    parser.add_argument(
+        "--spikes",
+        type=_csv,
+        default=list(SPIKES),
+        help=f"計測するスパイク（カンマ区切り、既定: {','.join(SPIKES)}）",
+    )
+    parser.add_argument("--budget", type=float, default=2.0, help="1操作あたりの計測時間の目安（秒）")
+    parser.add_argument("--min-runs", type=int, default=3, help="1操作あたりの最小実行回数")
+    parser.add_argument("--max-runs", type=int, default=50, help="1操作あたりの最大実行回数")
+    parser.add_argument("--output", type=Path, default=None, help="結果の JSON の書き出し先")
+    parser.add_argument("--baseline", type=Path, default=None, help="比較する以前の結果の JSON")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.spikes if name not in SPIKES]
+    if unknown:
+        parser.error(f"unknown spike: {', '.join(unknown)}")
+    return args
+
+
+def _run_worker(spike: Spike, variant: str, size: int, args: argparse.Namespace) -> dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=str(spike.source))
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as workdir:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                str(HERE / spike.worker),
+                str(size),
+                workdir,
+                "--variant", variant,
+                "--budget", str(args.budget),
+                "--min-runs", str(args.min_runs),
+                "--max-runs", str(args.max_runs),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+    result: dict[str, Any] = json.loads(completed.stdout)
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _key(run: dict[str, Any]) -> tuple[str, str, int]:
+    return run["spike"], run["variant"], run["size"]
+
+
+def _format_change(current: Optional[dict[str, Any]], previous: Optional[dict[str, Any]]) -> str:
+    if current is None or previous is None:
+        return ""
+    ratio = current["p50_ms"] / previous["p50_ms"] if previous["p50_ms"] else 1.0
+    mark = " !" if ratio > REGRESSION_RATIO else ""
+    return f" ({(ratio - 1) * 100:+.0f}%{mark})"
+
+
+def _format_throughput(value: float) -> str:
+    # 1コマンドに秒単位かかる操作も読めるよう、小さい値は小数で出す
+    return f"{value:>8,.0f}" if value >= 100 else f"{value:>8.2f}"
+
+
+def _print_run(run: dict[str, Any], previous: Optional[dict[str, Any]]) -> None:
+    print(
+        f"{run['spike']}/{run['variant']}  {run['size']:,} tasks  "
+        f"{run['store_bytes'] / 1e6:.1f} MB  setup {run['setup_seconds']:.1f} s"
+    )
+    print(f"  {'op':<9} {'p50':>11} {'p99':>11} {'throughput':>16} {'peak RSS':>10}")
+    for name in OPERATIONS:
+        op = run["operations"][name]
+        if op is None:
+            print(f"  {name:<9} {'-':>11}")
+            continue
+        unit = "tasks/s" if op["throughput_unit"] == "tasks" else "ops/s"
+        before = previous["operations"].get(name) if previous else None
+        print(
+            f"  {name:<9} {op['p50_ms']:>9.2f}ms {op['p99_ms']:>9.2f}ms "
+            f"{_format_throughput(op['throughput_per_s'])} {unit:<7} {op['peak_rss_mb']:>8.1f}MB"
+            f"{_format_change(op, before)}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    baseline: dict[tuple[str, str, int], dict[str, Any]] = {}
+    if args.baseline is not None:
+        previous_report = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline = {_key(run): run for run in previous_report["runs"]}
+
+    started = datetime.now(timezone.utc)
+    report: dict[str, Any] = {
+        "created_at": started.isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "budget_seconds": args.budget,
+            "min_runs": args.min_runs,
+            "max_runs": args.max_runs,
+        },
+        "runs": [],
+    }
+    for name in args.spikes:
+        spike = SPIKES[name]
+        for variant in spike.variants:
+            for size in args.sizes:
+                run = _run_worker(spike, variant, size, args)
+                report["runs"].append(run)
+                _print_run(run, baseline.get(_key(run)))
+
+    output = args.output or HERE / "results" / f"{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"results: {output}")
+
+
+if __name__ == "__main__":
+    main()
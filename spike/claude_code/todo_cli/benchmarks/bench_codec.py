@@ -0,0 +1,66 @@
+"""保存形式の読み書き（Task.to_dict / from_dict と JSON の生成・解析）の処理量を計測するベンチマーク。
+
+標準ライブラリの json と orjson（入っていれば）、インデント付きと compact を比べる。
+
+    PYTHONPATH=src python benchmarks/bench_codec.py
+"""
+from __future__ import annotations
+
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from todo_cli import codec
+from todo_cli.models import Priority, Task
+
+SIZES = (10_000, 100_000, 1_000_000)
+CATEGORIES = [f"cat{i}" for i in range(50)]
+
+
+def _make_tasks(size: int) -> list[Task]:
+    rng = random.Random(0)
+    now = datetime.now()
+    tasks = []
+    for i in range(size):
+        task = Task.create(
+            title=f"task {i}",
+            priority=rng.choice(list(Priority)),
+            due_date=date.today() + timedelta(days=rng.randint(-30, 30)) if i % 3 else None,
+            category=rng.choice(CATEGORIES),
+        )
+        if i % 2:
+            task.updated_at = now + timedelta(microseconds=i)
+        tasks.append(task)
+    return tasks
+
+
+def _measure(tasks: list[Task], compact: bool) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    payload = codec.dumps([t.to_dict() for t in tasks], compact=compact)
+    encode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    [Task.from_dict(d) for d in codec.loads(payload)]
+    decode = time.perf_counter() - start
+    return encode, decode, len(payload)
+
+
+def main() -> None:
+    orjson = codec._orjson
+    backends = [("json", None)] + ([("orjson", orjson)] if orjson is not None else [])
+    print(f"{'tasks':>10} {'backend':>8} {'mode':>8} {'encode/s':>12} {'decode/s':>12} {'size':>10}")
+    for size in SIZES:
+        tasks = _make_tasks(size)
+        for name, module in backends:
+            codec._orjson = module
+            for compact in (False, True):
+                encode, decode, length = _measure(tasks, compact)
+                print(
+                    f"{size:>10,} {name:>8} {'compact' if compact else 'indent':>8} "
+                    f"{size / encode:>12,.0f} {size / decode:>12,.0f} {length / 1e6:>8.1f}MB"
+                )
+    codec._orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
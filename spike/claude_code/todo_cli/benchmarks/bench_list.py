@@ -0,0 +1,119 @@
+"""TaskService.list_tasks の絞り込み・並べ替えコストを計測するベンチマーク。
+
+    PYTHONPATH=src python benchmarks/bench_list.py
+"""
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Collection
+from datetime import date, timedelta
+from pathlib import Path
+
+from todo_cli.models import Priority, Task
+from todo_cli.repository import TaskRepository
+from todo_cli.service import SortKey, TaskService, encode_cursor
+from todo_cli.service import _scan as _service_scan
+
+SIZES = (10_000, 100_000, 1_000_000)
+QUERIES = 20
+PAGE = 20
+CATEGORIES = [f"cat{i}" for i in range(50)]
+
+
+class _MemoryRepository(TaskRepository):
+    def __init__(self, tasks: list[Task]) -> None:
+        super().__init__(Path("unused.json"))
+        self._tasks = tasks
+
+    def load(self) -> list[Task]:
+        return self._tasks
+
+    def save(self, tasks: list[Task], categories: Collection[str | None] | None = None) -> None:
+        pass
+
+
+def _scan(tasks: list[Task], category: str) -> list[Task]:
+    # インデックス導入前の list_tasks と同じ絞り込みと並べ替え
+    result = [t for t in tasks if t.deleted_at is None]
+    result = [t for t in result if t.priority == Priority.HIGH]
+    result = [t for t in result if t.category == category]
+    result.sort(key=lambda t: (t.due_date is None, t.due_date))
+    return result
+
+
+def _make_tasks(size: int) -> list[Task]:
+    rng = random.Random(0)
+    today = date.today()
+    return [
+        Task.create(
+            title=f"task {i}",
+            priority=rng.choice(list(Priority)),
+            due_date=today + timedelta(days=rng.randint(-30, 30)),
+            category=rng.choice(CATEGORIES),
+        )
+        for i in range(size)
+    ]
+
+
+def main() -> None:
+    print(
+        f"{'tasks':>10} {'load':>10} {'index build':>12} {'scan/op':>10} "
+        f"{'index/op':>10} {'all by due/op':>14} {'sort/op':>10} {'top20/op':>10} {'page/op':>10}"
+    )
+    for size in SIZES:
+        tasks = _make_tasks(size)
+        service = TaskService(_MemoryRepository(tasks))
+        categories = random.sample(CATEGORIES, QUERIES)
+
+        start = time.perf_counter()
+        service.get_task("")
+        load = time.perf_counter() - start
+
+        # 1回目は全件走査、2回目は必要な二次インデックスの構築を含む
+        service.list_tasks(priority=Priority.HIGH, category=categories[0], sort=SortKey.DUE_DATE)
+        start = time.perf_counter()
+        service.list_tasks(priority=Priority.HIGH, category=categories[0], sort=SortKey.DUE_DATE)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for category in categories:
+            _scan(tasks, category)
+        scan = (time.perf_counter() - start) / QUERIES
+
+        start = time.perf_counter()
+        for category in categories:
+            service.list_tasks(priority=Priority.HIGH, category=category, sort=SortKey.DUE_DATE)
+        indexed = (time.perf_counter() - start) / QUERIES
+
+        service.list_tasks(sort=SortKey.DUE_DATE)
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            service.list_tasks(sort=SortKey.DUE_DATE)
+        walk = (time.perf_counter() - start) / QUERIES
+
+        # 単発のコマンドの経路（全件走査）: 全件の並べ替えと、ヒープによる上位 PAGE 件の選択
+        start = time.perf_counter()
+        _service_scan(tasks, None, None, None, False, SortKey.DUE_DATE)
+        full_sort = time.perf_counter() - start
+        start = time.perf_counter()
+        _service_scan(tasks, None, None, None, False, SortKey.DUE_DATE, limit=PAGE)
+        top = time.perf_counter() - start
+
+        # インデックスの経路: 整列済みリストの途中から PAGE 件（カーソルで次のページ）
+        first_page = service.list_tasks(sort=SortKey.DUE_DATE, limit=PAGE)
+        cursor = encode_cursor(SortKey.DUE_DATE, first_page[-1])
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            service.list_tasks(sort=SortKey.DUE_DATE, limit=PAGE, after=cursor)
+        page = (time.perf_counter() - start) / QUERIES
+
+        print(
+            f"{size:>10,} {load * 1e3:>8.1f}ms {build * 1e3:>10.1f}ms {scan * 1e3:>8.2f}ms "
+            f"{indexed * 1e3:>8.3f}ms {walk * 1e3:>12.1f}ms {full_sort * 1e3:>8.1f}ms "
+            f"{top * 1e3:>8.1f}ms {page * 1e3:>8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
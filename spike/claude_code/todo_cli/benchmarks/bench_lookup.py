@@ -0,0 +1,72 @@
+"""TaskService の ID 検索コストを計測するベンチマーク。
+
+    PYTHONPATH=src python benchmarks/bench_lookup.py
+"""
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Collection
+from pathlib import Path
+
+from todo_cli.models import Task
+from todo_cli.repository import TaskRepository
+from todo_cli.service import TaskService
+
+SIZES = (10_000, 100_000, 1_000_000)
+LOOKUPS = 200
+
+
+class _MemoryRepository(TaskRepository):
+    def __init__(self, tasks: list[Task]) -> None:
+        super().__init__(Path("unused.json"))
+        self._tasks = tasks
+
+    def load(self) -> list[Task]:
+        return self._tasks
+
+    def save(self, tasks: list[Task], categories: Collection[str | None] | None = None) -> None:
+        pass
+
+
+def _linear_find(tasks: list[Task], task_id: str) -> Task | None:
+    for task in tasks:
+        if task.id == task_id and task.deleted_at is None:
+            return task
+    return None
+
+
+def main() -> None:
+    print(f"{'tasks':>10} {'index build':>12} {'linear/op':>12} {'id/op':>10} {'prefix/op':>10}")
+    for size in SIZES:
+        tasks = [Task.create(title=f"task {i}") for i in range(size)]
+        targets = random.sample(tasks, LOOKUPS)
+        service = TaskService(_MemoryRepository(tasks))
+
+        start = time.perf_counter()
+        service.list_tasks()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for target in targets:
+            _linear_find(tasks, target.id)
+        linear = (time.perf_counter() - start) / LOOKUPS
+
+        start = time.perf_counter()
+        for target in targets:
+            service.get_task(target.id)
+        by_id = (time.perf_counter() - start) / LOOKUPS
+
+        start = time.perf_counter()
+        for target in targets:
+            service.get_task(target.id[:8])
+        by_prefix = (time.perf_counter() - start) / LOOKUPS
+
+        print(
+            f"{size:>10,} {build * 1e3:>10.1f}ms {linear * 1e6:>10.1f}us "
+            f"{by_id * 1e6:>8.2f}us {by_prefix * 1e6:>8.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
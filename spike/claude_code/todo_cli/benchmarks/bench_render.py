@@ -0,0 +1,86 @@
+"""todo list の出力形式ごとに、最初の行が出るまでの時間・総時間・ピークメモリを計測するベンチマーク。
+
+    PYTHONPATH=src python benchmarks/bench_render.py
+
+table は rich の Table を組み立ててから出力し、それ以外は stream_task_list で1行ずつ出力する。
+出力先は端末の代わりに最初の書き込み時刻を記録する書き捨てのストリーム。
+tracemalloc は処理を大幅に遅くするため、時間とピークメモリは別々の実行で測る。
+table のピークメモリは TRACE_TABLE_LIMIT 件までしか測らない。
+"""
+from __future__ import annotations
+
+import io
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from rich.console import Console
+
+from todo_cli.display import OutputFormat, print_task_list, stream_task_list
+from todo_cli.models import Priority, Task
+
+SIZES = (1_000, 10_000, 100_000)
+TRACE_TABLE_LIMIT = 10_000
+
+
+class _Sink(io.TextIOBase):
+    def __init__(self) -> None:
+        self.first: float | None = None
+
+    def write(self, s: str) -> int:
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(s)
+
+
+def _make_tasks(size: int) -> list[Task]:
+    rng = random.Random(0)
+    today = date.today()
+    return [
+        Task.create(
+            title=f"タスク {i} " + "x" * rng.randint(0, 40),
+            priority=rng.choice(list(Priority)),
+            due_date=today + timedelta(days=rng.randint(-30, 30)),
+            category=f"cat{rng.randint(0, 49)}",
+        )
+        for i in range(size)
+    ]
+
+
+def _measure(render: Callable[[_Sink], None]) -> tuple[float, float]:
+    sink = _Sink()
+    start = time.perf_counter()
+    render(sink)
+    total = time.perf_counter() - start
+    return (sink.first or start) - start, total
+
+
+def _peak(render: Callable[[_Sink], None]) -> float:
+    tracemalloc.start()
+    render(_Sink())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main() -> None:
+    print(f"{'tasks':>8} {'format':>6} {'first row':>11} {'total':>9} {'peak':>10}")
+    for size in SIZES:
+        tasks = _make_tasks(size)
+        renderers: dict[str, Callable[[_Sink], None]] = {
+            "table": lambda sink: print_task_list(tasks, console=Console(file=sink, width=120)),
+        }
+        for fmt in (OutputFormat.PLAIN, OutputFormat.TSV, OutputFormat.JSONL):
+            renderers[fmt.value] = lambda sink, fmt=fmt: stream_task_list(iter(tasks), fmt, out=sink)
+        for name, render in renderers.items():
+            first, total = _measure(render)
+            line = f"{size:>8,} {name:>6} {first * 1e3:>9.2f}ms {total:>8.3f}s"
+            if name != "table" or size <= TRACE_TABLE_LIMIT:
+                line += f" {_peak(render):>8.1f}MB"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""カテゴリの多いストアを、1つの tasks.json と `todo shard` で分割した形とで比べるベンチマーク。
+
+    PYTHONPATH=src python benchmarks/bench_shards.py
+
+各行は、新しい TaskService で CLI の1コマンド分を実行した時間（1つのカテゴリの一覧、1件の完了、
+1件の追加、全カテゴリの一覧）。分割した形では、コマンドが使うカテゴリのファイルだけを読み書きする。
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from todo_cli.models import Priority, Task
+from todo_cli.repository import TaskRepository
+from todo_cli.service import SortKey, TaskService
+from todo_cli.sharding import open_repository, split_store
+
+SIZES = (20_000, 100_000)
+CATEGORIES = 200
+
+
+def _make_tasks(size: int) -> list[Task]:
+    priorities = list(Priority)
+    return [
+        Task.create(title=f"task {i}", priority=priorities[i % 3], category=f"team-{i % CATEGORIES}")
+        for i in range(size)
+    ]
+
+
+def _commands(task_id: str) -> list[tuple[str, Callable[[TaskService], object]]]:
+    return [
+        ("list one category", lambda s: s.list_tasks(category="team-7")),
+        ("complete one task", lambda s: s.complete_task(task_id)),
+        ("add one task", lambda s: s.add_task("new task", category="team-7")),
+        ("list all categories", lambda s: s.list_tasks(sort=SortKey.PRIORITY, limit=20)),
+    ]
+
+
+def _time(path: Path, command: Callable[[TaskService], object]) -> float:
+    start = time.perf_counter()
+    command(TaskService(open_repository(path)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'tasks':>10} {'command':<22} {'tasks.json':>11} {'sharded':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            tasks = _make_tasks(size)
+            single = Path(tmp) / f"single-{size}" / "tasks.json"
+            sharded = Path(tmp) / f"sharded-{size}" / "tasks.json"
+            for path in (single, sharded):
+                TaskRepository(path).save(tasks)
+            split_store(sharded)
+            for name, command in _commands(tasks[size // 2].id):
+                print(
+                    f"{size:>10,} {name:<22} {_time(single, command) * 1e3:>9.1f}ms "
+                    f"{_time(sharded, command) * 1e3:>8.1f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""`todo` コマンドの入口。
+
+デーモン（`todo daemon`）が起動していればUNIXソケット経由でコマンドを転送し、
+起動していなければ従来どおりプロセス内で実行する。起動時間を抑えるため、
+このモジュールでは typer / rich を import しない。
+"""
+from __future__ import annotations
+
+# 最初に import する。ここからの経過時間が --profile の startup になる
+from todo_cli import profiling
+
+import json
+import shutil
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+SOCKET_PATH = Path.home() / ".todo_cli" / "daemon.sock"
+
+_RESPONSE_TIMEOUT = 30.0
+
+
+def send_message(conn: socket.socket, message: dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def recv_message(conn: socket.socket) -> dict[str, Any]:
+    chunks: list[bytes] = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    message: dict[str, Any] = json.loads(b"".join(chunks))
+    return message
+
+
+def forward(message: dict[str, Any], socket_path: Path = SOCKET_PATH) -> dict[str, Any] | None:
+    """デーモンへ要求を送り応答を返す。デーモンに接続できなければ None。"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            conn.connect(str(socket_path))
+        except OSError:
+            return None
+        # 接続後の失敗は、コマンドが実行済みかもしれないので直接モードに切り替えない
+        conn.settimeout(_RESPONSE_TIMEOUT)
+        send_message(conn, message)
+        return recv_message(conn)
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None, socket_path: Path = SOCKET_PATH) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if args[:1] != ["daemon"]:
+        args = profiling.options_from_environment() + args
+        columns = shutil.get_terminal_size().columns
+        response = forward({"argv": args, "columns": columns}, socket_path)
+        if response is not None:
+            sys.stdout.write(response["stdout"])
+            sys.stderr.write(response["stderr"])
+            return int(response["code"])
+
+    from todo_cli.main import app
+
+    try:
+        app(args=args, prog_name="todo")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+def run() -> None:
+    sys.exit(main())
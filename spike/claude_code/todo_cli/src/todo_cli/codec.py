@@ -0,0 +1,108 @@
+"""保存形式（JSON）との変換。
+
+フィールドごとの変換（優先度・期限・日時）と、タスク一覧全体の JSON の読み書きをまとめる。
+Task.from_dict / to_dict はフィールドの変換にここの関数を使い、TaskRepository は loads / dumps
+でファイルの中身を読み書きする。
+
+- 日時の解析は datetime.fromisoformat（C 実装）に任せ、文字列にするときは日付・時分・秒を
+  表から引いてつなぐ（datetime を作って isoformat() するより速い）。
+- orjson が入っていれば JSON の解析と生成に使い、なければ標準ライブラリの json を使う。
+  どちらでも同じ内容を読み書きする。
+- compact=True は改行・インデントなしで書く。ファイルが小さくなり、書き込みも速い。
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+# 任意の依存（pip install 'todo-cli[fast]'）。入っていなくても型検査が通るよう Any で宣言する
+_orjson: Any
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+# 優先度は並び順の添字で持つ（HIGH, MEDIUM, LOW の順）
+PRIORITY_NAMES = ("high", "medium", "low")
+_PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITY_NAMES)}
+
+# 日時は 1970-01-01 からのマイクロ秒で持つ
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+_MICROS_PER_DAY = 86_400_000_000
+_MICROS_PER_SECOND = 1_000_000
+# 時刻部分の "THH:MM:" と "SS" の表
+_CLOCK_MINUTES = tuple(f"T{h:02d}:{m:02d}:" for h in range(24) for m in range(60))
+_CLOCK_SECONDS = tuple(f"{s:02d}" for s in range(60))
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_fromisoformat = datetime.fromisoformat
+
+
+def decode_priority(text: str) -> int:
+    return _PRIORITY_CODES[text]
+
+
+def encode_priority(code: int) -> str:
+    return PRIORITY_NAMES[code]
+
+
+# 日付は種類が少ないので、変換結果を使い回す（同じ int オブジェクトを共有する）
+@lru_cache(maxsize=4096)
+def decode_date(text: str) -> int:
+    """YYYY-MM-DD を date.toordinal() の値にする。"""
+    return date.fromisoformat(text).toordinal()
+
+
+@lru_cache(maxsize=4096)
+def encode_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def datetime_to_micros(value: datetime) -> int:
+    # タイムゾーン付きの値はローカル時刻に直す（datetime.now() と同じ naive な値として持つ）
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _NAIVE_EPOCH) // _MICROSECOND
+
+
+def micros_to_datetime(micros: int) -> datetime:
+    return _NAIVE_EPOCH + timedelta(0, 0, micros)
+
+
+def decode_datetime(text: str) -> int:
+    """ISO 8601 の日時を 1970-01-01 からのマイクロ秒にする。"""
+    return datetime_to_micros(_fromisoformat(text))
+
+
+def encode_datetime(micros: int) -> str:
+    """decode_datetime の逆。datetime.isoformat() と同じ文字列を返す。"""
+    days, rest = divmod(micros, _MICROS_PER_DAY)
+    seconds, fraction = divmod(rest, _MICROS_PER_SECOND)
+    minute, second = divmod(seconds, 60)
+    text = encode_date(days + _EPOCH_DAY) + _CLOCK_MINUTES[minute] + _CLOCK_SECONDS[second]
+    return f"{text}.{fraction:06d}" if fraction else text
+
+
+def loads(data: bytes) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(records: list[dict[str, Any]], compact: bool = False) -> bytes:
+    if _orjson is not None:
+        payload: bytes = _orjson.dumps(records, option=0 if compact else _orjson.OPT_INDENT_2)
+        return payload
+    if compact:
+        return json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dumps_line(record: dict[str, Any]) -> bytes:
+    """1件を JSON Lines の1行（改行付き）にする。"""
+    if _orjson is not None:
+        line: bytes = _orjson.dumps(record, option=_orjson.OPT_APPEND_NEWLINE)
+        return line
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
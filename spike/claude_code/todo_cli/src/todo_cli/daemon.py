@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable
+
+import typer
+
+from todo_cli import display, main, profiling
+from todo_cli.client import recv_message, send_message
+from todo_cli.service import TaskService
+from todo_cli.sharding import open_repository
+
+
+class DaemonAlreadyRunningError(Exception):
+    pass
+
+
+class _Server:
+    def __init__(self, data_file: Path) -> None:
+        self._data_file = data_file
+        self._command = typer.main.get_command(main.app)
+
+    def _ensure_service(self) -> None:
+        # 直接モードの別プロセスによる書き込みは、TaskService がデータの版を見て読み直す
+        if main._service is None:
+            main._service = TaskService(open_repository(self._data_file))
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        argv = [str(arg) for arg in request.get("argv", [])]
+        # 常駐中は import 済みなので、--profile の startup は要求を受けた時点から数える
+        profiling.restart()
+        display.default_console().width = int(request.get("columns") or 80)
+        self._ensure_service()
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                self._command.main(args=argv, prog_name="todo", standalone_mode=True)
+                code = 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:  # noqa: BLE001 - デーモンを落とさずに利用者へ返す
+                print(f"Error: {e}", file=stderr)
+                code = 1
+                main._service = None
+
+        return {"code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _claim_socket(socket_path: Path) -> None:
+    if not socket_path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        socket_path.unlink(missing_ok=True)  # 異常終了したデーモンの残骸
+        return
+    finally:
+        probe.close()
+    raise DaemonAlreadyRunningError(f"デーモンは既に起動しています: {socket_path}")
+
+
+def serve(socket_path: Path, data_file: Path, on_ready: Callable[[], None] | None = None) -> None:
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    _claim_socket(socket_path)
+    server = _Server(data_file)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(str(socket_path))
+        os.chmod(socket_path, 0o600)
+        listener.listen()
+        if on_ready is not None:
+            on_ready()
+        while True:
+            conn, _ = listener.accept()
+            with conn:
+                try:
+                    request = recv_message(conn)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if request.get("shutdown"):
+                    send_message(conn, {"code": 0, "stdout": "", "stderr": ""})
+                    return
+                send_message(conn, server.handle(request))
+    finally:
+        listener.close()
+        main._service = None
+        socket_path.unlink(missing_ok=True)
@@ -1,22 +1,54 @@
 from __future__ import annotations
 
+import json
+import sys
+import unicodedata
+from collections.abc import Iterable
 from datetime import date
-
-from rich.console import Console
-from rich.table import Table
+from enum import Enum
+from typing import TYPE_CHECKING, TextIO
 
 from todo_cli.models import Task
 
-_DEFAULT_CONSOLE = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# rich の import と Console の生成は起動時間の大半を占めるため、初回出力まで遅らせる
+_DEFAULT_CONSOLE: Console | None = None
 
 _PRIORITY_LABEL = {"high": "高", "medium": "中", "low": "低"}
 
 
-def print_task_list(tasks: list[Task], console: Console = _DEFAULT_CONSOLE) -> None:
+class OutputFormat(str, Enum):
+    TABLE = "table"
+    PLAIN = "plain"
+    TSV = "tsv"
+    JSONL = "jsonl"
+
+
+# plain 形式の列幅（表示幅）。最後の「状態」列は埋めない
+_PLAIN_COLUMNS = (("ID", 8), ("タイトル", 40), ("優先度", 6), ("期限", 21), ("カテゴリ", 10))
+_ELLIPSIS = "…"
+
+
+def default_console() -> Console:
+    global _DEFAULT_CONSOLE
+    if _DEFAULT_CONSOLE is None:
+        from rich.console import Console
+
+        _DEFAULT_CONSOLE = Console()
+    return _DEFAULT_CONSOLE
+
+
+def print_task_list(tasks: list[Task], console: Console | None = None) -> None:
+    if console is None:
+        console = default_console()
     if not tasks:
         console.print("タスクがありません")
         return
 
+    from rich.table import Table
+
     table = Table(show_header=True, header_style="bold")
     table.add_column("ID", style="dim", width=8)
     table.add_column("タイトル")
@@ -28,12 +60,7 @@ def print_task_list(tasks: list[Task], console: Console = _DEFAULT_CONSOLE) -> N
     today = date.today()
 
     for task in tasks:
-        due_str = ""
-        if task.due_date:
-            due_str = task.due_date.isoformat()
-            if task.due_date < today:
-                due_str += " [期限切れ]"
-
+        due_str = _due_label(task, today)
         status = "完了" if task.done else "未完了"
         priority_label = _PRIORITY_LABEL.get(task.priority.value, task.priority.value)
 
@@ -49,7 +76,96 @@ def print_task_list(tasks: list[Task], console: Console = _DEFAULT_CONSOLE) -> N
     console.print(table)
 
 
-def print_task_detail(task: Task, console: Console = _DEFAULT_CONSOLE) -> None:
+def _cell_width(ch: str) -> int:
+    return 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+
+
+def _fit(text: str, width: int) -> str:
+    """表示幅 width に切り詰め、足りない分を空白で埋める。"""
+    if text.isascii() and len(text) <= width:
+        return text.ljust(width)
+    used = 0
+    for i, ch in enumerate(text):
+        w = _cell_width(ch)
+        if used + w > width:
+            # 省略記号の1桁を空けるため、入り切らなかった文字の直前から詰め直す
+            while used + len(_ELLIPSIS) > width:
+                i -= 1
+                used -= _cell_width(text[i])
+            return text[:i] + _ELLIPSIS + " " * (width - used - len(_ELLIPSIS))
+        used += w
+    return text + " " * (width - used)
+
+
+def _due_label(task: Task, today: date) -> str:
+    if task.due_date is None:
+        return ""
+    label = task.due_date.isoformat()
+    if task.due_date < today:
+        label += " [期限切れ]"
+    return label
+
+
+def _plain_row(cells: Iterable[str], status: str) -> str:
+    return " ".join(_fit(cell, width) for cell, (_, width) in zip(cells, _PLAIN_COLUMNS)) + " " + status
+
+
+def _tsv_field(value: str) -> str:
+    return value.replace("\t", " ").replace("\n", " ").replace("\r", " ")
+
+
+def stream_task_list(tasks: Iterable[Task], fmt: OutputFormat, out: TextIO | None = None) -> int:
+    """タスクを1行ずつ out（既定は標準出力）へ書き出し、書いた件数を返す。
+
+    table 形式と違い全体を組み立てて列幅を測ることはしないので、最初の行はすぐに出力され、
+    メモリ使用量も件数によらない。tasks はジェネレータでもよい。
+
+    - plain: 固定幅の列（見出し付き）。長いタイトルなどは「…」で切り詰める
+    - tsv: 完全なID・タイトル・優先度・期限・カテゴリ・完了(0/1) のタブ区切り（見出しなし）
+    - jsonl: 1行に1件、保存形式と同じ JSON オブジェクト
+    """
+    if fmt == OutputFormat.TABLE:
+        raise ValueError("table 形式は print_task_list で出力する")
+    if out is None:
+        out = sys.stdout
+    write = out.write
+    today = date.today()
+    count = 0
+
+    for task in tasks:
+        if fmt == OutputFormat.JSONL:
+            write(json.dumps(task.to_dict(), ensure_ascii=False) + "\n")
+        elif fmt == OutputFormat.TSV:
+            fields = (
+                task.id,
+                _tsv_field(task.title),
+                task.priority.value,
+                task.due_date.isoformat() if task.due_date else "",
+                _tsv_field(task.category or ""),
+                "1" if task.done else "0",
+            )
+            write("\t".join(fields) + "\n")
+        else:
+            if count == 0:
+                write(_plain_row((name for name, _ in _PLAIN_COLUMNS), "状態") + "\n")
+            cells = (
+                task.id[:8],
+                task.title,
+                _PRIORITY_LABEL.get(task.priority.value, task.priority.value),
+                _due_label(task, today),
+                task.category or "",
+            )
+            write(_plain_row(cells, "完了" if task.done else "未完了") + "\n")
+        count += 1
+
+    if count == 0 and fmt == OutputFormat.PLAIN:
+        write("タスクがありません\n")
+    return count
+
+
+def print_task_detail(task: Task, console: Console | None = None) -> None:
+    if console is None:
+        console = default_console()
     console.print(f"ID       : {task.id}")
     console.print(f"タイトル : {task.title}")
     console.print(f"優先度   : {task.priority.value}")
@@ -58,3 +174,5 @@ def print_task_detail(task: Task, console: Console = _DEFAULT_CONSOLE) -> None:
     console.print(f"状態     : {'完了' if task.done else '未完了'}")
     console.print(f"作成日時 : {task.created_at.isoformat()}")
     console.print(f"更新日時 : {task.updated_at.isoformat()}")
+    if task.deleted_at is not None:
+        console.print(f"削除日時 : {task.deleted_at.isoformat()}")
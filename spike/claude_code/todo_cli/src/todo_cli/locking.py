@@ -0,0 +1,168 @@
+"""データファイルの排他制御とアトミックな書き込み。
+
+ロックはデータファイルと同じディレクトリの `<name>.lock` に対する flock で取る。
+ロックファイルにはデータの版（書き込みのたびに 1 増える整数）を保存し、
+読み込み済みの一覧が古くなっていないかの確認に使う。
+同じスレッド内で同じファイルのロックを取り直した場合は、外側のロックをそのまま使う。
+ゴミ箱のような行単位のファイルは、置き換えずに append_durable で末尾に追記する。
+"""
+from __future__ import annotations
+
+import fcntl
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_local = threading.local()
+
+
+def lock_path(path: Path) -> Path:
+    """データファイルに対応するロックファイルのパスを返す。"""
+    return path.with_name(path.name + ".lock")
+
+
+class StoreLock:
+    """取得済みのロック。版の読み書きはロックファイルの先頭で行う。"""
+
+    def __init__(self, fd: int, shared: bool) -> None:
+        self._fd = fd
+        self.shared = shared
+
+    @property
+    def version(self) -> int:
+        return int(os.pread(self._fd, 32, 0) or b"0")
+
+    def bump(self) -> int:
+        if self.shared:
+            raise RuntimeError("cannot write under a shared lock")
+        version = self.version + 1
+        # 版は増える一方で桁数が減らないため、切り詰めずに先頭から上書きできる。
+        os.pwrite(self._fd, str(version).encode("ascii"), 0)
+        os.fsync(self._fd)
+        return version
+
+
+def _held() -> dict[str, StoreLock]:
+    if not hasattr(_local, "held"):
+        _local.held = {}
+    held: dict[str, StoreLock] = _local.held
+    return held
+
+
+@contextmanager
+def locked(path: Path, *, shared: bool = False) -> Iterator[StoreLock]:
+    """データファイルのロックを取る。既定は排他ロック、`shared=True` で共有ロック。"""
+    key = str(lock_path(path).absolute())
+    held = _held()
+    current = held.get(key)
+    if current is not None:
+        if current.shared and not shared:
+            raise RuntimeError("cannot upgrade a shared lock")
+        yield current
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = lock = StoreLock(fd, shared)
+        try:
+            yield lock
+        finally:
+            del held[key]
+    finally:
+        os.close(fd)
+
+
+def read_version(path: Path) -> int:
+    """ロックを取らずにデータファイルの版を返す（ロックファイルがなければ 0）。"""
+    try:
+        with lock_path(path).open("rb") as f:
+            return int(f.read(32) or b"0")
+    except FileNotFoundError:
+        return 0
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: Path, data: bytes) -> Path:
+    # 書き終えて fsync した一時ファイルを返す。呼び出し側が rename で path を置き換える
+    tmp = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+
+def _rename(tmp: Path, path: Path) -> None:
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def replace_file(path: Path, data: bytes) -> None:
+    """write_atomic と同じく置き換えるが、path のロックを取らず版も進めない。
+
+    別のファイルのロックで守られたファイル（分割したストアのカテゴリごとのファイル）に使う。
+    """
+    _rename(_write_temp(path, data), path)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """一時ファイルに書いて fsync し、版を進めてから rename で置き換える。
+
+    途中で落ちても元のファイルは壊れず、読み手は常に完全な内容を見る。
+    """
+    with locked(path) as lock:
+        tmp = _write_temp(path, data)
+        lock.bump()
+        _rename(tmp, path)
+
+
+def _last_line_end(fd: int, size: int) -> int:
+    # 末尾から 64KiB ずつ読み、最後の改行の直後の位置を返す（改行がなければ 0）
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        chunk = os.pread(fd, end - start, start)
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def append_durable(path: Path, data: bytes) -> None:
+    """行単位のファイルの末尾に data を追記して fsync し、版を進める。
+
+    前回の追記が途中で止まって末尾が改行で終わっていなければ、その不完全な行を切り詰めてから書く。
+    """
+    with locked(path) as lock:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o666)
+        try:
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                os.ftruncate(fd, _last_line_end(fd, size))
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        lock.bump()
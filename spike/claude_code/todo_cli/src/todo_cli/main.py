@@ -1,23 +1,52 @@
 from __future__ import annotations
 
-from datetime import date
+import os
+import sys
+from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
 
 import typer
 
-from todo_cli.display import print_task_detail, print_task_list
+from todo_cli import profiling
+from todo_cli.display import OutputFormat, print_task_detail, print_task_list, stream_task_list
 from todo_cli.models import Priority
-from todo_cli.repository import TaskRepository
-from todo_cli.service import SortKey, TaskNotFoundError, TaskService
+from todo_cli.sharding import open_repository, shard_dir, split_store
+from todo_cli.service import InvalidCursorError, SortKey, TaskNotFoundError, TaskService, encode_cursor
 
 app = typer.Typer(help="CLIタスク管理アプリ")
 
 _DATA_FILE = Path.home() / ".todo_cli" / "tasks.json"
 
+# デーモン実行中はタスク一覧とインデックスを保持したサービスを使い回す
+_service: TaskService | None = None
+
 
 def _get_service() -> TaskService:
-    return TaskService(TaskRepository(_DATA_FILE))
+    if _service is not None:
+        return _service
+    return TaskService(open_repository(_DATA_FILE))
+
+
+@app.callback()
+def _global_options(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="段階ごとの所要時間を標準エラーに出す"),
+    profile_trace: Optional[Path] = typer.Option(
+        None, "--profile-trace", help="段階ごとの所要時間を Chrome のトレース形式で書き出す（標準エラーには出さない）"
+    ),
+    profile_cprofile: Optional[Path] = typer.Option(
+        None, "--profile-cprofile", help="cProfile の統計をファイルに保存する"
+    ),
+) -> None:
+    """CLIタスク管理アプリ"""
+    if not (profile or profile_trace or profile_cprofile):
+        return
+    profiling.enable(profile_trace, profile_cprofile)
+    profiling.end_startup()
+    # コンテキストは後に登録したものから閉じるので、command を閉じてから結果を書き出す
+    ctx.call_on_close(profiling.finish)
+    ctx.with_resource(profiling.phase("command"))
 
 
 @app.command()
@@ -48,24 +77,60 @@ def list_tasks(
     category: Optional[str] = typer.Option(None, "--category", "-c", help="カテゴリで絞り込む"),
     overdue: bool = typer.Option(False, "--overdue", help="期限切れのみ表示"),
     sort: Optional[SortKey] = typer.Option(None, "--sort", "-s", help="並べ替え (priority/due-date/created-at)"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", min=0, help="表示する最大件数"),
+    offset: int = typer.Option(0, "--offset", min=0, help="先頭から読み飛ばす件数"),
+    after: Optional[str] = typer.Option(None, "--after", help="前のページの末尾に表示されたカーソルの続きから表示する"),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.TABLE, "--format", "-f", help="出力形式 (table/plain/tsv/jsonl)。table 以外は1行ずつ出力する"
+    ),
 ) -> None:
     """タスク一覧を表示する"""
     service = _get_service()
-    tasks = service.list_tasks(done=done, priority=priority, category=category, overdue=overdue, sort=sort)
-    print_task_list(tasks)
+    try:
+        tasks = service.list_tasks(
+            done=done,
+            priority=priority,
+            category=category,
+            overdue=overdue,
+            sort=sort,
+            limit=None if limit is None else offset + limit,
+            after=after,
+        )
+    except InvalidCursorError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    page = tasks[offset:] if offset else tasks
+    if output_format == OutputFormat.TABLE:
+        with profiling.phase("render"):
+            print_task_list(page)
+    else:
+        try:
+            with profiling.phase("render"):
+                stream_task_list(page, output_format)
+                sys.stdout.flush()
+        except BrokenPipeError:
+            # パイプの読み手（head など）が先に終了した。残りの出力は捨てて正常終了する
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return
+    if limit and len(page) == limit:
+        # 続きの取得方法はパイプを汚さないよう標準エラーに出す
+        typer.echo(f"続き: --after {encode_cursor(sort, page[-1])}", err=True)
 
 
 @app.command()
 def show(
     task_id: str = typer.Argument(..., help="タスクID"),
+    include_deleted: bool = typer.Option(False, "--include-deleted", help="削除済み（ゴミ箱）のタスクも探す"),
 ) -> None:
     """タスクの詳細を表示する"""
     service = _get_service()
-    task = service.get_task(task_id)
+    task = service.get_task(task_id, include_deleted=include_deleted)
     if task is None:
         typer.echo(f"Error: タスクID \"{task_id}\" が見つかりません", err=True)
         raise typer.Exit(1)
-    print_task_detail(task)
+    with profiling.phase("render"):
+        print_task_detail(task)
 
 
 @app.command()
@@ -122,6 +187,30 @@ def delete(
         raise typer.Exit(1)
 
 
+@app.command()
+def restore(
+    task_id: str = typer.Argument(..., help="タスクID"),
+) -> None:
+    """削除したタスクをゴミ箱から元に戻す"""
+    service = _get_service()
+    try:
+        task = service.restore_task(task_id)
+        typer.echo(f"元に戻しました: [{task.id[:8]}] {task.title}")
+    except TaskNotFoundError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@app.command()
+def purge(
+    older_than: int = typer.Option(..., "--older-than", min=0, help="削除してからこの日数以上たったタスクを消す"),
+) -> None:
+    """ゴミ箱のタスクを完全に削除する"""
+    service = _get_service()
+    count = service.purge_tasks(timedelta(days=older_than))
+    typer.echo(f"ゴミ箱から {count} 件のタスクを完全に削除しました")
+
+
 @app.command()
 def search(
     keyword: str = typer.Argument(..., help="検索キーワード"),
@@ -132,4 +221,42 @@ def search(
     if not tasks:
         typer.echo("該当するタスクが見つかりませんでした")
         return
-    print_task_list(tasks)
+    with profiling.phase("render"):
+        print_task_list(tasks)
+
+
+@app.command()
+def shard() -> None:
+    """タスクをカテゴリごとのファイルに分け、コマンドが使うカテゴリのファイルだけを読み書きするようにする"""
+    global _service
+    try:
+        task_count, shard_count = split_store(_DATA_FILE)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    # デーモンが保持しているサービスは分割前のデータファイルを見ているので、次の要求で開き直す
+    _service = None
+    typer.echo(f"{task_count} 件のタスクを {shard_count} 個のカテゴリ別ファイルに分けました: {shard_dir(_DATA_FILE)}")
+
+
+@app.command()
+def daemon(
+    stop: bool = typer.Option(False, "--stop", help="起動中のデーモンを停止する"),
+) -> None:
+    """常駐サーバを起動する（他のコマンドはUNIXソケット経由で転送される）"""
+    from todo_cli.client import SOCKET_PATH, forward
+
+    if stop:
+        if forward({"shutdown": True}, SOCKET_PATH) is None:
+            typer.echo("デーモンは起動していません")
+            return
+        typer.echo("デーモンを停止しました")
+        return
+
+    from todo_cli.daemon import DaemonAlreadyRunningError, serve
+
+    try:
+        serve(SOCKET_PATH, _DATA_FILE, on_ready=lambda: typer.echo(f"デーモンを起動しました: {SOCKET_PATH}"))
+    except DaemonAlreadyRunningError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import sys
 import uuid
-from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
 from typing import Any
 
+from todo_cli.codec import (
+    datetime_to_micros,
+    decode_date,
+    decode_datetime,
+    decode_priority,
+    encode_date,
+    encode_datetime,
+    encode_priority,
+    micros_to_datetime,
+)
+
 
 class Priority(str, Enum):
     HIGH = "high"
@@ -13,17 +24,130 @@ class Priority(str, Enum):
     LOW = "low"
 
 
-@dataclass
+# タスクは優先度を _PRIORITIES の添字で持つ（codec.PRIORITY_NAMES と同じ順）
+_PRIORITIES = tuple(Priority)
+
+
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
 class Task:
+    """タスク1件。
+
+    100万件を読み込んでも小さく済むよう __slots__ で属性を固定し、優先度は小さい整数、
+    日時はマイクロ秒、期限は date.toordinal() の整数で持つ。datetime / date / Priority への
+    変換は属性を読んだときに行う。カテゴリは種類が少ないので intern して同じ文字列を共有する。
+    """
+
+    __slots__ = ("id", "title", "done", "_priority", "_created", "_updated", "_due", "_category", "_deleted")
+
     id: str
     title: str
     done: bool
-    priority: Priority
-    created_at: datetime
-    updated_at: datetime
-    due_date: date | None = None
-    category: str | None = None
-    deleted_at: datetime | None = None
+    _priority: int
+    _created: int
+    _updated: int
+    _due: int | None
+    _category: str | None
+    _deleted: int | None
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        done: bool,
+        priority: Priority,
+        created_at: datetime,
+        updated_at: datetime,
+        due_date: date | None = None,
+        category: str | None = None,
+        deleted_at: datetime | None = None,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.done = done
+        self.priority = priority
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.due_date = due_date
+        self.category = category
+        self.deleted_at = deleted_at
+
+    @property
+    def priority(self) -> Priority:
+        return _PRIORITIES[self._priority]
+
+    @priority.setter
+    def priority(self, value: Priority) -> None:
+        self._priority = decode_priority(value)
+
+    @property
+    def created_at(self) -> datetime:
+        return micros_to_datetime(self._created)
+
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created = datetime_to_micros(value)
+
+    @property
+    def updated_at(self) -> datetime:
+        return micros_to_datetime(self._updated)
+
+    @updated_at.setter
+    def updated_at(self, value: datetime) -> None:
+        self._updated = datetime_to_micros(value)
+
+    @property
+    def due_date(self) -> date | None:
+        return None if self._due is None else date.fromordinal(self._due)
+
+    @due_date.setter
+    def due_date(self, value: date | None) -> None:
+        self._due = None if value is None else value.toordinal()
+
+    @property
+    def category(self) -> str | None:
+        return self._category
+
+    @category.setter
+    def category(self, value: str | None) -> None:
+        self._category = _intern(value)
+
+    @property
+    def deleted_at(self) -> datetime | None:
+        return None if self._deleted is None else micros_to_datetime(self._deleted)
+
+    @deleted_at.setter
+    def deleted_at(self, value: datetime | None) -> None:
+        self._deleted = None if value is None else datetime_to_micros(value)
+
+    # 並べ替え・絞り込み用。datetime / date を作らずに比較できる
+    @property
+    def created_micros(self) -> int:
+        return self._created
+
+    @property
+    def due_ordinal(self) -> int | None:
+        return self._due
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        return (
+            f"Task(id={self.id!r}, title={self.title!r}, done={self.done!r}, priority={self.priority!r}, "
+            f"created_at={self.created_at!r}, updated_at={self.updated_at!r}, due_date={self.due_date!r}, "
+            f"category={self.category!r}, deleted_at={self.deleted_at!r})"
+        )
+
+    def _astuple(self) -> tuple[Any, ...]:
+        return (
+            self.id, self.title, self.done, self._priority, self._created, self._updated,
+            self._due, self._category, self._deleted,
+        )
 
     @classmethod
     def create(
@@ -46,29 +170,37 @@ class Task:
             deleted_at=None,
         )
 
+    # 保存形式との変換。フィールドごとの変換は codec の関数を使う
     def to_dict(self) -> dict[str, Any]:
+        created = encode_datetime(self._created)
         return {
             "id": self.id,
             "title": self.title,
             "done": self.done,
-            "priority": self.priority.value,
-            "due_date": self.due_date.isoformat() if self.due_date else None,
-            "category": self.category,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None,
+            "priority": encode_priority(self._priority),
+            "due_date": None if self._due is None else encode_date(self._due),
+            "category": self._category,
+            "created_at": created,
+            "updated_at": created if self._updated == self._created else encode_datetime(self._updated),
+            "deleted_at": None if self._deleted is None else encode_datetime(self._deleted),
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Task:
-        return cls(
-            id=data["id"],
-            title=data["title"],
-            done=data["done"],
-            priority=Priority(data["priority"]),
-            due_date=date.fromisoformat(data["due_date"]) if data.get("due_date") else None,
-            category=data.get("category"),
-            created_at=datetime.fromisoformat(data["created_at"]),
-            updated_at=datetime.fromisoformat(data["updated_at"]),
-            deleted_at=datetime.fromisoformat(data["deleted_at"]) if data.get("deleted_at") else None,
-        )
+        # 読み込みは件数が多いので、__init__ のプロパティを通さずに直接スロットを埋める
+        task = cls.__new__(cls)
+        task.id = data["id"]
+        task.title = data["title"]
+        task.done = data["done"]
+        task._priority = decode_priority(data["priority"])
+        due = data.get("due_date")
+        task._due = decode_date(due) if due else None
+        category = data.get("category")
+        task._category = None if category is None else sys.intern(category)
+        created, updated = data["created_at"], data["updated_at"]
+        task._created = decode_datetime(created)
+        # 一度も変更されていないタスクは作成日時と同じ値なので、変換を省いて同じ int を共有する
+        task._updated = task._created if updated == created else decode_datetime(updated)
+        deleted = data.get("deleted_at")
+        task._deleted = decode_datetime(deleted) if deleted else None
+        return task
@@ -0,0 +1,161 @@
+"""1回のコマンド実行を段階ごとに計測する（既定では無効）。
+
+`todo --profile <コマンド>` で段階ごとの所要時間を標準エラーに出す。
+`--profile-trace FILE` は代わりに Chrome のトレース形式（Perfetto などで開ける）の JSON を書き、
+`--profile-cprofile FILE` は cProfile の統計も保存する。環境変数 TODO_PROFILE（1 なら標準エラー、
+それ以外はトレースの出力先）と TODO_PROFILE_CPROFILE は、client がこれらのオプションに変換する。
+
+段階は入れ子になる（command の中に load、load の中に parse と validate）。無効なときの
+phase() は使い回しの何もしないコンテキストマネージャを返すだけなので、計測箇所は残しておける。
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+PROFILE_ENV = "TODO_PROFILE"
+CPROFILE_ENV = "TODO_PROFILE_CPROFILE"
+
+# 起動の起点。client が最初に import するので、typer などの import 時間も含まれる
+_started = time.perf_counter()
+_OFF = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start: float
+    end: float = 0.0
+    children: float = 0.0  # 直下の段階に費やした時間
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    def __init__(self, trace_path: Path | None = None, cprofile_path: Path | None = None) -> None:
+        self.trace_path = trace_path
+        self.cprofile_path = cprofile_path
+        self.spans: list[Span] = []
+        self._open: list[Span] = []
+        self._cprofile: Any = None
+        if cprofile_path is not None:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        span = Span(name, len(self._open), time.perf_counter())
+        self.spans.append(span)
+        self._open.append(span)
+        try:
+            yield
+        finally:
+            span.end = time.perf_counter()
+            self._open.pop()
+            if self._open:
+                self._open[-1].children += span.duration
+
+    def end_startup(self) -> None:
+        self.spans.insert(0, Span("startup", 0, _started, time.perf_counter()))
+
+    def finish(self) -> None:
+        total = time.perf_counter() - _started
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.cprofile_path))
+        if self.trace_path is not None:
+            self.trace_path.write_text(json.dumps(self.trace()), encoding="utf-8")
+        else:
+            sys.stderr.write(self.summary(total))
+
+    def trace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start - _started) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": 0,
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self, total: float) -> str:
+        # 全角の見出しは2桁幅なので、数値の列の右端に揃うよう空白で詰める
+        lines = [f"{'profile (ms):':<33}合計{'':7}自身"]
+        for span in self.spans:
+            label = "  " * span.depth + span.name
+            lines.append(
+                f"  {label:<24} {span.duration * 1e3:>10.2f} "
+                f"{(span.duration - span.children) * 1e3:>10.2f}"
+            )
+        lines.append(f"  {'total':<24} {total * 1e3:>10.2f}")
+        return "\n".join(lines) + "\n"
+
+
+_active: Profiler | None = None
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+    """有効なときだけ、ブロックの所要時間を name の段階として記録する。"""
+    if _active is None:
+        return _OFF
+    return _active.span(name)
+
+
+def options_from_environment(environ: Mapping[str, str] = os.environ) -> list[str]:
+    """TODO_PROFILE / TODO_PROFILE_CPROFILE を同じ意味のコマンドラインオプションにする。
+
+    デーモンへ転送したコマンドでも効くよう、環境変数ではなくオプションとして渡す。
+    相対パスはデーモンの作業ディレクトリで解釈されないよう、ここで絶対パスにする。
+    """
+    options: list[str] = []
+    value = environ.get(PROFILE_ENV, "")
+    if value == "1":
+        options.append("--profile")
+    elif value not in ("", "0"):
+        options += ["--profile-trace", str(Path(value).resolve())]
+    cprofile = environ.get(CPROFILE_ENV)
+    if cprofile:
+        options += ["--profile-cprofile", str(Path(cprofile).resolve())]
+    return options
+
+
+def restart() -> None:
+    """起動の起点を今にする。常駐プロセスが要求ごとに計測し直すときに使う。"""
+    global _started
+    _started = time.perf_counter()
+
+
+def enable(trace_path: Path | None = None, cprofile_path: Path | None = None) -> None:
+    global _active
+    _active = Profiler(trace_path, cprofile_path)
+
+
+def end_startup() -> None:
+    """起点から今までを startup の段階として記録する。"""
+    if _active is not None:
+        _active.end_startup()
+
+
+def finish() -> None:
+    """計測を終えて結果を書き出す。無効なら何もしない。"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.finish()
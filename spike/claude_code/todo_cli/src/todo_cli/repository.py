@@ -1,23 +1,89 @@
 from __future__ import annotations
 
-import json
+import os
+from collections.abc import Collection
+from contextlib import AbstractContextManager
 from pathlib import Path
 
+from todo_cli import codec
+from todo_cli.locking import StoreLock, append_durable, locked, read_version, write_atomic
 from todo_cli.models import Task
+from todo_cli.profiling import phase
+
+# 1 にすると改行・インデントなしの JSON で保存する（読み込みはどちらの形でもできる）
+COMPACT_ENV = "TODO_COMPACT_JSON"
+
+
+def trash_path(path: Path) -> Path:
+    """削除したタスクを置くゴミ箱のパスを返す（tasks.json なら tasks.trash.jsonl）。"""
+    return path.with_name(path.stem + ".trash.jsonl")
 
 
 class TaskRepository:
-    def __init__(self, path: Path) -> None:
+    """タスクの保存先。
+
+    削除していないタスクはデータファイル（JSON）に、削除したタスクはゴミ箱（1行1件の JSON Lines）に
+    分けて置く。一覧・検索などはデータファイルだけを読み、ゴミ箱を読むのは復元・削除済みの表示・
+    完全削除のときだけ。ゴミ箱への移動は追記で済ませる。
+    """
+
+    # カテゴリごとのファイルに分けて保存するか。True なら load_category はそのカテゴリの
+    # ファイルだけを読み、save は categories に挙げたカテゴリのファイルだけを書き直す
+    sharded = False
+
+    def __init__(self, path: Path, compact: bool | None = None) -> None:
         self._path = path
+        self._trash = trash_path(path)
+        self._compact = os.environ.get(COMPACT_ENV) == "1" if compact is None else compact
 
     def load(self) -> list[Task]:
         if not self._path.exists():
             return []
-        with self._path.open(encoding="utf-8") as f:
-            data: list[dict[str, object]] = json.load(f)
-        return [Task.from_dict(d) for d in data]
-
-    def save(self, tasks: list[Task]) -> None:
-        self._path.parent.mkdir(parents=True, exist_ok=True)
-        with self._path.open("w", encoding="utf-8") as f:
-            json.dump([t.to_dict() for t in tasks], f, ensure_ascii=False, indent=2)
+        with phase("load"):
+            with phase("parse"):
+                with locked(self._path, shared=True):
+                    raw = self._path.read_bytes()
+                data: list[dict[str, object]] = codec.loads(raw)
+            with phase("validate"):
+                return [Task.from_dict(d) for d in data]
+
+    def load_category(self, category: str | None) -> list[Task]:
+        """カテゴリが category のタスクを、load と同じ順に返す。"""
+        return [task for task in self.load() if task.category == category]
+
+    def save(self, tasks: list[Task], categories: Collection[str | None] | None = None) -> None:
+        """tasks を保存する。categories は前回の保存から変わったタスクのカテゴリ（None なら不明）。
+
+        categories を挙げる場合、tasks はそのカテゴリのタスクをすべて含むこと。1つのファイルに
+        保存する場合は使わず、常に tasks 全体を書く。
+        """
+        with phase("save"):
+            payload = codec.dumps([t.to_dict() for t in tasks], compact=self._compact)
+            write_atomic(self._path, payload)
+
+    def load_trash(self) -> list[Task]:
+        """ゴミ箱のタスクを返す。同じ ID が複数あれば後から追記したものを使う。"""
+        if not self._trash.exists():
+            return []
+        with phase("load"):
+            with locked(self._trash, shared=True):
+                raw = self._trash.read_bytes()
+            # 改行で終わっていない最後の行は、追記の途中で止まった書きかけなので読まない
+            lines = raw.split(b"\n")[:-1]
+            tasks = (Task.from_dict(codec.loads(line)) for line in lines if line)
+            return list({task.id: task for task in tasks}.values())
+
+    def append_trash(self, tasks: list[Task]) -> None:
+        with phase("save"):
+            append_durable(self._trash, b"".join(codec.dumps_line(t.to_dict()) for t in tasks))
+
+    def save_trash(self, tasks: list[Task]) -> None:
+        with phase("save"):
+            write_atomic(self._trash, b"".join(codec.dumps_line(t.to_dict()) for t in tasks))
+
+    def locked(self, shared: bool = False) -> AbstractContextManager[StoreLock]:
+        # 読み込み→変更→保存を他のプロセスと直列化する
+        return locked(self._path, shared=shared)
+
+    def version(self) -> int:
+        return read_version(self._path)
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
-from datetime import date, datetime
+import base64
+import heapq
+import json
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from enum import Enum
+from itertools import islice
+from operator import itemgetter
+from typing import Any, TypeVar
 
 from todo_cli.models import Priority, Task
 from todo_cli.repository import TaskRepository
@@ -11,18 +21,372 @@ class TaskNotFoundError(Exception):
     pass
 
 
+class AmbiguousTaskIdError(TaskNotFoundError):
+    pass
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
 class SortKey(str, Enum):
     PRIORITY = "priority"
     DUE_DATE = "due-date"
     CREATED_AT = "created-at"
 
 
+# display.print_task_list shows this many leading characters of each ID.
+ID_PREFIX_LENGTH = 8
+
 _PRIORITY_ORDER = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
+_NO_DUE_DATE = date.max.toordinal()
+
+# 並べ替えキー, 作成日時（マイクロ秒）, ID。同じキー同士は作成日時、ID の順に並ぶ。
+# ID は一意なので、カーソルのタスクが削除されても次のページの位置が決まる
+_Entry = tuple[tuple[Any, ...], int, str]
+
+
+def _sort_key(sort: SortKey, task: Task) -> tuple[Any, ...]:
+    # 日付は Task が持つ整数のまま比べる（date / datetime を作らない）
+    if sort == SortKey.PRIORITY:
+        return (_PRIORITY_ORDER[task.priority],)
+    if sort == SortKey.DUE_DATE:
+        due = task.due_ordinal
+        return (due is None, _NO_DUE_DATE if due is None else due)
+    return (task.created_micros,)
+
+
+@dataclass(frozen=True)
+class _Cursor:
+    """前のページの最後のタスクの並べ替えキー・作成日時・ID。次のページはこれより後から始まる。
+
+    並べ替えなしの一覧は読み込み順に並ぶので、カーソルのタスクの読み込み順の次から再開する。
+    そのタスクが削除されて読み込み順がわからなければ、(作成日時, ID) がそれより後ろのタスクから
+    再開する。add は末尾に追加するので、復元して末尾に戻したタスクを除けば読み込み順と一致する。
+    """
+
+    key: tuple[Any, ...]
+    created_micros: int
+    task_id: str
+
+    @property
+    def entry(self) -> _Entry:
+        return (self.key, self.created_micros, self.task_id)
+
+    def precedes(self, task: Task) -> bool:
+        """(作成日時, ID) で task がカーソルより後ろか。"""
+        return (task.created_micros, task.id) > (self.created_micros, self.task_id)
+
+
+def _page_key(sort: SortKey | None, task: Task) -> tuple[Any, ...]:
+    return () if sort is None else _sort_key(sort, task)
+
+
+def _entry(sort: SortKey, task: Task) -> _Entry:
+    return (_sort_key(sort, task), task.created_micros, task.id)
+
+
+def encode_cursor(sort: SortKey | None, task: Task) -> str:
+    """task の次から一覧を再開するためのカーソル（URL安全な文字列）を返す。"""
+    key = list(_page_key(sort, task))
+    payload = json.dumps(
+        [sort.value if sort is not None else None, key, task.created_micros, task.id], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: SortKey | None) -> _Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, key, created_micros, task_id = json.loads(raw)
+        if sort_value != (sort.value if sort is not None else None):
+            raise InvalidCursorError("カーソルは別の並べ替えで作られたものです")
+        if sort == SortKey.PRIORITY:
+            parsed: tuple[Any, ...] = (int(key[0]),)
+        elif sort == SortKey.DUE_DATE:
+            parsed = (bool(key[0]), int(key[1]))
+        elif sort == SortKey.CREATED_AT:
+            parsed = (int(key[0]),)
+        else:
+            parsed = ()
+        return _Cursor(parsed, int(created_micros), str(task_id))
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError, IndexError) as e:
+        raise InvalidCursorError(f"カーソルが不正です: {cursor}") from e
+
+
+_T = TypeVar("_T")
+
+
+def _identity(item: _T) -> _T:
+    return item
+
+
+def _smallest(items: Iterable[_T], limit: int | None, key: Callable[[_T], Any]) -> list[_T]:
+    # 件数に上限があればヒープで上位 limit 件だけを選ぶ（全件の並べ替え O(n log n) ではなく O(n log k)）
+    if limit is None:
+        return sorted(items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
+
+
+def _scan(
+    tasks: list[Task],
+    done: bool | None,
+    priority: Priority | None,
+    category: str | None,
+    overdue: bool,
+    sort: SortKey | None,
+    limit: int | None = None,
+    after: _Cursor | None = None,
+) -> list[Task]:
+    selected: Iterable[Task] = tasks
+    if after is not None and sort is None:
+        last = next((i for i, t in enumerate(tasks) if t.id == after.task_id), None)
+        if last is None:
+            selected = (t for t in selected if after.precedes(t))
+        else:
+            selected = islice(tasks, last + 1, None)
+
+    if done is not None:
+        selected = (t for t in selected if t.done == done)
+    if priority is not None:
+        selected = (t for t in selected if t.priority == priority)
+    if category is not None:
+        selected = (t for t in selected if t.category == category)
+    if overdue:
+        today = date.today().toordinal()
+        selected = (t for t in selected if t.due_ordinal is not None and t.due_ordinal < today)
+
+    if sort is None:
+        return list(islice(selected, limit))
+    entries: Iterable[tuple[_Entry, Task]] = ((_entry(sort, t), t) for t in selected)
+    if after is not None:
+        bound = after.entry
+        entries = (e for e in entries if e[0] > bound)
+    return [t for _, t in _smallest(entries, limit, key=itemgetter(0))]
+
+
+class _ListViews:
+    """list_tasks 用の二次インデックス。
+
+    done/priority/category の値ごとの ID 集合と、並べ替えキーごとの整列済みリストを持つ。
+    どちらも初めて使われたときに作り、以降はタスクの変更に合わせて差分更新する。
+    """
+
+    _FIELDS = ("done", "priority", "category")
+
+    def __init__(self, by_id: dict[str, Task]) -> None:
+        self._by_id = by_id
+        self._seq = {task_id: i for i, task_id in enumerate(by_id)}
+        self._buckets: dict[str, dict[Any, set[str]]] = {}
+        self._ordered: dict[SortKey, list[_Entry]] = {}
+
+    def _follows(self, after: _Cursor) -> Callable[[Task], bool]:
+        # 並べ替えなしの一覧で、タスクがカーソルより後ろにあるか。_seq は削除したタスクの分も
+        # 残しているので、インデックスを作ってから削除されたカーソルのタスクも読み込み順で比べる
+        last = self._seq.get(after.task_id)
+        if last is None:
+            return after.precedes
+        return lambda task: self._seq[task.id] > last
+
+    def _bucket(self, field: str) -> dict[Any, set[str]]:
+        buckets = self._buckets.get(field)
+        if buckets is None:
+            buckets = {}
+            for task in self._by_id.values():
+                buckets.setdefault(getattr(task, field), set()).add(task.id)
+            self._buckets[field] = buckets
+        return buckets
+
+    def _order(self, sort: SortKey) -> list[_Entry]:
+        ordered = self._ordered.get(sort)
+        if ordered is None:
+            ordered = sorted(_entry(sort, task) for task in self._by_id.values())
+            self._ordered[sort] = ordered
+        return ordered
+
+    def add(self, task: Task) -> None:
+        self._seq.setdefault(task.id, len(self._seq))
+        for field, buckets in self._buckets.items():
+            buckets.setdefault(getattr(task, field), set()).add(task.id)
+        for sort, ordered in self._ordered.items():
+            insort(ordered, _entry(sort, task))
+
+    def remove(self, task: Task) -> None:
+        """タスクを外す。変更前の値で探すため、タスクを書き換える前に呼ぶこと。"""
+        for field, buckets in self._buckets.items():
+            ids = buckets[getattr(task, field)]
+            ids.discard(task.id)
+            if not ids:
+                del buckets[getattr(task, field)]
+        for sort, ordered in self._ordered.items():
+            del ordered[bisect_left(ordered, _entry(sort, task))]
+
+    def query(
+        self,
+        done: bool | None,
+        priority: Priority | None,
+        category: str | None,
+        overdue: bool,
+        sort: SortKey | None,
+        limit: int | None = None,
+        after: _Cursor | None = None,
+    ) -> list[Task]:
+        sets: list[set[str]] = []
+        for field, value in (("done", done), ("priority", priority), ("category", category)):
+            if value is not None:
+                sets.append(self._bucket(field).get(value, set()))
+        if overdue:
+            by_due = self._order(SortKey.DUE_DATE)
+            end = bisect_left(by_due, (False, date.today().toordinal()), key=itemgetter(0))
+            sets.append({entry[2] for entry in by_due[:end]})
+
+        candidates: set[str] | None = None
+        if sets:
+            sets.sort(key=len)
+            candidates = sets[0].intersection(*sets[1:])
+
+        if sort is None:
+            if candidates is None:
+                tasks: Iterator[Task] = iter(self._by_id.values())
+                if after is not None:
+                    tasks = filter(self._follows(after), tasks)
+                return list(islice(tasks, limit))
+            if after is not None:
+                follows = self._follows(after)
+                candidates = {i for i in candidates if follows(self._by_id[i])}
+            ids = _smallest(candidates, limit, key=self._seq.__getitem__)
+        elif candidates is not None and len(candidates) * 16 < len(self._by_id):
+            # 絞り込み結果が十分小さければ、整列済みリストを歩くより直接並べ替える方が速い
+            entries: Iterable[_Entry] = (_entry(sort, self._by_id[i]) for i in candidates)
+            if after is not None:
+                bound = after.entry
+                entries = (e for e in entries if e > bound)
+            ids = [entry[2] for entry in _smallest(entries, limit, key=_identity)]
+        else:
+            ordered = self._order(sort)
+            start = 0 if after is None else bisect_right(ordered, after.entry)
+            walk = (ordered[i][2] for i in range(start, len(ordered)))
+            if candidates is not None:
+                walk = (task_id for task_id in walk if task_id in candidates)
+            ids = list(islice(walk, limit))
+        return [self._by_id[task_id] for task_id in ids]
 
 
 class TaskService:
+    """タスクの操作。
+
+    読み込んだ一覧（_tasks）は削除していないタスクだけを持つ。削除したタスクはゴミ箱に移し、
+    復元・削除済みの表示・完全削除のときだけゴミ箱を読む。ゴミ箱へは先に追記してから
+    データファイルを保存するので、途中で落ちても両方に残るだけで消えはしない。両方にあるタスクは
+    データファイルの方を正とする。
+
+    分割したストア（repo.sharded）では、保存は前回の保存から変わったタスクのカテゴリ（_touched）の
+    ファイルだけを書き直す。まだ何も読み込んでいなければ、カテゴリを指定した一覧と追加は
+    そのカテゴリのファイルだけを読む。
+    """
+
     def __init__(self, repo: TaskRepository) -> None:
         self._repo = repo
+        self._tasks: list[Task] | None = None
+        # 以前の形式のデータファイルに残っていた削除済みタスク。次の保存でゴミ箱に移す
+        self._trash_pending: list[Task] = []
+        self._touched: set[str | None] = set()
+        self._by_id: dict[str, Task] = {}
+        self._by_prefix: dict[str, list[Task]] = {}
+        self._views: _ListViews | None = None
+        self._listed = False
+        self._version = 0
+
+    def _stale(self) -> bool:
+        # 他のプロセスが書き込んでいれば版が進んでいるので、読み込み済みの一覧は使えない
+        return self._tasks is None or self._repo.version() != self._version
+
+    def _load(self) -> list[Task]:
+        if self._tasks is not None and not self._stale():
+            return self._tasks
+        with self._repo.locked(shared=True) as lock:
+            self._version = lock.version
+            loaded = self._repo.load()
+        self._tasks = [task for task in loaded if task.deleted_at is None]
+        self._trash_pending = [task for task in loaded if task.deleted_at is not None]
+        self._by_id = {}
+        self._by_prefix = {}
+        self._views = None
+        self._listed = False
+        for task in self._tasks:
+            self._index(task)
+        return self._tasks
+
+    def _save(self) -> None:
+        # 呼び出し側で排他ロックを取り、_load で最新の一覧に揃えてから変更していること
+        with self._repo.locked() as lock:
+            tasks = self._load()
+            if self._trash_pending:
+                self._repo.append_trash(self._trash_pending)
+                self._touched.update(t.category for t in self._trash_pending)
+                self._trash_pending = []
+            self._repo.save(tasks, self._touched)
+            self._touched = set()
+            self._version = lock.version
+
+    def _load_trash(self) -> list[Task]:
+        # データファイルにもあるタスクは、復元の途中で止まった残りなので除く
+        self._load()
+        trash = [t for t in self._repo.load_trash() if t.id not in self._by_id]
+        known = {t.id for t in trash}
+        return trash + [t for t in self._trash_pending if t.id not in known]
+
+    def _index(self, task: Task) -> None:
+        self._by_id[task.id] = task
+        self._by_prefix.setdefault(task.id[:ID_PREFIX_LENGTH], []).append(task)
+        if self._views is not None:
+            self._views.add(task)
+
+    def _unindex(self, task: Task) -> None:
+        if self._views is not None:
+            self._views.remove(task)
+        del self._by_id[task.id]
+        prefix = task.id[:ID_PREFIX_LENGTH]
+        siblings = [t for t in self._by_prefix[prefix] if t.id != task.id]
+        if siblings:
+            self._by_prefix[prefix] = siblings
+        else:
+            del self._by_prefix[prefix]
+
+    @contextmanager
+    def _reindexing(self, task: Task) -> Iterator[None]:
+        # 一覧用インデックスから変更前の値で外し、変更後の値で入れ直す
+        if self._views is not None:
+            self._views.remove(task)
+        yield
+        if self._views is not None:
+            self._views.add(task)
+
+    def _find(self, task_id: str) -> Task:
+        self._load()
+        task = self._by_id.get(task_id)
+        if task is not None:
+            return task
+        if len(task_id) == ID_PREFIX_LENGTH:
+            candidates = self._by_prefix.get(task_id, [])
+            if len(candidates) == 1:
+                return candidates[0]
+            if candidates:
+                raise AmbiguousTaskIdError(f"タスクID \"{task_id}\" に一致するタスクが複数あります")
+        raise TaskNotFoundError(f"タスクID \"{task_id}\" が見つかりません")
+
+    def _find_deleted(self, task_id: str, trash: list[Task]) -> Task:
+        # ゴミ箱は索引を持たないので、ID・短縮 ID とも順に探す
+        found = [t for t in trash if t.id == task_id]
+        if not found and len(task_id) == ID_PREFIX_LENGTH:
+            found = [t for t in trash if t.id.startswith(task_id)]
+        if len(found) == 1:
+            return found[0]
+        if found:
+            raise AmbiguousTaskIdError(f"タスクID \"{task_id}\" に一致するタスクが複数あります")
+        raise TaskNotFoundError(f"タスクID \"{task_id}\" が見つかりません")
 
     def add_task(
         self,
@@ -31,10 +395,16 @@ class TaskService:
         due_date: date | None = None,
         category: str | None = None,
     ) -> Task:
-        tasks = self._repo.load()
         task = Task.create(title=title, priority=priority, due_date=due_date, category=category)
-        tasks.append(task)
-        self._repo.save(tasks)
+        with self._repo.locked():
+            if self._repo.sharded and self._stale():
+                # 追加先のカテゴリのファイルだけを読んで書き直す（読み込み済みの一覧は次に使うときに読み直す）
+                self._repo.save(self._repo.load_category(category) + [task], {category})
+                return task
+            self._load().append(task)
+            self._index(task)
+            self._touched.add(category)
+            self._save()
         return task
 
     def list_tasks(
@@ -44,43 +414,50 @@ class TaskService:
         category: str | None = None,
         overdue: bool = False,
         sort: SortKey | None = None,
+        limit: int | None = None,
+        after: str | None = None,
     ) -> list[Task]:
-        tasks = [t for t in self._repo.load() if t.deleted_at is None]
-
-        if done is not None:
-            tasks = [t for t in tasks if t.done == done]
-        if priority is not None:
-            tasks = [t for t in tasks if t.priority == priority]
-        if category is not None:
-            tasks = [t for t in tasks if t.category == category]
-        if overdue:
-            today = date.today()
-            tasks = [t for t in tasks if t.due_date is not None and t.due_date < today]
+        """絞り込み・並べ替えたタスクを返す。
 
-        if sort == SortKey.PRIORITY:
-            tasks.sort(key=lambda t: _PRIORITY_ORDER[t.priority])
-        elif sort == SortKey.DUE_DATE:
-            tasks.sort(key=lambda t: (t.due_date is None, t.due_date))
-        elif sort == SortKey.CREATED_AT:
-            tasks.sort(key=lambda t: t.created_at)
+        limit を指定すると先頭から最大 limit 件だけを選び、after には前のページの最後のタスクから
+        encode_cursor で作ったカーソルを渡すと、その続きから返す。
+        """
+        cursor = None if after is None else _decode_cursor(after, sort)
+        if category is not None and self._repo.sharded and self._stale():
+            # そのカテゴリのファイルだけを読む。読み込み順の中でのカテゴリ内の順は変わらない
+            with self._repo.locked(shared=True):
+                selected = [t for t in self._repo.load_category(category) if t.deleted_at is None]
+            return _scan(selected, done, priority, None, overdue, sort, limit, cursor)
+        tasks = self._load()
+        if self._views is None:
+            # インデックスの構築は全件走査の数倍かかるので、1回しか一覧を出さない
+            # 単発のコマンドでは作らず、同じサービスで2回目の一覧から使う（デーモンなど）
+            if not self._listed:
+                self._listed = True
+                return _scan(tasks, done, priority, category, overdue, sort, limit, cursor)
+            self._views = _ListViews(self._by_id)
+        return self._views.query(done, priority, category, overdue, sort, limit, cursor)
 
-        return tasks
-
-    def get_task(self, task_id: str) -> Task | None:
-        for task in self._repo.load():
-            if task.id == task_id and task.deleted_at is None:
-                return task
-        return None
+    def get_task(self, task_id: str, include_deleted: bool = False) -> Task | None:
+        try:
+            return self._find(task_id)
+        except TaskNotFoundError:
+            if not include_deleted:
+                return None
+        try:
+            return self._find_deleted(task_id, self._load_trash())
+        except TaskNotFoundError:
+            return None
 
     def complete_task(self, task_id: str) -> Task:
-        tasks = self._repo.load()
-        for task in tasks:
-            if task.id == task_id and task.deleted_at is None:
+        with self._repo.locked():
+            task = self._find(task_id)
+            self._touched.add(task.category)
+            with self._reindexing(task):
                 task.done = True
                 task.updated_at = datetime.now()
-                self._repo.save(tasks)
-                return task
-        raise TaskNotFoundError(f"タスクID \"{task_id}\" が見つかりません")
+            self._save()
+        return task
 
     def edit_task(
         self,
@@ -90,9 +467,10 @@ class TaskService:
         due_date: date | None = None,
         category: str | None = None,
     ) -> Task:
-        tasks = self._repo.load()
-        for task in tasks:
-            if task.id == task_id and task.deleted_at is None:
+        with self._repo.locked():
+            task = self._find(task_id)
+            self._touched.add(task.category)
+            with self._reindexing(task):
                 if title is not None:
                     task.title = title
                 if priority is not None:
@@ -102,22 +480,53 @@ class TaskService:
                 if category is not None:
                     task.category = category
                 task.updated_at = datetime.now()
-                self._repo.save(tasks)
-                return task
-        raise TaskNotFoundError(f"タスクID \"{task_id}\" が見つかりません")
+            self._touched.add(task.category)
+            self._save()
+        return task
 
     def delete_task(self, task_id: str) -> Task:
-        tasks = self._repo.load()
-        for task in tasks:
-            if task.id == task_id and task.deleted_at is None:
-                task.deleted_at = datetime.now()
-                task.updated_at = datetime.now()
-                self._repo.save(tasks)
-                return task
-        raise TaskNotFoundError(f"タスクID \"{task_id}\" が見つかりません")
+        with self._repo.locked():
+            task = self._find(task_id)
+            self._unindex(task)
+            task.deleted_at = datetime.now()
+            task.updated_at = datetime.now()
+            tasks = self._load()
+            del tasks[next(i for i, t in enumerate(tasks) if t is task)]
+            self._touched.add(task.category)
+            self._trash_pending.append(task)
+            self._save()
+        return task
+
+    def restore_task(self, task_id: str) -> Task:
+        """ゴミ箱のタスクを一覧の末尾に戻す。"""
+        with self._repo.locked():
+            task = self._find_deleted(task_id, self._load_trash())
+            self._trash_pending = [t for t in self._trash_pending if t is not task]
+            task.deleted_at = None
+            task.updated_at = datetime.now()
+            self._load().append(task)
+            # 一覧用インデックスの読み込み順が変わるので、次の一覧で作り直す
+            self._views = None
+            self._index(task)
+            self._touched.add(task.category)
+            # データファイルに戻してから、ゴミ箱を書き直す（戻したタスクは _load_trash が除く）
+            self._save()
+            self._repo.save_trash(self._load_trash())
+        return task
+
+    def purge_tasks(self, older_than: timedelta) -> int:
+        """削除してから older_than 以上たったタスクをゴミ箱から消し、消した件数を返す。"""
+        with self._repo.locked():
+            self._load()
+            if self._trash_pending:
+                self._save()
+            trash = self._load_trash()
+            cutoff = datetime.now() - older_than
+            kept = [t for t in trash if t.deleted_at is None or t.deleted_at > cutoff]
+            if len(kept) < len(trash):
+                self._repo.save_trash(kept)
+        return len(trash) - len(kept)
 
     def search_tasks(self, keyword: str) -> list[Task]:
-        return [
-            t for t in self._repo.load()
-            if t.deleted_at is None and keyword.lower() in t.title.lower()
-        ]
+        keyword = keyword.lower()
+        return [t for t in self._load() if keyword in t.title.lower()]
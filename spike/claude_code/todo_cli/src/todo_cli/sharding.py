@@ -0,0 +1,217 @@
+"""タスクをカテゴリごとのファイルに分けて保存するストア。
+
+`todo shard` で、データファイル tasks.json を隣のディレクトリ tasks.d/ に分割する。
+
+    tasks.d/manifest.json      {"generation": 7, "next_seq": 120, "shards": [{"category": "仕事", "file": "<hash>-7.json"}, ...]}
+    tasks.d/<hash>-7.json      1つのカテゴリのタスク（tasks.json と同じ形式に、通し番号 "seq" を加えたもの）
+
+カテゴリなしのタスクは uncategorized-<世代>.json に置く。1つのカテゴリの一覧はそのファイルだけを読み、
+変更は変わったカテゴリのファイルだけを書き直す。ゴミ箱は分割せず、tasks.trash.jsonl のまま使う。
+
+通し番号は1つのファイルだったときの並び（読み込み順）での位置で、追加と復元のたびに next_seq から
+新しい番号を振る（復元したタスクは一覧の末尾に戻る）。カテゴリを変えても番号は変わらない。
+各ファイルは番号順に並べ、全カテゴリを読むときは番号順に併合する。
+
+保存では、変わったカテゴリのファイルを次の世代の名前で書いてから manifest.json を置き換える。
+この置き換えが確定点で、どの時点で落ちても前の manifest と、それが指すファイルは残っている。
+新しい manifest が指さなくなったファイルは、その後で消す。
+
+ロックと版は manifest.json のロックファイル（manifest.json.lock）で扱う。書き込みは保存の間ずっと
+排他ロックを、読み込みは共有ロックを取るので、読み手が消されたファイルや2回の保存が混ざったものを見ることはない。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable, Collection, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, TypeVar
+
+from todo_cli import codec
+from todo_cli.locking import StoreLock, locked, read_version, replace_file, write_atomic
+from todo_cli.models import Task
+from todo_cli.profiling import phase
+from todo_cli.repository import TaskRepository
+
+MANIFEST_NAME = "manifest.json"
+
+# カテゴリ → そのカテゴリのタスクを置くファイル名
+_Shards = dict[str | None, str]
+_T = TypeVar("_T")
+
+
+def shard_dir(path: Path) -> Path:
+    """データファイルを分割した形を置くディレクトリを返す（tasks.json なら tasks.d）。"""
+    return path.with_suffix(".d")
+
+
+def manifest_path(path: Path) -> Path:
+    return shard_dir(path) / MANIFEST_NAME
+
+
+def is_sharded(path: Path) -> bool:
+    return manifest_path(path).exists()
+
+
+def _read_manifest(path: Path) -> tuple[int, int, _Shards]:
+    """世代、次に振る通し番号と、カテゴリ → ファイル名の対応を返す（manifest がなければ空）。"""
+    if not path.exists():
+        return 0, 0, {}
+    data = json.loads(path.read_bytes())
+    shards = {entry["category"]: entry["file"] for entry in data["shards"]}
+    return data["generation"], data["next_seq"], shards
+
+
+def _shard_name(category: str | None, generation: int) -> str:
+    if category is None:
+        return f"uncategorized-{generation}.json"
+    # カテゴリ名にはどんな文字でも使え、大文字小文字だけが違うこともあるので、ハッシュを名前にする
+    digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}-{generation}.json"
+
+
+def _read_shard(path: Path) -> tuple[list[Task], list[int]]:
+    data: list[dict[str, Any]] = codec.loads(path.read_bytes())
+    return [Task.from_dict(d) for d in data], [d["seq"] for d in data]
+
+
+class ShardedTaskRepository(TaskRepository):
+    """カテゴリごとのファイルに分けたストア。TaskRepository と同じ操作を、必要なファイルだけで行う。
+
+    読み込んだタスクの通し番号を覚えておき、保存ではそれを書き戻す。覚えていないタスク
+    （追加・復元したもの）には新しい番号を振る。全カテゴリを読むときは、ファイルをスレッドプールで
+    並行して読む（max_workers はスレッド数、None なら ThreadPoolExecutor の既定）。
+    """
+
+    sharded = True
+
+    def __init__(self, path: Path, compact: bool | None = None, max_workers: int | None = None) -> None:
+        super().__init__(path, compact)
+        self._root = shard_dir(path)
+        self._manifest = self._root / MANIFEST_NAME
+        self._max_workers = max_workers
+        # カテゴリ → そのファイルから読んだ（または書いた）タスクと通し番号。保存で番号を引く
+        self._read: dict[str | None, tuple[list[Task], list[int]]] = {}
+
+    def _fan_out(self, read: Callable[[Path], _T], names: list[str]) -> list[_T]:
+        # ファイルは互いに独立しているので、読み込みをスレッドプールで重ねる
+        paths = [self._root / name for name in names]
+        if len(paths) <= 1:
+            return [read(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            return list(pool.map(read, paths))
+
+    def _load_shards(self, categories: Iterable[str | None] | None) -> list[tuple[list[Task], list[int]]]:
+        with phase("parse"):
+            # 保存の後で古いファイルは消えるので、読み終えるまで共有ロックを持つ
+            with locked(self._manifest, shared=True):
+                _, _, shards = _read_manifest(self._manifest)
+                if categories is None:
+                    selected = list(shards)
+                    self._read = {}
+                else:
+                    selected = [category for category in categories if category in shards]
+                parts = self._fan_out(_read_shard, [shards[category] for category in selected])
+        self._read.update(zip(selected, parts))
+        return parts
+
+    def load(self) -> list[Task]:
+        with phase("load"):
+            # 各ファイルは番号順なので、並べ替えは連なりを併合するだけで済む
+            entries = [entry for tasks, seqs in self._load_shards(None) for entry in zip(seqs, tasks)]
+            entries.sort(key=itemgetter(0))
+            return [task for _, task in entries]
+
+    def load_category(self, category: str | None) -> list[Task]:
+        with phase("load"):
+            parts = self._load_shards([category])
+        return parts[0][0] if parts else []
+
+    def save(self, tasks: list[Task], categories: Collection[str | None] | None = None) -> None:
+        with phase("save"), locked(self._manifest):
+            generation, next_seq, shards = _read_manifest(self._manifest)
+            if categories is None:
+                categories = set(shards) | {task.category for task in tasks}
+            groups: dict[str | None, list[tuple[int, Task]]] = {category: [] for category in categories}
+            # カテゴリを変えたタスクは元のカテゴリも書き直すので、番号は書き直すカテゴリの中から引ける。
+            # 書き直すカテゴリから消えたタスク（削除したものなど）の番号はここで忘れ、復元したら振り直す
+            known = {
+                task.id: seq
+                for category in groups
+                for task, seq in zip(*self._read.get(category, ([], [])))
+            }
+            for task in tasks:
+                group = groups.get(task.category)
+                if group is None:
+                    continue
+                seq = known.get(task.id)
+                if seq is None:
+                    seq, next_seq = next_seq, next_seq + 1
+                group.append((seq, task))
+            for group in groups.values():
+                group.sort(key=itemgetter(0))
+            self._write(generation, next_seq, shards, groups)
+            for category, group in groups.items():
+                self._read[category] = ([task for _, task in group], [seq for seq, _ in group])
+
+    def _write(
+        self, generation: int, next_seq: int, shards: _Shards, groups: dict[str | None, list[tuple[int, Task]]]
+    ) -> None:
+        # groups のカテゴリのファイルを置き換え（空ならカテゴリごと外し）、manifest を確定してから古いファイルを消す
+        generation += 1
+        updated = dict(shards)
+        self._root.mkdir(parents=True, exist_ok=True)
+        for category, group in groups.items():
+            if group:
+                updated[category] = _shard_name(category, generation)
+                payload = codec.dumps([{**t.to_dict(), "seq": seq} for seq, t in group], compact=self._compact)
+                replace_file(self._root / updated[category], payload)
+            else:
+                updated.pop(category, None)
+        manifest = {
+            "generation": generation,
+            "next_seq": next_seq,
+            "shards": [{"category": category, "file": name} for category, name in updated.items()],
+        }
+        write_atomic(self._manifest, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        for category in groups:
+            old = shards.get(category)
+            if old is not None and old != updated.get(category):
+                (self._root / old).unlink(missing_ok=True)
+
+    def locked(self, shared: bool = False) -> AbstractContextManager[StoreLock]:
+        return locked(self._manifest, shared=shared)
+
+    def version(self) -> int:
+        return read_version(self._manifest)
+
+
+def open_repository(path: Path) -> TaskRepository:
+    """path のストアを開く。todo shard で分割してあれば ShardedTaskRepository を返す。"""
+    if is_sharded(path):
+        return ShardedTaskRepository(path)
+    return TaskRepository(path)
+
+
+def split_store(path: Path) -> tuple[int, int]:
+    """1つのファイルのストアを分割した形に移して tasks.json を消し、移したタスク数とファイル数を返す。
+
+    既に分割してあれば ValueError。以前の版で削除したタスクがデータファイルに残っていれば、ゴミ箱へ移す。
+    分割する前に開いた TaskRepository（常駐中のデーモンのものなど）は、開き直すまで分割後のストアを見ない。
+    """
+    single = TaskRepository(path)
+    with single.locked():
+        if is_sharded(path):
+            raise ValueError(f"{shard_dir(path)} は既にあります")
+        loaded = single.load()
+        tasks = [task for task in loaded if task.deleted_at is None]
+        deleted = [task for task in loaded if task.deleted_at is not None]
+        if deleted:
+            single.append_trash(deleted)
+        ShardedTaskRepository(path).save(tasks)
+        # 以降は manifest がすべてのタスクを持つ。ロックファイルは待っているプロセスのために残す
+        path.unlink(missing_ok=True)
+    return len(tasks), len({task.category for task in tasks})
@@ -0,0 +1,127 @@
+import json
+import random
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from todo_cli import codec
+from todo_cli.models import Priority, Task
+from todo_cli.repository import TaskRepository
+
+SEED = 20260418
+_TEXTS = ["", "買い物", 'quote " and \\ backslash', "改行\nタブ\t", "emoji 🎉", "\x00\x1f制御文字", "a" * 300]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "orjson":
+        if codec._orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(codec, "_orjson", None)
+    return str(request.param)
+
+
+def _random_moment(rng: random.Random) -> datetime:
+    moment = datetime(1, 1, 1) + timedelta(microseconds=rng.randrange(315_537_897_600_000_000))
+    # マイクロ秒が 0 の値（isoformat が小数部を省く）も混ぜる
+    return moment.replace(microsecond=0) if rng.random() < 0.3 else moment
+
+
+def _random_task(rng: random.Random, i: int) -> Task:
+    created = _random_moment(rng)
+    return Task(
+        id=f"{i:08x}-{rng.getrandbits(32):08x}",
+        title=rng.choice(_TEXTS) + str(rng.random()),
+        done=rng.random() < 0.5,
+        priority=rng.choice(list(Priority)),
+        created_at=created,
+        updated_at=created if rng.random() < 0.5 else _random_moment(rng),
+        due_date=None if rng.random() < 0.3 else date.fromordinal(rng.randint(1, date.max.toordinal())),
+        category=rng.choice([None, "仕事", "home", rng.choice(_TEXTS)]),
+        deleted_at=None if rng.random() < 0.7 else _random_moment(rng),
+    )
+
+
+class TestFieldCodecs:
+    def test_datetime_round_trip_matches_isoformat(self) -> None:
+        rng = random.Random(SEED)
+        for _ in range(5000):
+            moment = _random_moment(rng)
+            micros = codec.datetime_to_micros(moment)
+            assert codec.encode_datetime(micros) == moment.isoformat()
+            assert codec.decode_datetime(moment.isoformat()) == micros
+            assert codec.micros_to_datetime(micros) == moment
+
+    def test_aware_datetime_is_stored_as_local_time(self) -> None:
+        moment = datetime(2026, 4, 18, 9, 30, tzinfo=timezone.utc)
+        local = moment.astimezone().replace(tzinfo=None)
+        assert codec.decode_datetime(moment.isoformat()) == codec.datetime_to_micros(local)
+
+    def test_date_and_priority_round_trip(self) -> None:
+        for day in (date.min, date(1970, 1, 1), date(2026, 2, 28), date.max):
+            assert codec.encode_date(codec.decode_date(day.isoformat())) == day.isoformat()
+        for priority in Priority:
+            assert codec.encode_priority(codec.decode_priority(priority.value)) == priority.value
+
+    def test_invalid_values_are_rejected(self) -> None:
+        with pytest.raises(KeyError):
+            codec.decode_priority("urgent")
+        with pytest.raises(ValueError):
+            codec.decode_date("2026-02-30")
+        with pytest.raises(ValueError):
+            codec.decode_datetime("yesterday")
+
+
+class TestRoundTrip:
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_random_tasks_round_trip(self, backend: str, compact: bool) -> None:
+        rng = random.Random(SEED)
+        tasks = [_random_task(rng, i) for i in range(2000)]
+        payload = codec.dumps([t.to_dict() for t in tasks], compact=compact)
+        restored = [Task.from_dict(d) for d in codec.loads(payload)]
+        assert restored == tasks
+        assert [t.to_dict() for t in restored] == [t.to_dict() for t in tasks]
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_output_matches_stdlib_json(self, backend: str, compact: bool) -> None:
+        rng = random.Random(SEED)
+        records = [_random_task(rng, i).to_dict() for i in range(200)]
+        payload = codec.dumps(records, compact=compact)
+        if compact:
+            expected = json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+        else:
+            expected = json.dumps(records, ensure_ascii=False, indent=2)
+        assert json.loads(payload) == records
+        assert payload.decode("utf-8") == expected
+
+    def test_compact_output_has_no_newlines(self, backend: str) -> None:
+        records = [Task.create(title="タスク").to_dict() for _ in range(3)]
+        compact = codec.dumps(records, compact=True)
+        assert b"\n" not in compact
+        assert len(compact) < len(codec.dumps(records))
+
+
+class TestRepositoryCompact:
+    def _saved(self, path: Path, **kwargs: Any) -> bytes:
+        TaskRepository(path, **kwargs).save([Task.create(title="タスク1"), Task.create(title="タスク2")])
+        return path.read_bytes()
+
+    def test_indented_by_default(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("TODO_COMPACT_JSON", raising=False)
+        assert b"\n  " in self._saved(tmp_path / "tasks.json")
+
+    def test_compact_from_argument_and_environment(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert b"\n" not in self._saved(tmp_path / "a.json", compact=True)
+        monkeypatch.setenv("TODO_COMPACT_JSON", "1")
+        assert b"\n" not in self._saved(tmp_path / "b.json")
+        assert b"\n  " in self._saved(tmp_path / "c.json", compact=False)
+
+    def test_either_form_can_be_loaded(self, tmp_path: Path) -> None:
+        tasks = [Task.create(title="タスク", priority=Priority.HIGH, due_date=date(2026, 5, 1))]
+        for compact in (False, True):
+            repo = TaskRepository(tmp_path / f"{compact}.json", compact=compact)
+            repo.save(tasks)
+            assert TaskRepository(repo._path, compact=not compact).load() == tasks
@@ -0,0 +1,152 @@
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from todo_cli import client, main
+from todo_cli.daemon import DaemonAlreadyRunningError, serve
+from todo_cli.repository import TaskRepository
+from todo_cli.service import TaskService
+from todo_cli.sharding import ShardedTaskRepository
+
+
+@pytest.fixture
+def data_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "tasks.json"
+    monkeypatch.setattr("todo_cli.main._DATA_FILE", path)
+    return path
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    return tmp_path / "daemon.sock"
+
+
+@pytest.fixture
+def daemon(socket_path: Path, data_file: Path) -> Iterator[threading.Thread]:
+    ready = threading.Event()
+    thread = threading.Thread(target=serve, args=(socket_path, data_file, ready.set), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield thread
+    client.forward({"shutdown": True}, socket_path)
+    thread.join(5)
+
+
+def _run(argv: list[str], socket_path: Path) -> dict[str, object]:
+    response = client.forward({"argv": argv, "columns": 120}, socket_path)
+    assert response is not None
+    return response
+
+
+class TestDaemon:
+    def test_commands_are_forwarded(self, daemon: threading.Thread, socket_path: Path, data_file: Path) -> None:
+        added = _run(["add", "デーモンタスク", "--priority", "high"], socket_path)
+        assert added["code"] == 0
+        assert "デーモンタスク" in str(added["stdout"])
+        assert TaskRepository(data_file).load()[0].title == "デーモンタスク"
+
+        listed = _run(["list"], socket_path)
+        assert listed["code"] == 0
+        assert "デーモンタスク" in str(listed["stdout"])
+
+    def test_errors_are_returned_with_exit_code(self, daemon: threading.Thread, socket_path: Path) -> None:
+        result = _run(["done", "nonexistent-id"], socket_path)
+        assert result["code"] == 1
+        assert "見つかりません" in str(result["stderr"])
+
+        usage = _run(["no-such-command"], socket_path)
+        assert usage["code"] == 2
+
+    def test_profile_summary_is_returned(self, daemon: threading.Thread, socket_path: Path) -> None:
+        result = _run(["--profile", "list"], socket_path)
+        assert result["code"] == 0
+        assert "startup" in str(result["stderr"])
+        assert "render" in str(result["stderr"])
+
+    def test_service_is_kept_warm_between_requests(self, daemon: threading.Thread, socket_path: Path) -> None:
+        _run(["add", "タスク"], socket_path)
+        service = main._service
+        assert service is not None
+        _run(["list"], socket_path)
+        assert main._service is service
+
+    def test_external_writes_are_picked_up(
+        self, daemon: threading.Thread, socket_path: Path, data_file: Path
+    ) -> None:
+        _run(["add", "デーモン経由"], socket_path)
+        TaskService(TaskRepository(data_file)).add_task("直接モード経由")
+        listed = _run(["list"], socket_path)
+        assert "直接モード経由" in str(listed["stdout"])
+
+    def test_shard_reopens_the_store(self, daemon: threading.Thread, socket_path: Path, data_file: Path) -> None:
+        _run(["add", "分割前", "--category", "仕事"], socket_path)
+        assert _run(["shard"], socket_path)["code"] == 0
+        _run(["add", "分割後", "--category", "仕事"], socket_path)
+        assert not data_file.exists()
+        assert [t.title for t in ShardedTaskRepository(data_file).load()] == ["分割前", "分割後"]
+        listed = _run(["list", "--category", "仕事"], socket_path)
+        assert "分割後" in str(listed["stdout"])
+
+    def test_second_daemon_is_rejected(self, daemon: threading.Thread, socket_path: Path, data_file: Path) -> None:
+        with pytest.raises(DaemonAlreadyRunningError):
+            serve(socket_path, data_file)
+
+    def test_shutdown_removes_socket(self, socket_path: Path, data_file: Path) -> None:
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(socket_path, data_file, ready.set), daemon=True)
+        thread.start()
+        assert ready.wait(5)
+        assert client.forward({"shutdown": True}, socket_path) is not None
+        thread.join(5)
+        assert not thread.is_alive()
+        assert not socket_path.exists()
+        assert main._service is None
+
+
+class TestClient:
+    def test_falls_back_to_direct_mode_without_daemon(
+        self, socket_path: Path, data_file: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        assert client.forward({"argv": ["list"]}, socket_path) is None
+        assert client.main(["add", "直接タスク"], socket_path) == 0
+        assert "直接タスク" in capsys.readouterr().out
+        assert client.main(["done", "nonexistent-id"], socket_path) == 1
+
+    def test_stale_socket_file_is_ignored(self, socket_path: Path, data_file: Path) -> None:
+        socket_path.touch()
+        assert client.main(["list"], socket_path) == 0
+
+    def test_main_writes_daemon_response(
+        self, daemon: threading.Thread, socket_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        assert client.main(["add", "転送タスク"], socket_path) == 0
+        assert "転送タスク" in capsys.readouterr().out
+        assert client.main(["show", "nonexistent-id"], socket_path) == 1
+        assert "見つかりません" in capsys.readouterr().err
+
+
+class TestDaemonCommand:
+    def test_stop_without_daemon(self, monkeypatch: pytest.MonkeyPatch, socket_path: Path) -> None:
+        from typer.testing import CliRunner
+
+        monkeypatch.setattr("todo_cli.client.SOCKET_PATH", socket_path)
+        result = CliRunner().invoke(main.app, ["daemon", "--stop"])
+        assert result.exit_code == 0
+        assert "起動していません" in result.output
+
+    def test_stop_running_daemon(
+        self, monkeypatch: pytest.MonkeyPatch, socket_path: Path, data_file: Path
+    ) -> None:
+        from typer.testing import CliRunner
+
+        monkeypatch.setattr("todo_cli.client.SOCKET_PATH", socket_path)
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(socket_path, data_file, ready.set), daemon=True)
+        thread.start()
+        assert ready.wait(5)
+        result = CliRunner().invoke(main.app, ["daemon", "--stop"])
+        assert "停止しました" in result.output
+        thread.join(5)
+        assert not thread.is_alive()
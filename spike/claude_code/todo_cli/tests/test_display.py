@@ -1,10 +1,13 @@
+import json
+import unicodedata
+from collections.abc import Iterator
 from datetime import date, timedelta
 from io import StringIO
 
 import pytest
 from rich.console import Console
 
-from todo_cli.display import print_task_detail, print_task_list
+from todo_cli.display import OutputFormat, print_task_detail, print_task_list, stream_task_list
 from todo_cli.models import Priority, Task
 
 
@@ -22,6 +25,10 @@ def capture_output(func: object, *args: object) -> str:
     return buf.getvalue()
 
 
+def display_width(text: str) -> int:
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
 class TestPrintTaskList:
     def test_empty_list_shows_message(self) -> None:
         buf = StringIO()
@@ -72,3 +79,56 @@ class TestPrintTaskDetail:
         assert "high" in output.lower() or "高" in output
         assert "2026-04-01" in output
         assert "仕事" in output
+
+
+class TestStreamTaskList:
+    def _render(self, tasks: list[Task], fmt: OutputFormat) -> list[str]:
+        buf = StringIO()
+        stream_task_list(iter(tasks), fmt, out=buf)
+        return buf.getvalue().splitlines()
+
+    def test_plain_rows_have_fixed_width(self) -> None:
+        tasks = [
+            Task.create(title="短い"),
+            Task.create(title="とても長いタイトル" * 10, category="仕事仕事仕事仕事仕事仕事"),
+            Task.create(title="x" * 100, due_date=date.today() - timedelta(days=1)),
+        ]
+        lines = self._render(tasks, OutputFormat.PLAIN)
+        assert len(lines) == 4
+        widths = {display_width(line.rsplit(" ", 1)[0]) for line in lines}
+        assert len(widths) == 1
+        assert "…" in lines[2]
+        assert "[期限切れ]" in lines[3]
+        assert lines[1].endswith("未完了")
+
+    def test_plain_empty_list_shows_message(self) -> None:
+        assert self._render([], OutputFormat.PLAIN) == ["タスクがありません"]
+
+    def test_tsv_has_one_line_per_task_with_full_id(self) -> None:
+        task = Task.create(title="タブ\tを含む", priority=Priority.HIGH, due_date=date(2026, 4, 1), category="仕事")
+        task.done = True
+        assert self._render([task], OutputFormat.TSV) == [
+            f"{task.id}\tタブ を含む\thigh\t2026-04-01\t仕事\t1"
+        ]
+        assert self._render([], OutputFormat.TSV) == []
+
+    def test_jsonl_round_trips(self) -> None:
+        tasks = [Task.create(title="一件目"), Task.create(title="二件目", category="私用")]
+        lines = self._render(tasks, OutputFormat.JSONL)
+        assert [Task.from_dict(json.loads(line)) for line in lines] == tasks
+
+    def test_consumes_tasks_lazily(self) -> None:
+        written: list[str] = []
+
+        class _Out(StringIO):
+            def write(self, s: str) -> int:
+                written.append(s)
+                return len(s)
+
+        def tasks() -> Iterator[Task]:
+            for i in range(3):
+                # 前の行が書き出されてから次のタスクが要求される
+                assert len(written) == i
+                yield Task.create(title=f"t{i}")
+
+        assert stream_task_list(tasks(), OutputFormat.TSV, out=_Out()) == 3
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from todo_cli.locking import append_durable, locked, read_version
+from todo_cli.models import Task
+from todo_cli.repository import TaskRepository
+from todo_cli.service import TaskService
+
+WORKERS = 4
+UPDATES = 25
+
+
+def _add_worker(path: Path, worker: int) -> None:
+    service = TaskService(TaskRepository(path))
+    for i in range(UPDATES):
+        service.add_task(f"w{worker}-{i}", category=f"w{worker}")
+
+
+def _edit_worker(path: Path, worker: int) -> None:
+    # 全員が同じタスクのタイトルへ自分の印を足していく
+    service = TaskService(TaskRepository(path))
+    for i in range(UPDATES):
+        task = service.list_tasks()[0]
+        with TaskRepository(path).locked():
+            current = service.list_tasks()[0]
+            service.edit_task(task.id, title=f"{current.title},{worker}-{i}")
+
+
+def _run_workers(target: Callable[[Path, int], None], path: Path) -> None:
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=(path, n)) for n in range(WORKERS)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+
+class TestConcurrentWriters:
+    def test_parallel_adds_do_not_lose_writes(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        _run_workers(_add_worker, path)
+
+        titles = {t.title for t in TaskRepository(path).load()}
+        assert titles == {f"w{n}-{i}" for n in range(WORKERS) for i in range(UPDATES)}
+
+    def test_parallel_read_modify_write_on_same_task(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        TaskService(TaskRepository(path)).add_task("start")
+        _run_workers(_edit_worker, path)
+
+        marks = TaskRepository(path).load()[0].title.split(",")[1:]
+        assert sorted(marks) == sorted(f"{n}-{i}" for n in range(WORKERS) for i in range(UPDATES))
+
+    def test_cached_service_does_not_overwrite_newer_data(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        warm = TaskService(TaskRepository(path))
+        first = warm.add_task("デーモン側")
+
+        other = TaskService(TaskRepository(path))
+        second = other.add_task("別プロセス側")
+        other.complete_task(first.id)
+
+        warm.add_task("デーモン側2")
+        stored = {t.id: t for t in TaskRepository(path).load()}
+        assert second.id in stored
+        assert stored[first.id].done is True
+        assert len(stored) == 3
+
+
+class TestAtomicWrite:
+    def test_every_save_bumps_version(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        repo = TaskRepository(path)
+        assert repo.version() == 0
+        repo.save([Task.create(title="タスク")])
+        repo.save([])
+        assert read_version(path) == 2
+
+    def test_failed_write_keeps_previous_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        path = tmp_path / "tasks.json"
+        repo = TaskRepository(path)
+        repo.save([Task.create(title="残るタスク")])
+        before = path.read_bytes()
+
+        def broken_fsync(fd: int) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "fsync", broken_fsync)
+        with pytest.raises(OSError):
+            repo.save([])
+
+        assert path.read_bytes() == before
+        assert repo.version() == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["tasks.json", "tasks.json.lock"]
+
+    def test_shared_lock_cannot_be_upgraded(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        with locked(path, shared=True):
+            with pytest.raises(RuntimeError):
+                with locked(path):
+                    pass
+
+
+class TestAppendDurable:
+    def test_append_bumps_version(self, tmp_path: Path) -> None:
+        path = tmp_path / "trash.jsonl"
+        append_durable(path, b"1\n")
+        append_durable(path, b"2\n3\n")
+        assert path.read_bytes() == b"1\n2\n3\n"
+        assert read_version(path) == 2
+
+    def test_torn_last_line_is_dropped_before_append(self, tmp_path: Path) -> None:
+        path = tmp_path / "trash.jsonl"
+        path.write_bytes(b"1\n" + b"x" * 200_000)
+        append_durable(path, b"2\n")
+        assert path.read_bytes() == b"1\n2\n"
+        path.write_bytes(b"torn")
+        append_durable(path, b"3\n")
+        assert path.read_bytes() == b"3\n"
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from unittest.mock import patch
 
@@ -78,6 +79,44 @@ class TestListCommand:
         assert result.exit_code == 0
 
 
+    def test_list_limit_and_offset(self) -> None:
+        for i in range(5):
+            runner.invoke(app, ["add", f"タスク{i}"])
+        result = runner.invoke(app, ["list", "--sort", "created-at", "--offset", "1", "--limit", "2", "--format", "tsv"])
+        assert result.exit_code == 0
+        assert [line.split("\t")[1] for line in result.stdout.splitlines()] == ["タスク1", "タスク2"]
+
+    def test_list_plain_and_jsonl_formats(self) -> None:
+        runner.invoke(app, ["add", "一件目", "--category", "仕事"])
+        plain = runner.invoke(app, ["list", "--format", "plain"])
+        assert plain.exit_code == 0
+        assert plain.output.splitlines()[0].startswith("ID")
+        assert "一件目" in plain.output
+        jsonl = runner.invoke(app, ["list", "-f", "jsonl"])
+        assert json.loads(jsonl.output)["category"] == "仕事"
+
+    def test_list_prints_cursor_for_next_page(self) -> None:
+        for i in range(3):
+            runner.invoke(app, ["add", f"タスク{i}", "--due-date", f"2026-04-0{3 - i}"])
+        first = runner.invoke(app, ["list", "--sort", "due-date", "--limit", "2", "-f", "tsv"])
+        assert [line.split("\t")[1] for line in first.stdout.splitlines()] == ["タスク2", "タスク1"]
+        cursor = first.stderr.split("--after ")[1].strip()
+        rest = runner.invoke(app, ["list", "--sort", "due-date", "--limit", "2", "-f", "tsv", "--after", cursor])
+        assert [line.split("\t")[1] for line in rest.stdout.splitlines()] == ["タスク0"]
+        assert "--after" not in rest.stderr
+
+    def test_list_rejects_invalid_cursor(self) -> None:
+        result = runner.invoke(app, ["list", "--after", "invalid"])
+        assert result.exit_code == 1
+
+    def test_list_limit_applies_to_table(self) -> None:
+        runner.invoke(app, ["add", "表示される"])
+        runner.invoke(app, ["add", "表示されない"])
+        result = runner.invoke(app, ["list", "--sort", "created-at", "--limit", "1"])
+        assert "表示される" in result.output
+        assert "表示されない" not in result.output
+
+
 class TestShowCommand:
     def test_show_existing_task(self) -> None:
         runner.invoke(app, ["add", "表示タスク"])
@@ -108,6 +147,13 @@ class TestDoneCommand:
         assert result.exit_code == 0
         assert "完了" in result.output
 
+    def test_complete_task_by_short_id(self) -> None:
+        result = runner.invoke(app, ["add", "短縮IDタスク"])
+        short_id = result.output.split("[")[1].split("]")[0]
+        result = runner.invoke(app, ["done", short_id])
+        assert result.exit_code == 0
+        assert short_id in result.output
+
     def test_complete_nonexistent_task(self) -> None:
         result = runner.invoke(app, ["done", "nonexistent-id"])
         assert result.exit_code == 1
@@ -150,6 +196,41 @@ class TestDeleteCommand:
         assert result.exit_code == 1
 
 
+class TestTrashCommands:
+    def _deleted_task_id(self) -> str:
+        runner.invoke(app, ["add", "削除タスク"])
+        from todo_cli.main import _DATA_FILE
+        from todo_cli.repository import TaskRepository
+        task_id = TaskRepository(_DATA_FILE).load()[0].id
+        runner.invoke(app, ["delete", task_id])
+        return task_id
+
+    def test_show_include_deleted(self) -> None:
+        task_id = self._deleted_task_id()
+        assert runner.invoke(app, ["show", task_id]).exit_code == 1
+        result = runner.invoke(app, ["show", task_id[:8], "--include-deleted"])
+        assert result.exit_code == 0
+        assert "削除日時" in result.output
+
+    def test_restore(self) -> None:
+        task_id = self._deleted_task_id()
+        result = runner.invoke(app, ["restore", task_id[:8]])
+        assert result.exit_code == 0
+        assert "元に戻しました" in result.output
+        assert "削除タスク" in runner.invoke(app, ["list"]).output
+        assert runner.invoke(app, ["restore", task_id]).exit_code == 1
+
+    def test_purge(self) -> None:
+        task_id = self._deleted_task_id()
+        result = runner.invoke(app, ["purge", "--older-than", "30"])
+        assert result.exit_code == 0
+        assert "0 件" in result.output
+        result = runner.invoke(app, ["purge", "--older-than", "0"])
+        assert "1 件" in result.output
+        assert runner.invoke(app, ["show", task_id, "--include-deleted"]).exit_code == 1
+        assert runner.invoke(app, ["purge"]).exit_code != 0
+
+
 class TestSearchCommand:
     def test_search_found(self) -> None:
         runner.invoke(app, ["add", "レポートを提出する"])
@@ -1,9 +1,14 @@
-from datetime import date, datetime
+import gc
+import os
+import tracemalloc
+from datetime import date, datetime, timedelta
 
 import pytest
 
 from todo_cli.models import Priority, Task
 
+MEMORY_TEST_TASKS = int(os.environ.get("TODO_MEMORY_TEST_TASKS", "50000"))
+
 
 class TestPriority:
     def test_values_exist(self) -> None:
@@ -97,3 +102,58 @@ class TestTask:
         assert restored.category == task.category
         assert restored.done == task.done
         assert restored.deleted_at == task.deleted_at
+
+    def test_roundtrip_keeps_microseconds_and_updates(self) -> None:
+        task = Task.create(title="タスク", category="仕事")
+        task.done = True
+        task.updated_at = datetime(2026, 4, 1, 12, 0, 0, 5)
+        task.deleted_at = datetime(2026, 4, 2)
+        restored = Task.from_dict(task.to_dict())
+        assert restored == task
+        assert restored.to_dict() == task.to_dict()
+        assert restored.updated_at == datetime(2026, 4, 1, 12, 0, 0, 5)
+        assert restored.created_at == task.created_at
+
+    def test_attributes_are_slotted(self) -> None:
+        task = Task.create(title="タスク")
+        assert not hasattr(task, "__dict__")
+        with pytest.raises(AttributeError):
+            task.unknown = 1  # type: ignore[attr-defined]
+
+    def test_categories_are_shared(self) -> None:
+        records = [Task.create(title="タスク", category="".join(["仕", "事"])).to_dict() for _ in range(2)]
+        first, second = (Task.from_dict(d) for d in records)
+        assert first.category == "仕事"
+        assert first.category is second.category
+
+
+class TestMemory:
+    def test_per_task_memory(self) -> None:
+        # 件数は TODO_MEMORY_TEST_TASKS で変えられる（100万件で確かめるなら 1000000）
+        base = datetime(2026, 1, 1, 9, 0, 0, 123456)
+        records = []
+        for i in range(MEMORY_TEST_TASKS):
+            created = (base + timedelta(seconds=i)).isoformat()
+            records.append(
+                {
+                    "id": f"{i:08x}-0000-4000-8000-000000000000",
+                    "title": f"タスク {i}",
+                    "done": i % 3 == 0,
+                    "priority": ("high", "medium", "low")[i % 3],
+                    "due_date": (date(2026, 1, 1) + timedelta(days=i % 90)).isoformat() if i % 5 else None,
+                    "category": f"カテゴリ{i % 20}",
+                    "created_at": created,
+                    "updated_at": created if i % 3 else (base + timedelta(days=1, seconds=i)).isoformat(),
+                    "deleted_at": None,
+                }
+            )
+        gc.collect()
+        tracemalloc.start()
+        try:
+            tasks = [Task.from_dict(d) for d in records]
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        # タイトルや ID の文字列は読み込んだ辞書と共有するので、数えるのは Task が持つ分だけ。
+        # __dict__ と datetime を持っていた以前のモデルでは約 266 バイト、今は約 160 バイト
+        assert used / len(tasks) < 200
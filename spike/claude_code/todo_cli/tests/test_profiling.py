@@ -0,0 +1,79 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from todo_cli import profiling
+from todo_cli.main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def tmp_data_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr("todo_cli.main._DATA_FILE", tmp_path / "tasks.json")
+    yield
+    profiling.finish()
+
+
+class TestPhase:
+    def test_disabled_phase_is_noop(self) -> None:
+        with profiling.phase("load"):
+            pass
+        assert profiling._active is None
+
+    def test_nested_phases_in_summary(self, capsys: pytest.CaptureFixture[str]) -> None:
+        profiling.enable()
+        profiling.end_startup()
+        with profiling.phase("load"), profiling.phase("parse"):
+            pass
+        profiling.finish()
+        names = [line.split()[0] for line in capsys.readouterr().err.splitlines()[1:]]
+        assert names == ["startup", "load", "parse", "total"]
+        assert profiling._active is None
+
+
+class TestOptionsFromEnvironment:
+    @pytest.mark.parametrize(
+        ("environ", "expected"),
+        [
+            ({}, []),
+            ({"TODO_PROFILE": "0"}, []),
+            ({"TODO_PROFILE": "1"}, ["--profile"]),
+            ({"TODO_PROFILE_CPROFILE": "/tmp/out.prof"}, ["--profile-cprofile", "/tmp/out.prof"]),
+        ],
+    )
+    def test_translation(self, environ: dict[str, str], expected: list[str]) -> None:
+        assert profiling.options_from_environment(environ) == expected
+
+    def test_relative_trace_path_is_made_absolute(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.chdir(tmp_path)
+        options = profiling.options_from_environment({"TODO_PROFILE": "trace.json"})
+        assert options == ["--profile-trace", str(tmp_path / "trace.json")]
+
+
+class TestProfileOption:
+    def test_profile_reports_phases_on_stderr(self) -> None:
+        runner.invoke(app, ["add", "タスク"])
+        result = runner.invoke(app, ["--profile", "list"])
+        assert result.exit_code == 0
+        assert "タスク" in result.stdout
+        phases = [line.split()[0] for line in result.stderr.splitlines()[1:]]
+        assert phases == ["startup", "command", "load", "parse", "validate", "render", "total"]
+
+    def test_trace_and_cprofile_files(self, tmp_path: Path) -> None:
+        trace, stats = tmp_path / "trace.json", tmp_path / "out.prof"
+        result = runner.invoke(
+            app, ["--profile-trace", str(trace), "--profile-cprofile", str(stats), "add", "タスク"]
+        )
+        assert result.exit_code == 0
+        assert result.stderr == ""
+        events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+        assert {"startup", "command", "save"} <= {event["name"] for event in events}
+        assert stats.stat().st_size > 0
+
+    def test_without_profile_nothing_is_written(self) -> None:
+        result = runner.invoke(app, ["list"])
+        assert "profile" not in result.stderr
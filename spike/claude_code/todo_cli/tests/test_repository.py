@@ -59,3 +59,24 @@ class TestTaskRepository:
         assert restored.due_date == task.due_date
         assert restored.category == task.category
         assert restored.deleted_at == task.deleted_at
+
+    def test_trash_round_trip(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        assert repo.load_trash() == []
+        first, second = Task.create(title="削除1"), Task.create(title="削除2", category="仕事")
+        repo.append_trash([first])
+        repo.append_trash([second])
+        assert repo.load_trash() == [first, second]
+        assert (tmp_path / "tasks.trash.jsonl").read_bytes().count(b"\n") == 2
+        repo.save_trash([second])
+        assert repo.load_trash() == [second]
+
+    def test_trash_skips_torn_line_and_keeps_latest_copy(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        task = Task.create(title="削除")
+        repo.append_trash([task])
+        task.title = "変更後"
+        repo.append_trash([task])
+        with (tmp_path / "tasks.trash.jsonl").open("ab") as f:
+            f.write(b'{"id": "torn')
+        assert [t.title for t in repo.load_trash()] == ["変更後"]
@@ -1,11 +1,20 @@
+import itertools
+import random
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
 import pytest
 
 from todo_cli.models import Priority, Task
-from todo_cli.repository import TaskRepository
-from todo_cli.service import SortKey, TaskNotFoundError, TaskService
+from todo_cli.repository import TaskRepository, trash_path
+from todo_cli.service import (
+    AmbiguousTaskIdError,
+    InvalidCursorError,
+    SortKey,
+    TaskNotFoundError,
+    TaskService,
+    encode_cursor,
+)
 
 
 @pytest.fixture
@@ -169,6 +178,248 @@ class TestDeleteTask:
             service.delete_task("nonexistent-id")
 
 
+def _reference_list(
+    tasks: list[Task],
+    done: bool | None,
+    priority: Priority | None,
+    category: str | None,
+    overdue: bool,
+    sort: SortKey | None,
+) -> list[str]:
+    """インデックスを使わない素朴な絞り込みと並べ替え（比較用）。"""
+    order = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
+    result = [
+        t for t in tasks
+        if t.deleted_at is None
+        and (done is None or t.done == done)
+        and (priority is None or t.priority == priority)
+        and (category is None or t.category == category)
+        and (not overdue or (t.due_date is not None and t.due_date < date.today()))
+    ]
+    if sort == SortKey.PRIORITY:
+        result.sort(key=lambda t: order[t.priority])
+    elif sort == SortKey.DUE_DATE:
+        result.sort(key=lambda t: (t.due_date is None, t.due_date))
+    elif sort == SortKey.CREATED_AT:
+        result.sort(key=lambda t: t.created_at)
+    return [t.id for t in result]
+
+
+class TestListViews:
+    def _assert_matches_reference(self, service: TaskService, tasks: list[Task]) -> None:
+        for done, priority, category, overdue, sort in itertools.product(
+            (None, True, False),
+            (None, *Priority),
+            (None, "仕事", "趣味", "なし"),
+            (False, True),
+            (None, *SortKey),
+        ):
+            result = service.list_tasks(
+                done=done, priority=priority, category=category, overdue=overdue, sort=sort
+            )
+            assert [t.id for t in result] == _reference_list(
+                tasks, done, priority, category, overdue, sort
+            ), (done, priority, category, overdue, sort)
+
+    def test_views_follow_mutations(self, service: TaskService) -> None:
+        rng = random.Random(42)
+        today = date.today()
+        for i in range(60):
+            service.add_task(
+                f"タスク{i}",
+                priority=rng.choice(list(Priority)),
+                due_date=rng.choice([None, today + timedelta(days=rng.randint(-5, 5))]),
+                category=rng.choice([None, "仕事", "趣味"]),
+            )
+        # 一覧を一度出してインデックスを作らせてから、変更を差分で反映させる
+        service.list_tasks(sort=SortKey.DUE_DATE)
+        service.list_tasks(done=False, priority=Priority.HIGH, sort=SortKey.PRIORITY)
+        tasks = service.list_tasks()
+        for task in rng.sample(tasks, 20):
+            service.complete_task(task.id)
+        for task in rng.sample(tasks, 20):
+            service.edit_task(
+                task.id,
+                priority=rng.choice(list(Priority)),
+                due_date=today + timedelta(days=rng.randint(-5, 5)),
+                category=rng.choice(["仕事", "趣味"]),
+            )
+        for task in rng.sample(tasks, 10):
+            if task.deleted_at is None:
+                service.delete_task(task.id)
+        service.add_task("追加", priority=Priority.HIGH, category="仕事", due_date=today)
+
+        self._assert_matches_reference(service, service._repo.load())
+
+    def test_views_built_from_loaded_store(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        writer = TaskService(repo)
+        for i, priority in enumerate(list(Priority) * 5):
+            task = writer.add_task(f"タスク{i}", priority=priority, category="仕事" if i % 2 else None)
+            if i % 3 == 0:
+                writer.complete_task(task.id)
+
+        self._assert_matches_reference(TaskService(repo), repo.load())
+
+
+def _fill(service: TaskService, count: int) -> None:
+    # 同じ並べ替えキーのタスクが多数できるよう、値の種類を少なくする
+    rng = random.Random(7)
+    today = date.today()
+    for i in range(count):
+        task = service.add_task(
+            f"タスク{i}",
+            priority=rng.choice(list(Priority)),
+            due_date=rng.choice([None, today + timedelta(days=rng.randint(-2, 2))]),
+            category=rng.choice([None, "仕事", "趣味"]),
+        )
+        if i % 4 == 0:
+            service.complete_task(task.id)
+        if i % 9 == 0:
+            service.delete_task(task.id)
+
+
+def _pages(service: TaskService, size: int, **filters: object) -> list[str]:
+    ids: list[str] = []
+    after = None
+    while True:
+        page = service.list_tasks(limit=size, after=after, **filters)  # type: ignore[arg-type]
+        ids.extend(t.id for t in page)
+        if len(page) < size:
+            return ids
+        after = encode_cursor(filters.get("sort"), page[-1])  # type: ignore[arg-type]
+
+
+class TestPagination:
+    @pytest.mark.parametrize("sort", [None, *SortKey])
+    @pytest.mark.parametrize("filters", [{}, {"done": False}, {"priority": Priority.HIGH, "category": "仕事"}])
+    def test_pages_concatenate_to_full_list(
+        self, tmp_path: Path, sort: SortKey | None, filters: dict[str, object]
+    ) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        _fill(TaskService(repo), 80)
+        expected = [t.id for t in TaskService(repo).list_tasks(sort=sort, **filters)]  # type: ignore[arg-type]
+
+        # 単発のコマンドと同じく、ページごとに新しいサービス（全件走査とヒープ選択）で読む
+        ids: list[str] = []
+        after = None
+        while True:
+            page = TaskService(repo).list_tasks(sort=sort, limit=7, after=after, **filters)  # type: ignore[arg-type]
+            ids.extend(t.id for t in page)
+            if len(page) < 7:
+                break
+            after = encode_cursor(sort, page[-1])
+        assert ids == expected
+
+        # デーモンと同じく、同じサービスで繰り返し読む（二次インデックス）
+        service = TaskService(repo)
+        service.list_tasks()
+        assert _pages(service, 7, sort=sort, **filters) == expected
+
+    def test_limit_returns_first_tasks(self, service: TaskService) -> None:
+        _fill(service, 40)
+        full = service.list_tasks(sort=SortKey.DUE_DATE)
+        assert service.list_tasks(sort=SortKey.DUE_DATE, limit=5) == full[:5]
+        assert service.list_tasks(sort=SortKey.DUE_DATE, limit=0) == []
+
+    def test_cursor_keeps_position_when_last_task_changes(self, service: TaskService) -> None:
+        _fill(service, 30)
+        full = service.list_tasks(sort=SortKey.PRIORITY)
+        cursor = encode_cursor(SortKey.PRIORITY, full[9])
+        # 最後に表示したタスクの優先度が変わっても、カーソルに入れたキーの位置から再開する
+        service.edit_task(full[9].id, priority=Priority.LOW)
+        service.delete_task(full[5].id)
+        assert service.list_tasks(sort=SortKey.PRIORITY, after=cursor)[0].id == full[10].id
+
+    @pytest.mark.parametrize("sort", [None, *SortKey])
+    @pytest.mark.parametrize("reader", ["scan", "views", "views-before-delete"])
+    def test_cursor_survives_deleting_its_task(self, tmp_path: Path, sort: SortKey | None, reader: str) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        _fill(TaskService(repo), 60)
+        full = TaskService(repo).list_tasks(sort=sort)
+
+        def key(task: Task) -> object:
+            if sort == SortKey.PRIORITY:
+                return task.priority
+            return task.due_date if sort == SortKey.DUE_DATE else None
+
+        # 同じキーのタスクに挟まれたタスクをカーソルにする
+        last = next(i for i in range(9, len(full) - 6) if key(full[i - 1]) == key(full[i]) == key(full[i + 1]))
+        cursor = encode_cursor(sort, full[last])
+
+        daemon = TaskService(repo)
+        if reader == "views-before-delete":
+            daemon.list_tasks()
+            daemon.list_tasks()
+        # 前のページのタスクと、最後に表示したタスク自体をゴミ箱に移す
+        writer = daemon if reader == "views-before-delete" else TaskService(repo)
+        writer.delete_task(full[3].id)
+        writer.delete_task(full[last].id)
+
+        if reader == "scan":
+            resumed = TaskService(repo).list_tasks(sort=sort, limit=5, after=cursor)
+        else:
+            daemon.list_tasks()
+            resumed = daemon.list_tasks(sort=sort, limit=5, after=cursor)
+        assert [t.id for t in resumed] == [t.id for t in full[last + 1 : last + 6]]
+
+    def test_sorted_ties_follow_created_at(self, service: TaskService) -> None:
+        tasks = [service.add_task(f"タスク{i}", priority=Priority.HIGH) for i in range(3)]
+        # 読み込み順が変わっても（復元して末尾に戻しても）、同じキーのタスクは作成順に並ぶ
+        service.delete_task(tasks[0].id)
+        service.restore_task(tasks[0].id)
+        assert [t.id for t in service.list_tasks()] == [tasks[1].id, tasks[2].id, tasks[0].id]
+        assert [t.id for t in service.list_tasks(sort=SortKey.PRIORITY)] == [t.id for t in tasks]
+
+    def test_invalid_cursor_raises(self, service: TaskService) -> None:
+        task = service.add_task("タスク")
+        with pytest.raises(InvalidCursorError):
+            service.list_tasks(sort=SortKey.DUE_DATE, after=encode_cursor(SortKey.PRIORITY, task))
+        with pytest.raises(InvalidCursorError):
+            service.list_tasks(after="not-a-cursor")
+
+
+class TestIdLookup:
+    def test_resolve_by_id_prefix(self, service: TaskService) -> None:
+        task = service.add_task("短縮IDテスト")
+        found = service.get_task(task.id[:8])
+        assert found is not None
+        assert found.id == task.id
+        assert service.complete_task(task.id[:8]).done is True
+
+    def test_other_prefix_lengths_are_not_resolved(self, service: TaskService) -> None:
+        task = service.add_task("タスク")
+        assert service.get_task(task.id[:7]) is None
+        assert service.get_task(task.id[:9]) is None
+
+    def test_ambiguous_prefix_raises(self, service: TaskService) -> None:
+        t1 = service.add_task("タスク1")
+        t2 = service.add_task("タスク2")
+        t2.id = t1.id[:8] + t2.id[8:]
+        service._tasks = None
+        service._repo.save([t1, t2])
+        with pytest.raises(AmbiguousTaskIdError):
+            service.complete_task(t1.id[:8])
+        assert service.get_task(t1.id[:8]) is None
+        service.delete_task(t2.id)
+        assert service.complete_task(t1.id[:8]).id == t1.id
+
+    def test_index_stays_coherent_after_delete(self, service: TaskService) -> None:
+        task = service.add_task("削除タスク")
+        service.delete_task(task.id[:8])
+        assert service.get_task(task.id) is None
+        assert service.get_task(task.id[:8]) is None
+        with pytest.raises(TaskNotFoundError):
+            service.delete_task(task.id)
+
+    def test_lookup_sees_persisted_tasks(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        task = TaskService(repo).add_task("永続化")
+        fresh = TaskService(repo)
+        assert fresh.edit_task(task.id[:8], title="変更").title == "変更"
+        assert repo.load()[0].title == "変更"
+
+
 class TestSearchTasks:
     def test_search_by_keyword(self, service: TaskService) -> None:
         service.add_task("レポートを提出する")
@@ -190,3 +441,101 @@ class TestSearchTasks:
         task = service.add_task("削除済みタスク")
         service.delete_task(task.id)
         assert service.search_tasks("削除済み") == []
+
+
+class TestTrash:
+    def test_delete_moves_task_to_trash(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        service = TaskService(repo)
+        kept = service.add_task("残すタスク")
+        task = service.add_task("削除タスク")
+        service.delete_task(task.id)
+        assert [t.id for t in repo.load()] == [kept.id]
+        assert [t.id for t in repo.load_trash()] == [task.id]
+        assert repo.load_trash()[0].deleted_at is not None
+
+    def test_live_commands_do_not_read_trash(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        service = TaskService(repo)
+        task = service.add_task("タスク")
+        service.delete_task(service.add_task("削除タスク").id)
+        trash_path(repo._path).write_bytes(b"not json\n")
+        fresh = TaskService(repo)
+        assert [t.id for t in fresh.list_tasks()] == [task.id]
+        assert fresh.search_tasks("タスク") == [task]
+        assert fresh.complete_task(task.id[:8]).done is True
+
+    def test_restore_by_id_or_prefix(self, service: TaskService) -> None:
+        t1 = service.add_task("タスク1", category="仕事")
+        t2 = service.add_task("タスク2", category="仕事")
+        # 一覧用インデックスを作らせてから、削除と復元を反映させる
+        service.list_tasks(category="仕事")
+        service.list_tasks(category="仕事")
+        service.delete_task(t1.id)
+        service.delete_task(t2.id)
+        restored = service.restore_task(t1.id[:8])
+        assert restored.id == t1.id
+        assert restored.deleted_at is None
+        assert [t.id for t in service.list_tasks(category="仕事")] == [t1.id]
+        assert service.restore_task(t2.id).id == t2.id
+        assert [t.id for t in service.list_tasks()] == [t1.id, t2.id]
+        assert service._repo.load_trash() == []
+        with pytest.raises(TaskNotFoundError):
+            service.restore_task(t1.id)
+
+    def test_get_task_include_deleted(self, service: TaskService) -> None:
+        task = service.add_task("削除タスク")
+        service.delete_task(task.id)
+        assert service.get_task(task.id) is None
+        found = service.get_task(task.id[:8], include_deleted=True)
+        assert found is not None
+        assert found.id == task.id
+        assert found.deleted_at is not None
+        assert service.get_task("nonexistent-id", include_deleted=True) is None
+
+    def test_purge_older_than(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        service = TaskService(repo)
+        old, recent = service.add_task("古い"), service.add_task("新しい")
+        service.delete_task(old.id)
+        service.delete_task(recent.id)
+        trash = repo.load_trash()
+        trash[0].deleted_at = datetime.now() - timedelta(days=40)
+        repo.save_trash(trash)
+
+        assert service.purge_tasks(timedelta(days=30)) == 1
+        assert [t.id for t in repo.load_trash()] == [recent.id]
+        assert service.purge_tasks(timedelta(days=30)) == 0
+        assert service.purge_tasks(timedelta(0)) == 1
+        assert repo.load_trash() == []
+
+    def test_deleted_tasks_in_old_data_file_move_on_next_save(self, tmp_path: Path) -> None:
+        repo = TaskRepository(tmp_path / "tasks.json")
+        live, deleted = Task.create(title="タスク"), Task.create(title="削除済み")
+        deleted.deleted_at = datetime.now()
+        repo.save([live, deleted])
+
+        service = TaskService(repo)
+        assert service.list_tasks() == [live]
+        found = service.get_task(deleted.id, include_deleted=True)
+        assert found is not None and found.id == deleted.id
+        service.add_task("追加")
+        assert deleted.id not in [t.id for t in repo.load()]
+        assert [t.id for t in repo.load_trash()] == [deleted.id]
+
+    def test_data_file_wins_over_trash(self, tmp_path: Path) -> None:
+        # ゴミ箱への追記の後、データファイルの保存前に落ちた場合
+        repo = TaskRepository(tmp_path / "tasks.json")
+        service = TaskService(repo)
+        task = service.add_task("タスク")
+        copy = Task.from_dict(task.to_dict())
+        copy.deleted_at = datetime.now()
+        repo.append_trash([copy])
+
+        fresh = TaskService(repo)
+        assert fresh.list_tasks() == [task]
+        with pytest.raises(TaskNotFoundError):
+            fresh.restore_task(task.id)
+        assert fresh.purge_tasks(timedelta(days=1)) == 0
+        fresh.delete_task(task.id)
+        assert [t.id for t in repo.load_trash()] == [task.id]
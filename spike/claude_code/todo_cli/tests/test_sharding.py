@@ -0,0 +1,265 @@
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from todo_cli.locking import lock_path
+from todo_cli.main import app
+from todo_cli.models import Priority, Task
+from todo_cli.repository import TaskRepository, trash_path
+from todo_cli.service import SortKey, TaskService, encode_cursor
+from todo_cli.sharding import (
+    ShardedTaskRepository,
+    is_sharded,
+    manifest_path,
+    open_repository,
+    shard_dir,
+    split_store,
+)
+
+CATEGORIES = ["仕事", "家", "Work", "work", None]
+
+
+def _fill(path: Path, count: int) -> list[Task]:
+    rng = random.Random(count)
+    service = TaskService(TaskRepository(path))
+    for i in range(count):
+        service.add_task(
+            f"task {i}",
+            priority=rng.choice(list(Priority)),
+            due_date=None if i % 5 == 0 else date(2026, 4, 1) + timedelta(days=rng.randint(-20, 20)),
+            category=rng.choice(CATEGORIES),
+        )
+    return TaskRepository(path).load()
+
+
+def _shard_files(path: Path) -> dict[str, bytes]:
+    return {p.name: p.read_bytes() for p in shard_dir(path).glob("*.json") if p.name != "manifest.json"}
+
+
+@pytest.fixture
+def sharded(tmp_path: Path) -> tuple[Path, list[Task]]:
+    # 同じタスクを持つ1つのファイルのストア（single/tasks.json）と分割したストア（tasks.json）
+    path = tmp_path / "tasks.json"
+    tasks = _fill(path, 60)
+    (tmp_path / "single").mkdir()
+    (tmp_path / "single" / "tasks.json").write_bytes(path.read_bytes())
+    split_store(path)
+    return path, tasks
+
+
+class TestSplitStore:
+    def test_moves_tasks_into_one_file_per_category(self, sharded: tuple[Path, list[Task]]) -> None:
+        path, tasks = sharded
+        assert not path.exists()
+        assert is_sharded(path)
+        assert isinstance(open_repository(path), ShardedTaskRepository)
+        manifest = json.loads(manifest_path(path).read_text(encoding="utf-8"))
+        assert {entry["category"] for entry in manifest["shards"]} == {t.category for t in tasks}
+        assert sorted(_shard_files(path)) == sorted(entry["file"] for entry in manifest["shards"])
+
+        repo = ShardedTaskRepository(path)
+        assert repo.load() == tasks
+        assert repo.load_category("work") == [t for t in tasks if t.category == "work"]
+        assert repo.load_category(None) == [t for t in tasks if t.category is None]
+        assert repo.load_category("なし") == []
+
+    def test_refuses_to_split_twice(self, sharded: tuple[Path, list[Task]]) -> None:
+        path, _ = sharded
+        with pytest.raises(ValueError, match="既に"):
+            split_store(path)
+
+    def test_moves_deleted_tasks_of_old_format_to_trash(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        kept, deleted = Task.create(title="残す"), Task.create(title="削除済み", category="仕事")
+        deleted.deleted_at = deleted.created_at
+        TaskRepository(path).save([kept, deleted])
+
+        assert split_store(path) == (1, 1)
+        assert ShardedTaskRepository(path).load() == [kept]
+        assert [t.id for t in TaskRepository(path).load_trash()] == [deleted.id]
+
+    def test_empty_store(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        assert split_store(path) == (0, 0)
+        service = TaskService(open_repository(path))
+        assert service.list_tasks() == []
+        service.add_task("最初", category="仕事")
+        assert [t.title for t in TaskService(open_repository(path)).list_tasks()] == ["最初"]
+
+
+class TestShardedService:
+    @pytest.mark.parametrize("sort", [None, *SortKey])
+    @pytest.mark.parametrize("category", [None, "仕事", "work", "なし"])
+    def test_lists_like_a_single_file(
+        self, sharded: tuple[Path, list[Task]], sort: SortKey | None, category: str | None
+    ) -> None:
+        path, _ = sharded
+        single = TaskService(TaskRepository(path.parent / "single" / "tasks.json"))
+        split = TaskService(ShardedTaskRepository(path))
+        for done in (None, False):
+            expected = single.list_tasks(done=done, category=category, sort=sort)
+            fresh = TaskService(ShardedTaskRepository(path))
+            assert fresh.list_tasks(done=done, category=category, sort=sort) == expected
+            # 2回目からは索引を使う
+            assert split.list_tasks(done=done, category=category, sort=sort) == expected
+            page = single.list_tasks(category=category, sort=sort, limit=4)
+            if page:
+                cursor = encode_cursor(sort, page[-1])
+                assert TaskService(ShardedTaskRepository(path)).list_tasks(
+                    category=category, sort=sort, limit=5, after=cursor
+                ) == single.list_tasks(category=category, sort=sort, limit=5, after=cursor)
+
+    def test_category_list_reads_only_its_shard(
+        self, sharded: tuple[Path, list[Task]], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path, tasks = sharded
+
+        def fail(self: ShardedTaskRepository) -> list[Task]:
+            raise AssertionError("read every shard")
+
+        monkeypatch.setattr(ShardedTaskRepository, "load", fail)
+        service = TaskService(ShardedTaskRepository(path))
+        listed = service.list_tasks(category="仕事", sort=SortKey.DUE_DATE)
+        assert {t.id for t in listed} == {t.id for t in tasks if t.category == "仕事"}
+
+    def test_add_reads_and_rewrites_only_its_shard(
+        self, sharded: tuple[Path, list[Task]], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path, tasks = sharded
+        before = _shard_files(path)
+
+        def fail(self: ShardedTaskRepository) -> list[Task]:
+            raise AssertionError("read every shard")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(ShardedTaskRepository, "load", fail)
+            added = TaskService(ShardedTaskRepository(path)).add_task("追加", category="家")
+
+        after = _shard_files(path)
+        assert len(set(before) - set(after)) == 1
+        assert {name: data for name, data in after.items() if name in before} == {
+            name: data for name, data in before.items() if name in after
+        }
+        assert ShardedTaskRepository(path).load() == tasks + [added]
+
+    def test_mutations_rewrite_only_touched_shards(self, sharded: tuple[Path, list[Task]]) -> None:
+        path, tasks = sharded
+        service = TaskService(ShardedTaskRepository(path))
+        work = next(t for t in tasks if t.category == "work")
+        home = next(t for t in tasks if t.category == "家")
+        loose = next(t for t in tasks if t.category is None)
+
+        # 書き直したカテゴリのファイルは次の世代の名前に置き換わる
+        before = set(_shard_files(path))
+        service.complete_task(work.id)
+        assert len(before - set(_shard_files(path))) == 1
+
+        before = set(_shard_files(path))
+        service.edit_task(home.id, category="Work")
+        assert len(before - set(_shard_files(path))) == 2
+
+        before = set(_shard_files(path))
+        service.delete_task(loose.id)
+        assert len(before - set(_shard_files(path))) == 1
+        service.restore_task(loose.id)
+
+        reloaded = TaskService(ShardedTaskRepository(path))
+        assert reloaded.get_task(work.id).done  # type: ignore[union-attr]
+        assert reloaded.get_task(home.id).category == "Work"  # type: ignore[union-attr]
+        assert {t.id for t in reloaded.list_tasks()} == {t.id for t in tasks}
+        assert trash_path(path).exists()
+
+    def test_restored_task_goes_to_the_end_like_a_single_file(self, tmp_path: Path) -> None:
+        # A(x) B(y) C(x) D(y) で A を削除して復元すると、1つのファイルのストアと同じく B C D A になる
+        path, single_path = tmp_path / "tasks.json", tmp_path / "single" / "tasks.json"
+        split_store(path)
+        sharded = TaskService(open_repository(path))
+        for title, category in zip("ABCD", "xyxy"):
+            sharded.add_task(title, category=category)
+        TaskRepository(single_path).save(ShardedTaskRepository(path).load())
+        single = TaskService(TaskRepository(single_path))
+        a = sharded.list_tasks()[0]
+        for service in (sharded, single):
+            service.delete_task(a.id)
+            service.restore_task(a.id)
+
+        expected = ["B", "C", "D", "A"]
+        assert [t.title for t in single.list_tasks()] == expected
+        assert [t.title for t in sharded.list_tasks()] == expected
+        fresh = TaskService(ShardedTaskRepository(path))
+        assert [t.title for t in fresh.list_tasks()] == expected
+        assert [t.title for t in TaskService(ShardedTaskRepository(path)).list_tasks(category="x")] == ["C", "A"]
+
+        # 常駐中のサービスで取ったカーソルを、別のプロセスで続けても A を飛ばさない
+        d = sharded.list_tasks(limit=3)[-1]
+        assert d.title == "D"
+        resumed = TaskService(ShardedTaskRepository(path)).list_tasks(after=encode_cursor(None, d))
+        assert [t.title for t in resumed] == ["A"]
+
+        # 番号は保存し直しても変わらず、カテゴリを変えても位置は動かない
+        fresh.edit_task(next(t.id for t in fresh.list_tasks() if t.title == "B"), category="x")
+        assert [t.title for t in TaskService(ShardedTaskRepository(path)).list_tasks()] == expected
+
+    def test_parallel_and_serial_loads_match(self, sharded: tuple[Path, list[Task]]) -> None:
+        path, tasks = sharded
+        assert ShardedTaskRepository(path, max_workers=1).load() == tasks
+        assert ShardedTaskRepository(path, max_workers=4).load() == tasks
+
+    def test_emptied_category_is_dropped(self, tmp_path: Path) -> None:
+        path = tmp_path / "tasks.json"
+        split_store(path)
+        service = TaskService(open_repository(path))
+        task = service.add_task("一件だけ", category="仕事")
+        service.delete_task(task.id)
+        manifest = json.loads(manifest_path(path).read_text(encoding="utf-8"))
+        assert manifest["shards"] == []
+        assert _shard_files(path) == {}
+
+    def test_other_process_writes_are_seen(self, sharded: tuple[Path, list[Task]]) -> None:
+        path, tasks = sharded
+        warm = TaskService(ShardedTaskRepository(path))
+        assert len(warm.list_tasks()) == len(tasks)
+        added = TaskService(ShardedTaskRepository(path)).add_task("別のプロセス", category="仕事")
+        assert warm.list_tasks()[-1] == added
+        assert added in warm.list_tasks(category="仕事")
+
+    def test_crash_before_manifest_keeps_previous_store(
+        self, sharded: tuple[Path, list[Task]], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path, tasks = sharded
+
+        def crash(path: Path, data: bytes) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr("todo_cli.sharding.write_atomic", crash)
+        with pytest.raises(OSError):
+            TaskService(ShardedTaskRepository(path)).complete_task(tasks[0].id)
+        monkeypatch.undo()
+        assert ShardedTaskRepository(path).load() == tasks
+        assert lock_path(manifest_path(path)).exists()
+
+
+class TestShardCommand:
+    def test_shard_and_use(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        data_file = tmp_path / "tasks.json"
+        monkeypatch.setattr("todo_cli.main._DATA_FILE", data_file)
+        runner = CliRunner()
+        runner.invoke(app, ["add", "報告書", "--category", "仕事"])
+        runner.invoke(app, ["add", "買い物", "--category", "家"])
+
+        result = runner.invoke(app, ["shard"])
+        assert result.exit_code == 0
+        assert "2 件のタスクを 2 個" in result.output
+        assert not data_file.exists()
+
+        runner.invoke(app, ["add", "会議", "--category", "仕事"])
+        result = runner.invoke(app, ["list", "--category", "仕事", "--format", "plain"])
+        assert "報告書" in result.output and "会議" in result.output and "買い物" not in result.output
+
+        result = runner.invoke(app, ["shard"])
+        assert result.exit_code == 1
+        assert "既に" in result.output
@@ -0,0 +1,63 @@
+"""`todo` の起動時間の予算。
+
+コマンドごとに新しいインタプリタを起動し、数回のうち最速の時間を予算と比べる。
+遅い環境では TODO_STARTUP_BUDGET_SCALE で予算を広げられる。
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+RUNS = 5
+BUDGET_SCALE = float(os.environ.get("TODO_STARTUP_BUDGET_SCALE", "1"))
+
+# コマンドを実行し、読み込まれたモジュール名を標準エラーの最終行に出す
+_PROBE = """
+import json, sys
+from todo_cli.client import main
+try:
+    main(sys.argv[1:])
+finally:
+    sys.stderr.write("\\n" + json.dumps(sorted(sys.modules)))
+"""
+
+
+def _launch(home: Path, *argv: str) -> tuple[float, set[str], str]:
+    # HOME を差し替え、既存のデーモンやデータファイルに触れないようにする
+    env = {**os.environ, "HOME": str(home), "PYTHONPATH": str(SRC_DIR)}
+    best = float("inf")
+    modules: set[str] = set()
+    stdout = ""
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE, *argv],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        best = min(best, time.perf_counter() - started)
+        modules = set(json.loads(result.stderr.splitlines()[-1]))
+        stdout = result.stdout
+    return best, modules, stdout
+
+
+class TestStartup:
+    def test_help_within_budget(self, tmp_path: Path) -> None:
+        elapsed, _, stdout = _launch(tmp_path, "--help")
+        assert "CLIタスク管理アプリ" in stdout
+        assert elapsed < 0.6 * BUDGET_SCALE
+
+    def test_list_on_empty_store_within_budget(self, tmp_path: Path) -> None:
+        elapsed, _, stdout = _launch(tmp_path, "list")
+        assert "タスクがありません" in stdout
+        assert elapsed < 0.6 * BUDGET_SCALE
+
+    def test_add_does_not_import_rich(self, tmp_path: Path) -> None:
+        _, modules, _ = _launch(tmp_path, "add", "牛乳を買う")
+        assert "rich.console" not in modules
+        assert "rich.table" not in modules
@@ -0,0 +1,76 @@
+"""done 1回の時間を、通常保存とジャーナルモード（インデックスあり/なし）で比較するベンチマーク。
+
+    pipenv run python benchmarks/bench_journal.py [タスク数 ...]
+
+ジャーナルモードは対象の1件だけを読む。インデックスがあればそのレコードを、なければ
+スナップショットのバイト列を走査して読むので、走査の分だけストアの大きさに比例する。
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from todo_cli.commands.done import mark_done  # noqa: E402
+from todo_cli.models import Task  # noqa: E402
+from todo_cli.search_index import index_path, rebuild_index  # noqa: E402
+from todo_cli.storage import journal_path, save_tasks  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+ROUNDS = 20
+
+
+def _make_tasks(count: int) -> list[Task]:
+    return [
+        Task(
+            id=str(uuid.uuid4()),
+            title=f"task {i}",
+            description=None,
+            priority="medium",
+            due_date=None,
+            categories=["work"],
+            status="open",
+            created_at="2026-01-01T00:00:00Z",
+            completed_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def _time(storage: Path, tasks: list[Task], *, journal: bool) -> float:
+    # 毎回違うタスクを完了にし、1回あたりの平均を返す。
+    targets = tasks[:: max(1, len(tasks) // ROUNDS)][:ROUNDS]
+    start = time.perf_counter()
+    for task in targets:
+        mark_done(storage, task.id, journal=journal)
+    return (time.perf_counter() - start) / len(targets)
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'tasks':>8} {'full save':>11} {'journal+index':>14} {'journal+scan':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            tasks = _make_tasks(count)
+            storage = Path(tmp) / f"{count}" / "tasks.json"
+            storage.parent.mkdir()
+            timings = []
+            for journal, indexed in ((False, False), (True, True), (True, False)):
+                save_tasks(storage, tasks)
+                journal_path(storage).unlink(missing_ok=True)
+                index_path(storage).unlink(missing_ok=True)
+                if indexed:
+                    rebuild_index(storage)
+                timings.append(_time(storage, tasks, journal=journal))
+            full, with_index, scan = (t * 1e3 for t in timings)
+            print(f"{count:>8,} {full:>9.1f}ms {with_index:>12.2f}ms {scan:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
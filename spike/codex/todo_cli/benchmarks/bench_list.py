@@ -0,0 +1,100 @@
+"""list の全件走査と列指向表現（TaskColumns）での問い合わせを比較するベンチマーク。
+
+    pipenv run python benchmarks/bench_list.py [タスク数]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from todo_cli.columns import TaskColumns  # noqa: E402
+from todo_cli.commands import list as list_command  # noqa: E402
+from todo_cli.models import Task  # noqa: E402
+from todo_cli.storage import load_tasks, save_tasks  # noqa: E402
+
+CATEGORIES = [f"cat{i}" for i in range(50)]
+PAGE = 20
+TODAY = date(2026, 6, 1)
+QUERIES = (
+    ("open by due", dict(status="open", sort="due")),
+    ("high+cat", dict(priority="high", category="cat7", sort="created")),
+    ("overdue", dict(status="open", overdue=True, sort="priority")),
+    ("done", dict(status="done")),
+)
+
+
+def _make_tasks(count: int) -> list[Task]:
+    rng = random.Random(0)
+    return [
+        Task(
+            id=str(i),
+            title=f"task {i}",
+            description=None,
+            priority=rng.choice(["high", "medium", "low"]),
+            due_date=None if rng.random() < 0.2 else f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            categories=[rng.choice(CATEGORIES)],
+            status=rng.choice(["open", "done"]),
+            created_at=f"2026-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+            completed_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def _scan(tasks: list[Task], options: dict, limit: int | None = None) -> list[Task]:
+    # list_tasks の読み込み後と同じ全件走査のパイプライン
+    results = list_command._filter_status(tasks, options.get("status", "all"))
+    results = list_command._filter_priority(results, options.get("priority"))
+    results = list_command._filter_category(results, options.get("category"))
+    if options.get("overdue"):
+        results = list_command._filter_overdue(results, TODAY)
+    return list_command._page(tasks, results, options.get("sort"), limit, None)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Path(tmp) / "tasks.json"
+        save_tasks(storage, _make_tasks(count))
+        print(f"{count:,} tasks, {storage.stat().st_size / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        tasks = load_tasks(storage)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        columns = TaskColumns(tasks)
+        build = time.perf_counter() - start
+        print(f"  load {load * 1e3:.1f} ms, build columns {build * 1e3:.1f} ms")
+
+        for label, options in QUERIES:
+            # どちらも読み込み済みのタスクに対する絞り込み・並べ替えだけを比べる。
+            start = time.perf_counter()
+            hits = _scan(tasks, options)
+            scan = time.perf_counter() - start
+            start = time.perf_counter()
+            list_command.list_tasks(storage, today=TODAY, columns=columns, **options)  # type: ignore[arg-type]
+            columnar = time.perf_counter() - start
+            # --limit PAGE: 並べ替えありならヒープで上位だけを選ぶ
+            start = time.perf_counter()
+            _scan(tasks, options, PAGE)
+            scan_top = time.perf_counter() - start
+            start = time.perf_counter()
+            list_command.list_tasks(storage, today=TODAY, columns=columns, limit=PAGE, **options)  # type: ignore[arg-type]
+            columnar_top = time.perf_counter() - start
+            print(
+                f"  {label:<12} {len(hits):>8} hits  scan {scan * 1e3:>8.1f} ms  "
+                f"columns {columnar * 1e3:>8.1f} ms  "
+                f"top{PAGE}: scan {scan_top * 1e3:>8.1f} ms  columns {columnar_top * 1e3:>8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""report をこのプロセスだけで読む場合とプロセスプールで読む場合を比較するベンチマーク。
+
+    pipenv run python benchmarks/bench_report.py [ストア数] [1ストアあたりのタスク数]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from todo_cli.commands.report import build_report  # noqa: E402
+from todo_cli.models import Task  # noqa: E402
+from todo_cli.storage import save_tasks  # noqa: E402
+
+CATEGORIES = ("work", "home", "errand", "study", "health")
+TODAY = date(2026, 6, 1)
+
+
+def _make_tasks(rng: random.Random, count: int) -> list[Task]:
+    return [
+        Task(
+            id=str(uuid.uuid4()),
+            title=f"task {i}",
+            description=None,
+            priority=rng.choice(("high", "medium", "low")),
+            due_date=f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            categories=rng.sample(CATEGORIES, rng.randint(0, 2)),
+            status=rng.choice(("open", "done")),
+            created_at=f"2026-01-{rng.randint(1, 28):02d}T00:00:00Z",
+            completed_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    stores = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_store = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in range(stores):
+            save_tasks(Path(tmp) / f"user{n:03d}" / "tasks.json", _make_tasks(rng, per_store))
+        pattern = [str(Path(tmp) / "*" / "tasks.json")]
+        print(f"{stores} stores x {per_store:,} tasks, {os.cpu_count()} CPUs")
+
+        for workers in (1, None):
+            for limit in (None, 20):
+                start = time.perf_counter()
+                report = build_report(pattern, sort="due", limit=limit, today=TODAY, workers=workers)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  workers {workers or 'cpu':<4} limit {limit or 'all':<4} "
+                    f"{len(report.tasks):>9,} rows {elapsed * 1e3:>9.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
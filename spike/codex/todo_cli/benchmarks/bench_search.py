@@ -0,0 +1,91 @@
+"""search の全件走査とインデックス検索を比較するベンチマーク。
+
+    pipenv run python benchmarks/bench_search.py [タスク数]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from todo_cli.commands.search import search_tasks  # noqa: E402
+from todo_cli.models import Task  # noqa: E402
+from todo_cli.search_index import index_path, rebuild_index  # noqa: E402
+from todo_cli.storage import load_tasks, save_tasks  # noqa: E402
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike "
+    "november oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu "
+    "仕様 会議 資料 確認 提出 レビュー 設計 実装 テスト 報告"
+).split()
+QUERIES = (("zulu",), ("レビュー",), ("kilo", "tango"), ("uniq-42",), ("uniq-7", "uniq-9"))
+
+
+def _make_tasks(count: int) -> list[Task]:
+    rng = random.Random(0)
+    tasks = []
+    for i in range(count):
+        description = " ".join(rng.choice(WORDS) for _ in range(60)) + f" uniq-{i}"
+        tasks.append(
+            Task(
+                id=str(uuid.uuid4()),
+                title=" ".join(rng.choice(WORDS) for _ in range(5)),
+                description=description,
+                priority="medium",
+                due_date=None,
+                categories=[],
+                status="open",
+                created_at="2026-01-01T00:00:00Z",
+                completed_at=None,
+            )
+        )
+    return tasks
+
+
+def _time(label: str, storage: Path, load: Optional[float]) -> None:
+    # 走査では照合部分（全体 - 読み込み）も併記する。インデックス検索は候補だけを
+    # インデックスから読み、ストレージ全体を読み込まないので全体のみ。
+    for terms in QUERIES:
+        start = time.perf_counter()
+        hits = search_tasks(storage, *terms)
+        elapsed = time.perf_counter() - start
+        match = "" if load is None else f"  match {(elapsed - load) * 1e3:>8.1f} ms"
+        print(
+            f"  {label:<6} {' '.join(terms):<14} {len(hits):>7} hits "
+            f"total {elapsed * 1e3:>8.1f} ms{match}"
+        )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Path(tmp) / "tasks.json"
+        save_tasks(storage, _make_tasks(count))
+        print(f"{count:,} tasks, {storage.stat().st_size / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        load_tasks(storage)
+        load = time.perf_counter() - start
+        print(f"  load   {load * 1e3:.1f} ms")
+
+        _time("scan", storage, load)
+
+        start = time.perf_counter()
+        rebuild_index(storage)
+        print(
+            f"  reindex {time.perf_counter() - start:.1f} s, "
+            f"{index_path(storage).stat().st_size / 1e6:.1f} MB"
+        )
+        _time("index", storage, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""列指向表現（TaskColumns）による list のテスト。"""
+
+from __future__ import annotations
+
+import itertools
+import random
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from todo_cli.columns import TaskColumns, load_columns
+from todo_cli.commands.list import list_tasks
+from todo_cli.models import Task
+from todo_cli.storage import save_tasks
+
+
+def _random_tasks(count: int) -> list[Task]:
+    rng = random.Random(0)
+    tasks = []
+    for i in range(count):
+        due = rng.choice([None, f"2026-01-{rng.randint(1, 31):02d}"])
+        tasks.append(
+            Task(
+                id=str(i),
+                title=f"task {i}",
+                description=None,
+                priority=rng.choice(["high", "medium", "low"]),
+                due_date=due,
+                categories=rng.sample(["work", "home", "errand"], rng.randint(0, 2)),
+                status=rng.choice(["open", "done"]),
+                # 同じ作成日時を混ぜ、並べ替えの安定性も確かめる。
+                created_at=f"2026-01-{rng.randint(1, 5):02d}T10:00:00Z",
+                completed_at=None,
+            )
+        )
+    return tasks
+
+
+def test_columns_match_scan_for_all_combinations(tmp_path: Path) -> None:
+    """全ての条件の組み合わせで、列指向の結果が全件走査と一致することを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    save_tasks(storage_path, _random_tasks(300))
+    columns = load_columns(storage_path)
+
+    for status, priority, category, sort, overdue in itertools.product(
+        ["all", "open", "done"],
+        [None, "high", "low"],
+        [None, "Work", "errand", "missing", " "],
+        [None, "due", "priority", "created"],
+        [False, True],
+    ):
+        options = dict(
+            status=status,
+            priority=priority,
+            category=category,
+            sort=sort,
+            overdue=overdue,
+            today=date(2026, 1, 15),
+        )
+        expected = list_tasks(storage_path, **options)  # type: ignore[arg-type]
+        actual = list_tasks(storage_path, columns=columns, **options)  # type: ignore[arg-type]
+        assert [t.id for t in actual] == [t.id for t in expected], options
+
+
+def test_columns_encode_each_field_once() -> None:
+    """日付は数値の列に、カテゴリは辞書符号化されることを確認する。"""
+    columns = TaskColumns(_random_tasks(50))
+
+    assert len(columns) == 50
+    assert columns.priority.typecode == "B"
+    assert columns.due.typecode == columns.created.typecode == "q"
+    assert sorted(columns.category_names) == ["errand", "home", "work"]
+    assert columns.rows(columns.status_mask("done")) == [
+        row for row, task in enumerate(columns.tasks) if task.status == "done"
+    ]
+
+
+def test_columns_value_masks_and_order_key() -> None:
+    """値ごとのビット集合と、sort_rows と同じ順の行の位置を確認する。"""
+    columns = TaskColumns(_random_tasks(50))
+
+    work = columns.value_masks("category")["work"]
+    expected = [row for row, task in enumerate(columns.tasks) if "work" in task.categories]
+    assert columns.rows(work) == expected
+    assert set(columns.value_masks("priority")) == {"high", "medium", "low"}
+    assert sum(columns.value_masks("status").values()) == columns.all
+    with pytest.raises(ValueError, match="dimension"):
+        columns.value_masks("title")
+
+    rows = list(range(len(columns)))
+    for sort in ("due", "priority", "created"):
+        by_key = sorted(rows, key=lambda row: columns.order_key(row, sort))
+        assert by_key == columns.sort_rows(rows, sort)
+
+
+def test_columns_empty_and_invalid_sort(tmp_path: Path) -> None:
+    """空のストアでも動作し、不正な sort はエラーになることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    columns = load_columns(storage_path)
+
+    assert list_tasks(storage_path, columns=columns, overdue=True, sort="due") == []
+    with pytest.raises(ValueError, match="sort"):
+        list_tasks(storage_path, columns=columns, sort="unknown")
@@ -0,0 +1,227 @@
+"""ジャーナル（追記型ログ）ストレージのテスト。"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from todo_cli import cli
+from todo_cli.commands import delete, done, edit, undo
+from todo_cli.commands.add import add_task
+from todo_cli.commands.delete import delete_task
+from todo_cli.commands.done import mark_done
+from todo_cli.commands.edit import edit_task
+from todo_cli.commands.undo import mark_open
+from todo_cli.search_index import index_path
+from todo_cli.storage import (
+    append_add,
+    compact,
+    find_task,
+    journal_path,
+    load_tasks,
+    save_tasks,
+)
+
+
+def _journal_ops(storage_path: Path) -> list[dict]:
+    lines = journal_path(storage_path).read_text(encoding="utf-8").splitlines()
+    ops = [json.loads(line) for line in lines]
+    assert ops[0]["op"] == "base"
+    return ops[1:]
+
+
+def test_journal_mode_appends_without_rewriting_snapshot(tmp_path: Path) -> None:
+    """ジャーナルモードではスナップショットを書き換えないことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    base = add_task(storage_path, "Base", priority="low")
+    snapshot = storage_path.read_text(encoding="utf-8")
+
+    task = add_task(storage_path, "Write spec", priority="high", journal=True)
+    mark_done(storage_path, task.id, journal=True)
+    edit_task(storage_path, task.id, title="Write spec v2", journal=True)
+    delete_task(storage_path, base.id, journal=True)
+
+    assert storage_path.read_text(encoding="utf-8") == snapshot
+    ops = _journal_ops(storage_path)
+    assert [op["op"] for op in ops] == ["add", "patch", "patch", "delete"]
+    assert set(ops[1]["changes"]) == {"status", "completed_at"}
+    assert ops[2]["changes"] == {"title": "Write spec v2"}
+
+    tasks = load_tasks(storage_path)
+    assert [t.id for t in tasks] == [task.id]
+    assert tasks[0].title == "Write spec v2"
+    assert tasks[0].status == "done"
+
+    mark_open(storage_path, task.id, journal=True)
+    assert load_tasks(storage_path)[0].completed_at is None
+
+
+def test_full_save_folds_journal(tmp_path: Path) -> None:
+    """通常保存はジャーナルを畳み込んで削除することを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    first = add_task(storage_path, "First", priority="high", journal=True)
+    add_task(storage_path, "Second", priority="low")
+
+    assert not journal_path(storage_path).exists()
+    assert [t.title for t in load_tasks(storage_path)] == ["First", "Second"]
+    assert json.loads(storage_path.read_text(encoding="utf-8"))[0]["id"] == first.id
+
+
+def test_compaction_triggered_by_threshold(tmp_path: Path) -> None:
+    """ジャーナルが閾値を超えるとスナップショットへ畳み込まれることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    task = add_task(storage_path, "Task", priority="high")
+    append_add(storage_path, task, threshold=1)
+
+    assert not journal_path(storage_path).exists()
+    assert [t.id for t in load_tasks(storage_path)] == [task.id]
+
+
+def test_replay_is_idempotent_and_tolerates_torn_tail(tmp_path: Path) -> None:
+    """再生の冪等性と、末尾の書きかけ行の無視を確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    task = add_task(storage_path, "Task", priority="high")
+    save_tasks(storage_path, load_tasks(storage_path))
+    mark_done(storage_path, task.id, journal=True)
+    # スナップショット保存後にジャーナル削除前で落ちた状況を再現する。
+    log = journal_path(storage_path).read_text(encoding="utf-8")
+    compact(storage_path)
+    journal_path(storage_path).write_text(log + '{"op": "del', encoding="utf-8")
+
+    tasks = load_tasks(storage_path)
+    assert len(tasks) == 1
+    assert tasks[0].status == "done"
+
+
+def test_stale_journal_left_by_crash_is_not_replayed(monkeypatch, tmp_path: Path) -> None:
+    """スナップショット保存後、ジャーナル削除前に落ちても古い変更を再生しないことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    add_task(storage_path, "Base", priority="low")
+    task = add_task(storage_path, "Y", priority="high", journal=True)
+    edit_task(storage_path, task.id, title="Y v2", journal=True)
+
+    real_unlink = Path.unlink
+
+    def crash(self: Path, missing_ok: bool = False) -> None:
+        if self == journal_path(storage_path):
+            raise OSError("crashed before removing the journal")
+        real_unlink(self, missing_ok=missing_ok)
+
+    monkeypatch.setattr(Path, "unlink", crash)
+    try:
+        mark_done(storage_path, task.id)
+    except OSError:
+        pass
+    monkeypatch.undo()
+    assert journal_path(storage_path).exists()
+
+    tasks = load_tasks(storage_path)
+    assert [(t.title, t.status) for t in tasks] == [("Base", "open"), ("Y v2", "done")]
+
+    # 残った古いジャーナルへの追記は捨てられず、新しいジャーナルとして書き直される。
+    other = add_task(storage_path, "Z", priority="low", journal=True)
+    assert [op["op"] for op in _journal_ops(storage_path)] == ["add"]
+    tasks = load_tasks(storage_path)
+    assert [(t.title, t.status) for t in tasks] == [
+        ("Base", "open"),
+        ("Y v2", "done"),
+        ("Z", "open"),
+    ]
+    assert tasks[-1].id == other.id
+
+
+def test_copied_store_keeps_its_journal(tmp_path: Path) -> None:
+    """ストアを別の場所へコピーしても、内容が同じスナップショットのジャーナルは再生されることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    base = add_task(storage_path, "Base", priority="low")
+    mark_done(storage_path, base.id, journal=True)
+
+    copied = tmp_path / "copy" / "tasks.json"
+    copied.parent.mkdir()
+    copied.write_bytes(storage_path.read_bytes())
+    journal_path(copied).write_bytes(journal_path(storage_path).read_bytes())
+
+    assert load_tasks(copied)[0].status == "done"
+
+
+def test_append_after_torn_tail_drops_partial_line(tmp_path: Path) -> None:
+    """追記途中で中断された末尾行を切り詰めてから追記し、後続の追加が失われないことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    first = add_task(storage_path, "First", priority="high", journal=True)
+    with journal_path(storage_path).open("ab") as f:
+        f.write(b'{"op":"add","task":{"id":"torn')
+
+    second = add_task(storage_path, "Second", priority="low", journal=True)
+    third = add_task(storage_path, "Third", priority="low", journal=True)
+
+    assert [op["task"]["id"] for op in _journal_ops(storage_path)] == [first.id, second.id, third.id]
+    assert [t.id for t in load_tasks(storage_path)] == [first.id, second.id, third.id]
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_journal_commands_do_not_load_the_whole_store(
+    monkeypatch, tmp_path: Path, with_index: bool
+) -> None:
+    """ジャーナルモードの更新は、ストア全体を読み込まずに対象の1件だけを読むことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    tasks = [add_task(storage_path, f"Task {i}", priority="low") for i in range(5)]
+    if not with_index:
+        index_path(storage_path).unlink()
+
+    def fail(path: Path) -> list:
+        raise AssertionError("loaded the whole store")
+
+    for module in (delete, done, edit, undo):
+        monkeypatch.setattr(module, "load_tasks", fail)
+    target = tasks[2]
+    assert mark_done(storage_path, target.id, journal=True).status == "done"
+    assert edit_task(storage_path, target.id, title="Edited", journal=True).status == "done"
+    assert mark_open(storage_path, target.id, journal=True).title == "Edited"
+    assert delete_task(storage_path, tasks[0].id, journal=True).id == tasks[0].id
+    with pytest.raises(ValueError, match="not found"):
+        mark_done(storage_path, tasks[0].id, journal=True)
+    with pytest.raises(ValueError, match="not found"):
+        edit_task(storage_path, "missing", title="x", journal=True)
+    monkeypatch.undo()
+
+    loaded = load_tasks(storage_path)
+    assert [t.id for t in loaded] == [t.id for t in tasks[1:]]
+    assert (loaded[1].title, loaded[1].status, loaded[1].completed_at) == ("Edited", "open", None)
+
+
+def test_find_task_reads_one_record(tmp_path: Path) -> None:
+    """find_task がスナップショットの1件とそのIDのジャーナル行から現在の状態を返すことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    first = add_task(storage_path, 'Has "id": "quoted" {text}', priority="low")
+    second = add_task(storage_path, "Second", priority="high")
+    mark_done(storage_path, second.id, journal=True)
+    third = add_task(storage_path, "Third", priority="low", journal=True)
+
+    assert find_task(storage_path, first.id) == first
+    assert find_task(storage_path, second.id).status == "done"  # type: ignore[union-attr]
+    assert find_task(storage_path, third.id) == third
+    assert find_task(storage_path, "missing") is None
+
+    # ID が先頭にない（手で編集した）スナップショットは全体をパースして探す。
+    data = json.loads(storage_path.read_text(encoding="utf-8"))
+    storage_path.write_text(
+        json.dumps([dict(reversed(list(item.items()))) for item in data]), encoding="utf-8"
+    )
+    assert find_task(storage_path, first.id) == first
+
+
+def test_cli_journal_flag_and_compact(capsys, tmp_path: Path) -> None:
+    """CLIの --journal と compact を確認する。"""
+    storage = tmp_path / "tasks.json"
+    assert cli.main(["--storage", str(storage), "--journal", "add", "Task", "--priority", "high"]) == 0
+    task_id = capsys.readouterr().out.split()[2]
+    assert cli.main(["--storage", str(storage), "--journal", "done", task_id]) == 0
+    assert not storage.exists()
+    assert journal_path(storage).exists()
+
+    assert cli.main(["--storage", str(storage), "compact"]) == 0
+    assert capsys.readouterr().out.strip().endswith(f"Compacted: {storage}")
+    assert not journal_path(storage).exists()
+    assert load_tasks(storage)[0].status == "done"
@@ -0,0 +1,102 @@
+"""ストアのロックとアトミックな書き込みのテスト。"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from pathlib import Path
+
+import pytest
+
+from todo_cli.commands.add import add_task
+from todo_cli.commands.done import mark_done
+from todo_cli.locking import locked, read_version
+from todo_cli.storage import load_tasks, save_tasks, transaction
+
+WORKERS = 4
+UPDATES = 25
+
+
+def _add_worker(storage_path: Path, worker: int, journal: bool) -> None:
+    for i in range(UPDATES):
+        add_task(storage_path, f"w{worker}-{i}", priority="low", journal=journal)
+
+
+def _rename_worker(storage_path: Path, worker: int) -> None:
+    # 全員が同じタスクのタイトルへ自分の印を足していく（読み込み→変更→保存）。
+    for i in range(UPDATES):
+        with transaction(storage_path) as tasks:
+            tasks[0] = tasks[0].replace(title=f"{tasks[0].title},{worker}-{i}")
+
+
+def _run_workers(target, *args) -> None:  # type: ignore[no-untyped-def]
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=(args[0], n, *args[1:])) for n in range(WORKERS)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_parallel_adds_do_not_lose_writes(tmp_path: Path, journal: bool) -> None:
+    """複数プロセスから同時に追加しても、全件が残ることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+
+    _run_workers(_add_worker, storage_path, journal)
+
+    titles = {t.title for t in load_tasks(storage_path)}
+    assert titles == {f"w{n}-{i}" for n in range(WORKERS) for i in range(UPDATES)}
+
+
+def test_parallel_transactions_on_same_task(tmp_path: Path) -> None:
+    """同じタスクへの読み込み→変更→保存が直列化されることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    add_task(storage_path, "start", priority="low")
+
+    _run_workers(_rename_worker, storage_path)
+
+    marks = load_tasks(storage_path)[0].title.split(",")[1:]
+    assert sorted(marks) == sorted(f"{n}-{i}" for n in range(WORKERS) for i in range(UPDATES))
+
+
+def test_every_write_bumps_version(tmp_path: Path) -> None:
+    """書き込みごとに版が進むことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    assert read_version(storage_path) == 0
+
+    task = add_task(storage_path, "Write spec", priority="high")
+    first = read_version(storage_path)
+    mark_done(storage_path, task.id, journal=True)
+
+    assert first > 0
+    assert read_version(storage_path) > first
+
+
+def test_failed_write_keeps_previous_snapshot(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """書き込み途中で失敗しても、元のファイルが残ることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    add_task(storage_path, "Keep me", priority="low")
+    before = storage_path.read_text(encoding="utf-8")
+    version = read_version(storage_path)
+
+    def broken_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        save_tasks(storage_path, [])
+
+    assert storage_path.read_text(encoding="utf-8") == before
+    assert read_version(storage_path) == version
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["tasks.json", "tasks.json.idx", "tasks.json.lock"]
+
+
+def test_shared_lock_cannot_be_upgraded(tmp_path: Path) -> None:
+    """共有ロック中に同じストアの排他ロックを取ろうとするとエラーになることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    with locked(storage_path, shared=True):
+        with pytest.raises(RuntimeError):
+            with locked(storage_path):
+                pass
@@ -0,0 +1,121 @@
+"""Task モデルのテスト。"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import pickle
+import tracemalloc
+
+import pytest
+
+from todo_cli.models import Task
+
+# 100万件で確かめるときは TODO_MEMORY_TEST_TASKS=1000000 を指定する。
+MEMORY_TEST_TASKS = int(os.environ.get("TODO_MEMORY_TEST_TASKS", "50000"))
+
+
+def _record(i: int) -> dict:
+    return {
+        "id": f"{i:08x}-0000-4000-8000-000000000000",
+        "title": f"task {i}",
+        "description": None,
+        "priority": ("high", "medium", "low")[i % 3],
+        "due_date": f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 5 else None,
+        "categories": [f"cat{i % 20}"] if i % 4 else [],
+        "status": "done" if i % 3 == 0 else "open",
+        "created_at": f"2026-01-{i % 28 + 1:02d}T09:{i // 60 % 60:02d}:{i % 60:02d}Z",
+        "completed_at": f"2026-02-01T10:{i // 60 % 60:02d}:{i % 60:02d}Z" if i % 3 == 0 else None,
+    }
+
+
+def test_round_trip_restores_every_field() -> None:
+    """保存形式へ戻すと読み込んだ値とまったく同じになる。"""
+    records = [_record(i) for i in range(200)]
+    tasks = [Task.from_dict(record) for record in records]
+    assert [task.to_dict() for task in tasks] == records
+    assert tasks[3].created_at == "2026-01-04T09:00:03Z"
+    assert tasks[3].completed_at == "2026-02-01T10:00:03Z"
+    assert tasks[1].due_date == "2026-02-02"
+
+
+@pytest.mark.parametrize(
+    ("field", "value"),
+    [
+        ("created_at", "2026-01-31T20:04:11+00:00"),
+        ("created_at", "2026-01-31T24:00:00Z"),
+        ("created_at", "2026-W05-6T20:04:11Z"),
+        ("due_date", "2026-2-5"),
+        ("priority", "urgent"),
+    ],
+)
+def test_unexpected_formats_are_kept_verbatim(field: str, value: str) -> None:
+    """想定外の書き方の値も、保存し直して変わらない。"""
+    record = dict(_record(1), **{field: value})
+    task = Task.from_dict(record)
+    assert getattr(task, field) == value
+    assert task.to_dict() == record
+
+
+def test_replace_returns_changed_copy() -> None:
+    """replace は指定した属性だけを変えた複製を返し、元のタスクは変えない。"""
+    task = Task.from_dict(_record(1))
+    done = task.replace(status="done", completed_at="2026-03-01T00:00:00Z")
+    assert done.status == "done"
+    assert done.completed_at == "2026-03-01T00:00:00Z"
+    assert done.replace(status="open", completed_at=None) == task
+    assert task.status == "open"
+    assert task.completed_at is None
+
+
+def test_task_is_immutable_and_slotted() -> None:
+    """属性は読み取り専用で、インスタンスごとの __dict__ を持たない。"""
+    task = Task.from_dict(_record(1))
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.title = "changed"  # type: ignore[misc]
+
+
+def test_pickle_round_trip() -> None:
+    """pickle で渡しても同じタスクに戻る（想定外の優先度も名前で渡る）。"""
+    tasks = [Task.from_dict(_record(i)) for i in range(50)]
+    tasks.append(Task.from_dict(dict(_record(1), priority="someday")))
+    restored = pickle.loads(pickle.dumps(tasks))
+    assert restored == tasks
+    assert [task.to_dict() for task in restored] == [task.to_dict() for task in tasks]
+
+
+def test_created_seconds_orders_every_format() -> None:
+    """created_seconds は書き方によらず作成日時の順に並ぶ。"""
+    values = ["2026-01-01T09:00:00+09:00", "2026-01-01T00:00:01Z", "2026-01-01T00:00:01.5", "2026-01-01T00:00:02Z"]
+    tasks = [Task.from_dict(dict(_record(1), created_at=value)) for value in values]
+    seconds = [task.created_seconds for task in tasks]
+    assert seconds == sorted(seconds)
+    assert seconds[0] == seconds[1] - 1
+
+
+def test_categories_and_status_are_shared() -> None:
+    """同じカテゴリ名・ステータスは読み込むたびに作られた文字列でも1つを共有する。"""
+    first, second = (Task.from_dict(json.loads(json.dumps(_record(1)))) for _ in range(2))
+    assert first.categories == ["cat1"]
+    assert first.categories[0] is second.categories[0]
+    assert first.status is second.status
+
+
+def test_per_task_memory() -> None:
+    """JSON から読み込んだタスクが保持するメモリを tracemalloc で測る。
+
+    読み込み後は辞書を捨てるので、タスクが持ち続ける文字列も含めて数える。
+    ISO 文字列をそのまま持っていた以前のモデルでは約 660 バイト、今は約 340 バイト。
+    """
+    raw = json.dumps([_record(i) for i in range(MEMORY_TEST_TASKS)])
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tasks = [Task.from_dict(record) for record in json.loads(raw)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert used / len(tasks) < 450
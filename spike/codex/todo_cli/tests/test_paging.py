@@ -0,0 +1,141 @@
+"""件数制限とカーソルによるページ送りのテスト。"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from todo_cli import cli
+from todo_cli.columns import load_columns
+from todo_cli.commands.delete import delete_task
+from todo_cli.commands.list import list_tasks
+from todo_cli.models import Task
+from todo_cli.paging import encode_cursor
+from todo_cli.storage import save_tasks
+
+
+def _random_tasks(count: int) -> list[Task]:
+    # 値の種類を少なくして、同じ並べ替えキーのタスクを多数作る。
+    rng = random.Random(1)
+    return [
+        Task(
+            id=f"t{i}",
+            title=f"task {i}",
+            description=None,
+            priority=rng.choice(["high", "medium", "low"]),
+            due_date=rng.choice([None, "2026-01-01", "2026-01-02"]),
+            categories=[],
+            status=rng.choice(["open", "done"]),
+            created_at=f"2026-01-0{rng.randint(1, 3)}T10:00:00Z",
+            completed_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def _all_pages(storage_path: Path, size: int, **options) -> list[str]:
+    ids: list[str] = []
+    after: Optional[str] = None
+    while True:
+        page = list_tasks(storage_path, limit=size, after=after, **options)
+        ids.extend(task.id for task in page)
+        if len(page) < size:
+            return ids
+        after = encode_cursor(page[-1], options.get("sort"))
+
+
+@pytest.mark.parametrize("sort", [None, "due", "priority", "created"])
+@pytest.mark.parametrize("status", ["all", "open"])
+def test_pages_concatenate_to_full_list(tmp_path: Path, sort: Optional[str], status: str) -> None:
+    """ページを順にたどると、件数制限なしの一覧と同じ並びになることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    save_tasks(storage_path, _random_tasks(120))
+    expected = [task.id for task in list_tasks(storage_path, sort=sort, status=status)]
+
+    assert _all_pages(storage_path, 7, sort=sort, status=status) == expected
+    columns = load_columns(storage_path)
+    assert _all_pages(storage_path, 7, sort=sort, status=status, columns=columns) == expected
+
+
+def test_limit_selects_top_tasks(tmp_path: Path) -> None:
+    """limit は並べ替え後の先頭だけを返すことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    save_tasks(storage_path, _random_tasks(50))
+    full = list_tasks(storage_path, sort="due")
+
+    assert list_tasks(storage_path, sort="due", limit=5) == full[:5]
+    assert list_tasks(storage_path, sort="due", limit=0) == []
+
+
+@pytest.mark.parametrize("sort", [None, "due", "priority", "created"])
+@pytest.mark.parametrize("use_columns", [False, True])
+def test_cursor_survives_deleting_tasks(tmp_path: Path, sort: Optional[str], use_columns: bool) -> None:
+    """前のページのタスクやカーソルのタスク自体が削除されても、続きのページが変わらないことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    tasks = _random_tasks(30)
+    if sort is None:
+        # 並べ替えなしで削除されたカーソルの位置は作成日時で決まる。add と同じく作成順に並べる
+        tasks = [task.replace(created_at=f"2026-01-01T10:00:{i:02d}Z") for i, task in enumerate(tasks)]
+    save_tasks(storage_path, tasks)
+    full = list_tasks(storage_path, sort=sort)
+    cursor = encode_cursor(full[9], sort)
+
+    def resume() -> list[Task]:
+        columns = load_columns(storage_path) if use_columns else None
+        return list_tasks(storage_path, sort=sort, limit=5, after=cursor, columns=columns)
+
+    delete_task(storage_path, full[3].id)
+    assert resume() == full[10:15]
+
+    delete_task(storage_path, full[9].id)
+    assert resume() == full[10:15]
+
+
+def test_sorted_ties_follow_created_and_id(tmp_path: Path) -> None:
+    """同じ並べ替えキーのタスクは、ファイル上の順序ではなく作成日時、ID の順に並ぶことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    base = _random_tasks(1)[0].replace(priority="high", due_date=None)
+    save_tasks(
+        storage_path,
+        [
+            base.replace(id="b", created_at="2026-01-02T10:00:00Z"),
+            base.replace(id="c", created_at="2026-01-01T10:00:00Z"),
+            base.replace(id="a", created_at="2026-01-02T10:00:00Z"),
+        ],
+    )
+    for sort in ("due", "priority", "created"):
+        assert [task.id for task in list_tasks(storage_path, sort=sort)] == ["c", "a", "b"]
+        columns = load_columns(storage_path)
+        assert [task.id for task in list_tasks(storage_path, sort=sort, columns=columns)] == ["c", "a", "b"]
+
+
+def test_invalid_cursor(tmp_path: Path) -> None:
+    """壊れたカーソルや別の並べ替えのカーソルはエラーになることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    save_tasks(storage_path, _random_tasks(3))
+    task = list_tasks(storage_path)[0]
+
+    with pytest.raises(ValueError, match="cursor"):
+        list_tasks(storage_path, sort="due", after=encode_cursor(task, "priority"))
+    with pytest.raises(ValueError, match="cursor"):
+        list_tasks(storage_path, after="???")
+
+
+def test_cli_prints_next_cursor(capsys, tmp_path: Path) -> None:
+    """--limit で打ち切られたときだけ、続きのカーソルが標準エラーに出ることを確認する。"""
+    storage = tmp_path / "tasks.json"
+    save_tasks(storage, _random_tasks(3))
+
+    assert cli.main(["--storage", str(storage), "list", "--sort", "due", "--limit", "2"]) == 0
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 2
+    cursor = captured.err.split("--after ")[1].strip()
+
+    args = ["--storage", str(storage), "list", "--sort", "due", "--limit", "2", "--after", cursor]
+    assert cli.main(args) == 0
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 1
+    assert captured.err == ""
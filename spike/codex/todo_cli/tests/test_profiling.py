@@ -0,0 +1,68 @@
+"""--profile（段階ごとの計測）のテスト。"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from todo_cli import cli, profiling
+
+
+def _phases(stderr: str) -> list[str]:
+    return [line.split()[0] for line in stderr.splitlines()[1:]]
+
+
+def test_profile_disabled_by_default(capsys, tmp_path: Path, monkeypatch) -> None:
+    """指定がなければ何も出さない。"""
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    monkeypatch.delenv(profiling.CPROFILE_ENV, raising=False)
+    assert cli.main(["--storage", str(tmp_path / "tasks.json"), "list"]) == 0
+    assert capsys.readouterr().err == ""
+    assert profiling.phase("load") is profiling.phase("save")
+
+
+def test_profile_reports_phases_on_stderr(capsys, tmp_path: Path) -> None:
+    """list では読み込み（解析・検証）と表示の時間が入れ子で出る。"""
+    storage = tmp_path / "tasks.json"
+    cli.main(["--storage", str(storage), "add", "Write spec", "--priority", "high"])
+    capsys.readouterr()
+
+    assert cli.main(["--storage", str(storage), "--profile", "list"]) == 0
+    captured = capsys.readouterr()
+    assert "Write spec" in captured.out
+    assert _phases(captured.err) == [
+        "startup", "command", "load", "parse", "validate", "render", "total"
+    ]
+
+
+def test_profile_trace_from_environment(capsys, tmp_path: Path, monkeypatch) -> None:
+    """TODO_PROFILE にパスを渡すと、標準エラーではなくトレースファイルに書く。"""
+    trace = tmp_path / "trace.json"
+    stats = tmp_path / "out.prof"
+    monkeypatch.setenv(profiling.PROFILE_ENV, str(trace))
+    monkeypatch.setenv(profiling.CPROFILE_ENV, str(stats))
+
+    storage = tmp_path / "tasks.json"
+    assert cli.main(["--storage", str(storage), "add", "Write spec", "--priority", "high"]) == 0
+    assert capsys.readouterr().err == ""
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    assert {"startup", "command", "save"} <= {event["name"] for event in events}
+    assert all(event["ph"] == "X" for event in events)
+    assert stats.stat().st_size > 0
+
+
+@pytest.mark.parametrize(
+    ("environ", "expected"),
+    [
+        ({}, (False, None, None)),
+        ({"TODO_PROFILE": "0"}, (False, None, None)),
+        ({"TODO_PROFILE": "1"}, (True, None, None)),
+        ({"TODO_PROFILE": "t.json"}, (True, Path("t.json"), None)),
+        ({"TODO_PROFILE_CPROFILE": "c.prof"}, (True, None, Path("c.prof"))),
+    ],
+)
+def test_from_environment(environ, expected) -> None:
+    """環境変数の値を (有効か, トレース, cProfile) に読み替える。"""
+    assert profiling.from_environment(environ) == expected
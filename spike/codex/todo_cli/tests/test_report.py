@@ -0,0 +1,133 @@
+"""report コマンドのテスト。"""
+
+from __future__ import annotations
+
+import random
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from todo_cli import cli
+from todo_cli.commands.list import list_tasks
+from todo_cli.commands.report import build_report, find_stores
+from todo_cli.models import Task
+from todo_cli.storage import append_add, save_tasks
+
+TODAY = date(2026, 6, 1)
+
+
+def _random_tasks(rng: random.Random, prefix: str, count: int) -> list[Task]:
+    return [
+        Task(
+            id=f"{prefix}-{i}",
+            title=f"task {prefix} {i}",
+            description=None,
+            priority=rng.choice(["high", "medium", "low"]),
+            due_date=None if rng.random() < 0.3 else f"2026-{rng.randint(4, 8):02d}-{rng.randint(1, 28):02d}",
+            categories=rng.sample(["work", "home", "errand"], rng.randint(0, 2)),
+            status=rng.choice(["open", "done"]),
+            created_at=f"2026-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+            completed_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def stores(tmp_path: Path) -> tuple[list[Task], Path]:
+    """ユーザーごとのストア5つと、それを順に連結した1つのストア。"""
+    rng = random.Random(7)
+    combined: list[Task] = []
+    for user in ("alice", "bob", "carol", "dave", "erin"):
+        tasks = _random_tasks(rng, user, 40)
+        save_tasks(tmp_path / "users" / user / "tasks.json", tasks)
+        combined.extend(tasks)
+    save_tasks(tmp_path / "combined.json", combined)
+    return combined, tmp_path
+
+
+@pytest.mark.parametrize("sort", [None, "due", "priority", "created"])
+@pytest.mark.parametrize("limit", [None, 0, 7])
+@pytest.mark.parametrize(
+    "filters",
+    [{}, {"status": "open"}, {"priority": "high", "category": "work"}, {"overdue": True}],
+)
+def test_report_matches_list_over_combined_store(
+    stores: tuple[list[Task], Path], sort: Optional[str], limit: Optional[int], filters: dict
+) -> None:
+    """各ストアの結果をマージした列は、全ストアを連結した1つのストアの list と同じ順になる。"""
+    _, root = stores
+    report = build_report(
+        [str(root / "users" / "*" / "tasks.json")], sort=sort, limit=limit, today=TODAY, workers=1, **filters
+    )
+    expected = list_tasks(root / "combined.json", sort=sort, limit=limit, today=TODAY, **filters)
+    assert [task for _, task in report.tasks] == expected
+    assert all(task.id.split("-")[0] == store.parent.name for store, task in report.tasks)
+
+
+def test_report_counts(stores: tuple[list[Task], Path]) -> None:
+    """件数は limit で切る前の全タスクを、優先度・カテゴリごとに open/done/overdue で数える。"""
+    combined, root = stores
+    report = build_report([str(root / "users" / "*" / "tasks.json")], limit=0, today=TODAY, workers=1)
+    assert report.tasks == []
+    assert report.matched == len(combined)
+
+    def overdue(task: Task) -> bool:
+        return task.status == "open" and task.due_date is not None and task.due_date < TODAY.isoformat()
+
+    for priority in ("high", "medium", "low"):
+        tasks = [task for task in combined if task.priority == priority]
+        assert report.counts["priority", priority, "open"] == sum(t.status == "open" for t in tasks)
+        assert report.counts["priority", priority, "done"] == sum(t.status == "done" for t in tasks)
+        assert report.counts["priority", priority, "overdue"] == sum(map(overdue, tasks))
+    for category in ("work", "home", "errand"):
+        tasks = [task for task in combined if category in task.categories]
+        assert report.counts["category", category, "open"] == sum(t.status == "open" for t in tasks)
+        assert report.counts["category", category, "overdue"] == sum(map(overdue, tasks))
+    uncategorized = [task for task in combined if not task.categories]
+    assert report.counts["category", "-", "done"] == sum(t.status == "done" for t in uncategorized)
+
+
+def test_report_in_worker_processes(stores: tuple[list[Task], Path]) -> None:
+    """プロセスプールで読んでも、このプロセスで読んだときと同じ結果になる。"""
+    _, root = stores
+    pattern = [str(root / "users" / "*" / "tasks.json")]
+    serial = build_report(pattern, sort="due", limit=15, today=TODAY, workers=1)
+    parallel = build_report(pattern, sort="due", limit=15, today=TODAY, workers=3)
+    assert parallel == serial
+
+
+def test_find_stores(tmp_path: Path) -> None:
+    """glob の ** が使え、重なったパターンは1回だけ、.json 以外（ジャーナルなど）は含めない。"""
+    task = _random_tasks(random.Random(1), "x", 1)[0]
+    for name in ("a/tasks.json", "b/c/tasks.json"):
+        save_tasks(tmp_path / name, [task])
+    append_add(tmp_path / "a" / "tasks.json", task.replace(id="y"))
+    (tmp_path / "b" / "notes.txt").write_text("not a store")
+
+    found = find_stores([str(tmp_path / "**" / "*"), str(tmp_path / "a" / "tasks.json")])
+    assert found == [tmp_path / "a" / "tasks.json", tmp_path / "b" / "c" / "tasks.json"]
+    assert find_stores([str(tmp_path / "missing" / "*.json")]) == []
+
+    # ジャーナルに追記したタスクも読み込む
+    report = build_report([str(tmp_path / "a" / "tasks.json")], today=TODAY)
+    assert [t.id for _, t in report.tasks] == [task.id, "y"]
+
+
+def test_cli_report(capsys, stores: tuple[list[Task], Path]) -> None:
+    """CLI から report を実行し、マージした一覧と集計表を出力する。"""
+    _, root = stores
+    pattern = str(root / "users" / "*" / "tasks.json")
+    assert cli.main(["report", "--stores", pattern, "--sort", "priority", "--limit", "3", "--workers", "1"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert all(line.startswith(str(root / "users")) and "(high)" in line for line in lines[:3])
+    assert lines[3] == "5 stores, 200 tasks"
+    assert lines[4].split() == ["priority", "open", "done", "overdue"]
+    assert [line.split()[0] for line in lines[5:8]] == ["high", "medium", "low"]
+    assert lines[8].split()[0] == "category"
+
+    with pytest.raises(SystemExit):
+        cli.main(["report", "--stores", str(root / "nothing" / "*.json")])
+    assert "no stores match" in capsys.readouterr().err
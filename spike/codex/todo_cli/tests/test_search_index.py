@@ -0,0 +1,172 @@
+"""検索インデックスのテスト。"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from todo_cli import cli
+from todo_cli.commands.add import add_task
+from todo_cli.commands import search
+from todo_cli.commands.delete import delete_task
+from todo_cli.commands.done import mark_done
+from todo_cli.commands.edit import edit_task
+from todo_cli.commands.search import search_tasks
+from todo_cli.commands.undo import mark_open
+from todo_cli.search_index import index_path, open_index, rebuild_index
+from todo_cli.storage import load_tasks, save_tasks
+
+
+def _candidates(storage_path: Path, *terms: str, match: str = "all") -> set[str] | None:
+    index = open_index(storage_path)
+    assert index is not None
+    try:
+        return index.lookup(list(terms), match)
+    finally:
+        index.close()
+
+
+def test_index_is_maintained_by_add_edit_delete(tmp_path: Path) -> None:
+    """add/edit/delete でインデックスが差分更新されることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    spec = add_task(storage_path, "Write spec", priority="high")
+    slides = add_task(storage_path, "Prepare slides", description="Kickoff meeting", priority="low")
+    assert index_path(storage_path).exists()
+    assert _candidates(storage_path, "spec") == {spec.id}
+    assert _candidates(storage_path, "meeting") == {slides.id}
+
+    edit_task(storage_path, spec.id, title="Write keynote")
+    assert _candidates(storage_path, "spec") == set()
+    assert _candidates(storage_path, "keynote") == {spec.id}
+
+    mark_done(storage_path, slides.id)
+    assert _candidates(storage_path, "kickoff") == {slides.id}
+
+    delete_task(storage_path, slides.id)
+    assert _candidates(storage_path, "kickoff") == set()
+    assert [t.id for t in search_tasks(storage_path, "keynote")] == [spec.id]
+
+
+def test_multi_keyword_and_or(tmp_path: Path) -> None:
+    """複数キーワードの AND/OR を確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    both = add_task(storage_path, "Write spec", description="review draft", priority="high")
+    spec_only = add_task(storage_path, "Spec cleanup", priority="high")
+    draft_only = add_task(storage_path, "Draft email", priority="low")
+
+    assert [t.id for t in search_tasks(storage_path, "spec", "draft")] == [both.id]
+    assert [t.id for t in search_tasks(storage_path, "spec", "draft", match="any")] == [
+        both.id,
+        spec_only.id,
+        draft_only.id,
+    ]
+    # 3文字未満の語は絞り込めないが、結果は走査と同じになる。
+    assert _candidates(storage_path, "sp", "draft") == {both.id, draft_only.id}
+    assert _candidates(storage_path, "sp", "draft", match="any") is None
+    assert [t.id for t in search_tasks(storage_path, "sp", "draft")] == [both.id]
+    with pytest.raises(ValueError, match="match"):
+        search_tasks(storage_path, "spec", match="some")
+    with pytest.raises(ValueError, match="keyword is required"):
+        search_tasks(storage_path)
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_search_reads_only_candidates_from_index(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, journal: bool
+) -> None:
+    """最新のインデックスがあれば、ストレージを読まずに候補のレコードを返すことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    first = add_task(storage_path, "Write spec", priority="high", journal=journal)
+    second = add_task(storage_path, "Review draft", description="spec v2", priority="low", journal=journal)
+    third = add_task(storage_path, "Send mail", priority="low", journal=journal)
+    edit_task(storage_path, first.id, description="draft", journal=journal)
+    mark_done(storage_path, second.id, journal=journal)
+    delete_task(storage_path, third.id, journal=journal)
+    add_task(storage_path, "Spec appendix", priority="medium", journal=journal)
+    mark_open(storage_path, second.id, journal=journal)
+    mark_done(storage_path, first.id, journal=journal)
+    expected = {
+        terms: search_tasks(storage_path, *terms) for terms in [("spec",), ("draft", "spec"), ("mail",)]
+    }
+    assert [t.title for t in expected["spec",]] == ["Write spec", "Review draft", "Spec appendix"]
+
+    def fail(path: Path) -> list:
+        raise AssertionError("search loaded the whole store")
+
+    monkeypatch.setattr(search, "load_tasks", fail)
+    for terms, tasks in expected.items():
+        # 完了状態などの本文以外の変更も、インデックスのレコードに反映されている。
+        assert search_tasks(storage_path, *terms) == tasks == [
+            t for t in load_tasks(storage_path) if t in tasks
+        ]
+
+
+def test_index_without_records_is_ignored_until_reindex(tmp_path: Path) -> None:
+    """レコードを持たない旧形式のインデックスは古いものとして扱うことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    add_task(storage_path, "Write spec", priority="high")
+    with sqlite3.connect(index_path(storage_path)) as conn:
+        conn.execute("DELETE FROM meta WHERE key = 'schema'")
+    conn.close()
+
+    assert open_index(storage_path) is None
+    assert len(search_tasks(storage_path, "spec")) == 1
+    assert rebuild_index(storage_path) == 1
+    assert open_index(storage_path) is not None
+
+
+def test_stale_index_is_ignored_until_reindex(tmp_path: Path) -> None:
+    """インデックス外の書き込みで古くなった場合は使われないことを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    task = add_task(storage_path, "Write spec", priority="high")
+    tasks = load_tasks(storage_path)
+    save_tasks(storage_path, tasks + [tasks[0].replace(id="2")])
+
+    assert open_index(storage_path) is None
+    assert [t.id for t in search_tasks(storage_path, "spec")] == [task.id, "2"]
+    # 古いインデックスは更新しない（後から来た add も反映されない）。
+    add_task(storage_path, "Another spec", priority="low")
+    assert open_index(storage_path) is None
+
+    assert rebuild_index(storage_path) == 3
+    assert len(_candidates(storage_path, "spec") or ()) == 3
+
+
+def test_existing_store_without_index_is_not_indexed(tmp_path: Path) -> None:
+    """既存ストアはインデックスなしで走査検索し、reindex で作成されることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    save_tasks(storage_path, [])
+    add_task(storage_path, "Write spec", priority="high")
+    assert not index_path(storage_path).exists()
+    assert len(search_tasks(storage_path, "spec")) == 1
+
+
+def test_journal_mode_keeps_index_fresh(tmp_path: Path) -> None:
+    """ジャーナルモードでもインデックスが維持されることを確認する。"""
+    storage_path = tmp_path / "tasks.json"
+    task = add_task(storage_path, "Write spec", priority="high", journal=True)
+    edit_task(storage_path, task.id, description="with appendix", journal=True)
+    assert _candidates(storage_path, "appendix") == {task.id}
+
+
+def test_cli_reindex_and_any(capsys, tmp_path: Path) -> None:
+    """CLIの reindex と --any を確認する。"""
+    storage = tmp_path / "tasks.json"
+    save_tasks(storage, [])
+    assert cli.main(["--storage", str(storage), "add", "Write spec", "--priority", "high"]) == 0
+    assert cli.main(["--storage", str(storage), "add", "Send mail", "--priority", "low"]) == 0
+    capsys.readouterr()
+
+    assert cli.main(["--storage", str(storage), "reindex"]) == 0
+    assert capsys.readouterr().out.strip() == "Reindexed: 2 tasks"
+    assert open_index(storage) is not None
+
+    assert cli.main(["--storage", str(storage), "search", "spec", "mail"]) == 0
+    assert capsys.readouterr().out.strip() == ""
+    assert cli.main(["--storage", str(storage), "search", "spec", "mail", "--any"]) == 0
+    assert len(capsys.readouterr().out.strip().splitlines()) == 2
+
+    assert cli.main(["--storage", str(storage), "compact"]) == 0
+    assert open_index(storage) is not None
@@ -2,26 +2,63 @@
 
 from __future__ import annotations
 
+# 最初に import する。ここからの経過時間が --profile の startup になる
+from . import profiling
+
 import argparse
+import sys
 from pathlib import Path
 from typing import Iterable, Sequence
 
+from .columns import PRIORITY_ORDER
 from .commands.add import add_task
 from .commands.delete import delete_task
 from .commands.done import mark_done
 from .commands.edit import edit_task
 from .commands.list import list_tasks
+from .commands.report import COUNT_COLUMNS, Report, build_report
 from .commands.search import search_tasks
 from .commands.undo import mark_open
+from .locking import locked
+from .paging import encode_cursor
+from .search_index import maintain_index, rebuild_index
+from .storage import compact
 
 DEFAULT_STORAGE = Path("tasks.json")
 
 
+def _format_task(task) -> str:
+    due = task.due_date or "-"
+    cats = f" #{'#'.join(task.categories)}" if task.categories else ""
+    return f"{task.id} [{task.status}] ({task.priority}) {due} {task.title}{cats}"
+
+
 def _print_tasks(tasks: Iterable) -> None:
-    for task in tasks:
-        due = task.due_date or "-"
-        cats = f" #{'#'.join(task.categories)}" if task.categories else ""
-        print(f"{task.id} [{task.status}] ({task.priority}) {due} {task.title}{cats}")
+    with profiling.phase("render"):
+        for task in tasks:
+            print(_format_task(task))
+
+
+def _print_counts(report: Report, dimension: str, values: list[str]) -> None:
+    width = max([len(dimension), *map(len, values)])
+    print(f"{dimension:<{width}}" + "".join(f" {column:>8}" for column in COUNT_COLUMNS))
+    for value in values:
+        counts = (report.counts[dimension, value, column] for column in COUNT_COLUMNS)
+        print(f"{value:<{width}}" + "".join(f" {count:>8}" for count in counts))
+
+
+def _priority_order(priority: str) -> tuple[int, str]:
+    # 集計表の優先度の行は high, medium, low の順、未知の値はその後ろに名前の順で並べる
+    return PRIORITY_ORDER.get(priority, 99), priority
+
+
+def _print_report(report: Report) -> None:
+    with profiling.phase("render"):
+        for store, task in report.tasks:
+            print(f"{store}: {_format_task(task)}")
+        print(f"{len(report.stores)} stores, {report.matched} tasks")
+        _print_counts(report, "priority", sorted(report.values("priority"), key=_priority_order))
+        _print_counts(report, "category", sorted(report.values("category")))
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -33,6 +70,28 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_STORAGE,
         help="Path to tasks.json",
     )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Append changes to tasks.json.log instead of rewriting tasks.json",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each phase (startup, load, validate, save, ...) to stderr",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        metavar="FILE",
+        help="Write the phase timings to FILE as a Chrome trace instead of stderr",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        type=Path,
+        metavar="FILE",
+        help="Also run the command under cProfile and dump the stats to FILE",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -49,6 +108,12 @@ def build_parser() -> argparse.ArgumentParser:
     list_parser.add_argument("--category")
     list_parser.add_argument("--sort", choices=["due", "priority", "created"])
     list_parser.add_argument("--overdue", action="store_true")
+    list_parser.add_argument("--limit", type=int, help="Show at most this many tasks")
+    list_parser.add_argument(
+        "--after",
+        metavar="CURSOR",
+        help="Continue after the cursor printed by a previous --limit listing",
+    )
 
     done_parser = subparsers.add_parser("done", help="Mark task done")
     done_parser.add_argument("id")
@@ -68,15 +133,62 @@ def build_parser() -> argparse.ArgumentParser:
     edit_parser.add_argument("--category")
 
     search_parser = subparsers.add_parser("search", help="Search tasks")
-    search_parser.add_argument("keyword")
+    search_parser.add_argument("keyword", nargs="+")
+    search_parser.add_argument(
+        "--any",
+        action="store_true",
+        help="Match tasks containing any keyword (default: all keywords)",
+    )
+
+    report_parser = subparsers.add_parser(
+        "report", help="List and count tasks across many stores (ignores --storage)"
+    )
+    report_parser.add_argument(
+        "--stores",
+        nargs="+",
+        required=True,
+        metavar="GLOB",
+        help="tasks.json files or glob patterns; quote patterns using ** so that todo expands them",
+    )
+    report_parser.add_argument("--status", default="all", choices=["all", "open", "done"])
+    report_parser.add_argument("--priority", choices=["high", "medium", "low"])
+    report_parser.add_argument("--category")
+    report_parser.add_argument("--sort", choices=["due", "priority", "created"])
+    report_parser.add_argument("--overdue", action="store_true")
+    report_parser.add_argument(
+        "--limit", type=int, help="Show at most this many tasks (0: only the counts)"
+    )
+    report_parser.add_argument(
+        "--workers", type=int, help="Number of worker processes (default: number of CPUs)"
+    )
+
+    subparsers.add_parser("reindex", help="Rebuild the search index")
+
+    subparsers.add_parser("compact", help="Fold the journal into tasks.json")
 
     return parser
 
 
+def _start_profiling(args: argparse.Namespace) -> None:
+    enabled, trace, cprofile = profiling.from_environment()
+    if args.profile or args.profile_trace or args.profile_cprofile or enabled:
+        profiling.enable(args.profile_trace or trace, args.profile_cprofile or cprofile)
+        profiling.end_startup()
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     """CLIの実行入口。"""
     parser = build_parser()
     args = parser.parse_args(argv)
+    _start_profiling(args)
+    try:
+        with profiling.phase("command"):
+            return _run(parser, args)
+    finally:
+        profiling.finish()
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
     storage_path: Path = args.storage
 
     if args.command == "add":
@@ -88,34 +200,46 @@ def main(argv: Sequence[str] | None = None) -> int:
             priority=args.priority,
             due_date=args.due,
             categories=categories,
+            journal=args.journal,
         )
         print(f"Added task: {task.id} \"{task.title}\"")
         return 0
 
     if args.command == "list":
-        tasks = list_tasks(
-            storage_path,
-            status=args.status,
-            priority=args.priority,
-            category=args.category,
-            sort=args.sort,
-            overdue=args.overdue,
-        )
+        if args.limit is not None and args.limit < 0:
+            parser.error("--limit must not be negative")
+        try:
+            tasks = list_tasks(
+                storage_path,
+                status=args.status,
+                priority=args.priority,
+                category=args.category,
+                sort=args.sort,
+                overdue=args.overdue,
+                limit=args.limit,
+                after=args.after,
+            )
+        except ValueError as exc:
+            # 壊れたカーソルや別の --sort で作られたカーソル
+            parser.error(str(exc))
         _print_tasks(tasks)
+        if args.limit and len(tasks) == args.limit:
+            # 続きの取得方法はパイプを汚さないよう標準エラーに出す
+            print(f"next: --after {encode_cursor(tasks[-1], args.sort)}", file=sys.stderr)
         return 0
 
     if args.command == "done":
-        task = mark_done(storage_path, args.id)
+        task = mark_done(storage_path, args.id, journal=args.journal)
         print(f"Marked done: {task.id}")
         return 0
 
     if args.command == "undo":
-        task = mark_open(storage_path, args.id)
+        task = mark_open(storage_path, args.id, journal=args.journal)
         print(f"Marked open: {task.id}")
         return 0
 
     if args.command == "delete":
-        task = delete_task(storage_path, args.id)
+        task = delete_task(storage_path, args.id, journal=args.journal)
         print(f"Deleted: {task.id}")
         return 0
 
@@ -129,15 +253,48 @@ def main(argv: Sequence[str] | None = None) -> int:
             priority=args.priority,
             due_date=args.due,
             categories=categories,
+            journal=args.journal,
         )
         print(f"Updated: {task.id}")
         return 0
 
     if args.command == "search":
-        tasks = search_tasks(storage_path, args.keyword)
+        tasks = search_tasks(storage_path, *args.keyword, match="any" if args.any else "all")
         _print_tasks(tasks)
         return 0
 
+    if args.command == "report":
+        if args.limit is not None and args.limit < 0:
+            parser.error("--limit must not be negative")
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be at least 1")
+        try:
+            report = build_report(
+                args.stores,
+                status=args.status,
+                priority=args.priority,
+                category=args.category,
+                sort=args.sort,
+                overdue=args.overdue,
+                limit=args.limit,
+                workers=args.workers,
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+        _print_report(report)
+        return 0
+
+    if args.command == "compact":
+        with locked(storage_path), maintain_index(storage_path):
+            compact(storage_path)
+        print(f"Compacted: {storage_path}")
+        return 0
+
+    if args.command == "reindex":
+        count = rebuild_index(storage_path)
+        print(f"Reindexed: {count} tasks")
+        return 0
+
     parser.error("Unknown command")
     return 2
 
@@ -0,0 +1,240 @@
+"""一覧の絞り込み・並べ替え用の列指向（カラムナ）表現を扱う。
+
+読み込んだタスクから一度だけ構築し、同じスナップショットに何度も問い合わせる集計用途に使う。
+
+- priority: 並び順のコードを uint8 の配列で持つ。
+- status / priority / category: 値ごとに該当行のビット集合（Python の int）を持つ。
+  category は辞書符号化し、カテゴリ名→ID→ビット集合の順に引く。
+- due_date / created_at: エポックからの日数・マイクロ秒を int64 の配列で持つ。
+
+絞り込みはビット集合の AND で行い、並べ替えは該当行の番号を (列の値, 作成日時, ID) の順に
+並べる。日付文字列の解析は構築時に1回だけで済む。
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .models import Task
+from .paging import Cursor, smallest
+from .storage import load_tasks
+
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+_UNKNOWN_PRIORITY = 99
+# 期限なしは常に末尾に並ぶよう最大値を入れる。
+NO_DUE = 2**63 - 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_SET_BIT = re.compile("1")
+
+
+def parse_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+def parse_datetime(value: str) -> datetime:
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _epoch_micros(value: str) -> int:
+    moment = parse_datetime(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def _due_value(due_date: Optional[str]) -> int:
+    return NO_DUE if due_date is None else parse_date(due_date).toordinal()
+
+
+def _bitset(rows: Iterable[int], size: int) -> int:
+    # 行ごとに大きな int へ OR すると全体が O(n^2) になるため、'0'/'1' の列を作って一度に変換する。
+    flags = bytearray(b"0" * size)
+    for row in rows:
+        flags[row] = 0x31
+    flags.reverse()
+    return int(flags, 2) if size else 0
+
+
+class TaskColumns:
+    """タスク一覧の列指向スナップショット（構築後は変更しない）。"""
+
+    def __init__(self, tasks: Iterable[Task]) -> None:
+        self.tasks = list(tasks)
+        self.priority = array("B")
+        self.due = array("q")
+        self.created = array("q")
+        self.category_names: list[str] = []
+        self._category_ids: dict[str, int] = {}
+        self.all = (1 << len(self.tasks)) - 1
+
+        status_rows: dict[str, list[int]] = {}
+        priority_rows: dict[str, list[int]] = {}
+        category_rows: list[list[int]] = []
+        for row, task in enumerate(self.tasks):
+            status_rows.setdefault(task.status, []).append(row)
+            priority_rows.setdefault(task.priority, []).append(row)
+            self.priority.append(PRIORITY_ORDER.get(task.priority, _UNKNOWN_PRIORITY))
+            self.due.append(_due_value(task.due_date))
+            self.created.append(_epoch_micros(task.created_at))
+            for name in task.categories:
+                category_id = self._category_ids.get(name)
+                if category_id is None:
+                    category_id = self._category_ids[name] = len(self.category_names)
+                    self.category_names.append(name)
+                    category_rows.append([])
+                category_rows[category_id].append(row)
+
+        size = len(self.tasks)
+        self._status_bits = {key: _bitset(rows, size) for key, rows in status_rows.items()}
+        self._priority_bits = {key: _bitset(rows, size) for key, rows in priority_rows.items()}
+        self._category_bits = [_bitset(rows, size) for rows in category_rows]
+
+        # overdue 用に期限の昇順を一度だけ求めておく（期限なしは末尾）。
+        self._due_order = sorted(range(len(self.tasks)), key=self.due.__getitem__)
+        self._due_sorted = array("q", (self.due[row] for row in self._due_order))
+        # カーソルの再開位置を引くための ID→行番号（初めて使うときに作る）
+        self._row_by_id: Optional[dict[str, int]] = None
+        # 行ごとの (作成日時, ID) の順位。同じ値の行の並び順に使う（初めて使うときに作る）
+        self._tiebreak: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    # --- 絞り込み（いずれも該当行のビット集合を返す） ---
+
+    def status_mask(self, status: str) -> int:
+        if status == "all":
+            return self.all
+        return self._status_bits.get(status, 0)
+
+    def priority_mask(self, priority: Optional[str]) -> int:
+        if priority is None:
+            return self.all
+        return self._priority_bits.get(priority, 0)
+
+    def category_mask(self, category: Optional[str]) -> int:
+        key = (category or "").strip().lower()
+        if not key:
+            return self.all
+        category_id = self._category_ids.get(key)
+        return 0 if category_id is None else self._category_bits[category_id]
+
+    def value_masks(self, dimension: str) -> dict[str, int]:
+        """dimension（"status" / "priority" / "category"）の値ごとのビット集合。"""
+        if dimension == "status":
+            return dict(self._status_bits)
+        if dimension == "priority":
+            return dict(self._priority_bits)
+        if dimension == "category":
+            return dict(zip(self.category_names, self._category_bits))
+        raise ValueError("dimension must be status, priority, or category")
+
+    def overdue_mask(self, today: date) -> int:
+        # 期限の昇順で today より前の範囲を二分探索し、その行だけを立てる。
+        end = bisect_left(self._due_sorted, today.toordinal())
+        if end == 0:
+            return 0
+        return _bitset(self._due_order[:end], len(self.tasks))
+
+    # --- 取り出しと並べ替え ---
+
+    def rows(self, mask: int) -> list[int]:
+        """ビット集合で立っている行番号を昇順で返す。"""
+        if not mask:
+            return []
+        return [match.start() for match in _SET_BIT.finditer(format(mask, "b")[::-1])]
+
+    def _column(self, sort_key: str) -> array:
+        if sort_key == "due":
+            return self.due
+        if sort_key == "priority":
+            return self.priority
+        if sort_key == "created":
+            return self.created
+        raise ValueError("sort must be due, priority, or created")
+
+    def _ranks(self) -> array:
+        if self._tiebreak is None:
+            # ID 順に並べてから作成日時で安定ソートすると (作成日時, ID) の順になる
+            ids = [task.id for task in self.tasks]
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            order.sort(key=self.created.__getitem__)
+            self._tiebreak = array("q", bytes(8 * len(order)))
+            for rank, row in enumerate(order):
+                self._tiebreak[row] = rank
+        return self._tiebreak
+
+    def sort_rows(
+        self, rows: list[int], sort_key: Optional[str], limit: Optional[int] = None
+    ) -> list[int]:
+        """行番号を (列の値, 作成日時, ID) の順に並べ、limit があれば先頭 limit 件だけを返す。"""
+        if sort_key is None:
+            return rows if limit is None else rows[:limit]
+        column = self._column(sort_key)
+        ranks = self._ranks()
+        size = len(self.tasks)
+        # 順位は 0 <= rank < size なので、値 * size + 順位 の1つの int で比べられる
+        return smallest(rows, limit, key=lambda row: column[row] * size + ranks[row])
+
+    def order_key(self, row: int, sort_key: str) -> tuple[int, int, str]:
+        """並べ替えありの一覧での行の位置（sort_rows と同じ順）。別のスナップショットの行とも比べられる。"""
+        return (self._column(sort_key)[row], self.created[row], self.tasks[row].id)
+
+    def rows_after(self, rows: list[int], sort_key: Optional[str], cursor: Cursor) -> list[int]:
+        """カーソルのタスクより後ろの行だけを残す。"""
+        created = _epoch_micros(cursor.created_at)
+        if sort_key is not None:
+            column = self._column(sort_key)
+            bound = (_cursor_value(sort_key, cursor.value), created, cursor.task_id)
+            return [
+                row for row in rows if (column[row], self.created[row], self.tasks[row].id) > bound
+            ]
+        if self._row_by_id is None:
+            self._row_by_id = {task.id: row for row, task in enumerate(self.tasks)}
+        last = self._row_by_id.get(cursor.task_id)
+        if last is not None:
+            return rows[bisect_right(rows, last) :]
+        # カーソルのタスクが削除されていれば、作成日時と ID で続きを決める
+        return [row for row in rows if (self.created[row], self.tasks[row].id) > (created, cursor.task_id)]
+
+    def select(
+        self,
+        *,
+        status: str = "all",
+        priority: Optional[str] = None,
+        category: Optional[str] = None,
+        sort: Optional[str] = None,
+        overdue_before: Optional[date] = None,
+        limit: Optional[int] = None,
+        after: Optional[Cursor] = None,
+    ) -> list[Task]:
+        mask = self.status_mask(status) & self.priority_mask(priority)
+        mask &= self.category_mask(category)
+        if overdue_before is not None and mask:
+            mask &= self.overdue_mask(overdue_before)
+        rows = self.rows(mask)
+        if after is not None:
+            rows = self.rows_after(rows, sort, after)
+        return [self.tasks[row] for row in self.sort_rows(rows, sort, limit)]
+
+
+def _cursor_value(sort_key: str, value: Any) -> int:
+    # カーソルに入っている属性値を、列と同じ表現に変換する
+    if sort_key == "due":
+        return _due_value(value)
+    if sort_key == "priority":
+        return PRIORITY_ORDER.get(value, _UNKNOWN_PRIORITY)
+    return _epoch_micros(value)
+
+
+def load_columns(storage_path: Path) -> TaskColumns:
+    """ストレージを読み込み、列指向の表現を構築する。"""
+    return TaskColumns(load_tasks(storage_path))
@@ -8,7 +8,9 @@ from pathlib import Path
 from typing import Optional
 
 from ..models import Task, now_iso_utc
-from ..storage import load_tasks, save_tasks
+from ..locking import locked
+from ..search_index import maintain_index
+from ..storage import append_add, load_tasks, save_tasks
 
 VALID_PRIORITIES = {"high", "medium", "low"}
 
@@ -41,6 +43,7 @@ def add_task(
     priority: str,
     due_date: Optional[str] = None,
     categories: Optional[list[str]] = None,
+    journal: bool = False,
 ) -> Task:
     """タスクを追加して永続化し、追加したタスクを返す。"""
     if not title or not title.strip():
@@ -61,7 +64,13 @@ def add_task(
         completed_at=None,
     )
 
-    tasks = load_tasks(storage_path)
-    tasks.append(task)
-    save_tasks(storage_path, tasks)
+    with locked(storage_path), maintain_index(storage_path) as index:
+        if journal:
+            append_add(storage_path, task)
+        else:
+            tasks = load_tasks(storage_path)
+            tasks.append(task)
+            save_tasks(storage_path, tasks)
+        if index is not None:
+            index.add(task)
     return task
@@ -5,15 +5,27 @@ from __future__ import annotations
 from pathlib import Path
 
 from ..models import Task
-from ..storage import load_tasks, save_tasks
+from ..locking import locked
+from ..search_index import maintain_index
+from ..storage import append_delete, find_task, load_tasks, save_tasks
 
 
-def delete_task(storage_path: Path, task_id: str) -> Task:
+def delete_task(storage_path: Path, task_id: str, *, journal: bool = False) -> Task:
     """指定タスクを削除して返す。"""
-    tasks = load_tasks(storage_path)
-    for idx, task in enumerate(tasks):
-        if task.id == task_id:
+    with locked(storage_path), maintain_index(storage_path) as index:
+        if journal:
+            # ジャーナルモードでは対象の1件だけを読む（インデックスのレコードか、スナップショットの走査で）。
+            deleted = index.get(task_id) if index is not None else find_task(storage_path, task_id)
+            if deleted is None:
+                raise ValueError("task id not found")
+            append_delete(storage_path, task_id)
+        else:
+            tasks = load_tasks(storage_path)
+            idx = next((i for i, t in enumerate(tasks) if t.id == task_id), -1)
+            if idx < 0:
+                raise ValueError("task id not found")
             deleted = tasks.pop(idx)
             save_tasks(storage_path, tasks)
-            return deleted
-    raise ValueError("task id not found")
+        if index is not None:
+            index.remove(deleted)
+        return deleted
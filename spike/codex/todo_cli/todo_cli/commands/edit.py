@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from ..models import Task
-from ..storage import load_tasks, save_tasks
+from ..locking import locked
+from ..search_index import maintain_index
+from ..storage import append_patch, find_task, load_tasks, save_tasks
 
 VALID_PRIORITIES = {"high", "medium", "low"}
 
@@ -42,6 +43,7 @@ def edit_task(
     priority: Optional[str] = None,
     due_date: Optional[str] = None,
     categories: Optional[list[str]] = None,
+    journal: bool = False,
 ) -> Task:
     """指定タスクを編集して返す。"""
     if title is not None and not title.strip():
@@ -50,22 +52,34 @@ def edit_task(
         raise ValueError("priority must be high, medium, or low")
     _validate_due_date(due_date)
 
-    tasks = load_tasks(storage_path)
-    for idx, task in enumerate(tasks):
-        if task.id != task_id:
-            continue
+    with locked(storage_path), maintain_index(storage_path) as index:
+        if journal:
+            # ジャーナルモードでは対象の1件だけを読む（インデックスのレコードか、スナップショットの走査で）。
+            task = index.get(task_id) if index is not None else find_task(storage_path, task_id)
+            if task is None:
+                raise ValueError("task id not found")
+        else:
+            tasks = load_tasks(storage_path)
+            idx = next((i for i, t in enumerate(tasks) if t.id == task_id), -1)
+            if idx < 0:
+                raise ValueError("task id not found")
+            task = tasks[idx]
         updated = task
         if title is not None:
-            updated = replace(updated, title=title.strip())
+            updated = updated.replace(title=title.strip())
         if description is not None:
-            updated = replace(updated, description=description)
+            updated = updated.replace(description=description)
         if priority is not None:
-            updated = replace(updated, priority=priority)  # type: ignore[arg-type]
+            updated = updated.replace(priority=priority)  # type: ignore[arg-type]
         if due_date is not None:
-            updated = replace(updated, due_date=due_date)
+            updated = updated.replace(due_date=due_date)
         if categories is not None:
-            updated = replace(updated, categories=_normalize_categories(categories) or [])
-        tasks[idx] = updated
-        save_tasks(storage_path, tasks)
+            updated = updated.replace(categories=_normalize_categories(categories) or [])
+        if journal:
+            append_patch(storage_path, task, updated)
+        else:
+            tasks[idx] = updated
+            save_tasks(storage_path, tasks)
+        if index is not None:
+            index.update(task, updated)
         return updated
-    raise ValueError("task id not found")
@@ -2,26 +2,15 @@
 
 from __future__ import annotations
 
-from dataclasses import replace
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
-from ..models import Task
+from ..columns import PRIORITY_ORDER, TaskColumns, parse_date, parse_datetime
+from ..models import Task, epoch_seconds
+from ..paging import SORT_FIELDS, decode_cursor, smallest
 from ..storage import load_tasks
 
-_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
-
-
-def _parse_date(value: str) -> date:
-    return date.fromisoformat(value)
-
-
-def _parse_datetime(value: str) -> datetime:
-    if value.endswith("Z"):
-        value = value[:-1] + "+00:00"
-    return datetime.fromisoformat(value)
-
 
 def _filter_status(tasks: Iterable[Task], status: str) -> list[Task]:
     if status == "all":
@@ -49,52 +38,133 @@ def _filter_overdue(tasks: Iterable[Task], today: date) -> list[Task]:
     for task in tasks:
         if task.due_date is None:
             continue
-        if _parse_date(task.due_date) < today:
+        if parse_date(task.due_date) < today:
             overdue.append(task)
     return overdue
 
 
-def _sort_tasks(tasks: list[Task], sort_key: Optional[str]) -> list[Task]:
+# 並べ替えキーごとに、SORT_FIELDS の属性値から比較用の値を作る関数
+_SORT_VALUE: dict[str, Callable[[Any], Any]] = {
+    "due": lambda due_date: (0 if due_date is not None else 1, due_date or ""),
+    "priority": lambda priority: PRIORITY_ORDER.get(priority, 99),
+    "created": parse_datetime,
+}
+
+
+def sort_value(task: Task, sort_key: str) -> Any:
+    """--sort の並べ替えキーでの task の比較用の値を返す。"""
+    return _SORT_VALUE[sort_key](getattr(task, SORT_FIELDS[sort_key]))
+
+
+def _order(value: Any, created_seconds: float, task_id: str) -> tuple[Any, ...]:
+    # 入れ子のタプルは比較が遅いので、並べ替えキーの値がタプルなら展開する
+    if isinstance(value, tuple):
+        return (*value, created_seconds, task_id)
+    return (value, created_seconds, task_id)
+
+
+def order_key(task: Task, sort_key: str) -> tuple[Any, ...]:
+    """並べ替えありの一覧での task の位置。同じ値のタスクは作成日時、ID の順に並ぶ。"""
+    return _order(sort_value(task, sort_key), task.created_seconds, task.id)
+
+
+def _page(
+    tasks: list[Task],
+    results: list[Task],
+    sort_key: Optional[str],
+    limit: Optional[int],
+    after: Optional[str],
+) -> list[Task]:
+    """results を並べ替え、カーソルより後ろの先頭 limit 件を返す。
+
+    並べ替えなしではファイル上の順序（tasks での位置）のまま返す。
+    """
+    if sort_key is not None and sort_key not in SORT_FIELDS:
+        raise ValueError("sort must be due, priority, or created")
+    if after is not None:
+        cursor = decode_cursor(after, sort_key)
+        if sort_key is not None:
+            bound = _order(
+                _SORT_VALUE[sort_key](cursor.value), epoch_seconds(cursor.created_at), cursor.task_id
+            )
+            results = [task for task in results if order_key(task, sort_key) > bound]
+        else:
+            last = next((i for i, task in enumerate(tasks) if task.id == cursor.task_id), None)
+            if last is not None:
+                order = {task.id: i for i, task in enumerate(tasks)}
+                results = [task for task in results if order[task.id] > last]
+            else:
+                # カーソルのタスクが削除されていれば、作成日時と ID で続きを決める
+                created = (epoch_seconds(cursor.created_at), cursor.task_id)
+                results = [task for task in results if (task.created_seconds, task.id) > created]
     if sort_key is None:
-        return tasks
-    if sort_key == "due":
-        return sorted(
-            tasks,
-            key=lambda task: (
-                0 if task.due_date is not None else 1,
-                task.due_date or "",
-            ),
-        )
-    if sort_key == "priority":
-        return sorted(tasks, key=lambda task: _PRIORITY_ORDER.get(task.priority, 99))
-    if sort_key == "created":
-        return sorted(tasks, key=lambda task: _parse_datetime(task.created_at))
-    raise ValueError("sort must be due, priority, or created")
+        return results if limit is None else results[:limit]
+    return smallest(results, limit, key=lambda task: order_key(task, sort_key))
 
 
-def list_tasks(
-    storage_path: Path,
+def check_filters(status: str, priority: Optional[str]) -> None:
+    """status / priority が list で使える値か確かめる（不正なら ValueError）。"""
+    if status not in {"all", "open", "done"}:
+        raise ValueError("status must be all, open, or done")
+    if priority is not None and priority not in {"high", "medium", "low"}:
+        raise ValueError("priority must be high, medium, or low")
+
+
+def filter_tasks(
+    tasks: Iterable[Task],
     *,
     status: str = "all",
     priority: Optional[str] = None,
     category: Optional[str] = None,
-    sort: Optional[str] = None,
     overdue: bool = False,
     today: Optional[date] = None,
 ) -> list[Task]:
-    """フィルタ/ソート条件に基づきタスク一覧を返す。"""
-    if status not in {"all", "open", "done"}:
-        raise ValueError("status must be all, open, or done")
-    if priority is not None and priority not in {"high", "medium", "low"}:
-        raise ValueError("priority must be high, medium, or low")
-
-    tasks = load_tasks(storage_path)
+    """list と同じ条件でタスクを絞り込む。順序は tasks のまま。"""
     results = _filter_status(tasks, status)
     results = _filter_priority(results, priority)
     results = _filter_category(results, category)
-
     if overdue:
         results = _filter_overdue(results, today or date.today())
-
-    results = _sort_tasks(results, sort)
     return results
+
+
+def list_tasks(
+    storage_path: Path,
+    *,
+    status: str = "all",
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: Optional[str] = None,
+    overdue: bool = False,
+    today: Optional[date] = None,
+    columns: Optional[TaskColumns] = None,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+) -> list[Task]:
+    """フィルタ/ソート条件に基づきタスク一覧を返す。
+
+    columns（`load_columns` で構築済みの列指向表現）を渡すと、ストレージを読まずに
+    その表現に対してビット集合と列の並べ替えで問い合わせる。
+
+    limit を指定すると先頭から最大 limit 件を返す。並べ替えありでは全件を並べ替えず、
+    ヒープで上位 limit 件だけを選ぶ。after に前のページの最後のタスクから
+    `encode_cursor` で作ったカーソルを渡すと、その続きから返す。
+    """
+    check_filters(status, priority)
+
+    if columns is not None:
+        return columns.select(
+            status=status,
+            priority=priority,
+            category=category,
+            sort=sort,
+            overdue_before=(today or date.today()) if overdue else None,
+            limit=limit,
+            after=None if after is None else decode_cursor(after, sort),
+        )
+
+    tasks = load_tasks(storage_path)
+    results = filter_tasks(
+        tasks, status=status, priority=priority, category=category, overdue=overdue, today=today
+    )
+    return _page(tasks, results, sort, limit, after)
@@ -0,0 +1,160 @@
+"""複数のストアをまとめて一覧・集計する report コマンドの実装。
+
+ストアごとの読み込み・絞り込み・集計はプロセスプールで並行に行う（JSON の解析と Task の
+構築は CPU を使うため、スレッドでは GIL で順番待ちになる）。各プロセスはストア内で並べ替えた
+先頭 limit 件と件数だけを返し、親はそれらを k-way のヒープマージで1本の列にまとめる。
+
+1つのストアには、絞り込みと 値 x 列 ごとの件数という多数の問い合わせを行うので、ストアを
+列指向の表現（`TaskColumns`）にしてからビット集合の AND と popcount で答える。
+"""
+
+from __future__ import annotations
+
+import glob
+import heapq
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from ..columns import TaskColumns
+from ..models import Task
+from ..storage import load_tasks
+from .list import check_filters
+
+# 集計表の列
+COUNT_COLUMNS = ("open", "done", "overdue")
+# カテゴリのないタスクを数える行
+NO_CATEGORY = "-"
+
+# (マージのキー, タスク)。キーは (並べ替えキーの値, 作成日時, ID, ストアの順, ストア内の順) で、
+# 並べ替えなしのときは (ストアの順, ストア内の順)
+_Entry = tuple[tuple[Any, ...], Task]
+# ("priority" または "category", 値, COUNT_COLUMNS のいずれか) -> 件数
+Counts = Counter[tuple[str, str, str]]
+
+
+@dataclass(frozen=True)
+class _Query:
+    status: str
+    priority: Optional[str]
+    category: Optional[str]
+    sort: Optional[str]
+    overdue: bool
+    today: date
+    limit: Optional[int]
+
+
+@dataclass(frozen=True)
+class Report:
+    """report の結果。
+
+    tasks は絞り込んで並べ替えた (ストア, タスク) の列で、list と同じく同じキーのタスクは
+    作成日時、ID の順に並ぶ。並べ替えなしではストアの順、ストア内ではファイル上の順に並ぶ。
+    counts は limit で切る前の、絞り込んだ全タスクの件数。
+    """
+
+    stores: list[Path]
+    tasks: list[tuple[Path, Task]]
+    counts: Counts
+
+    @property
+    def matched(self) -> int:
+        """絞り込んだタスクの件数（どのタスクも優先度の open か done のどちらかに1回だけ数えられる）。"""
+        return sum(
+            count
+            for (dimension, _, column), count in self.counts.items()
+            if dimension == "priority" and column != "overdue"
+        )
+
+    def values(self, dimension: str) -> set[str]:
+        """集計に現れた dimension（"priority" / "category"）の値。"""
+        return {value for (name, value, _) in self.counts if name == dimension}
+
+
+def find_stores(patterns: Sequence[str]) -> list[Path]:
+    """パターン（glob。`**` も使える）に一致する .json のストアを、パスの順に返す。"""
+    paths = {Path(path) for pattern in patterns for path in glob.glob(pattern, recursive=True)}
+    return sorted(path for path in paths if path.suffix == ".json" and path.is_file())
+
+
+def _count(columns: TaskColumns, mask: int, today: date) -> Counts:
+    # 値ごとのビット集合と、列ごとの絞り込み結果の AND を数える（タスクごとには回らない）
+    counts: Counts = Counter()
+    by_column = {status: mask & bits for status, bits in columns.value_masks("status").items()}
+    by_column["overdue"] = by_column.get("open", 0) & columns.overdue_mask(today)
+    categorized = 0
+    for dimension in ("priority", "category"):
+        for value, bits in columns.value_masks(dimension).items():
+            if dimension == "category":
+                categorized |= bits
+            for column, rows in by_column.items():
+                count = (rows & bits).bit_count()
+                if count:
+                    counts[dimension, value, column] += count
+    for column, rows in by_column.items():
+        count = (rows & ~categorized).bit_count()
+        if count:
+            counts["category", NO_CATEGORY, column] += count
+    return counts
+
+
+def _scan_store(job: tuple[int, Path, _Query]) -> tuple[list[_Entry], Counts]:
+    # ワーカープロセスで実行する。1つのストアを読み、絞り込み、集計し、先頭 limit 件を返す
+    index, path, query = job
+    columns = TaskColumns(load_tasks(path))
+    mask = columns.status_mask(query.status) & columns.priority_mask(query.priority)
+    mask &= columns.category_mask(query.category)
+    if query.overdue and mask:
+        mask &= columns.overdue_mask(query.today)
+    counts = _count(columns, mask, query.today)
+    rows = columns.sort_rows(columns.rows(mask), query.sort, query.limit)
+    if query.sort is None:
+        return [((index, row), columns.tasks[row]) for row in rows], counts
+    sort = query.sort
+    # 列の値・作成日時・ID はストアによらず比べられるので、そのままマージのキーにする
+    entries = [((*columns.order_key(row, sort), index, row), columns.tasks[row]) for row in rows]
+    return entries, counts
+
+
+def build_report(
+    patterns: Sequence[str],
+    *,
+    status: str = "all",
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: Optional[str] = None,
+    overdue: bool = False,
+    today: Optional[date] = None,
+    limit: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Report:
+    """patterns に一致する全ストアのタスクを list と同じ条件で絞り込み、まとめて返す。
+
+    workers はプロセス数（既定は CPU 数）。ストアが1つか workers=1 なら、このプロセスで読む。
+    """
+    check_filters(status, priority)
+    if sort is not None and sort not in {"due", "priority", "created"}:
+        raise ValueError("sort must be due, priority, or created")
+    stores = find_stores(patterns)
+    if not stores:
+        raise ValueError(f"no stores match: {' '.join(patterns)}")
+
+    query = _Query(status, priority, category, sort, overdue, today or date.today(), limit)
+    jobs = [(index, path, query) for index, path in enumerate(stores)]
+    if len(jobs) == 1 or workers == 1:
+        results = [_scan_store(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_store, jobs))
+
+    counts: Counts = Counter()
+    for _, store_counts in results:
+        counts.update(store_counts)
+    # 各ストアの結果はキーの順に並んでいるので、k-way マージで先頭から limit 件を取る
+    merged = islice(heapq.merge(*(entries for entries, _ in results), key=itemgetter(0)), limit)
+    return Report(stores, [(stores[key[-2]], task) for key, task in merged], counts)
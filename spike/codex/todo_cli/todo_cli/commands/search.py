@@ -2,22 +2,51 @@
 
 from __future__ import annotations
 
+from contextlib import closing
 from pathlib import Path
+from typing import Optional
 
+from ..locking import locked
 from ..models import Task
+from ..search_index import haystack, index_path, open_index
 from ..storage import load_tasks
 
+VALID_MATCHES = {"all", "any"}
 
-def search_tasks(storage_path: Path, keyword: str) -> list[Task]:
-    """キーワードに一致するタスクを返す。"""
-    if not keyword or not keyword.strip():
+
+def _candidates(storage_path: Path, terms: list[str], match: str) -> Optional[list[Task]]:
+    """インデックスで絞り込んだ候補タスクを返す。使えない・絞り込めない場合は None。"""
+    if not index_path(storage_path).exists():
+        return None
+    # load_tasks と同じく共有ロックで、書き込み途中のストアとインデックスを読まない。
+    with locked(storage_path, shared=True):
+        index = open_index(storage_path)
+        if index is None:
+            return None
+        with closing(index):
+            ids = index.lookup(terms, match)
+            return None if ids is None else index.fetch(ids)
+
+
+def search_tasks(storage_path: Path, *keywords: str, match: str = "all") -> list[Task]:
+    """キーワードに一致するタスクを返す。
+
+    複数キーワードは match="all" で全て含む（AND）、"any" でいずれかを含む（OR）。
+    最新のインデックスがあれば候補のタスクだけをインデックスから読み、
+    なければストレージ全体を読み込んで走査する。
+    """
+    if not keywords or any(not keyword or not keyword.strip() for keyword in keywords):
         raise ValueError("keyword is required")
-    term = keyword.strip().lower()
+    if match not in VALID_MATCHES:
+        raise ValueError("match must be all or any")
+    terms = [keyword.strip().lower() for keyword in keywords]
+    combine = all if match == "all" else any
 
-    tasks = load_tasks(storage_path)
+    candidates = _candidates(storage_path, terms, match)
+    tasks = load_tasks(storage_path) if candidates is None else candidates
     results: list[Task] = []
     for task in tasks:
-        haystack = f"{task.title}\n{task.description or ''}".lower()
-        if term in haystack:
+        text = haystack(task)
+        if combine(term in text for term in terms):
             results.append(task)
     return results
@@ -2,24 +2,37 @@
 
 from __future__ import annotations
 
-from dataclasses import replace
 from pathlib import Path
 
 from ..models import Task
-from ..storage import load_tasks, save_tasks
+from ..locking import locked
+from ..search_index import maintain_index
+from ..storage import append_patch, find_task, load_tasks, save_tasks
 
 
 def _set_open(task: Task) -> Task:
-    return replace(task, status="open", completed_at=None)
+    return task.replace(status="open", completed_at=None)
 
 
-def mark_open(storage_path: Path, task_id: str) -> Task:
+def mark_open(storage_path: Path, task_id: str, *, journal: bool = False) -> Task:
     """指定タスクを未完了状態に戻して返す。"""
-    tasks = load_tasks(storage_path)
-    for idx, task in enumerate(tasks):
-        if task.id == task_id:
+    # 本文は変わらないが、インデックスが持つレコードと鮮度情報を更新するため囲む。
+    with locked(storage_path), maintain_index(storage_path) as index:
+        if journal:
+            # ジャーナルモードでは対象の1件だけを読む（インデックスのレコードか、スナップショットの走査で）。
+            task = index.get(task_id) if index is not None else find_task(storage_path, task_id)
+            if task is None:
+                raise ValueError("task id not found")
             updated = _set_open(task)
-            tasks[idx] = updated
+            append_patch(storage_path, task, updated)
+        else:
+            tasks = load_tasks(storage_path)
+            idx = next((i for i, t in enumerate(tasks) if t.id == task_id), -1)
+            if idx < 0:
+                raise ValueError("task id not found")
+            task = tasks[idx]
+            updated = tasks[idx] = _set_open(task)
             save_tasks(storage_path, tasks)
-            return updated
-    raise ValueError("task id not found")
+        if index is not None:
+            index.update(task, updated)
+        return updated
@@ -0,0 +1,117 @@
+"""ストアの排他制御とアトミックな書き込みを扱う。
+
+ロックはストアと同じディレクトリの `<name>.lock` に対する flock で取る。
+ロックファイルにはストアの版（書き込みのたびに 1 増える整数）を保存する。
+同じスレッド内で同じストアのロックを取り直した場合は、外側のロックをそのまま使う。
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_local = threading.local()
+
+
+def lock_path(path: Path) -> Path:
+    """ストアに対応するロックファイルのパスを返す。"""
+    return path.with_name(path.name + ".lock")
+
+
+class StoreLock:
+    """取得済みのロック。版の読み書きはロックファイルの先頭で行う。"""
+
+    def __init__(self, fd: int, shared: bool) -> None:
+        self._fd = fd
+        self.shared = shared
+
+    @property
+    def version(self) -> int:
+        return int(os.pread(self._fd, 32, 0) or b"0")
+
+    def bump(self) -> int:
+        if self.shared:
+            raise RuntimeError("cannot write under a shared lock")
+        version = self.version + 1
+        # 版は増える一方で桁数が減らないため、切り詰めずに先頭から上書きできる。
+        os.pwrite(self._fd, str(version).encode("ascii"), 0)
+        os.fsync(self._fd)
+        return version
+
+
+def _held() -> dict[str, StoreLock]:
+    if not hasattr(_local, "held"):
+        _local.held = {}
+    held: dict[str, StoreLock] = _local.held
+    return held
+
+
+@contextmanager
+def locked(path: Path, *, shared: bool = False) -> Iterator[StoreLock]:
+    """ストアのロックを取る。既定は排他ロック、`shared=True` で共有ロック。"""
+    key = str(lock_path(path).absolute())
+    held = _held()
+    current = held.get(key)
+    if current is not None:
+        if current.shared and not shared:
+            raise RuntimeError("cannot upgrade a shared lock")
+        yield current
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = lock = StoreLock(fd, shared)
+        try:
+            yield lock
+        finally:
+            del held[key]
+    finally:
+        os.close(fd)
+
+
+def read_version(path: Path) -> int:
+    """ロックを取らずにストアの版を返す（ロックファイルがなければ 0）。"""
+    try:
+        with lock_path(path).open("rb") as f:
+            return int(f.read(32) or b"0")
+    except FileNotFoundError:
+        return 0
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """一時ファイルに書いて fsync し、版を進めてから rename で置き換える。
+
+    途中で落ちても元のファイルは壊れず、読み手は常に完全な内容を見る。
+    """
+    with locked(path) as lock:
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        lock.bump()
+        os.replace(tmp, path)
+        _fsync_dir(path.parent)
+
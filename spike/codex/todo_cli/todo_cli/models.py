@@ -1,54 +1,280 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Literal, Optional
+import sys
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Literal, Optional, Union
 
 Priority = Literal["high", "medium", "low"]
 Status = Literal["open", "done"]
 
+# 優先度は並び順のコード（小さい整数）で持つ。想定外の値は末尾に番号を足して持つ。
+_PRIORITY_NAMES: list[str] = ["high", "medium", "low"]
+_PRIORITY_CODES: dict[str, int] = {name: code for code, name in enumerate(_PRIORITY_NAMES)}
+
+# 期限（YYYY-MM-DD）は日の序数、now_iso_utc() の書式の日時はエポック秒で持ち、読むときに
+# 文字列へ戻す。それ以外の書き方の値は、保存し直しても変わらないよう文字列のまま持つ。
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+# 時刻部分の "THH:MM:" と "SSZ" の表。解析は表を引くだけで済み、表にない書き方は文字列のまま残る。
+_CLOCK_MINUTES = tuple(f"T{h:02d}:{m:02d}:" for h in range(24) for m in range(60))
+_CLOCK_SECONDS = tuple(f"{s:02d}Z" for s in range(60))
+_MINUTE_OF = {text: minute for minute, text in enumerate(_CLOCK_MINUTES)}
+_SECOND_OF = {text: second for second, text in enumerate(_CLOCK_SECONDS)}
+
+_Packed = Union[int, str, None]
+
+_UNSET: Any = object()
+
+
+def _priority_code(name: str) -> int:
+    code = _PRIORITY_CODES.get(name)
+    if code is None:
+        code = _PRIORITY_CODES[name] = len(_PRIORITY_NAMES)
+        _PRIORITY_NAMES.append(name)
+    return code
+
+
+def _pack_moment(value: Optional[str]) -> _Packed:
+    # YYYY-MM-DD + THH:MM: + SSZ
+    if value is None:
+        return None
+    minute = _MINUTE_OF.get(value[10:17])
+    second = _SECOND_OF.get(value[17:])
+    if minute is None or second is None:
+        return value
+    day = _pack_date(value[:10])
+    if isinstance(day, str):
+        return value
+    return (day - _EPOCH_DAY) * 86400 + minute * 60 + second
+
+
+def _unpack_moment(value: _Packed) -> Optional[str]:
+    if not isinstance(value, int):
+        return value
+    days, seconds = divmod(value, 86400)
+    minute, second = divmod(seconds, 60)
+    return _format_date(days + _EPOCH_DAY) + _CLOCK_MINUTES[minute] + _CLOCK_SECONDS[second]
+
+
+# 期限の日付は種類が少ないので、変換結果を使い回す（同じ int オブジェクトを共有する）。
+@lru_cache(maxsize=4096)
+def _pack_date(value: str) -> Union[int, str]:
+    try:
+        ordinal = date.fromisoformat(value).toordinal()
+    except ValueError:
+        return value
+    return ordinal if _format_date(ordinal) == value else value
+
+
+@lru_cache(maxsize=4096)
+def _format_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
 
-@dataclass(frozen=True)
 class Task:
-    """タスクの不変データモデル（作成後に変更しない前提）。"""
-    id: str
-    title: str
-    description: Optional[str]
-    priority: Priority
-    due_date: Optional[str]
-    categories: list[str]
-    status: Status
-    created_at: str
-    completed_at: Optional[str]
+    """タスクの不変データモデル（作成後に変更しない前提）。
+
+    件数が多くても小さく済むよう __slots__ で属性を固定し、優先度はコード、日時はエポック秒、
+    期限は日の序数で持つ。文字列への変換は属性を読んだときに行う。ステータスとカテゴリは
+    intern して同じ文字列を共有する。属性は読み取り専用で、変更した複製は replace() で作る。
+    """
+
+    __slots__ = (
+        "_id", "_title", "_description", "_priority", "_due", "_categories", "_status",
+        "_created", "_completed",
+    )
+
+    _id: str
+    _title: str
+    _description: Optional[str]
+    _priority: int
+    _due: _Packed
+    _categories: tuple[str, ...]
+    _status: str
+    _created: _Packed
+    _completed: _Packed
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        description: Optional[str],
+        priority: Priority,
+        due_date: Optional[str],
+        categories: list[str],
+        status: Status,
+        created_at: str,
+        completed_at: Optional[str],
+    ) -> None:
+        self._id = id
+        self._title = title
+        self._description = description
+        self._priority = _priority_code(priority)
+        self._due = None if due_date is None else _pack_date(due_date)
+        self._categories = tuple(map(sys.intern, categories))
+        self._status = sys.intern(status)
+        self._created = _pack_moment(created_at)
+        self._completed = _pack_moment(completed_at)
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def description(self) -> Optional[str]:
+        return self._description
+
+    @property
+    def priority(self) -> Priority:
+        return _PRIORITY_NAMES[self._priority]  # type: ignore[return-value]
+
+    @property
+    def due_date(self) -> Optional[str]:
+        due = self._due
+        return _format_date(due) if isinstance(due, int) else due
+
+    @property
+    def categories(self) -> list[str]:
+        return list(self._categories)
+
+    @property
+    def status(self) -> Status:
+        return self._status  # type: ignore[return-value]
+
+    @property
+    def created_at(self) -> str:
+        return _unpack_moment(self._created)  # type: ignore[return-value]
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        return _unpack_moment(self._completed)
+
+    @property
+    def created_seconds(self) -> float:
+        """作成日時のエポック秒（並べ替え用。文字列を作らずに比べられる）。"""
+        created = self._created
+        return created if isinstance(created, int) else epoch_seconds(created)  # type: ignore[arg-type]
+
+    def replace(
+        self,
+        *,
+        id: str = _UNSET,
+        title: str = _UNSET,
+        description: Optional[str] = _UNSET,
+        priority: Priority = _UNSET,
+        due_date: Optional[str] = _UNSET,
+        categories: list[str] = _UNSET,
+        status: Status = _UNSET,
+        created_at: str = _UNSET,
+        completed_at: Optional[str] = _UNSET,
+    ) -> "Task":
+        """指定した属性だけを変えた複製を返す（dataclasses.replace 相当）。"""
+        task = Task.__new__(Task)
+        task._id = self._id if id is _UNSET else id
+        task._title = self._title if title is _UNSET else title
+        task._description = self._description if description is _UNSET else description
+        task._priority = self._priority if priority is _UNSET else _priority_code(priority)
+        if due_date is _UNSET:
+            task._due = self._due
+        else:
+            task._due = None if due_date is None else _pack_date(due_date)
+        if categories is _UNSET:
+            task._categories = self._categories
+        else:
+            task._categories = tuple(map(sys.intern, categories))
+        task._status = self._status if status is _UNSET else sys.intern(status)
+        task._created = self._created if created_at is _UNSET else _pack_moment(created_at)
+        task._completed = self._completed if completed_at is _UNSET else _pack_moment(completed_at)
+        return task
+
+    def _astuple(self) -> tuple[Any, ...]:
+        return (
+            self._id, self._title, self._description, self._priority, self._due,
+            self._categories, self._status, self._created, self._completed,
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # report のワーカープロセスから返すときなどに使う。既定の pickle（スロット名→値の辞書）より
+        # 小さく速い。優先度のコードは想定外の値の分がプロセスごとに違うので、名前で渡す。
+        state = self._astuple()
+        return (_unpickle_task, (*state[:3], _PRIORITY_NAMES[self._priority], *state[4:]))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"Task({fields})"
 
     @staticmethod
     def from_dict(data: dict[str, Any]) -> "Task":
-        return Task(
-            id=data["id"],
-            title=data["title"],
-            description=data.get("description"),
-            priority=data["priority"],
-            due_date=data.get("due_date"),
-            categories=list(data.get("categories", [])),
-            status=data["status"],
-            created_at=data["created_at"],
-            completed_at=data.get("completed_at"),
-        )
+        # 読み込みは件数が多いので、__init__ を通さずに直接スロットを埋める。
+        task = Task.__new__(Task)
+        task._id = data["id"]
+        task._title = data["title"]
+        task._description = data.get("description")
+        task._priority = _priority_code(data["priority"])
+        due = data.get("due_date")
+        task._due = None if due is None else _pack_date(due)
+        categories = data.get("categories")
+        task._categories = tuple(map(sys.intern, categories)) if categories else ()
+        task._status = sys.intern(data["status"])
+        task._created = _pack_moment(data["created_at"])
+        task._completed = _pack_moment(data.get("completed_at"))
+        return task
 
     def to_dict(self) -> dict[str, Any]:
         return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "priority": self.priority,
+            "id": self._id,
+            "title": self._title,
+            "description": self._description,
+            "priority": _PRIORITY_NAMES[self._priority],
             "due_date": self.due_date,
-            "categories": list(self.categories),
-            "status": self.status,
-            "created_at": self.created_at,
-            "completed_at": self.completed_at,
+            "categories": list(self._categories),
+            "status": self._status,
+            "created_at": _unpack_moment(self._created),
+            "completed_at": _unpack_moment(self._completed),
         }
 
 
+def _unpickle_task(
+    id: str,
+    title: str,
+    description: Optional[str],
+    priority: str,
+    due: _Packed,
+    categories: tuple[str, ...],
+    status: str,
+    created: _Packed,
+    completed: _Packed,
+) -> Task:
+    task = Task.__new__(Task)
+    task._id = id
+    task._title = title
+    task._description = description
+    task._priority = _priority_code(priority)
+    task._due = due
+    task._categories = tuple(map(sys.intern, categories))
+    task._status = sys.intern(status)
+    task._created = created
+    task._completed = completed
+    return task
+
+
+def epoch_seconds(value: str) -> float:
+    """ISO 8601 の日時をエポック秒にする（タイムゾーンなしは UTC とみなす）。"""
+    moment = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
 def now_iso_utc() -> str:
     """UTCの現在時刻をISO 8601で返す（Zサフィックス）。"""
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
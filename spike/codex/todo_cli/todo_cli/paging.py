@@ -0,0 +1,63 @@
+"""一覧の件数制限とカーソル（キーセット）によるページ送りを扱う。
+
+カーソルは前のページの最後のタスクの、並べ替えキーの元になる値・作成日時・IDを持つ。
+並べ替えありの一覧は (並べ替えキー, 作成日時, ID) の順に並び、次のページはこの組が
+そのタスクより後ろのものから始まる。ID は一意なので、途中でタスクが追加・削除されても
+（カーソルのタスク自体が削除されても）位置がずれない。
+
+並べ替えなしの一覧はファイル上の順序に並ぶ。カーソルのタスクが残っていればその位置の
+次から、削除されていれば (作成日時, ID) がそれより後ろのタスクから再開する。add は
+末尾に追加するので、作成日時が同じ秒のタスク同士を除き、これはファイル上の順序と一致する。
+"""
+
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from .models import Task
+
+# 並べ替えキーごとに、カーソルへ入れるタスクの属性
+SORT_FIELDS = {"due": "due_date", "priority": "priority", "created": "created_at"}
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Cursor:
+    sort: Optional[str]
+    value: Any
+    created_at: str
+    task_id: str
+
+
+def encode_cursor(task: Task, sort: Optional[str]) -> str:
+    """task の次から一覧を再開するためのカーソル（URL安全な文字列）を返す。"""
+    value = getattr(task, SORT_FIELDS[sort]) if sort is not None else None
+    payload = json.dumps(
+        [sort, value, task.created_at, task.id], ensure_ascii=False, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(text: str, sort: Optional[str]) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+        cursor_sort, value, created_at, task_id = json.loads(raw)
+        if not isinstance(created_at, str):
+            raise TypeError(created_at)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"invalid cursor: {text}") from exc
+    if cursor_sort != sort:
+        raise ValueError("cursor was created with a different sort")
+    return Cursor(cursor_sort, value, created_at, str(task_id))
+
+
+def smallest(items: Iterable[T], limit: Optional[int], key: Callable[[T], Any]) -> list[T]:
+    """key の小さい順に並べる。limit があればヒープで上位 limit 件だけを選ぶ（O(n log k)）。"""
+    if limit is None:
+        return sorted(items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
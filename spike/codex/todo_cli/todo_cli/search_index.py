@@ -0,0 +1,230 @@
+"""検索用のトライグラム転置インデックスを扱う。
+
+インデックスは `tasks.json.idx`（SQLite）に保存し、add/edit/delete/done/undo で差分更新する。
+各タスクのレコードも保持し、検索は候補だけをインデックスから読む（ストレージ全体を読まない）。
+保存時のストレージのサイズと更新時刻を記録し、一致しない場合は古いとみなして使わない。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .locking import locked
+from .models import Task
+from .storage import journal_path, load_tasks
+
+GRAM_SIZE = 3
+# docs にレコード列がない旧形式のインデックスは、reindex するまで古いものとして扱う。
+SCHEMA_VERSION = 2
+# 長い検索語でも SQL の複合 SELECT 上限を超えないよう、照会に使うグラム数を抑える。
+# 候補は最終的に部分一致で検証するため、一部のグラムだけでも結果は変わらない。
+_MAX_QUERY_GRAMS = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY,
+    task_id TEXT NOT NULL UNIQUE,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    gram TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (gram, doc)
+) WITHOUT ROWID;
+"""
+
+
+def index_path(path: Path) -> Path:
+    """ストレージに対応するインデックスファイルのパスを返す。"""
+    return path.with_name(path.name + ".idx")
+
+
+def haystack(task: Task) -> str:
+    """検索対象テキスト（タイトルと説明、小文字化済み）を返す。"""
+    return f"{task.title}\n{task.description or ''}".lower()
+
+
+def grams(text: str) -> set[str]:
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _record(task: Task) -> str:
+    return json.dumps(task.to_dict(), ensure_ascii=False)
+
+
+def _fingerprint(path: Path) -> str:
+    stamps: list[list[int] | None] = []
+    for target in (path, journal_path(path)):
+        if target.exists():
+            stat = target.stat()
+            stamps.append([stat.st_size, stat.st_mtime_ns])
+        else:
+            stamps.append(None)
+    return json.dumps(stamps)
+
+
+class SearchIndex:
+    """タスクID単位のトライグラム転置インデックス。
+
+    doc はストレージ上の並び順（追加順）で、edit/done/undo では変えない。
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def add(self, task: Task) -> None:
+        cursor = self._conn.execute(
+            "INSERT INTO docs (task_id, record) VALUES (?, ?)", (task.id, _record(task))
+        )
+        doc = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO postings (gram, doc) VALUES (?, ?)",
+            ((gram, doc) for gram in grams(haystack(task))),
+        )
+
+    def remove(self, task: Task) -> None:
+        row = self._conn.execute("SELECT doc FROM docs WHERE task_id = ?", (task.id,)).fetchone()
+        if row is None:
+            return
+        doc = row[0]
+        self._conn.executemany(
+            "DELETE FROM postings WHERE gram = ? AND doc = ?",
+            ((gram, doc) for gram in grams(haystack(task))),
+        )
+        self._conn.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+
+    def update(self, before: Task, after: Task) -> None:
+        row = self._conn.execute("SELECT doc FROM docs WHERE task_id = ?", (before.id,)).fetchone()
+        if row is None:
+            self.add(after)
+            return
+        doc = row[0]
+        self._conn.execute("UPDATE docs SET record = ? WHERE doc = ?", (_record(after), doc))
+        old, new = grams(haystack(before)), grams(haystack(after))
+        self._conn.executemany(
+            "DELETE FROM postings WHERE gram = ? AND doc = ?", ((gram, doc) for gram in old - new)
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO postings (gram, doc) VALUES (?, ?)",
+            ((gram, doc) for gram in new - old),
+        )
+
+    def candidates(self, term: str) -> Optional[set[str]]:
+        """語を含みうるタスクIDを返す。短すぎて絞り込めない場合は None。"""
+        term_grams = sorted(grams(term))[:_MAX_QUERY_GRAMS]
+        if not term_grams:
+            return None
+        query = " INTERSECT ".join(["SELECT doc FROM postings WHERE gram = ?"] * len(term_grams))
+        rows = self._conn.execute(
+            f"SELECT task_id FROM docs WHERE doc IN ({query})", term_grams
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def lookup(self, terms: Iterable[str], match: str) -> Optional[set[str]]:
+        """全語（all）/いずれか（any）の条件で候補IDを返す。絞り込めない場合は None。"""
+        sets = [self.candidates(term) for term in terms]
+        narrowed = [s for s in sets if s is not None]
+        if match == "any":
+            if len(narrowed) < len(sets):
+                return None
+            return set().union(*narrowed)
+        if not narrowed:
+            return None
+        return set.intersection(*narrowed)
+
+    def fetch(self, task_ids: Iterable[str]) -> list[Task]:
+        """指定IDのタスクを、ストレージ上の並び順で返す。"""
+        rows = self._conn.execute(
+            "SELECT record FROM docs WHERE task_id IN (SELECT value FROM json_each(?)) ORDER BY doc",
+            (json.dumps(list(task_ids)),),
+        )
+        return [Task.from_dict(json.loads(row[0])) for row in rows]
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """指定IDのタスクを返す（なければ None）。"""
+        row = self._conn.execute("SELECT record FROM docs WHERE task_id = ?", (task_id,)).fetchone()
+        return None if row is None else Task.from_dict(json.loads(row[0]))
+
+    def commit(self, storage_path: Path) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("schema", str(SCHEMA_VERSION)), ("fingerprint", _fingerprint(storage_path))],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(index_path(path))
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def open_index(path: Path) -> Optional[SearchIndex]:
+    """最新のインデックスを開く。存在しないか古い場合は None。"""
+    if not index_path(path).exists():
+        return None
+    conn = sqlite3.connect(index_path(path))
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.OperationalError:
+        meta = {}
+    if meta.get("schema") != str(SCHEMA_VERSION) or meta.get("fingerprint") != _fingerprint(path):
+        conn.close()
+        return None
+    return SearchIndex(conn)
+
+
+def rebuild_index(path: Path) -> int:
+    """既存ストレージからインデックスを作り直し、登録件数を返す。"""
+    # 作り直しの間に更新されると鮮度情報が実際の内容とずれるため、書き込みを止める。
+    with locked(path):
+        return _rebuild_index(path)
+
+
+def _rebuild_index(path: Path) -> int:
+    tasks = load_tasks(path)
+    index_path(path).unlink(missing_ok=True)
+    conn = _connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    # 主キー順にまとめて挿入するため、一時表に集めてから整列して移す。
+    conn.execute("CREATE TEMP TABLE staged (gram TEXT NOT NULL, doc INTEGER NOT NULL)")
+    for doc, task in enumerate(tasks, start=1):
+        conn.execute(
+            "INSERT INTO docs (doc, task_id, record) VALUES (?, ?, ?)", (doc, task.id, _record(task))
+        )
+        conn.executemany(
+            "INSERT INTO staged (gram, doc) VALUES (?, ?)",
+            ((gram, doc) for gram in grams(haystack(task))),
+        )
+    conn.execute("INSERT INTO postings SELECT gram, doc FROM staged ORDER BY gram, doc")
+    conn.execute("DROP TABLE staged")
+    index = SearchIndex(conn)
+    with closing(index):
+        index.commit(path)
+    return len(tasks)
+
+
+@contextmanager
+def maintain_index(path: Path) -> Iterator[Optional[SearchIndex]]:
+    """ストレージ更新を囲み、インデックスを差分更新する。
+
+    新規ストレージではインデックスを作成する。既存ストレージにインデックスがない、
+    または古い場合は None を渡し、`reindex` で作り直すまで検索は全件走査になる。
+    """
+    is_new = not any(p.exists() for p in (path, journal_path(path), index_path(path)))
+    index = SearchIndex(_connect(path)) if is_new else open_index(path)
+    if index is None:
+        yield None
+        return
+    with closing(index):
+        yield index
+        index.commit(path)
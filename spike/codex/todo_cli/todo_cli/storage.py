@@ -1,27 +1,275 @@
-"""タスクの永続化（JSON）を扱う。"""
+"""タスクの永続化（JSON）を扱う。
+
+ジャーナルの先頭行は、それが前提とするスナップショットを表す `base` レコードにする。
+スナップショットの保存後、ジャーナルの削除前に落ちて古いジャーナルが残っても、
+前提が今のスナップショットと一致しないため再生しない（古い変更で書き戻さない）。
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterator, Optional
 
+from . import profiling
+from .locking import locked, write_atomic
 from .models import Task
 
+# ジャーナルがこのサイズを超えたらスナップショットへ畳み込む。
+COMPACT_THRESHOLD_BYTES = 1024 * 1024
 
-def load_tasks(path: Path) -> list[Task]:
-    """ストレージからタスク一覧を読み込む。"""
-    if not path.exists():
-        return []
+
+def _check_suffix(path: Path) -> None:
     if path.suffix not in {".json"}:
         raise ValueError("Only .json storage is supported for now")
-    raw = path.read_text(encoding="utf-8")
-    data = json.loads(raw) if raw.strip() else []
-    return [Task.from_dict(item) for item in data]
+
+
+def journal_path(path: Path) -> Path:
+    """スナップショットに対応するジャーナル（JSON Lines）のパスを返す。"""
+    return path.with_name(path.name + ".log")
+
+
+def _snapshot_stat(path: Path) -> Optional[list[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _snapshot_digest(raw: Optional[bytes]) -> Optional[str]:
+    return None if raw is None else hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _read_snapshot(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _base_record(path: Path) -> dict[str, Any]:
+    return {
+        "op": "base",
+        "snapshot": _snapshot_digest(_read_snapshot(path)),
+        "stat": _snapshot_stat(path),
+    }
+
+
+def _is_current(path: Path, base: dict[str, Any], raw: Optional[bytes]) -> bool:
+    # 置き換えられていなければ stat が一致する。一致しなくても（コピーし直した場合など）、
+    # 内容が同じならジャーナルの変更はそのまま当てはまる。
+    if base["stat"] == _snapshot_stat(path):
+        return True
+    if raw is None:
+        raw = _read_snapshot(path)
+    return bool(base["snapshot"] == _snapshot_digest(raw))
+
+
+def _replay_journal(
+    path: Path,
+    records: dict[str, dict[str, Any]],
+    raw: Optional[bytes] = None,
+    *,
+    only: Optional[str] = None,
+) -> None:
+    # only を指定すると、そのIDのレコードだけを再生する。
+    log = journal_path(path)
+    if not log.exists():
+        return
+    lines = log.read_text(encoding="utf-8").splitlines()
+    for lineno, line in enumerate(lines, start=1):
+        if not line.strip() or (only is not None and lineno > 1 and only not in line):
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            # 追記途中で中断された末尾行のみ読み飛ばす。
+            if lineno == len(lines):
+                break
+            raise
+        op = entry["op"]
+        if op == "base":
+            # 今のスナップショットより前に書かれたジャーナルは、既に畳み込み済みなので読まない。
+            # （base 行のない以前の版のジャーナルは、そのまま再生する）
+            if not _is_current(path, entry, raw):
+                return
+        elif only is not None and (entry["task"]["id"] if op == "add" else entry["id"]) != only:
+            continue
+        elif op == "add":
+            records[entry["task"]["id"]] = entry["task"]
+        elif op == "patch":
+            if entry["id"] in records:
+                records[entry["id"]].update(entry["changes"])
+        elif op == "delete":
+            records.pop(entry["id"], None)
+        else:
+            raise ValueError(f"unknown journal op: {op}")
+
+
+def load_tasks(path: Path) -> list[Task]:
+    """ストレージからタスク一覧を読み込む（ジャーナルがあれば再生する）。"""
+    records: dict[str, dict[str, Any]] = {}
+    if not path.exists() and not journal_path(path).exists():
+        return []
+    with profiling.phase("load"):
+        # 共有ロックで、スナップショットとジャーナルを同じ時点の組として読む。
+        with profiling.phase("parse"), locked(path, shared=True):
+            raw = _read_snapshot(path)
+            if raw is not None:
+                _check_suffix(path)
+                data = json.loads(raw) if raw.strip() else []
+                records = {item["id"]: item for item in data}
+            _replay_journal(path, records, raw)
+        with profiling.phase("validate"):
+            return [Task.from_dict(item) for item in records.values()]
+
+
+def _scan_snapshot(raw: bytes, task_id: str) -> Optional[dict[str, Any]]:
+    # save_tasks は各タスクを "id" から書き始めるので、その位置からタスク1件分だけをパースする。
+    # ID の前に別のキーがある（手で編集した）スナップショットは全体をパースする。
+    key = re.search(rb'"id"\s*:\s*"' + re.escape(task_id.encode("utf-8")) + rb'"', raw)
+    if key is None:
+        return None
+    start = raw.rfind(b"{", 0, key.start())
+    if start < 0 or raw[start + 1 : key.start()].strip():
+        data: list[dict[str, Any]] = json.loads(raw)
+        return next((item for item in data if item["id"] == task_id), None)
+    record, _ = json.JSONDecoder().raw_decode(raw[start:].decode("utf-8"))
+    found: dict[str, Any] = record
+    return found
+
+
+def find_task(path: Path, task_id: str) -> Optional[Task]:
+    """指定IDのタスクの現在の状態を返す（なければ None）。
+
+    スナップショット全体はパースせず、バイト列からそのタスクを探して1件だけ読み、
+    ジャーナルのうちそのIDの行だけを再生する。
+    """
+    records: dict[str, dict[str, Any]] = {}
+    with profiling.phase("load"), locked(path, shared=True):
+        raw = _read_snapshot(path)
+        if raw is not None:
+            _check_suffix(path)
+            record = _scan_snapshot(raw, task_id)
+            if record is not None:
+                records[task_id] = record
+        _replay_journal(path, records, raw, only=task_id)
+    return Task.from_dict(records[task_id]) if task_id in records else None
 
 
 def save_tasks(path: Path, tasks: list[Task]) -> None:
-    """タスク一覧をストレージへ保存する。"""
-    if path.suffix not in {".json"}:
-        raise ValueError("Only .json storage is supported for now")
-    payload = [task.to_dict() for task in tasks]
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    """タスク一覧をスナップショットとして保存し、ジャーナルを破棄する。"""
+    _check_suffix(path)
+    with profiling.phase("save"):
+        payload = [task.to_dict() for task in tasks]
+        with locked(path):
+            write_atomic(path, json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8"))
+            # スナップショット書き込み後に削除する。削除前に落ちて残ったジャーナルは、
+            # base が新しいスナップショットと一致しないため再生されない。
+            journal_path(path).unlink(missing_ok=True)
+
+
+@contextmanager
+def transaction(path: Path) -> Iterator[list[Task]]:
+    """排他ロックを取ってタスク一覧を読み込み、ブロックを正常に抜けたら保存する。
+
+    複数プロセスが同じストアを読み込み→変更→保存しても更新が失われない。
+    """
+    with locked(path):
+        tasks = load_tasks(path)
+        yield tasks
+        save_tasks(path, tasks)
+
+
+def compact(path: Path) -> None:
+    """ジャーナルをスナップショットへ畳み込む。"""
+    with transaction(path):
+        pass
+
+
+def _last_line_end(fd: int, size: int) -> int:
+    # 末尾から 64KiB ずつ読み、最後の改行の直後の位置を返す（改行がなければ 0）。
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        chunk = os.pread(fd, end - start, start)
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def _dump_line(record: dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=True, separators=(",", ":")) + "\n"
+
+
+def _journal_base(fd: int) -> Optional[dict[str, Any]]:
+    # 先頭行の base レコードを返す（空、または base 行のない以前の版のジャーナルなら None）。
+    head = os.pread(fd, 4096, 0)
+    if not head.startswith(b'{"op":"base"'):
+        return None
+    line, newline, _ = head.partition(b"\n")
+    if not newline:
+        return None
+    base: dict[str, Any] = json.loads(line)
+    return base
+
+
+def _append(path: Path, record: dict[str, Any], threshold: int) -> None:
+    _check_suffix(path)
+    line = _dump_line(record)
+    with locked(path) as lock:
+        lock.bump()
+        with profiling.phase("save"):
+            fd = os.open(journal_path(path), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o666)
+            try:
+                size = os.fstat(fd).st_size
+                # 前回の追記が途中で止まって末尾が改行で終わっていなければ、その不完全な行を
+                # 切り詰めてから書く（続けて書くと次の行と1行につながり、再生で読めなくなる）。
+                if size and os.pread(fd, 1, size - 1) != b"\n":
+                    size = _last_line_end(fd, size)
+                    os.ftruncate(fd, size)
+                base = _journal_base(fd) if size else None
+                if size and base is not None and not _is_current(path, base, None):
+                    # 畳み込み済みの古いジャーナル。続けて書くと再生されないので作り直す。
+                    os.ftruncate(fd, 0)
+                    size = 0
+                if not size:
+                    line = _dump_line(_base_record(path)) + line
+                view = memoryview(line.encode("utf-8"))
+                while view:
+                    written = os.write(fd, view)
+                    size += written
+                    view = view[written:]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        if size >= threshold:
+            compact(path)
+
+
+def append_add(path: Path, task: Task, *, threshold: int = COMPACT_THRESHOLD_BYTES) -> None:
+    """タスク追加をジャーナルへ追記する。"""
+    _append(path, {"op": "add", "task": task.to_dict()}, threshold)
+
+
+def append_patch(
+    path: Path, before: Task, after: Task, *, threshold: int = COMPACT_THRESHOLD_BYTES
+) -> None:
+    """タスク更新の差分フィールドのみをジャーナルへ追記する。"""
+    old = before.to_dict()
+    changes = {key: value for key, value in after.to_dict().items() if old[key] != value}
+    if not changes:
+        return
+    _append(path, {"op": "patch", "id": before.id, "changes": changes}, threshold)
+
+
+def append_delete(path: Path, task_id: str, *, threshold: int = COMPACT_THRESHOLD_BYTES) -> None:
+    """タスク削除をジャーナルへ追記する。"""
+    _append(path, {"op": "delete", "id": task_id}, threshold)
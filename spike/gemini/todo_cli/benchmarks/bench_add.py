@@ -0,0 +1,54 @@
+"""
+Benchmark for bulk insertion through TaskManager.add_task.
+
+    PYTHONPATH=src python benchmarks/bench_add.py
+
+All inserts run inside one transaction(), so the file is written once and the
+per-task cost is ID allocation plus bookkeeping. The "max scan" column replays the
+previous allocation (max over all IDs on every add) for comparison; it grows
+quadratically and is only run up to SCAN_LIMIT tasks.
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from todo.manager import TaskManager
+from todo.models import Task
+
+SIZES = (25_000, 50_000, 100_000)
+SCAN_LIMIT = 25_000
+
+
+def _max_scan(size: int) -> float:
+    tasks: List[Task] = []
+    start = time.perf_counter()
+    for i in range(size):
+        new_id = max((task.id for task in tasks), default=0) + 1
+        tasks.append(Task(id=new_id, title=f"Task {i}"))
+    return time.perf_counter() - start
+
+
+def _manager(size: int, db_path: Path) -> float:
+    manager = TaskManager(db_path=db_path)
+    start = time.perf_counter()
+    with manager.transaction():
+        for i in range(size):
+            manager.add_task(f"Task {i}")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'tasks':>10} {'manager':>10} {'per add':>10} {'max scan':>10} {'per add':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            total = _manager(size, Path(tmp) / f"tasks-{size}.json")
+            line = f"{size:>10,} {total:>9.2f}s {total / size * 1e6:>8.1f}us"
+            if size <= SCAN_LIMIT:
+                scan = _max_scan(size)
+                line += f" {scan:>9.2f}s {scan / size * 1e6:>8.1f}us"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
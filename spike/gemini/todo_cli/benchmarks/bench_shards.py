@@ -0,0 +1,65 @@
+"""
+Benchmark for a store with many categories, as one tasks.json and split with `todo shard`.
+
+    PYTHONPATH=src python benchmarks/bench_shards.py
+
+Each row is one CLI-like command on a fresh lazy manager: listing one category,
+completing one task, adding one task, and listing every category. The sharded store
+reads and writes only the shards a command needs; the full list reads all of them on
+a thread pool.
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from todo.database import save_tasks
+from todo.manager import TaskManager
+from todo.models import Task
+from todo.sharding import open_task_manager, split_store
+
+SIZES = (20_000, 100_000)
+CATEGORIES = 200
+
+
+def _write_store(db_path: Path, size: int) -> None:
+    save_tasks(
+        [Task(id=i, title=f"Task {i}", priority=i % 5 + 1, category=f"team-{i % CATEGORIES}") for i in range(1, size + 1)],
+        db_path,
+    )
+
+
+def _commands(size: int) -> List[tuple]:
+    return [
+        ("list one category", lambda m: m.list_tasks(category="team-7")),
+        ("complete one task", lambda m: m.complete_task(size // 2)),
+        ("add one task", lambda m: m.add_task("New task", category="team-7")),
+        ("list all categories", lambda m: m.list_tasks(sort_by="priority", limit=20)),
+    ]
+
+
+def _time(db_path: Path, command: Callable[[TaskManager], object]) -> float:
+    start = time.perf_counter()
+    command(open_task_manager(db_path, lazy=True))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'tasks':>10} {'command':<22} {'tasks.json':>11} {'sharded':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            single = Path(tmp) / f"single-{size}" / "tasks.json"
+            sharded = Path(tmp) / f"sharded-{size}" / "tasks.json"
+            for db_path in (single, sharded):
+                db_path.parent.mkdir()
+                _write_store(db_path, size)
+            split_store(sharded)
+            for name, command in _commands(size):
+                print(
+                    f"{size:>10,} {name:<22} {_time(single, command) * 1e3:>9.1f}ms "
+                    f"{_time(sharded, command) * 1e3:>8.1f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
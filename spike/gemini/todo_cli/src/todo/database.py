@@ -1,10 +1,93 @@
 import json
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
+from todo.locking import locked, write_atomic
 from todo.models import Task
 
 DEFAULT_DB_PATH = Path("tasks.json")
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+def _iter_task_dicts(db_path: Path, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parses the top-level JSON array, yielding one raw dict at a time.
+    Only the unparsed tail of the current chunk is kept in memory, so peak usage is
+    bounded by chunk_size plus the largest single record rather than the file size.
+    """
+    decoder = json.JSONDecoder()
+    with db_path.open(encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            # Drop the consumed prefix and append the next chunk; False at end of file.
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            return bool(chunk)
+
+        def next_token() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    raise json.JSONDecodeError("Unexpected end of data", buf, pos)
+
+        if next_token() != "[":
+            raise json.JSONDecodeError("Expecting '['", buf, pos)
+        pos += 1
+        expect_value = True
+        while True:
+            token = next_token()
+            if token == "]":
+                return
+            if not expect_value:
+                if token != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                pos += 1
+                next_token()
+            while True:
+                try:
+                    data, pos = decoder.raw_decode(buf, pos)
+                    break
+                except json.JSONDecodeError:
+                    # The record may straddle the chunk boundary; read more and retry.
+                    if not fill():
+                        raise
+            yield data
+            expect_value = False
+
+
+def iter_tasks(
+    db_path: Path = DEFAULT_DB_PATH,
+    where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Task]:
+    """
+    Lazily yields tasks from a JSON file.
+    `where` is a cheap pre-check on the raw dict; records it rejects are never validated.
+    """
+    if not db_path.exists() or db_path.stat().st_size == 0:
+        return
+    try:
+        for data in _iter_task_dicts(db_path, chunk_size):
+            if where is None or where(data):
+                yield Task.model_validate(data)
+    except json.JSONDecodeError as e:
+        print(f"Error loading tasks from {db_path}: {e}")
+
 
 def load_tasks(db_path: Path = DEFAULT_DB_PATH) -> List[Task]:
     """
@@ -24,11 +107,55 @@ def load_tasks(db_path: Path = DEFAULT_DB_PATH) -> List[Task]:
         return []
 
 
-def save_tasks(tasks: List[Task], db_path: Path = DEFAULT_DB_PATH):
+def encode_task(task: Task) -> bytes:
     """
-    Saves tasks to a JSON file.
+    Serializes one task exactly as it appears as an element of the tasks.json array,
+    so saved elements can be cached and joined without re-dumping unchanged tasks.
     """
-    # Convert Pydantic models to JSON-compatible dictionaries
     # model_dump(mode='json') handles serialization of types like date
-    tasks_data = [task.model_dump(mode='json') for task in tasks]
-    db_path.write_text(json.dumps(tasks_data, indent=4, ensure_ascii=False), encoding="utf-8")
\ No newline at end of file
+    text = json.dumps(task.model_dump(mode='json'), indent=4, ensure_ascii=False)
+    return ("    " + text.replace("\n", "\n    ")).encode("utf-8")
+
+
+def _join(parts: List[bytes]) -> bytes:
+    return b"[\n" + b",\n".join(parts) + b"\n]" if parts else b"[]"
+
+
+def dump_tasks(tasks: Iterable[Task], encode: Callable[[Task], bytes] = encode_task) -> bytes:
+    """Returns the file content save_tasks would write for tasks."""
+    return _join([encode(task) for task in tasks])
+
+
+def save_tasks(
+    tasks: Iterable[Task],
+    db_path: Path = DEFAULT_DB_PATH,
+    encode: Callable[[Task], bytes] = encode_task,
+    next_id: int = 0,
+):
+    """
+    Saves tasks to a JSON file.
+    `encode` may return cached bytes for tasks that have not changed since the last save;
+    the output is identical to json.dumps(..., indent=4) of the whole list.
+    The next ID to allocate is recorded as the larger of next_id and the highest saved ID + 1.
+    """
+    parts = []
+    for task in tasks:
+        parts.append(encode(task))
+        if task.id >= next_id:
+            next_id = task.id + 1
+    content = _join(parts)
+    # Written to a temp file and renamed, so readers never need a lock to see a whole file
+    write_atomic(db_path, content, next_id)
+
+
+@contextmanager
+def transaction(db_path: Path = DEFAULT_DB_PATH) -> Iterator[List[Task]]:
+    """
+    Loads tasks under the store's exclusive lock and saves them when the block exits
+    normally, so concurrent read-modify-write cycles from other processes never
+    overwrite each other.
+    """
+    with locked(db_path):
+        tasks = load_tasks(db_path)
+        yield tasks
+        save_tasks(tasks, db_path)
\ No newline at end of file
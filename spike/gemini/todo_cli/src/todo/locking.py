@@ -0,0 +1,162 @@
+"""
+Cross-process locking and atomic writes for the JSON task store.
+
+The lock is an flock on `<db>.lock` next to the store. The lock file also holds the
+store version, an integer bumped on every write, which lets a TaskManager that loaded
+earlier detect that another process has changed the store since, followed by the next
+task ID to allocate (a high-water mark, so IDs of deleted tasks are not handed out again).
+Re-entering the lock for the same store on the same thread reuses the outer lock.
+"""
+import fcntl
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+_local = threading.local()
+_HEADER_SIZE = 64
+
+
+def lock_path(path: Path) -> Path:
+    """Returns the lock file guarding the store at path."""
+    return path.with_name(path.name + ".lock")
+
+
+def _parse_header(data: bytes) -> Tuple[int, int]:
+    # "<version> <next id>"; lock files written before the next ID was kept hold only the version
+    fields = data.split()
+    version = int(fields[0]) if fields else 0
+    next_id = int(fields[1]) if len(fields) > 1 else 0
+    return version, next_id
+
+
+class StoreLock:
+    """A held lock; the store version and next task ID live at the start of the lock file."""
+
+    def __init__(self, fd: int, shared: bool) -> None:
+        self._fd = fd
+        self.shared = shared
+
+    def _header(self) -> Tuple[int, int]:
+        return _parse_header(os.pread(self._fd, _HEADER_SIZE, 0))
+
+    @property
+    def version(self) -> int:
+        return self._header()[0]
+
+    @property
+    def next_id(self) -> int:
+        return self._header()[1]
+
+    def bump(self, next_id: int = 0) -> int:
+        """Increments the version and raises the stored next ID to at least next_id."""
+        if self.shared:
+            raise RuntimeError("cannot write under a shared lock")
+        version, stored_next_id = self._header()
+        version += 1
+        # Both fields only grow, so overwriting in place never leaves stale digits.
+        header = f"{version} {max(next_id, stored_next_id)}".encode("ascii")
+        os.pwrite(self._fd, header, 0)
+        os.fsync(self._fd)
+        return version
+
+
+def _held() -> Dict[str, StoreLock]:
+    if not hasattr(_local, "held"):
+        _local.held = {}
+    held: Dict[str, StoreLock] = _local.held
+    return held
+
+
+@contextmanager
+def locked(path: Path, *, shared: bool = False) -> Iterator[StoreLock]:
+    """Acquires the store lock: exclusive by default, shared with shared=True."""
+    key = str(lock_path(path).absolute())
+    held = _held()
+    current = held.get(key)
+    if current is not None:
+        if current.shared and not shared:
+            raise RuntimeError("cannot upgrade a shared lock")
+        yield current
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = lock = StoreLock(fd, shared)
+        try:
+            yield lock
+        finally:
+            del held[key]
+    finally:
+        os.close(fd)
+
+
+def _read_header(path: Path) -> Tuple[int, int]:
+    try:
+        with lock_path(path).open("rb") as f:
+            return _parse_header(f.read(_HEADER_SIZE))
+    except FileNotFoundError:
+        return 0, 0
+
+
+def read_version(path: Path) -> int:
+    """Reads the store version without locking (0 if the store was never written)."""
+    return _read_header(path)[0]
+
+
+def read_next_id(path: Path) -> int:
+    """Reads the persisted next task ID without locking (0 if none was recorded)."""
+    return _read_header(path)[1]
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: Path, data: bytes) -> Path:
+    # Fully written and fsynced before it is renamed over path
+    tmp = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+
+def _rename(tmp: Path, path: Path) -> None:
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def replace_file(path: Path, data: bytes) -> None:
+    """
+    Like write_atomic, but neither locks path nor bumps a version; for files guarded
+    by another store's lock (the shards of a sharded store, under its manifest lock).
+    """
+    _rename(_write_temp(path, data), path)
+
+
+def write_atomic(path: Path, data: bytes, next_id: int = 0) -> None:
+    """
+    Writes data to a temp file, fsyncs it, bumps the version and renames it over path.
+    A crash leaves the previous file intact, and readers always see a complete file.
+    """
+    with locked(path) as lock:
+        tmp = _write_temp(path, data)
+        lock.bump(next_id)
+        _rename(tmp, path)
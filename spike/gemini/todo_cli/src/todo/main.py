@@ -1,12 +1,15 @@
 import typer
 from typing import Optional
 from datetime import datetime, date
+from pathlib import Path
 
-from todo.manager import TaskManager
+from todo.manager import encode_cursor
 from todo.models import Task
+from todo.sharding import open_task_manager, shard_dir, split_store
 
 app = typer.Typer(help="A simple command-line TODO application.")
-task_manager = TaskManager() # Initialize TaskManager
+# Tasks are read on demand; a store split with `todo shard` is opened shard by shard
+task_manager = open_task_manager(Path("tasks.json"), lazy=True)
 
 # Helper function to print task details
 def _print_task(task: Task):
@@ -40,9 +43,15 @@ def add(
 def list(
     category: Optional[str] = typer.Option(None, "--category", "-c", help="Filter tasks by category."),
     sort_by: Optional[str] = typer.Option(None, "--sort-by", "-s", help="Sort tasks by 'priority' or 'due-date'."),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", min=0, help="Show at most this many tasks."),
+    after: Optional[str] = typer.Option(None, "--after", help="Resume after the cursor printed with the previous page."),
 ):
     """Lists all TODO tasks."""
-    tasks = task_manager.list_tasks(category=category, sort_by=sort_by)
+    try:
+        tasks = task_manager.list_tasks(category=category, sort_by=sort_by, limit=limit, after=after)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
     if not tasks:
         typer.echo("No tasks found.")
         return
@@ -51,6 +60,8 @@ def list(
     for task in tasks:
         _print_task(task)
     typer.echo("------------------\n")
+    if limit and len(tasks) == limit:
+        typer.echo(f"Next page: --after {encode_cursor(tasks[-1], sort_by)}")
 
 @app.command()
 def edit(
@@ -115,5 +126,15 @@ def search(
         _print_task(task)
     typer.echo("------------------------------------\n")
 
+@app.command()
+def shard():
+    """Splits tasks.json into one file per category, so commands read and write only the categories they use."""
+    try:
+        task_count, shard_count = split_store(task_manager.db_path)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Moved {task_count} tasks into {shard_count} category files in {shard_dir(task_manager.db_path)}.")
+
 if __name__ == "__main__":
     app()
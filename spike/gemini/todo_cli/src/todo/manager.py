@@ -1,101 +1,309 @@
+import base64
+import heapq
+import json
+from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
-from typing import List, Optional, Any
-from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 
 from todo.models import Task
-from todo.database import load_tasks, save_tasks
+from todo.database import encode_task, iter_tasks, load_tasks, save_tasks
+from todo.locking import locked, read_next_id, read_version
+
+
+# Every sort key ends with the unique ID, so it totally orders the tasks and a
+# page can resume strictly after the last key it showed.
+_SORT_KEYS: Dict[Optional[str], Callable[[Task], tuple]] = {
+    "priority": lambda task: (task.priority, task.id),
+    # None due dates sort last
+    "due-date": lambda task: (task.due_date is None, task.due_date, task.id),
+    None: lambda task: (task.id,),
+}
+
+
+def _sort_name(sort_by: Optional[str]) -> Optional[str]:
+    # Unknown sort names fall back to the default ID order
+    return sort_by if sort_by in _SORT_KEYS else None
+
+
+def encode_cursor(task: Task, sort_by: Optional[str] = None) -> str:
+    """Returns an opaque cursor that makes list_tasks resume right after task."""
+    sort_name = _sort_name(sort_by)
+    payload = [sort_name, task.id]
+    if sort_name == "priority":
+        payload.append(task.priority)
+    elif sort_name == "due-date":
+        payload.append(task.due_date.isoformat() if task.due_date else None)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: Optional[str]) -> tuple:
+    """Turns a cursor back into the sort key of the task it was made from."""
+    sort_name = _sort_name(sort_by)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload[0] != sort_name:
+            raise ValueError("cursor was made for a different sort order")
+        task_id = int(payload[1])
+        if sort_name == "priority":
+            return (int(payload[2]), task_id)
+        if sort_name == "due-date":
+            due_date = date.fromisoformat(payload[2]) if payload[2] is not None else None
+            return (due_date is None, due_date, task_id)
+        return (task_id,)
+    except (ValueError, TypeError, IndexError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _select(
+    tasks: Iterable[Task], key: Callable[[Task], tuple], bound: Optional[tuple], limit: Optional[int]
+) -> List[Task]:
+    """Sorts tasks by key, keeping only those past bound and at most limit of them."""
+    if bound is not None:
+        tasks = (task for task in tasks if key(task) > bound)
+    if limit is None:
+        return sorted(tasks, key=key)
+    return heapq.nsmallest(limit, tasks, key=key)
+
+
+def _title_contains(keyword_lower: str) -> Callable[[Dict[str, Any]], bool]:
+    # Cheap pre-check on the raw title; the exact match runs on validated tasks
+    return lambda data: keyword_lower in str(data.get("title", "")).lower()
+
+
+def _search(candidates: Iterable[Task], keyword_lower: str) -> List[Task]:
+    return [task for task in candidates if keyword_lower in task.title.lower()]
 
 
 class TaskManager:
-    def __init__(self, db_path: Path = Path("tasks.json")):
+    def __init__(self, db_path: Path = Path("tasks.json"), lazy: bool = False):
+        """
+        With lazy=True nothing is read up front: read-only queries stream matching
+        records from disk, and the full list is loaded on the first mutation.
+        """
         self.db_path = db_path
-        self._tasks: List[Task] = load_tasks(self.db_path)
+        self._version = 0
+        # Never lower than the highest ID ever saved + 1, so deleted IDs are not reused
+        self._next_id = 1
+        # task id -> (task, its serialized bytes as of the last save); dropped when the task changes
+        self._encoded: Dict[int, Tuple[Task, bytes]] = {}
+        self._in_transaction = False
+        self._pending = False
+        # Categories whose tasks changed since the last save (None: all of them).
+        # Only a sharded store uses it, to rewrite just those categories' shards.
+        self._dirty: Optional[Set[str]] = set()
+        # task id -> task, in file order; None until loaded
+        self._loaded: Optional[Dict[int, Task]] = None if lazy else self._load()
+
+    def _load(self) -> Dict[int, Task]:
+        # Read the version first: if a write lands in between, the next mutation
+        # merely reloads once more instead of overwriting it.
+        self._version = read_version(self.db_path)
+        stored_next_id = read_next_id(self.db_path)
+        self._encoded.clear()
+        self._dirty = set()
+        by_id = self._index(load_tasks(self.db_path))
+        # The recorded mark outlives deleted tasks; the scan covers files saved by other tools
+        self._next_id = max(self._next_id, stored_next_id)
+        return by_id
+
+    def _index(self, tasks: List[Task]) -> Dict[int, Task]:
+        by_id = {task.id: task for task in tasks}
+        self._next_id = max(by_id, default=0) + 1
+        return by_id
+
+    @property
+    def _by_id(self) -> Dict[int, Task]:
+        if self._loaded is None:
+            self._loaded = self._load()
+        return self._loaded
+
+    @property
+    def _tasks(self) -> List[Task]:
+        return list(self._by_id.values())
+
+    @_tasks.setter
+    def _tasks(self, tasks: List[Task]) -> None:
+        self._encoded.clear()
+        self._dirty = None
+        self._loaded = self._index(tasks)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """
+        Holds the store's exclusive lock around a read-modify-write cycle.
+        If another process wrote since our last load (the version moved on), the
+        tasks are reloaded first so the mutation applies to the current data.
+        """
+        with locked(self.db_path) as lock:
+            if self._loaded is None or lock.version != self._version:
+                self._loaded = self._load()
+            yield
+
+    @contextmanager
+    def transaction(self) -> Iterator["TaskManager"]:
+        """
+        Coalesces every mutation made inside the block into a single write on exit.
+        The store lock is held for the whole block. If the block raises, nothing is
+        written and the in-memory tasks are reloaded from disk on next use.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        with self._write_lock():
+            self._in_transaction = True
+            try:
+                yield self
+            except BaseException:
+                self._loaded = None
+                self._pending = False
+                raise
+            finally:
+                self._in_transaction = False
+            if self._pending:
+                self._save()
+
+    def _mark_dirty(self, task: Task) -> None:
+        """Drops the cached bytes of a task changed in place so the next save re-encodes it."""
+        self._encoded.pop(task.id, None)
+        self._touch(task.category)
+
+    def _touch(self, category: str) -> None:
+        if self._dirty is not None:
+            self._dirty.add(category)
+
+    def _encode(self, task: Task) -> bytes:
+        cached = self._encoded.get(task.id)
+        if cached is None or cached[0] is not task:
+            cached = (task, encode_task(task))
+            self._encoded[task.id] = cached
+        return cached[1]
 
     def _save(self):
         """Internal method to save the current state of tasks to the database."""
-        save_tasks(self._tasks, self.db_path)
+        if self._in_transaction:
+            self._pending = True
+            return
+        save_tasks(self._by_id.values(), self.db_path, encode=self._encode, next_id=self._next_id)
+        self._version = read_version(self.db_path)
+        self._pending = False
+        self._dirty = set()
 
     def get_next_id(self) -> int:
         """Generates the next available ID for a new task."""
-        return max((task.id for task in self._tasks), default=0) + 1
+        if self._loaded is None:
+            self._loaded = self._load()
+        return self._next_id
 
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         """Helper method to find a task by its ID."""
-        return next((task for task in self._tasks if task.id == task_id), None)
+        return self._by_id.get(task_id)
 
     def add_task(self, title: str, priority: int = 3, due_date: Optional[date] = None, category: str = "default") -> Task:
         """Adds a new task to the list and saves it."""
-        new_id = self.get_next_id()
-        new_task = Task(
-            id=new_id,
-            title=title,
-            priority=priority,
-            due_date=due_date,
-            category=category,
-            is_completed=False
-        )
-        self._tasks.append(new_task)
-        self._save()
+        with self._write_lock():
+            new_id = self.get_next_id()
+            new_task = Task(
+                id=new_id,
+                title=title,
+                priority=priority,
+                due_date=due_date,
+                category=category,
+                is_completed=False
+            )
+            self._by_id[new_id] = new_task
+            self._next_id = new_id + 1
+            self._touch(category)
+            self._save()
         return new_task
 
     def edit_task(self, task_id: int, title: Optional[str] = None, priority: Optional[int] = None, due_date: Optional[date] = None, category: Optional[str] = None) -> Optional[Task]:
         """Edits an existing task and saves the changes."""
-        task_to_edit = self.get_task_by_id(task_id)
-        if task_to_edit:
-            if title is not None:
-                task_to_edit.title = title
-            if priority is not None:
-                task_to_edit.priority = priority
-            if due_date is not None:
-                task_to_edit.due_date = due_date
-            if category is not None:
-                task_to_edit.category = category
-            self._save()
-            return task_to_edit
+        with self._write_lock():
+            task_to_edit = self.get_task_by_id(task_id)
+            if task_to_edit:
+                # Marked before and after, so a category change covers both categories
+                self._mark_dirty(task_to_edit)
+                if title is not None:
+                    task_to_edit.title = title
+                if priority is not None:
+                    task_to_edit.priority = priority
+                if due_date is not None:
+                    task_to_edit.due_date = due_date
+                if category is not None:
+                    task_to_edit.category = category
+                self._mark_dirty(task_to_edit)
+                self._save()
+                return task_to_edit
         return None
 
     def delete_task(self, task_id: int) -> bool:
         """Deletes a task by ID and saves the changes."""
-        initial_len = len(self._tasks)
-        self._tasks = [task for task in self._tasks if task.id != task_id]
-        if len(self._tasks) < initial_len:
-            self._save()
-            return True
+        with self._write_lock():
+            deleted = self._by_id.pop(task_id, None)
+            if deleted is not None:
+                self._mark_dirty(deleted)
+                self._save()
+                return True
         return False
 
     def complete_task(self, task_id: int) -> Optional[Task]:
         """Marks a task as completed and saves the changes."""
-        task_to_complete = self.get_task_by_id(task_id)
-        if task_to_complete:
-            task_to_complete.is_completed = True
-            self._save()
-            return task_to_complete
+        with self._write_lock():
+            task_to_complete = self.get_task_by_id(task_id)
+            if task_to_complete:
+                task_to_complete.is_completed = True
+                self._mark_dirty(task_to_complete)
+                self._save()
+                return task_to_complete
         return None
 
-    def list_tasks(self, category: Optional[str] = None, sort_by: Optional[str] = None) -> List[Task]:
+    def list_tasks(
+        self,
+        category: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[Task]:
         """
         Lists tasks, optionally filtered by category and sorted by priority or due date.
+        With limit, only the first limit tasks are selected (a heap, O(n log limit)).
+        after is a cursor from encode_cursor; the list resumes right after that task,
+        so a page stays correct when tasks are added or deleted in between.
+        Raises ValueError for a malformed cursor or one made for another sort order.
         """
-        filtered_tasks = self._tasks
+        key = _SORT_KEYS[_sort_name(sort_by)]
+        bound = _decode_cursor(after, sort_by) if after is not None else None
+        if self._loaded is None:
+            return self._query_stored(category, key, bound, limit)
+        filtered_tasks: Iterator[Task] = iter(self._by_id.values())
         if category:
-            filtered_tasks = [task for task in filtered_tasks if task.category == category]
-
-        if sort_by == "priority":
-            # Sort by priority ascending, then by ID ascending for stable sort
-            filtered_tasks.sort(key=attrgetter('priority', 'id'))
-        elif sort_by == "due-date":
-            # Sort by due_date (None values last), then by ID ascending
-            # Use a tuple for sorting: (is_due_date_none, due_date_value, id)
-            # This ensures None due_dates are always at the end
-            filtered_tasks.sort(key=lambda task: (task.due_date is None, task.due_date, task.id))
-        else:
-            # Default sort by ID
-            filtered_tasks.sort(key=attrgetter('id'))
-
-        return filtered_tasks
+            filtered_tasks = (task for task in filtered_tasks if task.category == category)
+        return _select(filtered_tasks, key, bound, limit)
+
+    def _query_stored(
+        self,
+        category: Optional[str],
+        key: Callable[[Task], tuple],
+        bound: Optional[tuple],
+        limit: Optional[int],
+    ) -> List[Task]:
+        """list_tasks for a manager that has not loaded its tasks."""
+        # Stream from disk and only validate records in the requested category
+        filtered_tasks = iter_tasks(
+            self.db_path,
+            where=(lambda data: data.get("category") == category) if category else None,
+        )
+        return _select(filtered_tasks, key, bound, limit)
 
     def search_tasks(self, keyword: str) -> List[Task]:
         """Searches tasks by keyword in their title."""
         keyword_lower = keyword.lower()
-        return [task for task in self._tasks if keyword_lower in task.title.lower()]
\ No newline at end of file
+        if self._loaded is None:
+            return self._search_stored(keyword_lower)
+        return _search(self._tasks, keyword_lower)
+
+    def _search_stored(self, keyword_lower: str) -> List[Task]:
+        """search_tasks for a manager that has not loaded its tasks."""
+        return _search(iter_tasks(self.db_path, where=_title_contains(keyword_lower)), keyword_lower)
\ No newline at end of file
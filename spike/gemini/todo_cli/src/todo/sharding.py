@@ -0,0 +1,242 @@
+"""
+A task store split into one JSON file per category, plus a manifest.
+
+The sharded form of the store `tasks.json` lives in the directory `tasks.d/`:
+
+    tasks.d/manifest.json      {"generation": 7, "shards": {"work": "<hash>-7.json", ...}}
+    tasks.d/<hash>-7.json      the tasks of one category, in the format of tasks.json
+
+Listing one category reads only its shard, and a mutation rewrites only the shards of
+the categories it changed. Queries over all categories read the shards on a thread pool.
+
+A save writes the changed shards under new file names and then replaces the manifest.
+That replace is the commit point: a crash at any moment leaves the previous manifest and
+the shards it names intact. Shards the new manifest no longer names are removed afterwards.
+
+The manifest's lock file (`manifest.json.lock`) holds the store version and the next task
+ID, as `tasks.json.lock` does for a single file. Writers hold it exclusively for the whole
+save and readers hold it shared, so a reader never sees a shard removed under it or a mix
+of two saves.
+"""
+import hashlib
+import heapq
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from todo.database import dump_tasks, encode_task, iter_tasks, load_tasks
+from todo.locking import locked, read_next_id, read_version, replace_file, write_atomic
+from todo.manager import TaskManager, _search, _select, _title_contains
+from todo.models import Task
+
+MANIFEST_NAME = "manifest.json"
+
+_T = TypeVar("_T")
+
+
+def shard_dir(db_path: Path) -> Path:
+    """Returns the directory holding the sharded form of the store at db_path."""
+    return db_path.with_suffix(".d")
+
+
+def manifest_path(db_path: Path) -> Path:
+    return shard_dir(db_path) / MANIFEST_NAME
+
+
+def is_sharded(db_path: Path) -> bool:
+    return manifest_path(db_path).exists()
+
+
+def read_manifest(path: Path) -> Tuple[int, Dict[str, str]]:
+    """Returns the generation and the category -> shard file name map (empty if missing)."""
+    if not path.exists():
+        return 0, {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data["generation"], data["shards"]
+
+
+def _shard_name(category: str, generation: int) -> str:
+    # Category names may hold any character, and may differ only in case
+    digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}-{generation}.json"
+
+
+def _task_id(task: Task) -> int:
+    return task.id
+
+
+def _write_shards(
+    root: Path,
+    generation: int,
+    shards: Dict[str, str],
+    groups: Dict[str, List[Task]],
+    next_id: int,
+    encode: Callable[[Task], bytes] = encode_task,
+) -> Tuple[int, Dict[str, str]]:
+    """
+    Replaces the shards of the categories in groups (an empty group drops its category),
+    commits the manifest and removes the replaced shards. The caller holds the manifest
+    lock. Returns the new generation and shard map.
+    """
+    generation += 1
+    updated = dict(shards)
+    for category, tasks in groups.items():
+        if tasks:
+            updated[category] = _shard_name(category, generation)
+            replace_file(root / updated[category], dump_tasks(tasks, encode))
+        else:
+            updated.pop(category, None)
+    manifest = {"generation": generation, "shards": updated}
+    write_atomic(root / MANIFEST_NAME, json.dumps(manifest, indent=4, ensure_ascii=False).encode("utf-8"), next_id)
+    for category in groups:
+        old = shards.get(category)
+        if old is not None and old != updated.get(category):
+            (root / old).unlink(missing_ok=True)
+    return generation, updated
+
+
+class ShardedTaskManager(TaskManager):
+    """
+    A TaskManager over the sharded form of the store at db_path. It answers every
+    query like TaskManager over a single tasks.json, but reads and writes only the
+    shards a command needs. Tasks are kept in ID order within each shard, so merging
+    the shards gives the order of a single file.
+    """
+
+    def __init__(self, db_path: Path = Path("tasks.json"), lazy: bool = False, max_workers: Optional[int] = None):
+        # Thread pool size for queries over all shards (None: the executor's default)
+        self.max_workers = max_workers
+        self._generation = 0
+        # category -> shard file name, as of the last load or save
+        self._shards: Dict[str, str] = {}
+        super().__init__(db_path, lazy)
+
+    @property
+    def root(self) -> Path:
+        return shard_dir(self.db_path)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def _fan_out(self, read: Callable[[Path], _T], names: List[str]) -> List[_T]:
+        # The shards are independent files, so their reads overlap on a thread pool
+        paths = [self.root / name for name in names]
+        if len(paths) <= 1:
+            return [read(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(read, paths))
+
+    def _load(self) -> Dict[int, Task]:
+        with locked(self.manifest_path, shared=True) as lock:
+            self._version = lock.version
+            stored_next_id = lock.next_id
+            self._generation, self._shards = read_manifest(self.manifest_path)
+            shards = self._fan_out(load_tasks, list(self._shards.values()))
+        self._encoded.clear()
+        self._dirty = set()
+        by_id = self._index(list(heapq.merge(*shards, key=_task_id)))
+        self._next_id = max(self._next_id, stored_next_id)
+        return by_id
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with locked(self.manifest_path) as lock:
+            if lock.version != self._version:
+                # Another process saved since our last load; reload on first use
+                self._loaded = None
+            yield
+
+    def _save(self) -> None:
+        if self._in_transaction:
+            self._pending = True
+            return
+        with locked(self.manifest_path) as lock:
+            tasks = self._by_id.values()
+            dirty = self._dirty if self._dirty is not None else set(self._shards) | {t.category for t in tasks}
+            groups: Dict[str, List[Task]] = {category: [] for category in dirty}
+            for task in tasks:
+                if task.category in groups:
+                    groups[task.category].append(task)
+            self._generation, self._shards = _write_shards(
+                self.root, self._generation, self._shards, groups, self._next_id, self._encode
+            )
+            self._version = lock.version
+        self._pending = False
+        self._dirty = set()
+
+    def add_task(self, title: str, priority: int = 3, due_date: Optional[date] = None, category: str = "default") -> Task:
+        """Adds a new task. If nothing is loaded yet, only the task's own shard is read and rewritten."""
+        with self._write_lock():
+            if self._loaded is not None or self._in_transaction:
+                return super().add_task(title, priority, due_date, category)
+            new_id = max(self._next_id, read_next_id(self.manifest_path))
+            new_task = Task(id=new_id, title=title, priority=priority, due_date=due_date, category=category)
+            self._generation, self._shards = read_manifest(self.manifest_path)
+            name = self._shards.get(category)
+            tasks = load_tasks(self.root / name) if name is not None else []
+            self._next_id = new_id + 1
+            self._generation, self._shards = _write_shards(
+                self.root, self._generation, self._shards, {category: tasks + [new_task]}, self._next_id
+            )
+            self._version = read_version(self.manifest_path)
+        return new_task
+
+    def _shard_names(self, category: Optional[str]) -> List[str]:
+        self._generation, self._shards = read_manifest(self.manifest_path)
+        if not category:
+            return list(self._shards.values())
+        return [self._shards[category]] if category in self._shards else []
+
+    def _query_stored(
+        self,
+        category: Optional[str],
+        key: Callable[[Task], tuple],
+        bound: Optional[tuple],
+        limit: Optional[int],
+    ) -> List[Task]:
+        with locked(self.manifest_path, shared=True):
+            # Each shard picks its own first `limit` tasks; the answer is the first `limit` of all those
+            parts = self._fan_out(lambda path: _select(iter_tasks(path), key, bound, limit), self._shard_names(category))
+        return list(islice(heapq.merge(*parts, key=key), limit))
+
+    def _search_stored(self, keyword_lower: str) -> List[Task]:
+        with locked(self.manifest_path, shared=True):
+            parts = self._fan_out(
+                lambda path: _search(iter_tasks(path, where=_title_contains(keyword_lower)), keyword_lower),
+                self._shard_names(None),
+            )
+        return list(heapq.merge(*parts, key=_task_id))
+
+
+def open_task_manager(db_path: Path = Path("tasks.json"), lazy: bool = False) -> TaskManager:
+    """Returns a ShardedTaskManager if the store at db_path has been sharded, else a TaskManager."""
+    if is_sharded(db_path):
+        return ShardedTaskManager(db_path, lazy=lazy)
+    return TaskManager(db_path, lazy=lazy)
+
+
+def split_store(db_path: Path) -> Tuple[int, int]:
+    """
+    Moves the tasks of the single-file store at db_path into the sharded layout and
+    removes tasks.json. Returns the number of tasks and of shards written.
+    Raises ValueError if the store is already sharded.
+    """
+    if is_sharded(db_path):
+        raise ValueError(f"{shard_dir(db_path)} already exists")
+    with locked(db_path):
+        tasks = sorted(load_tasks(db_path), key=_task_id)
+        next_id = max([read_next_id(db_path)] + [task.id + 1 for task in tasks])
+        groups: Dict[str, List[Task]] = {}
+        for task in tasks:
+            groups.setdefault(task.category, []).append(task)
+        root = shard_dir(db_path)
+        with locked(root / MANIFEST_NAME):
+            _write_shards(root, 0, {}, groups, next_id)
+        # The manifest now holds every task; the lock file stays for processes still waiting on it
+        db_path.unlink(missing_ok=True)
+    return len(tasks), len(groups)
@@ -1,11 +1,12 @@
 import json
+import tracemalloc
 from pathlib import Path
 from typing import List
 from datetime import date
 
 import pytest
 from todo.models import Task
-from todo.database import load_tasks, save_tasks
+from todo.database import iter_tasks, load_tasks, save_tasks
 
 @pytest.fixture
 def sample_tasks() -> List[Task]:
@@ -114,4 +115,66 @@ def test_load_tasks_with_malformed_json(tmp_path: Path, capsys):
     assert tasks == []
     
     captured = capsys.readouterr()
-    assert "Error loading tasks" in captured.out
\ No newline at end of file
+    assert "Error loading tasks" in captured.out
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_tasks_matches_load_tasks(tmp_path: Path, sample_tasks: List[Task], chunk_size: int):
+    """
+    Test that streaming yields the same tasks as load_tasks for any chunk size.
+    """
+    db_path = tmp_path / "tasks.json"
+    save_tasks(sample_tasks, db_path)
+    assert list(iter_tasks(db_path, chunk_size=chunk_size)) == load_tasks(db_path)
+
+    db_path.write_text(json.dumps([task.model_dump(mode="json") for task in sample_tasks]))
+    assert list(iter_tasks(db_path, chunk_size=chunk_size)) == sample_tasks
+
+def test_iter_tasks_empty_and_missing(tmp_path: Path):
+    """
+    Test that streaming handles missing, empty and empty-array files.
+    """
+    db_path = tmp_path / "tasks.json"
+    assert list(iter_tasks(db_path)) == []
+    db_path.touch()
+    assert list(iter_tasks(db_path)) == []
+    db_path.write_text(" [ \n ] ")
+    assert list(iter_tasks(db_path)) == []
+
+def test_iter_tasks_where_skips_validation_of_rejected_records(tmp_path: Path):
+    """
+    Test that records rejected by the raw pre-check are never validated.
+    """
+    db_path = tmp_path / "tasks.json"
+    db_path.write_text(json.dumps([
+        {"id": 1, "title": "", "priority": 99, "category": "broken"},
+        {"id": 2, "title": "Valid", "priority": 1, "category": "work"},
+    ]))
+    tasks = list(iter_tasks(db_path, where=lambda data: data["category"] == "work"))
+    assert [task.id for task in tasks] == [2]
+
+@pytest.mark.parametrize("content", ["this is not json", '[{"id": 1}', '[{"id": 1, "title": "a"} {"id": 2}]'])
+def test_iter_tasks_with_malformed_json(tmp_path: Path, capsys, content: str):
+    """
+    Test that streaming stops and prints an error message on malformed JSON.
+    """
+    db_path = tmp_path / "tasks.json"
+    db_path.write_text(content)
+    list(iter_tasks(db_path, where=lambda data: False))
+    assert "Error loading tasks" in capsys.readouterr().out
+
+def test_iter_tasks_memory_is_bounded_by_chunk_size(tmp_path: Path):
+    """
+    Test that peak memory while streaming stays well below the file size.
+    """
+    db_path = tmp_path / "tasks.json"
+    tasks = [Task(id=i, title=f"Task {i} " + "x" * 80, category=f"c{i % 10}") for i in range(20000)]
+    save_tasks(tasks, db_path)
+    file_size = db_path.stat().st_size
+
+    tracemalloc.start()
+    count = sum(1 for _ in iter_tasks(db_path, where=lambda data: data["category"] == "c3"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == 2000
+    assert peak < file_size / 10
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+from pathlib import Path
+
+import pytest
+from todo.database import load_tasks, save_tasks, transaction
+from todo.locking import lock_path, locked, read_next_id, read_version
+from todo.manager import TaskManager
+from todo.models import Task
+
+WORKERS = 4
+UPDATES = 25
+
+
+def _add_worker(db_path: Path, worker: int) -> None:
+    # One long-lived manager per process, like a worker in the cron fleet
+    manager = TaskManager(db_path=db_path)
+    for i in range(UPDATES):
+        manager.add_task(f"w{worker}-{i}", category=f"w{worker}")
+
+
+def _complete_worker(db_path: Path, worker: int) -> None:
+    manager = TaskManager(db_path=db_path)
+    for i in range(UPDATES):
+        manager.complete_task(worker * UPDATES + i + 1)
+
+
+def _transaction_worker(db_path: Path, worker: int) -> None:
+    for i in range(UPDATES):
+        with transaction(db_path) as tasks:
+            tasks[0].title += f",{worker}-{i}"
+
+
+def _run_workers(target, db_path: Path) -> None:
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=(db_path, n)) for n in range(WORKERS)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+
+def test_parallel_managers_do_not_lose_writes(tmp_path: Path):
+    """
+    Test that managers in several processes adding at once keep every task,
+    each with a distinct ID.
+    """
+    db_path = tmp_path / "tasks.json"
+    _run_workers(_add_worker, db_path)
+
+    tasks = load_tasks(db_path)
+    assert {task.title for task in tasks} == {f"w{n}-{i}" for n in range(WORKERS) for i in range(UPDATES)}
+    assert sorted(task.id for task in tasks) == list(range(1, WORKERS * UPDATES + 1))
+
+
+def test_parallel_managers_updating_different_tasks(tmp_path: Path):
+    """
+    Test that updates to different tasks from stale managers are all kept.
+    """
+    db_path = tmp_path / "tasks.json"
+    save_tasks([Task(id=i, title=f"Task {i}") for i in range(1, WORKERS * UPDATES + 1)], db_path)
+    _run_workers(_complete_worker, db_path)
+
+    assert all(task.is_completed for task in load_tasks(db_path))
+
+
+def test_parallel_transactions_on_same_task(tmp_path: Path):
+    """
+    Test that read-modify-write transactions on the same task are serialized.
+    """
+    db_path = tmp_path / "tasks.json"
+    save_tasks([Task(id=1, title="start")], db_path)
+    _run_workers(_transaction_worker, db_path)
+
+    marks = load_tasks(db_path)[0].title.split(",")[1:]
+    assert sorted(marks) == sorted(f"{n}-{i}" for n in range(WORKERS) for i in range(UPDATES))
+
+
+def test_stale_manager_reloads_before_mutating(tmp_path: Path):
+    """
+    Test that a manager which loaded before another process wrote does not
+    overwrite that write.
+    """
+    db_path = tmp_path / "tasks.json"
+    stale = TaskManager(db_path=db_path)
+    TaskManager(db_path=db_path).add_task("From elsewhere")
+
+    task = stale.add_task("From stale manager")
+
+    assert task.id == 2
+    assert [t.title for t in load_tasks(db_path)] == ["From elsewhere", "From stale manager"]
+
+
+def test_save_bumps_version_and_keeps_old_file_on_failure(tmp_path: Path, monkeypatch):
+    """
+    Test that each save bumps the version and a failed write leaves the previous file.
+    """
+    db_path = tmp_path / "tasks.json"
+    save_tasks([Task(id=1, title="Keep me")], db_path)
+    assert read_version(db_path) == 1
+    before = db_path.read_bytes()
+
+    def broken_fsync(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        save_tasks([], db_path)
+
+    assert db_path.read_bytes() == before
+    assert read_version(db_path) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["tasks.json", "tasks.json.lock"]
+
+
+def test_shared_lock_cannot_be_upgraded(tmp_path: Path):
+    """
+    Test that asking for the exclusive lock while holding the shared one fails.
+    """
+    db_path = tmp_path / "tasks.json"
+    with locked(db_path, shared=True):
+        with pytest.raises(RuntimeError):
+            with locked(db_path):
+                pass
+
+
+def test_save_records_next_id_alongside_version(tmp_path: Path):
+    """
+    Test that saves keep the highest next ID seen, and that lock files holding only
+    a version are still read.
+    """
+    db_path = tmp_path / "tasks.json"
+    lock_path(db_path).write_bytes(b"7")
+    assert (read_version(db_path), read_next_id(db_path)) == (7, 0)
+
+    save_tasks([Task(id=3, title="Three")], db_path)
+    assert (read_version(db_path), read_next_id(db_path)) == (8, 4)
+
+    save_tasks([], db_path)
+    save_tasks([Task(id=1, title="One")], db_path, next_id=9)
+    assert (read_version(db_path), read_next_id(db_path)) == (10, 9)
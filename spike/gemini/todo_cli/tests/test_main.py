@@ -5,6 +5,7 @@ from typer.testing import CliRunner
 import pytest
 from todo.main import app, task_manager # Import app and the initialized task_manager
 from todo.models import Task
+from todo.sharding import open_task_manager
 
 runner = CliRunner()
 
@@ -139,3 +140,40 @@ def test_app_list_by_category():
     assert "Work task 1" in result.stdout
     assert "Work task 2" in result.stdout
     assert "Personal task 1" not in result.stdout
+
+def test_app_list_limit_and_after():
+    """Test that --limit prints a cursor and --after continues from it."""
+    for i in range(1, 4):
+        runner.invoke(app, ["add", f"Paged task {i}", "-p", str(4 - i)])
+
+    result = runner.invoke(app, ["list", "--sort-by", "priority", "--limit", "2"])
+    assert result.exit_code == 0
+    assert "Paged task 3" in result.stdout and "Paged task 2" in result.stdout
+    assert "Paged task 1" not in result.stdout
+    cursor = result.stdout.split("Next page: --after ")[1].strip()
+
+    result = runner.invoke(app, ["list", "--sort-by", "priority", "--limit", "2", "--after", cursor])
+    assert result.exit_code == 0
+    assert "Paged task 1" in result.stdout
+    assert "Next page" not in result.stdout
+
+def test_app_list_invalid_cursor():
+    """Test that a malformed --after cursor is reported as an error."""
+    result = runner.invoke(app, ["list", "--after", "bogus"])
+    assert result.exit_code == 1
+    assert "Invalid cursor" in result.stderr
+
+def test_app_shard_splits_store_by_category():
+    """Test that `shard` moves tasks.json into per-category files and refuses to run twice."""
+    runner.invoke(app, ["add", "Work task", "-c", "work"])
+    runner.invoke(app, ["add", "Home task", "-c", "home"])
+
+    result = runner.invoke(app, ["shard"])
+    assert result.exit_code == 0
+    assert "Moved 2 tasks into 2 category files" in result.stdout
+    assert not task_manager.db_path.exists()
+    assert [t.title for t in open_task_manager(task_manager.db_path).list_tasks(category="home")] == ["Home task"]
+
+    result = runner.invoke(app, ["shard"])
+    assert result.exit_code == 1
+    assert "already exists" in result.stderr
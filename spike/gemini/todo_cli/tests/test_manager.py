@@ -6,13 +6,14 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from todo.models import Task
-from todo.manager import TaskManager  # This will be created later
+from todo.database import encode_task, load_tasks, save_tasks
+from todo.manager import TaskManager, encode_cursor  # This will be created later
 
 
 @pytest.fixture
-def mock_db_path() -> Path:
+def mock_db_path(tmp_path: Path) -> Path:
     """Fixture to provide a dummy database path."""
-    return Path("dummy_tasks.json")
+    return tmp_path / "dummy_tasks.json"
 
 @pytest.fixture
 def sample_tasks_data() -> List[dict]:
@@ -123,6 +124,58 @@ def test_list_tasks_invalid_sort_by(task_manager):
     assert tasks[2].id == 3
 
 
+def _paged_ids(manager: TaskManager, sort_by: Optional[str], limit: int, **filters) -> List[int]:
+    ids: List[int] = []
+    after = None
+    while True:
+        page = manager.list_tasks(sort_by=sort_by, limit=limit, after=after, **filters)
+        ids.extend(task.id for task in page)
+        if len(page) < limit:
+            return ids
+        after = encode_cursor(page[-1], sort_by)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("sort_by", [None, "priority", "due-date"])
+def test_list_tasks_pages_concatenate_to_full_list(tmp_path, lazy, sort_by):
+    """Test that limit/after pages, eager or streamed from disk, add up to the unpaged list."""
+    db_path = tmp_path / "tasks.json"
+    save_tasks(
+        [
+            Task(id=i, title=f"task {i}", priority=i % 5 + 1,
+                 due_date=date(2026, 3, i % 7 + 1) if i % 3 else None, category=f"c{i % 2}")
+            for i in range(1, 48)
+        ],
+        db_path,
+    )
+    manager = TaskManager(db_path=db_path, lazy=lazy)
+    full = [task.id for task in manager.list_tasks(sort_by=sort_by)]
+    assert _paged_ids(manager, sort_by, 5) == full
+    assert [task.id for task in manager.list_tasks(sort_by=sort_by, limit=5)] == full[:5]
+    assert _paged_ids(manager, sort_by, 4, category="c1") == [
+        task.id for task in manager.list_tasks(category="c1", sort_by=sort_by)
+    ]
+
+
+def test_list_tasks_cursor_survives_deletes(task_manager):
+    """Test that a cursor resumes after its task even once that task is deleted."""
+    first = task_manager.list_tasks(sort_by="priority", limit=1)
+    assert [task.id for task in first] == [1]
+    cursor = encode_cursor(first[0], "priority")
+    task_manager.delete_task(1)
+    task_manager.delete_task(3)
+    assert [task.id for task in task_manager.list_tasks(sort_by="priority", after=cursor)] == [2]
+
+
+def test_list_tasks_rejects_bad_cursor(task_manager):
+    """Test that malformed cursors and cursors for another sort order raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        task_manager.list_tasks(after="not a cursor")
+    cursor = encode_cursor(task_manager.list_tasks()[0], "priority")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        task_manager.list_tasks(sort_by="due-date", after=cursor)
+
+
 def test_delete_task_success(task_manager, mock_save_tasks):
     """Test deleting an existing task."""
     result = task_manager.delete_task(1)
@@ -193,3 +246,100 @@ def test_search_tasks_by_keyword(task_manager):
 
     no_results = task_manager.search_tasks(keyword="xyz")
     assert len(no_results) == 0
+
+
+def test_lazy_manager_streams_queries_without_loading(tmp_path, sample_tasks_data):
+    """Test that a lazy manager answers list/search from disk and loads on first mutation."""
+    db_path = tmp_path / "tasks.json"
+    db_path.write_text(json.dumps(sample_tasks_data))
+    manager = TaskManager(db_path=db_path, lazy=True)
+
+    assert [task.id for task in manager.list_tasks(category="family")] == [3]
+    assert [task.id for task in manager.list_tasks(sort_by="priority")] == [1, 3, 2]
+    assert [task.title for task in manager.search_tasks("BOOK")] == ["Read a book"]
+    assert manager._loaded is None
+
+    manager.complete_task(1)
+    assert manager._loaded is not None
+    assert TaskManager(db_path=db_path, lazy=True).list_tasks()[0].is_completed is True
+
+
+def test_transaction_coalesces_mutations_into_one_write(tmp_path):
+    """Test that mutations inside manager.transaction() are written once, on exit."""
+    db_path = tmp_path / "tasks.json"
+    manager = TaskManager(db_path=db_path)
+
+    with patch('todo.manager.save_tasks', wraps=save_tasks) as spy:
+        with manager.transaction():
+            first = manager.add_task("First")
+            manager.add_task("Second")
+            manager.complete_task(first.id)
+            manager.edit_task(first.id, title="First (edited)")
+            assert not db_path.exists()
+
+    spy.assert_called_once()
+    stored = load_tasks(db_path)
+    assert [(t.title, t.is_completed) for t in stored] == [("First (edited)", True), ("Second", False)]
+
+
+def test_transaction_discards_changes_when_block_raises(tmp_path):
+    """Test that a failing transaction writes nothing and forgets its in-memory changes."""
+    db_path = tmp_path / "tasks.json"
+    manager = TaskManager(db_path=db_path)
+    manager.add_task("Kept")
+
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            manager.add_task("Dropped")
+            manager.delete_task(1)
+            raise RuntimeError("abort")
+
+    assert [t.title for t in load_tasks(db_path)] == ["Kept"]
+    assert [t.title for t in manager.list_tasks()] == ["Kept"]
+
+
+def test_save_reencodes_only_changed_tasks(tmp_path):
+    """Test that unchanged tasks reuse their cached bytes and the file format is unchanged."""
+    db_path = tmp_path / "tasks.json"
+    manager = TaskManager(db_path=db_path)
+    with manager.transaction():
+        for i in range(100):
+            manager.add_task(f"Task {i}", due_date=date(2026, 1, 1 + i % 28))
+
+    with patch('todo.manager.encode_task', wraps=encode_task) as spy:
+        with manager.transaction():
+            for task_id in (3, 50, 99):
+                manager.edit_task(task_id, priority=1)
+            manager.complete_task(7)
+            manager.delete_task(10)
+
+    assert spy.call_count == 4
+    expected = [task.model_dump(mode='json') for task in manager._tasks]
+    assert db_path.read_text(encoding="utf-8") == json.dumps(expected, indent=4, ensure_ascii=False)
+
+
+def test_deleted_ids_are_not_reused(tmp_path):
+    """Test that the next ID stays past deleted tasks, also for a manager started later."""
+    db_path = tmp_path / "tasks.json"
+    manager = TaskManager(db_path=db_path)
+    for title in ("First", "Second", "Third"):
+        manager.add_task(title)
+
+    assert manager.delete_task(3) is True
+    assert manager.get_task_by_id(3) is None
+    assert manager.add_task("Fourth").id == 4
+
+    assert manager.delete_task(4) is True
+    restarted = TaskManager(db_path=db_path)
+    assert restarted.get_next_id() == 5
+    assert [task.title for task in restarted.list_tasks()] == ["First", "Second"]
+    assert restarted.get_task_by_id(2).title == "Second"
+
+
+def test_next_id_covers_tasks_saved_elsewhere(tmp_path):
+    """Test that IDs written without the manager still push the next ID past them."""
+    db_path = tmp_path / "tasks.json"
+    TaskManager(db_path=db_path).add_task("First")
+    db_path.write_text(json.dumps([Task(id=10, title="Imported").model_dump(mode='json')]))
+
+    assert TaskManager(db_path=db_path).get_next_id() == 11
@@ -0,0 +1,189 @@
+import multiprocessing
+from datetime import date
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from todo.database import iter_tasks, load_tasks, save_tasks
+from todo.manager import TaskManager, encode_cursor
+from todo.models import Task
+from todo.sharding import (
+    ShardedTaskManager,
+    is_sharded,
+    manifest_path,
+    open_task_manager,
+    read_manifest,
+    shard_dir,
+    split_store,
+)
+
+CATEGORIES = ["work", "Work", "家事", "a/b", "default"]
+
+
+def _sample_tasks() -> List[Task]:
+    return [
+        Task(id=i, title=f"task {i}", priority=i % 5 + 1,
+             due_date=date(2026, 3, i % 7 + 1) if i % 3 else None, category=CATEGORIES[i % len(CATEGORIES)])
+        for i in range(1, 61)
+    ]
+
+
+@pytest.fixture
+def stores(tmp_path: Path):
+    """The same tasks as a single tasks.json and as a sharded store."""
+    single = tmp_path / "single" / "tasks.json"
+    sharded = tmp_path / "sharded" / "tasks.json"
+    for db_path in (single, sharded):
+        db_path.parent.mkdir()
+        save_tasks(_sample_tasks(), db_path)
+    split_store(sharded)
+    return single, sharded
+
+
+def _ids(tasks: List[Task]) -> List[int]:
+    return [task.id for task in tasks]
+
+
+def test_split_store_writes_one_shard_per_category(stores):
+    """Test that splitting moves every task into its category's shard and removes tasks.json."""
+    _, sharded = stores
+    assert not sharded.exists()
+    assert is_sharded(sharded)
+    _, shards = read_manifest(manifest_path(sharded))
+    assert sorted(shards) == sorted(CATEGORIES)
+    for category, name in shards.items():
+        tasks = load_tasks(shard_dir(sharded) / name)
+        assert tasks and all(task.category == category for task in tasks)
+        assert _ids(tasks) == sorted(_ids(tasks))
+    with pytest.raises(ValueError, match="already exists"):
+        split_store(sharded)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("sort_by", [None, "priority", "due-date"])
+def test_sharded_queries_match_single_file(stores, lazy, sort_by):
+    """Test that list, paging and search answer exactly as over a single tasks.json."""
+    single, sharded = stores
+    expected = TaskManager(single, lazy=lazy)
+    manager = ShardedTaskManager(sharded, lazy=lazy, max_workers=3)
+    for category in (None, "work", "家事", "missing"):
+        assert _ids(manager.list_tasks(category=category, sort_by=sort_by)) == _ids(
+            expected.list_tasks(category=category, sort_by=sort_by)
+        )
+    page = manager.list_tasks(sort_by=sort_by, limit=7)
+    assert _ids(page) == _ids(expected.list_tasks(sort_by=sort_by, limit=7))
+    after = encode_cursor(page[-1], sort_by)
+    assert _ids(manager.list_tasks(sort_by=sort_by, limit=7, after=after)) == _ids(
+        expected.list_tasks(sort_by=sort_by, limit=7, after=after)
+    )
+    assert _ids(manager.search_tasks("TASK 1")) == _ids(expected.search_tasks("TASK 1"))
+
+
+def test_category_list_reads_only_its_shard(stores):
+    """Test that listing one category opens that category's shard and nothing else."""
+    _, sharded = stores
+    manager = ShardedTaskManager(sharded, lazy=True)
+    _, shards = read_manifest(manifest_path(sharded))
+    with patch("todo.sharding.iter_tasks", wraps=iter_tasks) as spy:
+        tasks = manager.list_tasks(category="家事")
+    assert tasks and all(task.category == "家事" for task in tasks)
+    assert [call.args[0].name for call in spy.call_args_list] == [shards["家事"]]
+
+
+def test_mutations_rewrite_only_affected_shards(stores):
+    """Test that completing, moving and deleting tasks replace only the shards they touch."""
+    single, sharded = stores
+    manager = ShardedTaskManager(sharded)
+    before = read_manifest(manifest_path(sharded))[1]
+
+    manager.complete_task(5)  # in "work"
+    manager.edit_task(6, category="work")  # from "Work"
+    manager.edit_task(7, category="新規")  # from "家事"
+    after = read_manifest(manifest_path(sharded))[1]
+    changed = {category for category in after if after[category] != before.get(category)}
+    assert changed == {"work", "Work", "家事", "新規"}
+    assert sorted(p.name for p in shard_dir(sharded).glob("*-*.json")) == sorted(after.values())
+
+    for task_id in [t.id for t in manager.list_tasks(category="新規")]:
+        manager.delete_task(task_id)
+    assert "新規" not in read_manifest(manifest_path(sharded))[1]
+
+    reference = TaskManager(single)
+    reference.complete_task(5)
+    reference.edit_task(6, category="work")
+    reference.delete_task(7)
+    reopened = ShardedTaskManager(sharded)
+    assert reopened._tasks == reference._tasks
+
+
+def test_lazy_add_reads_and_writes_only_its_shard(stores):
+    """Test that adding to a lazy manager touches one shard and still allocates a fresh ID."""
+    _, sharded = stores
+    before = read_manifest(manifest_path(sharded))[1]
+    manager = ShardedTaskManager(sharded, lazy=True)
+    with patch("todo.sharding.load_tasks", wraps=load_tasks) as spy:
+        task = manager.add_task("New chore", category="家事")
+        second = manager.add_task("First errand", category="errands")
+    assert spy.call_count == 1
+    assert manager._loaded is None
+    assert (task.id, second.id) == (61, 62)
+
+    after = read_manifest(manifest_path(sharded))[1]
+    assert {c for c in after if after[c] != before.get(c)} == {"家事", "errands"}
+    assert _ids(ShardedTaskManager(sharded).list_tasks(category="家事"))[-1] == 61
+
+
+def test_deleted_ids_are_not_reused_after_split(tmp_path):
+    """Test that the next ID recorded for tasks.json carries over to the sharded store."""
+    db_path = tmp_path / "tasks.json"
+    manager = TaskManager(db_path)
+    for title in ("One", "Two", "Three"):
+        manager.add_task(title)
+    manager.delete_task(3)
+    split_store(db_path)
+
+    sharded = open_task_manager(db_path, lazy=True)
+    assert isinstance(sharded, ShardedTaskManager)
+    assert sharded.add_task("Four").id == 4
+    assert ShardedTaskManager(db_path).get_next_id() == 5
+
+
+def test_failed_save_keeps_previous_manifest_and_shards(stores, monkeypatch):
+    """Test that a save failing before the manifest is replaced leaves the old store readable."""
+    _, sharded = stores
+    manager = ShardedTaskManager(sharded)
+    before = ShardedTaskManager(sharded)._tasks
+
+    def broken_write(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("todo.sharding.write_atomic", broken_write)
+    with pytest.raises(OSError):
+        manager.edit_task(1, title="Lost", category="elsewhere")
+    monkeypatch.undo()
+
+    assert ShardedTaskManager(sharded)._tasks == before
+
+
+def _sharded_add_worker(db_path: Path, worker: int) -> None:
+    manager = ShardedTaskManager(db_path=db_path, lazy=True)
+    for i in range(10):
+        manager.add_task(f"w{worker}-{i}", category=f"w{worker % 2}")
+
+
+def test_parallel_adds_to_sharded_store(tmp_path):
+    """Test that processes adding to the same and different shards keep every task with a distinct ID."""
+    db_path = tmp_path / "tasks.json"
+    split_store(db_path)
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_sharded_add_worker, args=(db_path, n)) for n in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+    tasks = ShardedTaskManager(db_path).list_tasks()
+    assert {task.title for task in tasks} == {f"w{n}-{i}" for n in range(4) for i in range(10)}
+    assert _ids(tasks) == list(range(1, 41))
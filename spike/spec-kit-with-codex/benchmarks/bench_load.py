@@ -0,0 +1,64 @@
+"""Benchmark loading a JSON store with and without the trusted path.
+
+    PYTHONPATH=src python benchmarks/bench_load.py [tasks]
+
+"before" replays the previous load (json.loads, then model_validate with the
+garbage collector running). "verify" is a load with ``--verify``: full
+validation, with collection paused. "trusted" is a normal load: the checksum
+written by the last save matches, so pydantic-core decodes the bytes directly
+and titles are not normalized again. Each figure is the best of REPEAT runs;
+freeing the loaded tasks is not timed.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from todo_cli.models import Task, TaskCollection
+from todo_cli.repository import TaskRepository
+
+REPEAT = 5
+
+
+def _best(load: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        loaded = load()
+        timings.append(time.perf_counter() - start)
+        del loaded
+    return min(timings)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tasks = [
+        Task(id=uuid4(), title=f"Task number {i}", is_completed=i % 3 == 0, is_archived=i % 7 == 0)
+        for i in range(size)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Path(tmp) / "tasks.json"
+        TaskRepository(storage).save_collection(TaskCollection(tasks=tasks))
+        del tasks
+        before = _best(
+            lambda: TaskCollection.model_validate(json.loads(storage.read_text(encoding="utf-8")))
+        )
+        verified = _best(TaskRepository(storage, verify=True).load_collection)
+        trusted = _best(TaskRepository(storage).load_collection)
+
+    print(f"{'tasks':>10} {'before':>10} {'verify':>10} {'trusted':>10} {'speedup':>8}")
+    print(
+        f"{size:>10,} {before:>9.3f}s {verified:>9.3f}s {trusted:>9.3f}s"
+        f" {before / trusted:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,67 @@
 from __future__ import annotations
 
+from contextlib import AbstractContextManager
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from todo_cli.models import Task
-from todo_cli.repository import TaskRepository
+if TYPE_CHECKING:
+    from todo_cli.models import Task
+    from todo_cli.repository import TaskRepository
+
+BACKENDS = ("json", "sqlite", "binary", "mmap")
+
+
+def create_repository(
+    storage_path: Path, backend: str | None = None, *, verify: bool = False
+) -> TaskRepository:
+    # Imported here so that `todo --help` and argument errors never load pydantic.
+    from todo_cli.binary_repository import BinaryTaskRepository, is_binary_path
+    from todo_cli.mmap_repository import MmapTaskRepository, is_mmap_path
+    from todo_cli.repository import TaskRepository
+    from todo_cli.sqlite_repository import SqliteTaskRepository, is_sqlite_path
+
+    if backend is None:
+        if is_sqlite_path(storage_path):
+            backend = "sqlite"
+        elif is_binary_path(storage_path):
+            backend = "binary"
+        elif is_mmap_path(storage_path):
+            backend = "mmap"
+        else:
+            backend = "json"
+    if backend == "sqlite":
+        return SqliteTaskRepository(storage_path=storage_path)
+    if backend == "binary":
+        return BinaryTaskRepository(storage_path=storage_path, verify=verify)
+    if backend == "mmap":
+        return MmapTaskRepository(storage_path=storage_path)
+    if backend == "json":
+        # Only the JSON and binary stores have a trusted load path; the others always validate.
+        return TaskRepository(storage_path=storage_path, verify=verify)
+    raise ValueError(f"unknown backend: {backend}")
 
 
 class TodoApp:
-    def __init__(self, storage_path: Path) -> None:
-        self.repo = TaskRepository(storage_path=storage_path)
+    def __init__(
+        self, storage_path: Path, backend: str | None = None, *, verify: bool = False
+    ) -> None:
+        self.repo = create_repository(storage_path, backend, verify=verify)
+        self.verify = verify
+
+    def batch(self, flush_every: int = 0) -> AbstractContextManager[None]:
+        return self.repo.batch(flush_every=flush_every)
 
     def add_task(self, title: str) -> Task:
         return self.repo.add_task(title=title)
 
-    def list_tasks(self, include_completed: bool = False) -> list[Task]:
-        return self.repo.list_tasks(include_completed=include_completed)
+    def list_tasks(
+        self,
+        include_completed: bool = False,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[Task]:
+        return self.repo.list_tasks(include_completed=include_completed, after=after, limit=limit)
 
     def complete_task(self, task_id: str) -> Task:
         return self.repo.complete_task(task_id=task_id)
@@ -30,3 +77,9 @@ class TodoApp:
 
     def edit_task_title(self, task_id: str, new_title: str) -> Task:
         return self.repo.edit_task_title(task_id=task_id, new_title=new_title)
+
+    def import_json(self, source_path: Path) -> int:
+        # The source format follows its suffix, so this also converts between
+        # JSON and binary snapshots in either direction.
+        source = create_repository(source_path, verify=self.verify)
+        return self.repo.import_tasks(source.export_tasks())
@@ -1,28 +1,81 @@
 from __future__ import annotations
 
+# Imported first: the startup phase is timed from here.
+from todo_cli import profiling
+
 import argparse
+import json
+import shlex
 import sys
 from pathlib import Path
-from typing import Sequence
+from typing import Iterable, NoReturn, Sequence
 
-from todo_cli.app import TodoApp
-from todo_cli.repository import (
+from todo_cli.app import BACKENDS, TodoApp
+from todo_cli.errors import (
     TaskEditArchivedError,
     InvalidTaskIdError,
     TaskAlreadyArchivedError,
     TaskNotArchivedError,
     TaskNotFoundError,
+    TaskStorageFormatError,
     TaskValidationError,
 )
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(prog="todo", description="CLI TODO manager")
+def _page_size(value: str) -> int:
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return size
+
+
+def build_parser(
+    parser_class: type[argparse.ArgumentParser] = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    parser = parser_class(prog="todo", description="CLI TODO manager")
     parser.add_argument(
         "--storage",
         type=Path,
         default=Path(".todo/tasks.json"),
-        help="Path to the task storage JSON file",
+        help=(
+            "Path to the task storage file "
+            "(.db/.sqlite selects the SQLite backend, .bin the binary snapshot, "
+            ".rec the memory-mapped record file)"
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="Storage backend (default: inferred from the --storage suffix)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help=(
+            "Validate every task when loading a JSON or binary store, even if its checksum "
+            "shows it is unchanged since the last save"
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each phase (startup, load, validate, save, ...) to stderr",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write the phase timings to FILE as a Chrome trace instead of stderr",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Also run the command under cProfile and dump the stats to FILE",
     )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -36,6 +89,18 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Include completed active tasks",
     )
+    list_cmd.add_argument(
+        "--limit",
+        type=_page_size,
+        default=None,
+        help="Show at most N tasks, then the --after value for the next page",
+    )
+    list_cmd.add_argument(
+        "--after",
+        default=None,
+        metavar="ID",
+        help="Continue after this task (the ID printed at the end of the previous page)",
+    )
 
     complete_cmd = subparsers.add_parser("complete", help="Mark task as completed")
     complete_cmd.add_argument("--id", required=True, help="Task ID (UUID)")
@@ -53,69 +118,181 @@ def build_parser() -> argparse.ArgumentParser:
     edit_cmd.add_argument("--id", required=True, help="Task ID (UUID)")
     edit_cmd.add_argument("--title", required=True, help="New task title")
 
+    import_cmd = subparsers.add_parser(
+        "import-json", help="Import tasks from an existing JSON storage file"
+    )
+    import_cmd.add_argument(
+        "--source",
+        type=Path,
+        required=True,
+        help="Source storage file (format inferred from its suffix)",
+    )
+
+    batch_cmd = subparsers.add_parser(
+        "batch", help="Run newline-delimited commands (or JSON objects) from stdin"
+    )
+    batch_cmd.add_argument(
+        "--flush-every",
+        type=int,
+        default=0,
+        help="Persist after every N successful writes (default: once at the end)",
+    )
+
     return parser
 
 
-def _print_task(task_id: str, title: str, completed: bool, archived: bool) -> None:
-    print(f"{task_id} | {title} | completed={completed} | archived={archived}")
+class BatchLineError(Exception):
+    pass
+
+
+class _BatchLineParser(argparse.ArgumentParser):
+    def error(self, message: str) -> NoReturn:
+        raise BatchLineError(message)
+
+
+EXPECTED_ERRORS = (
+    InvalidTaskIdError,
+    TaskNotFoundError,
+    TaskAlreadyArchivedError,
+    TaskNotArchivedError,
+    TaskEditArchivedError,
+    TaskValidationError,
+    TaskStorageFormatError,
+)
+
+
+def _format_task(task_id: str, title: str, completed: bool, archived: bool) -> str:
+    return f"{task_id} | {title} | completed={completed} | archived={archived}"
+
+
+def _execute(app: TodoApp, args: argparse.Namespace) -> list[str] | None:
+    if args.command == "add":
+        task = app.add_task(args.title)
+        return [f"added: {task.id} | {task.title}"]
+
+    if args.command == "list":
+        tasks = app.list_tasks(
+            include_completed=args.all_active, after=args.after, limit=args.limit
+        )
+        if not tasks:
+            return ["No tasks found."]
+        lines = [
+            _format_task(str(task.id), task.title, task.is_completed, task.is_archived)
+            for task in tasks
+        ]
+        if args.limit is not None and len(tasks) == args.limit:
+            lines.append(f"next: --after {tasks[-1].id}")
+        return lines
+
+    if args.command == "complete":
+        task = app.complete_task(args.id)
+        return [f"completed: {task.id}"]
+
+    if args.command == "reopen":
+        task = app.reopen_task(args.id)
+        return [f"reopened: {task.id}"]
+
+    if args.command == "archive":
+        task = app.archive_task(args.id)
+        return [f"archived: {task.id}"]
+
+    if args.command == "restore":
+        task = app.restore_task(args.id)
+        return [f"restored: {task.id}"]
+
+    if args.command == "edit":
+        task = app.edit_task_title(args.id, args.title)
+        return [f"edited: {task.id} | {task.title}"]
+
+    if args.command == "import-json":
+        count = app.import_json(args.source)
+        return [f"imported: {count}"]
+
+    return None
+
+
+def _batch_argv(line: str) -> list[str]:
+    if not line.startswith("{"):
+        return shlex.split(line)
+
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise BatchLineError(f"invalid JSON: {exc}") from exc
+    if not isinstance(request, dict) or "command" not in request:
+        raise BatchLineError('JSON line must be an object with a "command" key')
+
+    argv = [str(request.pop("command"))]
+    for key, value in request.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value is not False and value is not None:
+            argv.extend([flag, str(value)])
+    return argv
+
+
+def _run_batch(app: TodoApp, lines: Iterable[str], flush_every: int) -> int:
+    parser = build_parser(parser_class=_BatchLineParser)
+    succeeded = failed = 0
+
+    with app.batch(flush_every=flush_every):
+        for lineno, raw in enumerate(lines, start=1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                args = parser.parse_args(_batch_argv(line))
+                if args.command in ("batch", "import-json"):
+                    raise BatchLineError(f"{args.command} is not allowed in batch mode")
+                output = _execute(app, args) or []
+            except (BatchLineError, ValueError, *EXPECTED_ERRORS) as exc:
+                failed += 1
+                print(f"{lineno}: error: {exc}")
+                continue
+            succeeded += 1
+            for text in output:
+                print(f"{lineno}: {text}")
+
+    print(f"batch: {succeeded} succeeded, {failed} failed")
+    return 2 if failed else 0
+
+
+def _start_profiling(args: argparse.Namespace) -> None:
+    enabled, trace, cprofile = profiling.from_environment()
+    if args.profile or args.profile_trace or args.profile_cprofile or enabled:
+        profiling.enable(args.profile_trace or trace, args.profile_cprofile or cprofile)
 
 
 def run(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    _start_profiling(args)
+    try:
+        return _run(parser, args)
+    finally:
+        profiling.finish()
+
 
-    app = TodoApp(storage_path=args.storage)
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    app = TodoApp(storage_path=args.storage, backend=args.backend, verify=args.verify)
+    profiling.end_startup()
 
     try:
-        if args.command == "add":
-            task = app.add_task(args.title)
-            print(f"added: {task.id} | {task.title}")
-            return 0
-
-        if args.command == "list":
-            tasks = app.list_tasks(include_completed=args.all_active)
-            if not tasks:
-                print("No tasks found.")
-                return 0
-            for task in tasks:
-                _print_task(str(task.id), task.title, task.is_completed, task.is_archived)
-            return 0
-
-        if args.command == "complete":
-            task = app.complete_task(args.id)
-            print(f"completed: {task.id}")
-            return 0
-
-        if args.command == "reopen":
-            task = app.reopen_task(args.id)
-            print(f"reopened: {task.id}")
-            return 0
-
-        if args.command == "archive":
-            task = app.archive_task(args.id)
-            print(f"archived: {task.id}")
-            return 0
-
-        if args.command == "restore":
-            task = app.restore_task(args.id)
-            print(f"restored: {task.id}")
-            return 0
-
-        if args.command == "edit":
-            task = app.edit_task_title(args.id, args.title)
-            print(f"edited: {task.id} | {task.title}")
-            return 0
-
-        parser.print_help()
-        return 2
-    except (
-        InvalidTaskIdError,
-        TaskNotFoundError,
-        TaskAlreadyArchivedError,
-        TaskNotArchivedError,
-        TaskEditArchivedError,
-        TaskValidationError,
-    ) as exc:
+        if args.command == "batch":
+            with profiling.phase("command"):
+                return _run_batch(app, sys.stdin, args.flush_every)
+
+        with profiling.phase("command"):
+            output = _execute(app, args)
+        if output is None:
+            parser.print_help()
+            return 2
+        with profiling.phase("render"):
+            for text in output:
+                print(text)
+        return 0
+    except EXPECTED_ERRORS as exc:
         print(str(exc), file=sys.stderr)
         return 2
     except Exception as exc:  # pragma: no cover
@@ -0,0 +1,33 @@
+"""Repository errors, importable without loading pydantic."""
+
+
+class TaskRepositoryError(Exception):
+    pass
+
+
+class InvalidTaskIdError(TaskRepositoryError):
+    pass
+
+
+class TaskNotFoundError(TaskRepositoryError):
+    pass
+
+
+class TaskAlreadyArchivedError(TaskRepositoryError):
+    pass
+
+
+class TaskNotArchivedError(TaskRepositoryError):
+    pass
+
+
+class TaskEditArchivedError(TaskRepositoryError):
+    pass
+
+
+class TaskValidationError(TaskRepositoryError):
+    pass
+
+
+class TaskStorageFormatError(TaskRepositoryError):
+    pass
@@ -0,0 +1,120 @@
+"""Cross-process locking and atomic writes for the JSON store.
+
+The lock is an ``flock`` on ``<storage>.lock`` next to the store. The lock
+file also holds the store version, an integer bumped on every write.
+Re-entering the lock for the same store on the same thread reuses the outer
+lock, so repository methods can nest freely inside a batch.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_local = threading.local()
+
+
+def lock_path(path: Path) -> Path:
+    """Returns the lock file guarding the store at path."""
+    return path.with_name(path.name + ".lock")
+
+
+class StoreLock:
+    """A held lock; the store version lives at the start of the lock file."""
+
+    def __init__(self, fd: int, shared: bool) -> None:
+        self._fd = fd
+        self.shared = shared
+
+    @property
+    def version(self) -> int:
+        return int(os.pread(self._fd, 32, 0) or b"0")
+
+    def bump(self) -> int:
+        if self.shared:
+            raise RuntimeError("cannot write under a shared lock")
+        version = self.version + 1
+        # The version only grows, so overwriting in place never leaves stale digits.
+        os.pwrite(self._fd, str(version).encode("ascii"), 0)
+        os.fsync(self._fd)
+        return version
+
+
+def _held() -> dict[str, StoreLock]:
+    if not hasattr(_local, "held"):
+        _local.held = {}
+    held: dict[str, StoreLock] = _local.held
+    return held
+
+
+@contextmanager
+def locked(path: Path, *, shared: bool = False) -> Iterator[StoreLock]:
+    """Acquires the store lock: exclusive by default, shared with shared=True."""
+    key = str(lock_path(path).absolute())
+    held = _held()
+    current = held.get(key)
+    if current is not None:
+        if current.shared and not shared:
+            raise RuntimeError("cannot upgrade a shared lock")
+        yield current
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = lock = StoreLock(fd, shared)
+        try:
+            yield lock
+        finally:
+            del held[key]
+    finally:
+        os.close(fd)
+
+
+def read_version(path: Path) -> int:
+    """Reads the store version without locking (0 if the store was never written)."""
+    try:
+        with lock_path(path).open("rb") as f:
+            return int(f.read(32) or b"0")
+    except FileNotFoundError:
+        return 0
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: Path, data: bytes, *, store: Path | None = None) -> None:
+    """Write ``data`` to a temp file, fsync it, bump the version and rename it over ``path``.
+
+    A crash leaves the previous file intact and readers always see a complete file.
+    ``store`` names the store whose lock and version cover ``path`` when ``path``
+    is a side file of that store rather than the store itself.
+    """
+    with locked(store or path) as lock:
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        lock.bump()
+        os.replace(tmp, path)
+        _fsync_dir(path.parent)
+
@@ -0,0 +1,419 @@
+"""Memory-mapped store of fixed-width task records.
+
+The store is three files::
+
+    tasks.rec         header | record 0 | record 1 | ...
+    tasks.rec.titles  heap token | title bytes ...
+    tasks.rec.slots   heap token | indexed count u32 | capacity u32 | bucket u32 ...
+
+    header  magic b"TREC" | schema version u16 | record size u16 | count u32 | heap token 8 bytes
+    record  id 16 bytes | flags u8 | created_at i64 | utc offset i32 | title offset u64 | title length u32
+
+Fields use the same encodings as the binary snapshot. Every record has the same
+size, so a task's slot is found through an id -> slot index, and completing,
+reopening, archiving or restoring it rewrites a single flags byte in place.
+New tasks are appended: the title goes to the heap, then the record, and the
+record count in the header is updated last. That count is the commit point.
+Edited titles are appended to the heap and the record is repointed. Full
+rewrites (imports, batches) write a fresh heap with a new token, and a
+mismatch between the two files' tokens is reported as corruption.
+
+The slot index is an open-addressing hash table keyed by the CRC-32 of the id;
+a bucket holds slot + 1, or 0 when empty, and is kept at most half full. It
+covers the first ``indexed count`` records, and records appended after it (a
+crash between the two writes) are scanned. An index that is missing or carries
+another token is stale: reads fall back to scanning the records, and the next
+write rebuilds it.
+
+Writes update the files in place instead of renaming over them, so reads take
+the store's shared lock.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+
+from todo_cli.binary_repository import (
+    ARCHIVED,
+    COMPLETED,
+    decode_created_at,
+    encode_created_at,
+    encode_flags,
+)
+from todo_cli.errors import TaskNotFoundError, TaskStorageFormatError, TaskValidationError
+from todo_cli.locking import locked, write_atomic
+from todo_cli.models import Task, TaskCollection
+from todo_cli.profiling import phase
+from todo_cli.repository import TaskRepository
+
+MMAP_SUFFIXES = frozenset({".rec"})
+MAGIC = b"TREC"
+SCHEMA_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHI8s12x")
+_COUNT = struct.Struct("<I")
+_COUNT_OFFSET = 8
+_RECORD = struct.Struct("<16sBxxxqiQI4x")
+_FLAGS_OFFSET = 16
+_TITLE_REF = struct.Struct("<QI")
+_TITLE_REF_OFFSET = 32
+_IDS = struct.Struct(f"<16s{_RECORD.size - 16}x")
+_TOKEN_SIZE = 8
+_INDEX_HEADER = struct.Struct("<8sII")
+_INDEX_COUNT = struct.Struct("<I")
+_INDEX_COUNT_OFFSET = 8
+_BUCKET = struct.Struct("<I")
+_MIN_CAPACITY = 64
+
+
+def heap_path(path: Path) -> Path:
+    return path.with_name(path.name + ".titles")
+
+
+def slots_path(path: Path) -> Path:
+    return path.with_name(path.name + ".slots")
+
+
+def _capacity(count: int) -> int:
+    """A power of two that keeps ``count`` entries at most half full."""
+    return max(_MIN_CAPACITY, 1 << (2 * count).bit_length())
+
+
+def _home(raw_id: bytes, capacity: int) -> int:
+    return zlib.crc32(raw_id) & (capacity - 1)
+
+
+def _build_index(token: bytes, ids: Iterable[bytes], count: int) -> bytes:
+    capacity = _capacity(count)
+    mask = capacity - 1
+    buckets = [0] * capacity
+    for entry, raw_id in enumerate(ids, 1):
+        i = _home(raw_id, capacity)
+        while buckets[i]:
+            i = (i + 1) & mask
+        buckets[i] = entry
+    return _INDEX_HEADER.pack(token, count, capacity) + struct.pack(f"<{capacity}I", *buckets)
+
+
+class _Mapped:
+    """An open, mapped store; valid only inside ``MmapTaskRepository._mapped``."""
+
+    def __init__(self, mm: mmap.mmap, heap_fd: int, index_fd: int | None) -> None:
+        self.mm = mm
+        self.heap_fd = heap_fd
+        self.index_fd = index_fd
+        magic, version, record_size, self.count, self.token = _HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            raise TaskStorageFormatError("not a task record file")
+        if version != SCHEMA_VERSION or record_size != _RECORD.size:
+            raise TaskStorageFormatError(f"unsupported record file schema version: {version}")
+        if _HEADER.size + self.count * _RECORD.size > len(mm):
+            raise TaskStorageFormatError("record file is truncated")
+        if os.pread(heap_fd, _TOKEN_SIZE, 0) != self.token:
+            raise TaskStorageFormatError("title heap does not belong to this record file")
+        # capacity 0 marks a stale index: missing, torn, or written for another record file.
+        self.indexed, self.capacity = 0, 0
+        if index_fd is not None:
+            header = os.pread(index_fd, _INDEX_HEADER.size, 0)
+            if len(header) == _INDEX_HEADER.size:
+                token, indexed, capacity = _INDEX_HEADER.unpack(header)
+                size = os.fstat(index_fd).st_size
+                if (
+                    token == self.token
+                    and indexed <= self.count
+                    and capacity >= _MIN_CAPACITY
+                    and capacity & (capacity - 1) == 0
+                    and size == _INDEX_HEADER.size + capacity * _BUCKET.size
+                ):
+                    self.indexed, self.capacity = indexed, capacity
+
+    def offset(self, slot: int) -> int:
+        return _HEADER.size + slot * _RECORD.size
+
+    def id_at(self, slot: int) -> bytes:
+        return self.mm[self.offset(slot) : self.offset(slot) + 16]
+
+    def ids(self, start: int = 0) -> Iterator[bytes]:
+        for (raw_id,) in _IDS.iter_unpack(self.mm[self.offset(start) : self.offset(self.count)]):
+            yield raw_id
+
+    def _bucket(self, i: int) -> int:
+        assert self.index_fd is not None
+        data = os.pread(self.index_fd, _BUCKET.size, _INDEX_HEADER.size + i * _BUCKET.size)
+        return int(_BUCKET.unpack(data)[0])
+
+    def find(self, raw_id: bytes) -> int | None:
+        """Locate a record through the slot index, or by a scan when it is stale."""
+        if not self.capacity:
+            return self._scan(raw_id)
+        mask = self.capacity - 1
+        i = _home(raw_id, self.capacity)
+        for _ in range(self.capacity):
+            entry = self._bucket(i)
+            if not entry:
+                break
+            # Ids are compared against the records, so a bucket left by an
+            # interrupted append only costs a probe.
+            if entry <= self.count and self.id_at(entry - 1) == raw_id:
+                return entry - 1
+            i = (i + 1) & mask
+        for slot, other in enumerate(self.ids(self.indexed), self.indexed):
+            if other == raw_id:
+                return slot
+        return None
+
+    def _scan(self, raw_id: bytes) -> int | None:
+        end = self.offset(self.count)
+        pos = self.mm.find(raw_id, _HEADER.size, end)
+        while pos != -1:
+            slot, misaligned = divmod(pos - _HEADER.size, _RECORD.size)
+            if not misaligned:
+                return slot
+            pos = self.mm.find(raw_id, pos + 1, end)
+        return None
+
+    def task(self, slot: int, heap: bytes | None = None) -> Task:
+        raw_id, flags, micros, utc_offset, title_at, title_len = _RECORD.unpack_from(
+            self.mm, self.offset(slot)
+        )
+        if heap is None:
+            title = os.pread(self.heap_fd, title_len, title_at)
+        else:
+            title = heap[title_at : title_at + title_len]
+        return _to_task(raw_id, flags, micros, utc_offset, title)
+
+    def write_index(self, ids: list[bytes]) -> None:
+        """Rewrite the index in place; the header goes last, so a torn write reads as stale.
+
+        Writers hold the store's exclusive lock, so no reader sees the rewrite.
+        """
+        assert self.index_fd is not None
+        fd = self.index_fd
+        data = _build_index(self.token, ids, len(ids))
+        os.pwrite(fd, bytes(_INDEX_HEADER.size), 0)
+        os.fsync(fd)
+        os.ftruncate(fd, len(data))
+        os.pwrite(fd, data[_INDEX_HEADER.size :], _INDEX_HEADER.size)
+        os.fsync(fd)
+        os.pwrite(fd, data[: _INDEX_HEADER.size], 0)
+        os.fsync(fd)
+        self.indexed, self.capacity = len(ids), _INDEX_HEADER.unpack_from(data)[2]
+
+    def ensure_index(self) -> None:
+        """Rebuild a stale index, or one missing records appended after it."""
+        if not self.capacity or self.indexed < self.count:
+            self.write_index(list(self.ids()))
+
+    def index_appended(self, raw_id: bytes) -> None:
+        """Add the record just committed at slot ``count`` to an up-to-date index."""
+        assert self.index_fd is not None
+        slot = self.count
+        if (slot + 1) * 2 > self.capacity:
+            self.write_index([*self.ids(), raw_id])
+            return
+        mask = self.capacity - 1
+        i = _home(raw_id, self.capacity)
+        while self._bucket(i):
+            i = (i + 1) & mask
+        os.pwrite(self.index_fd, _BUCKET.pack(slot + 1), _INDEX_HEADER.size + i * _BUCKET.size)
+        os.fsync(self.index_fd)
+        # If this count is lost, the record is still found by the tail scan in find().
+        os.pwrite(self.index_fd, _INDEX_COUNT.pack(slot + 1), _INDEX_COUNT_OFFSET)
+        self.indexed = slot + 1
+
+    def append_title(self, title: str) -> tuple[int, int]:
+        data = title.encode("utf-8")
+        at = os.lseek(self.heap_fd, 0, os.SEEK_END)
+        os.pwrite(self.heap_fd, data, at)
+        os.fsync(self.heap_fd)
+        return at, len(data)
+
+
+def _to_task(raw_id: bytes, flags: int, micros: int, utc_offset: int, title: bytes) -> Task:
+    try:
+        return Task.model_validate(
+            {
+                "id": raw_id,
+                "title": title.decode("utf-8"),
+                "is_completed": bool(flags & COMPLETED),
+                "is_archived": bool(flags & ARCHIVED),
+                "created_at": decode_created_at(micros, utc_offset),
+            }
+        )
+    except UnicodeDecodeError as exc:
+        raise TaskStorageFormatError(f"invalid title encoding: {exc}") from exc
+    except ValidationError as exc:
+        raise TaskValidationError(str(exc)) from exc
+
+
+def _pack_record(task: Task, title_at: int, title_len: int) -> bytes:
+    micros, utc_offset = encode_created_at(task.created_at)
+    return _RECORD.pack(task.id.bytes, encode_flags(task), micros, utc_offset, title_at, title_len)
+
+
+class MmapTaskRepository(TaskRepository):
+    """TaskRepository over a memory-mapped file of fixed-width records.
+
+    Status changes write one byte in place, and adding a task appends one
+    record. Batches and imports keep the inherited load/modify/save path and
+    rewrite both files once.
+    """
+
+    tiered = False
+
+    @contextmanager
+    def _mapped(self, *, write: bool = False) -> Iterator[_Mapped | None]:
+        with locked(self.storage_path, shared=not write):
+            if not self.storage_path.exists():
+                yield None
+                return
+            flags = os.O_RDWR if write else os.O_RDONLY
+            try:
+                heap_fd = os.open(heap_path(self.storage_path), flags)
+            except FileNotFoundError as exc:
+                raise TaskStorageFormatError(
+                    f"title heap is missing: {heap_path(self.storage_path)}"
+                ) from exc
+            index_fd = None
+            try:
+                if write:
+                    # Created empty, and so stale, when missing: the write rebuilds it.
+                    index_fd = os.open(slots_path(self.storage_path), os.O_RDWR | os.O_CREAT, 0o666)
+                elif slots_path(self.storage_path).exists():
+                    index_fd = os.open(slots_path(self.storage_path), os.O_RDONLY)
+                with open(self.storage_path, "r+b" if write else "rb") as f, mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_WRITE if write else mmap.ACCESS_READ
+                ) as mm:
+                    yield _Mapped(mm, heap_fd, index_fd)
+                    if write:
+                        mm.flush()
+            finally:
+                os.close(heap_fd)
+                if index_fd is not None:
+                    os.close(index_fd)
+
+    def _read_collection(self) -> TaskCollection:
+        return TaskCollection(tasks=self._read_tasks(skip_flags=0))
+
+    def _read_tasks(
+        self, skip_flags: int, after: UUID | None = None, limit: int | None = None
+    ) -> list[Task]:
+        with self._mapped() as store:
+            if store is None:
+                if after is not None:
+                    raise TaskNotFoundError(f"task not found: {after}")
+                return []
+            start = 0
+            if after is not None:
+                slot = store.find(after.bytes)
+                if slot is None:
+                    raise TaskNotFoundError(f"task not found: {after}")
+                start = slot + 1
+            # A page reads only its own titles; a full listing reads the heap once.
+            heap = None if limit is not None else os.pread(
+                store.heap_fd, os.fstat(store.heap_fd).st_size, 0
+            )
+            tasks: list[Task] = []
+            for slot in range(start, store.count):
+                if limit is not None and len(tasks) >= limit:
+                    break
+                if store.mm[store.offset(slot) + _FLAGS_OFFSET] & skip_flags:
+                    continue
+                tasks.append(store.task(slot, heap))
+            return tasks
+
+    def _write_collection(self, collection: TaskCollection) -> None:
+        self._ensure_parent_dir()
+        token = os.urandom(_TOKEN_SIZE)
+        heap = bytearray(token)
+        records = [_HEADER.pack(MAGIC, SCHEMA_VERSION, _RECORD.size, len(collection.tasks), token)]
+        for task in collection.tasks:
+            title = task.title.encode("utf-8")
+            records.append(_pack_record(task, len(heap), len(title)))
+            heap += title
+        ids = [task.id.bytes for task in collection.tasks]
+        index = _build_index(token, ids, len(ids))
+        with locked(self.storage_path):
+            # The heap goes first: until the record file is replaced, its token
+            # no longer matches and readers see the pair as corrupt, not mismatched titles.
+            # The index goes last; until then its old token marks it stale.
+            write_atomic(heap_path(self.storage_path), bytes(heap), store=self.storage_path)
+            write_atomic(self.storage_path, b"".join(records))
+            write_atomic(slots_path(self.storage_path), index, store=self.storage_path)
+
+    def list_tasks(
+        self,
+        include_completed: bool = False,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[Task]:
+        if self._batch is not None:
+            return super().list_tasks(include_completed=include_completed, after=after, limit=limit)
+        with phase("load"):
+            return self._read_tasks(
+                ARCHIVED if include_completed else ARCHIVED | COMPLETED,
+                after=self._parse_id(after) if after is not None else None,
+                limit=limit,
+            )
+
+    def add_task(self, title: str) -> Task:
+        if self._batch is not None:
+            return super().add_task(title)
+        try:
+            task = Task(id=uuid4(), title=title)
+        except ValidationError as exc:
+            raise TaskValidationError(str(exc)) from exc
+
+        with locked(self.storage_path) as lock:
+            with self._mapped(write=True) as store:
+                if store is None:
+                    self._write_collection(TaskCollection(tasks=[task]))
+                    return task
+                store.ensure_index()
+                title_at, title_len = store.append_title(task.title)
+                record = _pack_record(task, title_at, title_len)
+                with open(self.storage_path, "r+b") as f:
+                    # Written past the mapping, which keeps the size it was opened with.
+                    os.pwrite(f.fileno(), record, store.offset(store.count))
+                    os.fsync(f.fileno())
+                    os.pwrite(f.fileno(), _COUNT.pack(store.count + 1), _COUNT_OFFSET)
+                    os.fsync(f.fileno())
+                store.index_appended(task.id.bytes)
+            lock.bump()
+        return task
+
+    def _update_task(self, task_id: str, change: Callable[[Task], Task]) -> Task:
+        if self._batch is not None:
+            return super()._update_task(task_id, change)
+        parsed_id = self._parse_id(task_id)
+        with locked(self.storage_path) as lock:
+            with self._mapped(write=True) as store:
+                if store is None:
+                    raise TaskNotFoundError(f"task not found: {parsed_id}")
+                store.ensure_index()
+                slot = store.find(parsed_id.bytes)
+                if slot is None:
+                    raise TaskNotFoundError(f"task not found: {parsed_id}")
+                task = store.task(slot)
+                updated = change(task)
+                offset = store.offset(slot)
+                if updated.title != task.title:
+                    ref = _TITLE_REF.pack(*store.append_title(updated.title))
+                    store.mm[offset + _TITLE_REF_OFFSET : offset + _TITLE_REF_OFFSET + len(ref)] = ref
+                store.mm[offset + _FLAGS_OFFSET] = encode_flags(updated)
+            lock.bump()
+        return updated
+
+
+def is_mmap_path(path: Path) -> bool:
+    return path.suffix.lower() in MMAP_SUFFIXES
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 
 TASK_TITLE_MAX_LENGTH = 255
+# Validation context for data this application wrote itself and has checksummed.
+TRUSTED = {"trusted": True}
+
+_TASK_FIELDS = frozenset({"id", "title", "is_completed", "is_archived", "created_at"})
+_object_setattr = object.__setattr__
 
 
 class Task(BaseModel):
@@ -17,9 +23,38 @@ class Task(BaseModel):
 
     @field_validator("title")
     @classmethod
-    def validate_title(cls, value: str) -> str:
+    def validate_title(cls, value: str, info: ValidationInfo) -> str:
+        if info.context is not None and info.context.get("trusted"):
+            # Saved titles were normalized before they were written.
+            return value
         return cls.normalize_title(value)
 
+    @classmethod
+    def from_trusted(cls, rows: Iterable[tuple[UUID, str, bool, bool, datetime]]) -> list["Task"]:
+        """Build tasks from typed fields this application wrote itself, without validation.
+
+        Each row is (id, title, is_completed, is_archived, created_at). Does what
+        ``model_construct`` does for a model whose fields are all given, without its
+        per-field alias and default handling, in one loop for the whole batch.
+        """
+        new = cls.__new__
+        tasks = []
+        for id, title, is_completed, is_archived, created_at in rows:
+            task = new(cls)
+            fields = {
+                "id": id,
+                "title": title,
+                "is_completed": is_completed,
+                "is_archived": is_archived,
+                "created_at": created_at,
+            }
+            _object_setattr(task, "__dict__", fields)
+            _object_setattr(task, "__pydantic_fields_set__", set(_TASK_FIELDS))
+            _object_setattr(task, "__pydantic_extra__", None)
+            _object_setattr(task, "__pydantic_private__", None)
+            tasks.append(task)
+        return tasks
+
     @staticmethod
     def normalize_title(value: str) -> str:
         title = value.strip()
@@ -45,3 +80,14 @@ class Task(BaseModel):
 
 class TaskCollection(BaseModel):
     tasks: list[Task] = Field(default_factory=list)
+
+
+class ArchiveCollection(TaskCollection):
+    """Archived tasks, kept in a separate file from the active ones.
+
+    ``anchors`` maps each task to the task it followed in the active store
+    (``None`` at the start). Restoring a task puts it back behind that task,
+    and ``list --after`` on an archived task resumes from there.
+    """
+
+    anchors: dict[UUID, UUID | None] = Field(default_factory=dict)
@@ -0,0 +1,152 @@
+"""Opt-in timing of the phases of one CLI invocation.
+
+Enabled with ``--profile`` (a summary on stderr), ``--profile-trace FILE``
+(a Chrome trace event file, viewable in Perfetto or chrome://tracing) or
+``--profile-cprofile FILE`` (a cProfile dump for ``pstats``), or with the
+environment variables ``TODO_PROFILE`` (``1`` for stderr, anything else is the
+trace file path) and ``TODO_PROFILE_CPROFILE``.
+
+The CLI imports this module before anything else and calls ``end_startup``
+right before running the command, so the ``startup`` phase covers importing
+the application and opening the store. Phases nest: ``load`` contains
+``parse`` and ``validate``. While profiling is off, ``phase`` returns a shared
+no-op context manager.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+PROFILE_ENV = "TODO_PROFILE"
+CPROFILE_ENV = "TODO_PROFILE_CPROFILE"
+
+_STARTED = time.perf_counter()
+_OFF = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start: float
+    end: float = 0.0
+    children: float = 0.0  # time spent in directly nested spans
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    def __init__(self, trace_path: Path | None = None, cprofile_path: Path | None = None) -> None:
+        self.trace_path = trace_path
+        self.cprofile_path = cprofile_path
+        self.spans: list[Span] = []
+        self._open: list[Span] = []
+        self._cprofile: Any = None
+        if cprofile_path is not None:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        span = Span(name, len(self._open), time.perf_counter())
+        self.spans.append(span)
+        self._open.append(span)
+        try:
+            yield
+        finally:
+            span.end = time.perf_counter()
+            self._open.pop()
+            if self._open:
+                self._open[-1].children += span.duration
+
+    def end_startup(self) -> None:
+        self.spans.insert(0, Span("startup", 0, _STARTED, time.perf_counter()))
+
+    def finish(self) -> None:
+        total = time.perf_counter() - _STARTED
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.cprofile_path))
+        if self.trace_path is not None:
+            self.trace_path.write_text(json.dumps(self.trace()), encoding="utf-8")
+        else:
+            sys.stderr.write(self.summary(total))
+
+    def trace(self) -> dict[str, Any]:
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": (span.start - _STARTED) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": 0,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def summary(self, total: float) -> str:
+        lines = [f"profile: {'phase':<20} {'total ms':>10} {'self ms':>10}"]
+        for span in self.spans:
+            label = "  " * span.depth + span.name
+            lines.append(
+                f"  {label:<27} {span.duration * 1e3:>10.2f} "
+                f"{(span.duration - span.children) * 1e3:>10.2f}"
+            )
+        lines.append(f"  {'total':<27} {total * 1e3:>10.2f}")
+        return "\n".join(lines) + "\n"
+
+
+_active: Profiler | None = None
+
+
+def phase(name: str) -> AbstractContextManager[None]:
+    """Time the enclosed block as ``name`` if profiling is enabled."""
+    if _active is None:
+        return _OFF
+    return _active.span(name)
+
+
+def from_environment(environ: Mapping[str, str] = os.environ) -> tuple[bool, Path | None, Path | None]:
+    """Return (enabled, trace path, cProfile path) requested through the environment."""
+    value = environ.get(PROFILE_ENV, "")
+    cprofile = environ.get(CPROFILE_ENV) or None
+    trace = None if value in ("", "0", "1") else Path(value)
+    enabled = value not in ("", "0") or cprofile is not None
+    return enabled, trace, Path(cprofile) if cprofile else None
+
+
+def enable(trace_path: Path | None = None, cprofile_path: Path | None = None) -> None:
+    """Start profiling."""
+    global _active
+    _active = Profiler(trace_path, cprofile_path)
+
+
+def end_startup() -> None:
+    """Record the time from this module's import until now as the startup phase."""
+    if _active is not None:
+        _active.end_startup()
+
+
+def finish() -> None:
+    """Stop profiling and write the results, if profiling was enabled."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.finish()
@@ -1,65 +1,201 @@
 from __future__ import annotations
 
+import gc
+import hashlib
 import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
+from typing import Callable, ClassVar, Iterable, Iterator, TypeVar
 from uuid import UUID, uuid4
 
 from pydantic import ValidationError
 
-from todo_cli.models import Task, TaskCollection
+from todo_cli.errors import (
+    InvalidTaskIdError,
+    TaskAlreadyArchivedError,
+    TaskEditArchivedError,
+    TaskNotArchivedError,
+    TaskNotFoundError,
+    TaskRepositoryError,
+    TaskValidationError,
+)
+from todo_cli.locking import locked, write_atomic
+from todo_cli.models import TRUSTED, ArchiveCollection, Task, TaskCollection
+from todo_cli.profiling import phase
+
+# Version 2 starts with "format_version" and "checksum" ahead of "tasks".
+# Files without them (version 1) still load, through full validation.
+JSON_FORMAT_VERSION = 2
+_CHECKSUM_KEY = b'"checksum": "'
+_HEADER = re.compile(rb'\{\s*"format_version": (\d+),\s*"checksum": "([0-9a-f]{64})"')
+
+_C = TypeVar("_C", bound=TaskCollection)
+
+
+def archive_path(path: Path) -> Path:
+    """Returns the file holding the archived tasks of the store at path."""
+    return path.with_name(f"{path.stem}.archive{path.suffix}")
+
+
+def _digest(data: bytes, start: int, end: int) -> str:
+    """SHA-256 of ``data`` with the checksum value at ``start:end`` left out."""
+    view = memoryview(data)
+    digest = hashlib.sha256(view[:start])
+    digest.update(view[end:])
+    return digest.hexdigest()
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Decoding allocates an object graph without cycles; letting the collector
+    # rescan it every few hundred allocations costs about as much as validation.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def encode_json(collection: TaskCollection) -> bytes:
+    payload = {
+        "format_version": JSON_FORMAT_VERSION,
+        "checksum": "",
+        **collection.model_dump(mode="json"),
+    }
+    data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    at = data.index(_CHECKSUM_KEY) + len(_CHECKSUM_KEY)
+    return data[:at] + _digest(data, at, at).encode("ascii") + data[at:]
+
+
+def is_trusted(data: bytes) -> bool:
+    """Whether ``data`` is unchanged since ``encode_json`` wrote it."""
+    header = _HEADER.match(data)
+    if header is None or int(header.group(1)) != JSON_FORMAT_VERSION:
+        return False
+    return _digest(data, *header.span(2)) == header.group(2).decode("ascii")
+
+
+def decode_json(data: bytes, verify: bool = False) -> TaskCollection:
+    """Decode a JSON store, trusting its contents if the checksum matches.
+
+    A trusted file is parsed and typed by pydantic-core straight from the bytes,
+    without calling back into Python for title normalization. Files from older
+    versions, files edited by hand and ``verify=True`` get full validation.
+    """
+    return _decode(data, verify, TaskCollection)
+
+
+def _decode(data: bytes, verify: bool, model: type[_C]) -> _C:
+    try:
+        with _gc_paused():
+            if not verify and is_trusted(data):
+                # pydantic-core parses and validates in one pass.
+                with phase("validate"):
+                    return model.model_validate_json(data, context=TRUSTED)
+            with phase("parse"):
+                raw = json.loads(data)
+            with phase("validate"):
+                return model.model_validate(raw)
+    except ValidationError as exc:
+        raise TaskValidationError(str(exc)) from exc
+
+
+@dataclass
+class _Batch:
+    collection: TaskCollection
+    flush_every: int
+    pending: int = 0
 
 
-class TaskRepositoryError(Exception):
-    pass
-
-
-class InvalidTaskIdError(TaskRepositoryError):
-    pass
-
-
-class TaskNotFoundError(TaskRepositoryError):
-    pass
-
-
-class TaskAlreadyArchivedError(TaskRepositoryError):
-    pass
-
-
-class TaskNotArchivedError(TaskRepositoryError):
-    pass
-
-
-class TaskEditArchivedError(TaskRepositoryError):
-    pass
-
+class TaskRepository:
+    """Task store kept as one JSON file.
 
-class TaskValidationError(TaskRepositoryError):
-    pass
+    Archiving moves a task out of the store into ``archive_path(storage_path)``,
+    so commands on active tasks never read or parse the archived ones. Only
+    ``restore``, changes to archived tasks and a ``list --after`` cursor that
+    points at an archived task read that file. Archived tasks are written first
+    and removed from the archive lazily. If a task ends up in both files after
+    a crash, the copy in the store wins.
+    """
 
+    # Whether archive moves tasks to the archive file. Backends that flip a flag in
+    # place (and skip archived tasks without decoding them) turn this off.
+    tiered: ClassVar[bool] = True
 
-class TaskRepository:
-    def __init__(self, storage_path: Path) -> None:
+    def __init__(self, storage_path: Path, *, verify: bool = False) -> None:
         self.storage_path = storage_path
+        # Validate every task on load even when the file's checksum matches.
+        self.verify = verify
+        self._batch: _Batch | None = None
 
     def _ensure_parent_dir(self) -> None:
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
 
+    @contextmanager
+    def batch(self, flush_every: int = 0) -> Iterator[None]:
+        """Keep the collection in memory and persist it once on exit.
+
+        With ``flush_every`` > 0 the collection is also written after every
+        ``flush_every`` saves, bounding the work lost if the process dies.
+        """
+        # Other processes wait for the whole batch instead of interleaving with it.
+        with locked(self.storage_path):
+            with phase("load"):
+                collection = self._read_collection()
+            self._batch = _Batch(collection, flush_every)
+            try:
+                yield
+            finally:
+                batch, self._batch = self._batch, None
+                if batch.pending:
+                    with phase("save"):
+                        self._write_collection(batch.collection)
+
+    @contextmanager
+    def transaction(self) -> Iterator[TaskCollection]:
+        """Load, let the caller modify and save the collection under the store lock.
+
+        Concurrent read-modify-write cycles from other processes are serialized
+        rather than overwriting each other. Nothing is saved if the block raises.
+        """
+        with locked(self.storage_path):
+            collection = self.load_collection()
+            yield collection
+            self.save_collection(collection)
+
     def load_collection(self) -> TaskCollection:
+        if self._batch is not None:
+            return self._batch.collection
+        with phase("load"):
+            return self._read_collection()
+
+    def save_collection(self, collection: TaskCollection) -> None:
+        batch = self._batch
+        if batch is None:
+            with phase("save"):
+                self._write_collection(collection)
+            return
+        batch.collection = collection
+        batch.pending += 1
+        if batch.flush_every and batch.pending >= batch.flush_every:
+            with phase("save"):
+                self._write_collection(collection)
+            batch.pending = 0
+
+    def _read_collection(self) -> TaskCollection:
         if not self.storage_path.exists():
             return TaskCollection()
 
-        data = json.loads(self.storage_path.read_text(encoding="utf-8"))
-        try:
-            return TaskCollection.model_validate(data)
-        except ValidationError as exc:
-            raise TaskValidationError(str(exc)) from exc
+        return decode_json(self.storage_path.read_bytes(), verify=self.verify)
 
-    def save_collection(self, collection: TaskCollection) -> None:
+    def _write_collection(self, collection: TaskCollection) -> None:
         self._ensure_parent_dir()
-        payload = collection.model_dump(mode="json")
-        self.storage_path.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        write_atomic(self.storage_path, encode_json(collection))
 
     def _parse_id(self, task_id: str) -> UUID:
         try:
@@ -74,79 +210,205 @@ class TaskRepository:
         raise TaskNotFoundError(f"task not found: {task_id}")
 
     def add_task(self, title: str) -> Task:
-        collection = self.load_collection()
         try:
             task = Task(id=uuid4(), title=title)
         except ValidationError as exc:
             raise TaskValidationError(str(exc)) from exc
 
-        collection.tasks.append(task)
-        self.save_collection(collection)
+        with self.transaction() as collection:
+            collection.tasks.append(task)
         return task
 
-    def list_tasks(self, include_completed: bool = False) -> list[Task]:
-        collection = self.load_collection()
-        tasks = [task for task in collection.tasks if not task.is_archived]
-        if not include_completed:
-            tasks = [task for task in tasks if not task.is_completed]
-        return tasks
-
-    def complete_task(self, task_id: str) -> Task:
+    def list_tasks(
+        self,
+        include_completed: bool = False,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[Task]:
+        """List visible tasks in store order.
+
+        ``after`` is the id of the last task of the previous page; the listing
+        resumes right behind it. The position holds even if that task was
+        completed or archived meanwhile.
+        """
+        tasks = self.load_collection().tasks
+        start = 0
+        if after is not None:
+            start = self._resume_index(tasks, self._parse_id(after))
+        visible = (
+            task
+            for task in islice(tasks, start, None)
+            if not task.is_archived and (include_completed or not task.is_completed)
+        )
+        return list(islice(visible, limit))
+
+    def export_tasks(self) -> list[Task]:
+        """All tasks, archived ones included (store order, then archive order)."""
+        if not self.tiered:
+            return self.load_collection().tasks
+        with locked(self.storage_path, shared=True):
+            tasks = self.load_collection().tasks
+            archived = self._read_archive().tasks
+        active = {task.id for task in tasks}
+        return [*tasks, *(task for task in archived if task.id not in active)]
+
+    def import_tasks(self, tasks: Iterable[Task]) -> int:
+        # Imported tasks all go to the store, archived ones included, so that a
+        # conversion round trip gives back the same file.
+        imported = 0
+        with self.transaction() as collection:
+            known = {task.id for task in collection.tasks}
+            if self.tiered:
+                known.update(task.id for task in self._read_archive().tasks)
+            for task in tasks:
+                if task.id in known:
+                    continue
+                collection.tasks.append(task)
+                known.add(task.id)
+                imported += 1
+        return imported
+
+    def _update_task(self, task_id: str, change: Callable[[Task], Task]) -> Task:
         parsed_id = self._parse_id(task_id)
-        collection = self.load_collection()
-        idx = self._find_index(collection.tasks, parsed_id)
-        collection.tasks[idx] = collection.tasks[idx].complete()
-        self.save_collection(collection)
+        with self.transaction() as collection:
+            try:
+                idx = self._find_index(collection.tasks, parsed_id)
+            except TaskNotFoundError:
+                if not self.tiered:
+                    raise
+                archive = self._load_archive(collection)
+                at = self._find_index(archive.tasks, parsed_id)
+                archive.tasks[at] = updated = change(archive.tasks[at])
+                self._write_archive(archive)
+                return updated
+            collection.tasks[idx] = change(collection.tasks[idx])
         return collection.tasks[idx]
 
-    def reopen_task(self, task_id: str) -> Task:
-        parsed_id = self._parse_id(task_id)
-        collection = self.load_collection()
-        idx = self._find_index(collection.tasks, parsed_id)
-        collection.tasks[idx] = collection.tasks[idx].reopen()
-        self.save_collection(collection)
-        return collection.tasks[idx]
+    def _read_archive(self) -> ArchiveCollection:
+        path = archive_path(self.storage_path)
+        if not path.exists():
+            return ArchiveCollection()
+        with phase("load"):
+            return _decode(path.read_bytes(), self.verify, ArchiveCollection)
+
+    def _load_archive(self, collection: TaskCollection) -> ArchiveCollection:
+        """Read the archive to change it alongside ``collection``.
+
+        Outside a batch the collection was just read from disk, so archived
+        copies of tasks that are in it are stale and dropped. Inside a batch
+        the store on disk may still lack restored tasks, so they are kept.
+        """
+        archive = self._read_archive()
+        if self._batch is None:
+            active = {task.id for task in collection.tasks}
+            if any(task.id in active for task in archive.tasks):
+                archive.tasks = [task for task in archive.tasks if task.id not in active]
+                archive.anchors = {
+                    key: value for key, value in archive.anchors.items() if key not in active
+                }
+        return archive
+
+    def _write_archive(self, archive: ArchiveCollection) -> None:
+        # Written right away, also inside a batch, and always before the store:
+        # a task is never missing from both files.
+        with phase("save"):
+            write_atomic(
+                archive_path(self.storage_path), encode_json(archive), store=self.storage_path
+            )
 
-    def archive_task(self, task_id: str) -> Task:
-        parsed_id = self._parse_id(task_id)
-        collection = self.load_collection()
-        idx = self._find_index(collection.tasks, parsed_id)
+    def _resume_index(
+        self, tasks: list[Task], task_id: UUID, archive: ArchiveCollection | None = None
+    ) -> int:
+        """Index right behind ``task_id`` in store order.
+
+        An archived task stands where its anchor chain leads back into the store.
+        """
+        seen: set[UUID] = set()
+        current: UUID | None = task_id
+        while current is not None:
+            for i, task in enumerate(tasks):
+                if task.id == current:
+                    return i + 1
+            if not self.tiered or current in seen:
+                break
+            if archive is None:
+                archive = self._read_archive()
+            if current not in archive.anchors:
+                break
+            seen.add(current)
+            current = archive.anchors[current]
+        if current is None:
+            return 0
+        raise TaskNotFoundError(f"task not found: {task_id}")
 
-        if collection.tasks[idx].is_archived:
-            raise TaskAlreadyArchivedError(f"task already archived: {parsed_id}")
+    def complete_task(self, task_id: str) -> Task:
+        return self._update_task(task_id, Task.complete)
 
-        collection.tasks[idx] = collection.tasks[idx].archive()
-        self.save_collection(collection)
-        return collection.tasks[idx]
+    def reopen_task(self, task_id: str) -> Task:
+        return self._update_task(task_id, Task.reopen)
 
-    def restore_task(self, task_id: str) -> Task:
+    def archive_task(self, task_id: str) -> Task:
+        def change(task: Task) -> Task:
+            if task.is_archived:
+                raise TaskAlreadyArchivedError(f"task already archived: {task.id}")
+            return task.archive()
+
+        if not self.tiered:
+            return self._update_task(task_id, change)
         parsed_id = self._parse_id(task_id)
-        collection = self.load_collection()
-        idx = self._find_index(collection.tasks, parsed_id)
+        with self.transaction() as collection:
+            try:
+                idx = self._find_index(collection.tasks, parsed_id)
+            except TaskNotFoundError:
+                # Archived tasks are no longer in the store.
+                archive = self._load_archive(collection)
+                return change(archive.tasks[self._find_index(archive.tasks, parsed_id)])
+            archived = change(collection.tasks[idx])
+            archive = self._load_archive(collection)
+            # A stale copy from an earlier archive is replaced, not duplicated.
+            archive.tasks = [task for task in archive.tasks if task.id != parsed_id]
+            archive.tasks.append(archived)
+            archive.anchors[parsed_id] = collection.tasks[idx - 1].id if idx else None
+            self._write_archive(archive)
+            del collection.tasks[idx]
+        return archived
 
-        if not collection.tasks[idx].is_archived:
-            raise TaskNotArchivedError(f"task is not archived: {parsed_id}")
+    def restore_task(self, task_id: str) -> Task:
+        def change(task: Task) -> Task:
+            if not task.is_archived:
+                raise TaskNotArchivedError(f"task is not archived: {task.id}")
+            return task.restore()
 
-        collection.tasks[idx] = collection.tasks[idx].restore()
-        self.save_collection(collection)
-        return collection.tasks[idx]
+        if not self.tiered:
+            return self._update_task(task_id, change)
+        parsed_id = self._parse_id(task_id)
+        with self.transaction() as collection:
+            try:
+                idx = self._find_index(collection.tasks, parsed_id)
+            except TaskNotFoundError:
+                archive = self._read_archive()
+                restored = change(archive.tasks[self._find_index(archive.tasks, parsed_id)])
+                # Back in its old place; the copy left in the archive is now stale.
+                at = self._resume_index(collection.tasks, parsed_id, archive)
+                collection.tasks.insert(at, restored)
+                return restored
+            # Archived before archiving moved tasks out of the store.
+            collection.tasks[idx] = restored = change(collection.tasks[idx])
+        return restored
 
     def edit_task_title(self, task_id: str, new_title: str) -> Task:
-        parsed_id = self._parse_id(task_id)
-        collection = self.load_collection()
-        idx = self._find_index(collection.tasks, parsed_id)
-        task = collection.tasks[idx]
+        def change(task: Task) -> Task:
+            if task.is_archived:
+                raise TaskEditArchivedError(
+                    f"task is archived; restore before editing: {task.id}"
+                )
 
-        if task.is_archived:
-            raise TaskEditArchivedError(
-                f"task is archived; restore before editing: {parsed_id}"
-            )
+            try:
+                normalized_title = Task.normalize_title(new_title)
+            except ValueError as exc:
+                raise TaskValidationError(str(exc)) from exc
 
-        try:
-            normalized_title = Task.normalize_title(new_title)
-        except ValueError as exc:
-            raise TaskValidationError(str(exc)) from exc
+            return task.model_copy(update={"title": normalized_title})
 
-        collection.tasks[idx] = task.model_copy(update={"title": normalized_title})
-        self.save_collection(collection)
-        return collection.tasks[idx]
+        return self._update_task(task_id, change)
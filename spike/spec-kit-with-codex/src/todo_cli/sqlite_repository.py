@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from uuid import uuid4
+
+from pydantic import ValidationError
+
+from todo_cli.models import Task, TaskCollection
+from todo_cli.profiling import phase
+from todo_cli.repository import (
+    TaskNotFoundError,
+    TaskRepository,
+    TaskValidationError,
+)
+
+SQLITE_SUFFIXES = frozenset({".db", ".sqlite", ".sqlite3"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    is_completed INTEGER NOT NULL DEFAULT 0,
+    is_archived INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_active ON tasks (is_archived, is_completed);
+"""
+
+_COLUMNS = "id, title, is_completed, is_archived, created_at"
+
+_Row = tuple[str, str, int, int, str]
+
+
+def _to_row(task: Task) -> _Row:
+    return (
+        str(task.id),
+        task.title,
+        int(task.is_completed),
+        int(task.is_archived),
+        task.created_at.isoformat(),
+    )
+
+
+def _from_row(row: _Row) -> Task:
+    task_id, title, is_completed, is_archived, created_at = row
+    try:
+        return Task.model_validate(
+            {
+                "id": task_id,
+                "title": title,
+                "is_completed": bool(is_completed),
+                "is_archived": bool(is_archived),
+                "created_at": created_at,
+            }
+        )
+    except ValidationError as exc:
+        raise TaskValidationError(str(exc)) from exc
+
+
+class SqliteTaskRepository(TaskRepository):
+    """TaskRepository backed by an indexed SQLite database.
+
+    Point updates touch a single row through the primary key and
+    ``list_tasks`` is served by the ``(is_archived, is_completed)`` index,
+    so neither scales with the size of the store.
+    """
+
+    tiered = False
+
+    def __init__(self, storage_path: Path) -> None:
+        super().__init__(storage_path)
+        self._batch_conn: sqlite3.Connection | None = None
+        self._flush_every = 0
+        self._pending = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        self._ensure_parent_dir()
+        conn = sqlite3.connect(self.storage_path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    @contextmanager
+    def batch(self, flush_every: int = 0) -> Iterator[None]:
+        """Share one connection and commit once on exit (or every N writes)."""
+        conn = self._connect()
+        self._batch_conn, self._flush_every, self._pending = conn, flush_every, 0
+        try:
+            yield
+        finally:
+            self._batch_conn = None
+            conn.commit()
+            conn.close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if self._batch_conn is not None:
+            yield self._batch_conn
+            return
+        with closing(self._connect()) as conn:
+            yield conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes SQLite's write lock before the first read, so a
+        # read-modify-write in _update_task cannot interleave with another process.
+        conn = self._batch_conn
+        if conn is None:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("BEGIN IMMEDIATE")
+                yield conn
+            return
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        self._pending += 1
+        if self._flush_every and self._pending >= self._flush_every:
+            conn.commit()
+            self._pending = 0
+
+    def _select(
+        self, where: str = "", params: tuple[object, ...] = (), limit: int | None = None
+    ) -> Iterator[Task]:
+        # rowid preserves insertion order, matching the JSON backend.
+        query = f"SELECT {_COLUMNS} FROM tasks {where} ORDER BY rowid"
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (*params, limit)
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return (_from_row(row) for row in rows)
+
+    def load_collection(self) -> TaskCollection:
+        if not self.storage_path.exists():
+            return TaskCollection()
+        with phase("load"):
+            return TaskCollection(tasks=list(self._select()))
+
+    def save_collection(self, collection: TaskCollection) -> None:
+        with phase("save"), self._transaction() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.executemany(
+                f"INSERT INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (_to_row(task) for task in collection.tasks),
+            )
+
+    def add_task(self, title: str) -> Task:
+        try:
+            task = Task(id=uuid4(), title=title)
+        except ValidationError as exc:
+            raise TaskValidationError(str(exc)) from exc
+
+        with self._transaction() as conn:
+            conn.execute(
+                f"INSERT INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)", _to_row(task)
+            )
+        return task
+
+    def list_tasks(
+        self,
+        include_completed: bool = False,
+        *,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[Task]:
+        where = "WHERE is_archived = 0"
+        if not include_completed:
+            where += " AND is_completed = 0"
+        params: tuple[object, ...] = ()
+        if after is not None:
+            # Seek past the previous page through the rowid instead of OFFSET,
+            # which would read and discard every row before it.
+            parsed_id = self._parse_id(after)
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT rowid FROM tasks WHERE id = ?", (str(parsed_id),)
+                ).fetchone()
+            if row is None:
+                raise TaskNotFoundError(f"task not found: {parsed_id}")
+            where += " AND rowid > ?"
+            params = (row[0],)
+        with phase("load"):
+            return list(self._select(where, params, limit))
+
+    def import_tasks(self, tasks: Iterable[Task]) -> int:
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (_to_row(task) for task in tasks),
+            )
+            return conn.total_changes - before
+
+    def _update_task(self, task_id: str, change: Callable[[Task], Task]) -> Task:
+        parsed_id = self._parse_id(task_id)
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (str(parsed_id),)
+            ).fetchone()
+            if row is None:
+                raise TaskNotFoundError(f"task not found: {parsed_id}")
+            updated = change(_from_row(row))
+            conn.execute(
+                "UPDATE tasks SET title = ?, is_completed = ?, is_archived = ? WHERE id = ?",
+                (
+                    updated.title,
+                    int(updated.is_completed),
+                    int(updated.is_archived),
+                    str(parsed_id),
+                ),
+            )
+        return updated
+
+
+def is_sqlite_path(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
@@ -74,6 +74,21 @@ def test_invalid_or_unknown_id_returns_code_2(
     assert "invalid task id" in err or "task not found" in err
 
 
+def test_corrupt_binary_snapshot_returns_code_2(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    storage = tmp_path / "tasks.bin"
+    assert run(["--storage", str(storage), "add", "--title", "milk"]) == 0
+    storage.write_bytes(storage.read_bytes()[:-2])
+    capsys.readouterr()
+
+    code = run(["--storage", str(storage), "list"])
+    assert code == 2
+    err = capsys.readouterr().err
+    assert "truncated" in err
+    assert "unexpected error" not in err
+
+
 def test_archive_restore_contract(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
     storage = tmp_path / "tasks.json"
     assert run(["--storage", str(storage), "add", "--title", "t1"]) == 0
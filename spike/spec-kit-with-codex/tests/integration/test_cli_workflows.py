@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import io
+from datetime import UTC, datetime
 from pathlib import Path
+from uuid import uuid4
 
-from pytest import CaptureFixture
+from pytest import CaptureFixture, MonkeyPatch
 
 from todo_cli.cli import run
+from todo_cli.models import Task, TaskCollection
+from todo_cli.repository import TaskRepository, encode_json
 
 
 def test_add_then_list_default_shows_task(
@@ -123,3 +128,164 @@ def test_edit_failures_do_not_mutate_data(
     assert run(["--storage", str(storage), "list", "--all-active"]) == 0
     out = capsys.readouterr().out
     assert "safe" in out
+
+
+def test_sqlite_backend_workflow_and_json_import(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    json_storage = tmp_path / "tasks.json"
+    db_storage = tmp_path / "tasks.db"
+    assert run(["--storage", str(json_storage), "add", "--title", "from-json"]) == 0
+    json_id = capsys.readouterr().out.split("added:")[1].split("|")[0].strip()
+
+    assert run(["--storage", str(db_storage), "import-json", "--source", str(json_storage)]) == 0
+    assert capsys.readouterr().out.strip() == "imported: 1"
+
+    assert run(["--storage", str(db_storage), "add", "--title", "from-db"]) == 0
+    db_id = capsys.readouterr().out.split("added:")[1].split("|")[0].strip()
+    assert run(["--storage", str(db_storage), "complete", "--id", json_id]) == 0
+    capsys.readouterr()
+
+    assert run(["--storage", str(db_storage), "list"]) == 0
+    out = capsys.readouterr().out
+    assert db_id in out and json_id not in out
+
+    assert run(["--storage", str(db_storage), "list", "--all-active"]) == 0
+    out = capsys.readouterr().out
+    assert json_id in out and "completed=True" in out
+
+    # The JSON source is left untouched by the import.
+    assert run(["--storage", str(json_storage), "list"]) == 0
+    assert json_id in capsys.readouterr().out
+
+
+def test_backend_flag_overrides_suffix(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    storage = tmp_path / "tasks.store"
+    assert run(["--storage", str(storage), "--backend", "sqlite", "add", "--title", "t1"]) == 0
+    capsys.readouterr()
+    assert storage.read_bytes().startswith(b"SQLite format 3")
+    assert run(["--storage", str(storage), "--backend", "sqlite", "list"]) == 0
+    assert "t1" in capsys.readouterr().out
+
+
+def test_batch_runs_text_and_json_lines_with_single_write(
+    tmp_path: Path, capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
+) -> None:
+    storage = tmp_path / "tasks.json"
+    commands = "\n".join(
+        [
+            'add --title "first task"',
+            "# comments and blank lines are skipped",
+            "",
+            '{"command": "add", "title": "second"}',
+            "complete --id not-a-uuid",
+            "frobnicate",
+            '{"command": "list", "all_active": true}',
+        ]
+    )
+    monkeypatch.setattr("sys.stdin", io.StringIO(commands))
+    writes: list[int] = []
+    original_write = TaskRepository._write_collection
+
+    def counting_write(self: TaskRepository, collection: TaskCollection) -> None:
+        writes.append(len(collection.tasks))
+        original_write(self, collection)
+
+    monkeypatch.setattr(TaskRepository, "_write_collection", counting_write)
+
+    assert run(["--storage", str(storage), "batch"]) == 2
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("1: added:") and lines[0].endswith("| first task")
+    assert lines[1].startswith("4: added:")
+    assert lines[2] == "5: error: invalid task id: not-a-uuid"
+    assert lines[3].startswith("6: error:")
+    assert lines[4].startswith("7: ") and "first task" in lines[4]
+    assert lines[5].startswith("7: ") and "second" in lines[5]
+    assert lines[-1] == "batch: 3 succeeded, 2 failed"
+    assert writes == [2]
+
+
+def test_batch_flush_every_persists_periodically(
+    tmp_path: Path, capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
+) -> None:
+    storage = tmp_path / "tasks.db"
+    commands = "".join(f"add --title t{i}\n" for i in range(5))
+    monkeypatch.setattr("sys.stdin", io.StringIO(commands))
+
+    assert run(["--storage", str(storage), "batch", "--flush-every", "2"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == "batch: 5 succeeded, 0 failed"
+    assert run(["--storage", str(storage), "list"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 5
+
+
+def test_batch_rejects_nested_batch_and_bad_json(
+    tmp_path: Path, capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
+) -> None:
+    storage = tmp_path / "tasks.json"
+    commands = 'batch\n{"title": "x"}\n{not json\n[1]\nadd --title "unterminated\n'
+    monkeypatch.setattr("sys.stdin", io.StringIO(commands))
+
+    assert run(["--storage", str(storage), "batch"]) == 2
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "1: error: batch is not allowed in batch mode"
+    assert out[1] == '2: error: JSON line must be an object with a "command" key'
+    assert out[2].startswith("3: error: invalid JSON")
+    assert out[3].startswith("4: error:")
+    assert out[4].startswith("5: error:")
+    assert out[-1] == "batch: 0 succeeded, 5 failed"
+    assert not storage.exists()
+
+
+def test_verify_flag_rejects_invalid_store_with_matching_checksum(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    storage = tmp_path / "tasks.json"
+    invalid = Task.model_construct(id=uuid4(), title="   ", created_at=datetime.now(UTC))
+    storage.write_bytes(encode_json(TaskCollection.model_construct(tasks=[invalid])))
+
+    assert run(["--storage", str(storage), "list"]) == 0
+    assert run(["--storage", str(storage), "--verify", "list"]) == 2
+    assert "title must not be empty" in capsys.readouterr().err
+
+
+def test_list_limit_prints_next_page_cursor(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    storage = tmp_path / "tasks.json"
+    for i in range(3):
+        assert run(["--storage", str(storage), "add", "--title", f"t{i}"]) == 0
+    capsys.readouterr()
+
+    assert run(["--storage", str(storage), "list", "--limit", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" | ")[1] for line in lines[:2]] == ["t0", "t1"]
+    assert lines[2].startswith("next: --after ")
+    after = lines[2].removeprefix("next: --after ")
+
+    assert run(["--storage", str(storage), "list", "--limit", "2", "--after", after]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" | ")[1] for line in lines] == ["t2"]
+
+    assert run(["--storage", str(storage), "list", "--after", str(uuid4())]) == 2
+    assert "task not found" in capsys.readouterr().err
+
+
+def test_profile_reports_phases_on_stderr(
+    tmp_path: Path, capsys: CaptureFixture[str], monkeypatch: MonkeyPatch
+) -> None:
+    storage = tmp_path / "tasks.json"
+    assert run(["--storage", str(storage), "add", "--title", "t1"]) == 0
+    capsys.readouterr()
+
+    assert run(["--storage", str(storage), "--profile", "list"]) == 0
+    captured = capsys.readouterr()
+    assert "t1" in captured.out
+    phases = [line.split()[0] for line in captured.err.splitlines()[1:]]
+    assert phases[:2] == ["startup", "command"]
+    assert "load" in phases and phases[-2:] == ["render", "total"]
+
+    trace = tmp_path / "trace.json"
+    monkeypatch.setenv("TODO_PROFILE", str(trace))
+    assert run(["--storage", str(storage), "list"]) == 0
+    assert capsys.readouterr().err == ""
+    assert "command" in trace.read_text(encoding="utf-8")
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pytest import MonkeyPatch
+
+from todo_cli.app import create_repository
+from todo_cli.locking import locked, read_version
+from todo_cli.models import TaskCollection
+from todo_cli.repository import TaskRepository
+
+WORKERS = 4
+UPDATES = 25
+
+
+def _add_worker(storage: Path, worker: int) -> None:
+    repo = create_repository(storage)
+    for i in range(UPDATES):
+        repo.add_task(f"w{worker}-{i}")
+
+
+def _batch_worker(storage: Path, worker: int) -> None:
+    repo = create_repository(storage)
+    with repo.batch():
+        for i in range(UPDATES):
+            repo.add_task(f"w{worker}-{i}")
+
+
+def _complete_worker(storage: Path, worker: int) -> None:
+    repo = create_repository(storage)
+    ids = [str(task.id) for task in repo.load_collection().tasks]
+    for task_id in ids[worker::WORKERS]:
+        repo.complete_task(task_id)
+
+
+def _increment_worker(storage: Path, worker: int) -> None:
+    # Every worker increments the same counter kept in the task title.
+    repo = TaskRepository(storage)
+    for _ in range(UPDATES):
+        with repo.transaction() as collection:
+            task = collection.tasks[0]
+            collection.tasks[0] = task.model_copy(update={"title": str(int(task.title) + 1)})
+
+
+def _run_workers(target: Callable[[Path, int], None], storage: Path) -> None:
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=(storage, n)) for n in range(WORKERS)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db", "tasks.rec"])
+@pytest.mark.parametrize("worker", [_add_worker, _batch_worker])
+def test_parallel_writers_do_not_lose_tasks(
+    tmp_path: Path, name: str, worker: Callable[[Path, int], None]
+) -> None:
+    storage = tmp_path / name
+    _run_workers(worker, storage)
+
+    titles = {task.title for task in create_repository(storage).load_collection().tasks}
+    assert titles == {f"w{n}-{i}" for n in range(WORKERS) for i in range(UPDATES)}
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db", "tasks.rec"])
+def test_parallel_point_updates(tmp_path: Path, name: str) -> None:
+    storage = tmp_path / name
+    repo = create_repository(storage)
+    with repo.batch():
+        for i in range(WORKERS * UPDATES):
+            repo.add_task(f"t{i}")
+    _run_workers(_complete_worker, storage)
+
+    assert create_repository(storage).list_tasks() == []
+    assert len(create_repository(storage).list_tasks(include_completed=True)) == WORKERS * UPDATES
+
+
+def test_parallel_transactions_on_same_task(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    TaskRepository(storage).add_task("0")
+    _run_workers(_increment_worker, storage)
+
+    title = TaskRepository(storage).load_collection().tasks[0].title
+    assert title == str(WORKERS * UPDATES)
+
+
+def test_failed_write_keeps_previous_file(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    repo.add_task("keep me")
+    before = storage.read_bytes()
+    assert read_version(storage) == 1
+
+    def broken_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        repo.save_collection(TaskCollection())
+
+    assert storage.read_bytes() == before
+    assert read_version(storage) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["tasks.json", "tasks.json.lock"]
+
+
+def test_shared_lock_cannot_be_upgraded(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    with locked(storage, shared=True):
+        with pytest.raises(RuntimeError):
+            with locked(storage):
+                pass
@@ -0,0 +1,67 @@
+"""Cold-start budget for the `todo` entry point.
+
+Each command runs in a fresh interpreter; the best of several runs is
+compared with the budget so that a slow first run (disk cache) does not
+fail the suite. Budgets can be raised on slow machines with
+``TODO_STARTUP_BUDGET_SCALE``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+RUNS = 5
+BUDGET_SCALE = float(os.environ.get("TODO_STARTUP_BUDGET_SCALE", "1"))
+
+# Runs the CLI and reports which modules were imported on the way.
+_PROBE = """
+import json, sys
+from todo_cli.cli import run
+try:
+    run(sys.argv[1:])
+finally:
+    sys.stderr.write("\\n" + json.dumps(sorted(sys.modules)))
+"""
+
+
+def _launch(tmp_path: Path, *argv: str) -> tuple[float, set[str]]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    best = float("inf")
+    modules: set[str] = set()
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE, *argv],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        best = min(best, time.perf_counter() - started)
+        modules = set(json.loads(result.stderr.splitlines()[-1]))
+    return best, modules
+
+
+def test_help_does_not_import_pydantic(tmp_path: Path) -> None:
+    elapsed, modules = _launch(tmp_path, "--help")
+
+    assert "pydantic" not in modules
+    assert "todo_cli.models" not in modules
+    assert elapsed < 0.5 * BUDGET_SCALE
+
+
+@pytest.mark.parametrize("storage", ["tasks.json", "tasks.db"])
+def test_list_on_empty_store_within_budget(tmp_path: Path, storage: str) -> None:
+    elapsed, modules = _launch(tmp_path, "--storage", storage, "list")
+
+    assert "todo_cli.repository" in modules
+    assert elapsed < 1.0 * BUDGET_SCALE
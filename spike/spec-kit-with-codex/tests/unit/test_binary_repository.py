@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from todo_cli.app import TodoApp, create_repository
+from todo_cli import binary_repository
+from todo_cli.binary_repository import (
+    MAGIC,
+    SCHEMA_VERSION,
+    BinaryTaskRepository,
+    decode_collection,
+    encode_collection,
+)
+from todo_cli.errors import TaskStorageFormatError, TaskValidationError
+from todo_cli.models import Task, TaskCollection
+from todo_cli.repository import TaskRepository
+
+
+def _sample_collection() -> TaskCollection:
+    return TaskCollection(
+        tasks=[
+            Task(id=uuid4(), title="牛乳を買う", created_at=datetime.now(UTC)),
+            Task(
+                id=uuid4(),
+                title="done",
+                is_completed=True,
+                created_at=datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone(timedelta(hours=9))),
+            ),
+            Task(
+                id=uuid4(),
+                title="archived",
+                is_completed=True,
+                is_archived=True,
+                created_at=datetime(1969, 12, 31, 23, 59, 59, tzinfo=timezone(timedelta(hours=-5, minutes=-30))),
+            ),
+            Task(id=uuid4(), title="naive", created_at=datetime(2026, 2, 3, 4, 5, 6)),
+        ]
+    )
+
+
+def test_create_repository_infers_binary_from_suffix(tmp_path: Path) -> None:
+    assert isinstance(create_repository(tmp_path / "tasks.bin"), BinaryTaskRepository)
+    assert isinstance(create_repository(tmp_path / "tasks.json", backend="binary"), BinaryTaskRepository)
+
+
+def test_round_trip_is_lossless(tmp_path: Path) -> None:
+    collection = _sample_collection()
+    decoded = decode_collection(encode_collection(collection))
+
+    assert decoded == collection
+    assert decoded.model_dump(mode="json") == collection.model_dump(mode="json")
+    assert decoded.tasks[3].created_at.tzinfo is None
+
+
+def test_header_and_size(tmp_path: Path) -> None:
+    collection = _sample_collection()
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    repo.save_collection(collection)
+    TaskRepository(tmp_path / "tasks.json").save_collection(collection)
+
+    data = repo.storage_path.read_bytes()
+    assert data[:4] == MAGIC
+    assert struct.unpack_from("<HxxI", data, 4) == (SCHEMA_VERSION, 4)
+    assert data[12:44] == hashlib.sha256(data[44:]).digest()
+    assert len(data) * 3 < (tmp_path / "tasks.json").stat().st_size
+    assert repo.load_collection() == collection
+
+
+def test_repository_operations_use_binary_store(tmp_path: Path) -> None:
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    t1 = repo.add_task("task1")
+    t2 = repo.add_task("task2")
+    repo.complete_task(str(t2.id))
+    repo.archive_task(str(t1.id))
+    repo.restore_task(str(t1.id))
+    repo.edit_task_title(str(t1.id), "  renamed  ")
+
+    reloaded = BinaryTaskRepository(repo.storage_path).load_collection().tasks
+    assert [(t.id, t.title, t.is_completed, t.is_archived) for t in reloaded] == [
+        (t1.id, "renamed", False, False),
+        (t2.id, "task2", True, False),
+    ]
+
+
+def test_list_tasks_skips_hidden_records(tmp_path: Path) -> None:
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    assert repo.list_tasks() == []
+    collection = _sample_collection()
+    repo.save_collection(collection)
+
+    assert repo.list_tasks() == [collection.tasks[0], collection.tasks[3]]
+    assert repo.list_tasks(include_completed=True) == [
+        collection.tasks[0],
+        collection.tasks[1],
+        collection.tasks[3],
+    ]
+    with repo.batch():
+        repo.add_task("in batch")
+        assert [t.title for t in repo.list_tasks()] == ["牛乳を買う", "naive", "in batch"]
+
+
+def test_convert_json_to_binary_and_back(tmp_path: Path) -> None:
+    source = tmp_path / "tasks.json"
+    TaskRepository(source).save_collection(_sample_collection())
+
+    assert TodoApp(tmp_path / "tasks.bin").import_json(source) == 4
+    assert TodoApp(tmp_path / "back.json").import_json(tmp_path / "tasks.bin") == 4
+
+    assert json.loads((tmp_path / "back.json").read_text(encoding="utf-8")) == json.loads(
+        source.read_text(encoding="utf-8")
+    )
+
+
+@pytest.mark.parametrize(
+    ("mutate", "message"),
+    [
+        (lambda data: b"JSON" + data[4:], "not a binary"),
+        (lambda data: data[:4] + struct.pack("<H", 99) + data[6:], "schema version"),
+        (lambda data: data[:-3], "truncated"),
+        (lambda data: data[:10], "truncated"),
+        (lambda data: data + b"\x00", "trailing"),
+        (lambda data: data[:44] + struct.pack("<I", 3) + data[48:], "record length"),
+    ],
+)
+def test_corrupt_snapshot_raises_format_error(mutate, message: str) -> None:  # type: ignore[no-untyped-def]
+    data = encode_collection(_sample_collection())
+    with pytest.raises(TaskStorageFormatError, match=message):
+        decode_collection(mutate(data))
+
+
+def test_invalid_title_raises_validation_error() -> None:
+    # Editing a record breaks the checksum, so the snapshot is validated.
+    data = bytearray(encode_collection(TaskCollection(tasks=[Task(id=uuid4(), title="x")])))
+    data[-1:] = b" "
+    with pytest.raises(TaskValidationError):
+        decode_collection(bytes(data))
+    data[-1:] = b"\xff"
+    with pytest.raises(TaskStorageFormatError, match="encoding"):
+        decode_collection(bytes(data))
+
+
+def test_checksummed_snapshot_is_trusted(monkeypatch: pytest.MonkeyPatch) -> None:
+    collection = _sample_collection()
+    data = encode_collection(collection)
+    validated: list[bool] = []
+    original = binary_repository._validated
+
+    def spy(rows):  # type: ignore[no-untyped-def]
+        validated.append(True)
+        return original(rows)
+
+    monkeypatch.setattr(binary_repository, "_validated", spy)
+    assert decode_collection(data) == collection
+    assert validated == []
+    assert decode_collection(data, verify=True) == collection
+    assert validated == [True]
+
+
+def test_edited_title_is_normalized_when_checksum_mismatches() -> None:
+    data = bytearray(encode_collection(TaskCollection(tasks=[Task(id=uuid4(), title="xy")])))
+    data[-2:] = b"z "
+    assert decode_collection(bytes(data)).tasks[0].title == "z"
+
+
+def test_version_1_snapshot_is_validated() -> None:
+    collection = _sample_collection()
+    data = encode_collection(collection)
+    old = struct.pack("<4sHxxI", MAGIC, 1, len(collection.tasks)) + data[44:]
+    assert decode_collection(old) == collection
+    assert decode_collection(old[:-1] + b" ").tasks[3].title == "naiv"
+
+
+def test_decoded_ids_match_uuid_from_bytes() -> None:
+    collection = _sample_collection()
+    decoded = decode_collection(encode_collection(collection))
+    for task, original in zip(decoded.tasks, collection.tasks, strict=True):
+        assert task.id == original.id
+        assert hash(task.id) == hash(original.id)
+        assert str(task.id) == str(original.id)
+        assert task.id.version == 4
+    assert decoded.model_fields_set == {"tasks"}
+    assert decoded.tasks[0].model_fields_set == set(Task.model_fields)
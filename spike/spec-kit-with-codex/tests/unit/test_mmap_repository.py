@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from todo_cli.app import TodoApp, create_repository
+from todo_cli.errors import (
+    TaskAlreadyArchivedError,
+    TaskNotFoundError,
+    TaskStorageFormatError,
+    TaskValidationError,
+)
+from todo_cli.mmap_repository import MmapTaskRepository, _Mapped, heap_path, slots_path
+from todo_cli.models import TaskCollection
+from todo_cli.repository import TaskRepository
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> MmapTaskRepository:
+    return MmapTaskRepository(tmp_path / "tasks.rec")
+
+
+def _changed_bytes(before: bytes, after: bytes) -> list[int]:
+    assert len(before) == len(after)
+    return [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+
+
+def test_create_repository_infers_mmap_from_suffix(tmp_path: Path) -> None:
+    assert isinstance(create_repository(tmp_path / "tasks.rec"), MmapTaskRepository)
+    assert isinstance(create_repository(tmp_path / "tasks.json", backend="mmap"), MmapTaskRepository)
+
+
+def test_empty_store(repo: MmapTaskRepository) -> None:
+    assert repo.load_collection().tasks == []
+    assert repo.list_tasks() == []
+    with pytest.raises(TaskNotFoundError):
+        repo.complete_task("cb5f4da4-8ba6-4ce9-9b58-849534f4f5d3")
+
+
+def test_operations_persist(repo: MmapTaskRepository) -> None:
+    t1 = repo.add_task("task1")
+    t2 = repo.add_task("  task2 ")
+    t3 = repo.add_task("タスク3")
+    repo.complete_task(str(t2.id))
+    repo.archive_task(str(t3.id))
+    with pytest.raises(TaskAlreadyArchivedError):
+        repo.archive_task(str(t3.id))
+    with pytest.raises(TaskValidationError):
+        repo.add_task(" ")
+
+    reloaded = MmapTaskRepository(repo.storage_path)
+    assert [t.id for t in reloaded.list_tasks()] == [t1.id]
+    assert [t.id for t in reloaded.list_tasks(include_completed=True)] == [t1.id, t2.id]
+    assert [(t.title, t.is_completed, t.is_archived) for t in reloaded.load_collection().tasks] == [
+        ("task1", False, False),
+        ("task2", True, False),
+        ("タスク3", False, True),
+    ]
+    assert reloaded.restore_task(str(t3.id)).is_archived is False
+    assert reloaded.load_collection().tasks[2].created_at == t3.created_at
+
+
+def test_status_change_writes_one_byte(repo: MmapTaskRepository) -> None:
+    tasks = [repo.add_task(f"task{i}") for i in range(5)]
+    before = repo.storage_path.read_bytes()
+    heap_before = heap_path(repo.storage_path).read_bytes()
+
+    repo.complete_task(str(tasks[3].id))
+    assert len(_changed_bytes(before, repo.storage_path.read_bytes())) == 1
+    repo.archive_task(str(tasks[3].id))
+    repo.restore_task(str(tasks[3].id))
+    assert repo.storage_path.read_bytes() == before
+    assert heap_path(repo.storage_path).read_bytes() == heap_before
+
+
+def test_edit_appends_title_and_repoints_record(repo: MmapTaskRepository) -> None:
+    task = repo.add_task("old")
+    before = repo.storage_path.read_bytes()
+
+    assert repo.edit_task_title(str(task.id), " new title ").title == "new title"
+
+    assert 0 < len(_changed_bytes(before, repo.storage_path.read_bytes())) <= 12
+    assert heap_path(repo.storage_path).read_bytes().endswith(b"oldnew title")
+    assert MmapTaskRepository(repo.storage_path).load_collection().tasks[0].title == "new title"
+
+
+def test_index_follows_appends_and_rewrites(repo: MmapTaskRepository) -> None:
+    first = repo.add_task("first")
+    repo.complete_task(str(first.id))
+
+    other = MmapTaskRepository(repo.storage_path)
+    second = other.add_task("second")
+    assert repo.complete_task(str(second.id)).title == "second"
+
+    collection = repo.load_collection()
+    other.save_collection(TaskCollection(tasks=list(reversed(collection.tasks))))
+    assert repo.reopen_task(str(first.id)).title == "first"
+    assert [(t.title, t.is_completed) for t in repo.load_collection().tasks] == [
+        ("second", True),
+        ("first", False),
+    ]
+
+
+def _fail_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    def scan(self: _Mapped, raw_id: bytes) -> int | None:
+        raise AssertionError("scanned the records")
+
+    monkeypatch.setattr(_Mapped, "_scan", scan)
+
+
+def test_lookups_use_persisted_index(repo: MmapTaskRepository, monkeypatch: pytest.MonkeyPatch) -> None:
+    # More tasks than the smallest table holds, so appends grow it.
+    tasks = [repo.add_task(f"task{i}") for i in range(150)]
+    _fail_scan(monkeypatch)
+
+    fresh = MmapTaskRepository(repo.storage_path)
+    for task in tasks[::7]:
+        assert fresh.complete_task(str(task.id)).title == task.title
+    page = fresh.list_tasks(include_completed=True, after=str(tasks[99].id), limit=2)
+    assert [t.id for t in page] == [tasks[100].id, tasks[101].id]
+
+    repo.save_collection(TaskCollection(tasks=list(reversed(repo.load_collection().tasks))))
+    assert MmapTaskRepository(repo.storage_path).reopen_task(str(tasks[0].id)).title == "task0"
+    with pytest.raises(TaskNotFoundError):
+        fresh.complete_task("cb5f4da4-8ba6-4ce9-9b58-849534f4f5d3")
+
+
+def test_stale_index_is_scanned_then_rebuilt(
+    repo: MmapTaskRepository, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    tasks = [repo.add_task(f"task{i}") for i in range(3)]
+    slots_path(repo.storage_path).unlink()
+    assert [t.id for t in repo.list_tasks(after=str(tasks[0].id))] == [tasks[1].id, tasks[2].id]
+
+    # An index written for another record file is stale too.
+    other = MmapTaskRepository(tmp_path / "other.rec")
+    other.add_task("other")
+    slots_path(repo.storage_path).write_bytes(slots_path(other.storage_path).read_bytes())
+    repo.complete_task(str(tasks[1].id))
+
+    _fail_scan(monkeypatch)
+    assert repo.archive_task(str(tasks[2].id)).is_archived
+
+
+def test_append_missing_from_index_is_found(
+    repo: MmapTaskRepository, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = repo.add_task("first")
+    # A crash after the record count is committed but before the index is updated.
+    with monkeypatch.context() as crashed:
+        crashed.setattr(_Mapped, "index_appended", lambda self, raw_id: None)
+        second = repo.add_task("second")
+
+    _fail_scan(monkeypatch)
+    fresh = MmapTaskRepository(repo.storage_path)
+    assert [t.id for t in fresh.list_tasks(after=str(first.id))] == [second.id]
+    assert fresh.complete_task(str(second.id)).is_completed
+    third = fresh.add_task("third")
+    assert fresh.complete_task(str(third.id)).is_completed
+
+
+def test_batch_and_import_rewrite_store(tmp_path: Path, repo: MmapTaskRepository) -> None:
+    with repo.batch():
+        for i in range(3):
+            repo.add_task(f"batched{i}")
+        assert len(repo.list_tasks()) == 3
+        repo.complete_task(str(repo.list_tasks()[0].id))
+    assert [t.title for t in repo.list_tasks()] == ["batched1", "batched2"]
+
+    source = tmp_path / "tasks.json"
+    TaskRepository(source).add_task("imported")
+    assert TodoApp(repo.storage_path).import_json(source) == 1
+    assert [t.title for t in repo.list_tasks()] == ["batched1", "batched2", "imported"]
+
+
+def test_mismatched_heap_is_reported(repo: MmapTaskRepository, tmp_path: Path) -> None:
+    repo.add_task("task")
+    other = MmapTaskRepository(tmp_path / "other.rec")
+    other.add_task("other")
+    heap_path(repo.storage_path).write_bytes(heap_path(other.storage_path).read_bytes())
+
+    with pytest.raises(TaskStorageFormatError, match="heap"):
+        repo.load_collection()
+
+
+def test_corrupt_header_is_reported(repo: MmapTaskRepository) -> None:
+    repo.add_task("task")
+    data = bytearray(repo.storage_path.read_bytes())
+    repo.storage_path.write_bytes(b"XXXX" + data[4:])
+    with pytest.raises(TaskStorageFormatError, match="not a task record"):
+        repo.list_tasks()
+
+    data[8] = 9
+    repo.storage_path.write_bytes(bytes(data))
+    with pytest.raises(TaskStorageFormatError, match="truncated"):
+        repo.list_tasks()
+
+    data[4] = 2
+    repo.storage_path.write_bytes(bytes(data))
+    with pytest.raises(TaskStorageFormatError, match="schema version"):
+        repo.list_tasks()
+
+
+def test_missing_heap_is_reported(repo: MmapTaskRepository) -> None:
+    repo.add_task("task")
+    heap_path(repo.storage_path).unlink()
+
+    with pytest.raises(TaskStorageFormatError, match="heap is missing"):
+        repo.list_tasks()
+    with pytest.raises(TaskStorageFormatError, match="heap is missing"):
+        repo.add_task("another")
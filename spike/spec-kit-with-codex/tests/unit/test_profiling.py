@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+from pytest import CaptureFixture
+
+from todo_cli import profiling
+from todo_cli.repository import TaskRepository
+
+
+@pytest.fixture(autouse=True)
+def _no_profiler() -> object:
+    yield
+    profiling.finish()
+
+
+def test_phase_is_a_no_op_when_disabled() -> None:
+    assert profiling.phase("load") is profiling.phase("save")
+    with profiling.phase("load"):
+        pass
+    profiling.end_startup()
+
+
+def test_summary_nests_phases_and_reports_self_time(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    repo = TaskRepository(tmp_path / "tasks.json")
+    repo.add_task("task")
+
+    profiling.enable()
+    profiling.end_startup()
+    with profiling.phase("command"):
+        repo.list_tasks()
+    profiling.finish()
+
+    lines = capsys.readouterr().err.splitlines()
+    names = [line.split()[0] for line in lines[1:]]
+    assert names == ["startup", "command", "load", "validate", "total"]
+    assert lines[3].startswith("    load")
+    assert lines[4].startswith("      validate")
+    command_total, command_self = map(float, lines[2].split()[1:])
+    assert command_self <= command_total
+
+
+def test_trace_and_cprofile_files(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    repo = TaskRepository(tmp_path / "tasks.json")
+    repo.add_task("task")
+    storage = repo.storage_path
+    storage.write_bytes(storage.read_bytes().replace(b'"task"', b'"edited"'))
+
+    trace, dump = tmp_path / "trace.json", tmp_path / "cli.prof"
+    profiling.enable(trace, dump)
+    repo.complete_task(str(repo.list_tasks()[0].id))
+    profiling.finish()
+
+    assert capsys.readouterr().err == ""
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    assert [e["name"] for e in events] == ["load", "parse", "validate", "load", "parse", "validate", "save"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert pstats.Stats(str(dump)).stats  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize(
+    ("environ", "expected"),
+    [
+        ({}, (False, None, None)),
+        ({"TODO_PROFILE": "0"}, (False, None, None)),
+        ({"TODO_PROFILE": "1"}, (True, None, None)),
+        ({"TODO_PROFILE": "out.json"}, (True, Path("out.json"), None)),
+        ({"TODO_PROFILE_CPROFILE": "cli.prof"}, (True, None, Path("cli.prof"))),
+    ],
+)
+def test_from_environment(
+    environ: dict[str, str], expected: tuple[bool, Path | None, Path | None]
+) -> None:
+    assert profiling.from_environment(environ) == expected
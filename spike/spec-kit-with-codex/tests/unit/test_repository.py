@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import json
+from datetime import UTC, datetime, timedelta, timezone
 from pathlib import Path
+from uuid import UUID, uuid4
 
 import pytest
 
+from todo_cli.app import create_repository
+from todo_cli.models import Task, TaskCollection
 from todo_cli.repository import (
     InvalidTaskIdError,
     TaskAlreadyArchivedError,
@@ -11,7 +16,11 @@ from todo_cli.repository import (
     TaskNotArchivedError,
     TaskNotFoundError,
     TaskRepository,
+    JSON_FORMAT_VERSION,
     TaskValidationError,
+    archive_path,
+    encode_json,
+    is_trusted,
 )
 
 
@@ -101,3 +110,236 @@ def test_edit_task_title_invalid_input_raises_validation(tmp_path: Path) -> None
         repo.edit_task_title(str(task.id), "   ")
     with pytest.raises(TaskValidationError):
         repo.edit_task_title(str(task.id), "x" * 256)
+
+
+def test_batch_defers_writes_until_exit(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    with repo.batch():
+        task = repo.add_task("task1")
+        repo.complete_task(str(task.id))
+        assert not storage.exists()
+        assert [t.id for t in repo.list_tasks(include_completed=True)] == [task.id]
+    assert TaskRepository(storage).load_collection().tasks[0].is_completed is True
+
+
+def test_batch_flush_every_writes_periodically(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    with repo.batch(flush_every=2):
+        repo.add_task("task1")
+        assert not storage.exists()
+        repo.add_task("task2")
+        assert len(TaskRepository(storage).load_collection().tasks) == 2
+        repo.add_task("task3")
+        assert len(TaskRepository(storage).load_collection().tasks) == 2
+    assert len(TaskRepository(storage).load_collection().tasks) == 3
+
+
+def _sample_collection() -> TaskCollection:
+    return TaskCollection(
+        tasks=[
+            Task(id=uuid4(), title="plain"),
+            Task(id=uuid4(), title="日本語 ✓", is_completed=True),
+            Task(id=uuid4(), title="archived", is_archived=True, is_completed=True),
+            Task(id=uuid4(), title="naive", created_at=datetime(2024, 1, 2, 3, 4, 5, 6)),
+            Task(
+                id=uuid4(),
+                title="offset",
+                created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=9))),
+            ),
+        ]
+    )
+
+
+def test_trusted_load_matches_validated_load(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    collection = _sample_collection()
+    TaskRepository(storage).save_collection(collection)
+
+    assert is_trusted(storage.read_bytes())
+    trusted = TaskRepository(storage).load_collection()
+    verified = TaskRepository(storage, verify=True).load_collection()
+    assert trusted == verified == collection
+    assert [task.created_at.utcoffset() for task in trusted.tasks] == [
+        task.created_at.utcoffset() for task in collection.tasks
+    ]
+
+
+def test_edited_or_legacy_file_is_validated(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    task = repo.add_task("before")
+
+    # Edited by hand: the checksum no longer matches, so the title is normalized.
+    storage.write_bytes(storage.read_bytes().replace(b'"before"', b'"  after  "'))
+    assert not is_trusted(storage.read_bytes())
+    assert [t.title for t in repo.load_collection().tasks] == ["after"]
+
+    storage.write_bytes(storage.read_bytes().replace(b'"  after  "', b'"   "'))
+    with pytest.raises(TaskValidationError):
+        repo.load_collection()
+
+    future = storage.read_bytes().replace(
+        b'"format_version": %d' % JSON_FORMAT_VERSION, b'"format_version": 99'
+    )
+    assert not is_trusted(future)
+
+    # Written before the checksum header existed.
+    storage.write_text(json.dumps({"tasks": [task.model_dump(mode="json")]}), encoding="utf-8")
+    assert repo.load_collection().tasks == [task]
+
+
+def test_verify_validates_even_when_checksum_matches(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    invalid = Task.model_construct(id=uuid4(), title="   ", created_at=datetime.now(UTC))
+    storage.write_bytes(encode_json(TaskCollection.model_construct(tasks=[invalid])))
+
+    assert TaskRepository(storage).load_collection().tasks[0].title == "   "
+    with pytest.raises(TaskValidationError):
+        TaskRepository(storage, verify=True).load_collection()
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db", "tasks.bin", "tasks.rec"])
+def test_list_pages_resume_after_cursor(tmp_path: Path, name: str) -> None:
+    repo = create_repository(tmp_path / name)
+    with repo.batch():
+        tasks = [repo.add_task(f"task{i}") for i in range(10)]
+    repo.complete_task(str(tasks[1].id))
+    repo.archive_task(str(tasks[6].id))
+    visible = [t.id for t in tasks if t.id not in (tasks[1].id, tasks[6].id)]
+
+    pages: list[list[UUID]] = []
+    after = None
+    while True:
+        page = repo.list_tasks(after=after, limit=3)
+        pages.append([t.id for t in page])
+        if len(page) < 3:
+            break
+        after = str(page[-1].id)
+    assert [i for page in pages for i in page] == visible
+    assert [len(page) for page in pages] == [3, 3, 2]
+
+    # The cursor task may be hidden (or its successors changed) between pages.
+    repo.complete_task(str(tasks[3].id))
+    assert [t.id for t in repo.list_tasks(after=str(tasks[3].id), limit=2)] == [
+        tasks[4].id,
+        tasks[5].id,
+    ]
+    assert [t.id for t in repo.list_tasks(True, after=str(tasks[0].id), limit=2)] == [
+        tasks[1].id,
+        tasks[2].id,
+    ]
+    assert repo.list_tasks(after=str(tasks[-1].id)) == []
+
+    with pytest.raises(TaskNotFoundError):
+        repo.list_tasks(after=str(uuid4()))
+    with pytest.raises(InvalidTaskIdError):
+        repo.list_tasks(after="not-a-uuid")
+    with repo.batch():
+        assert [t.id for t in repo.list_tasks(after=str(tasks[7].id))] == [tasks[8].id, tasks[9].id]
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db", "tasks.bin", "tasks.rec"])
+def test_list_resumes_after_archived_cursor_task(tmp_path: Path, name: str) -> None:
+    repo = create_repository(tmp_path / name)
+    tasks = [repo.add_task(f"task{i}") for i in range(6)]
+    repo.archive_task(str(tasks[2].id))
+    repo.archive_task(str(tasks[1].id))
+    assert [t.id for t in repo.list_tasks(after=str(tasks[2].id))] == [t.id for t in tasks[3:]]
+    assert [t.id for t in repo.list_tasks(after=str(tasks[1].id), limit=1)] == [tasks[3].id]
+    repo.archive_task(str(tasks[0].id))
+    assert [t.id for t in repo.list_tasks(after=str(tasks[1].id), limit=1)] == [tasks[3].id]
+
+
+def test_archive_moves_task_out_of_the_store(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    tasks = [repo.add_task(f"task{i}") for i in range(3)]
+    repo.archive_task(str(tasks[1].id))
+
+    assert [t.id for t in TaskRepository(storage).load_collection().tasks] == [
+        tasks[0].id,
+        tasks[2].id,
+    ]
+    archived = json.loads(archive_path(storage).read_text(encoding="utf-8"))
+    assert [t["id"] for t in archived["tasks"]] == [str(tasks[1].id)]
+    assert archived["anchors"] == {str(tasks[1].id): str(tasks[0].id)}
+    assert is_trusted(archive_path(storage).read_bytes())
+
+    # Active tasks never read the archive, even when it is unreadable.
+    archive_path(storage).write_bytes(b"{")
+    repo.complete_task(str(tasks[2].id))
+    assert [t.id for t in repo.list_tasks(include_completed=True)] == [tasks[0].id, tasks[2].id]
+    with pytest.raises(json.JSONDecodeError):
+        repo.restore_task(str(tasks[1].id))
+
+
+def test_restore_returns_task_to_its_place(tmp_path: Path) -> None:
+    repo = TaskRepository(tmp_path / "tasks.json")
+    tasks = [repo.add_task(f"task{i}") for i in range(4)]
+    for task in (tasks[0], tasks[2], tasks[1]):
+        repo.archive_task(str(task.id))
+    repo.complete_task(str(tasks[2].id))
+    assert repo.load_collection().tasks == [tasks[3]]
+
+    # Each task goes back behind the task it followed when it was archived.
+    repo.restore_task(str(tasks[1].id))
+    restored = repo.restore_task(str(tasks[2].id))
+    assert restored.is_archived is False
+    assert restored.is_completed is False
+    assert [t.id for t in repo.list_tasks()] == [tasks[1].id, tasks[2].id, tasks[3].id]
+    repo.restore_task(str(tasks[0].id))
+    assert [t.id for t in repo.list_tasks()] == [t.id for t in tasks]
+    with pytest.raises(TaskNotArchivedError):
+        repo.restore_task(str(tasks[1].id))
+
+
+def test_store_copy_wins_over_stale_archive_copy(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    task = repo.add_task("task")
+    other = repo.add_task("other")
+    repo.archive_task(str(task.id))
+    repo.restore_task(str(task.id))
+    # The restored task is still in the archive file until the archive is rewritten.
+    assert str(task.id) in archive_path(storage).read_text(encoding="utf-8")
+    assert [t.id for t in repo.export_tasks()] == [task.id, other.id]
+
+    repo.archive_task(str(other.id))
+    archived = TaskRepository(archive_path(storage)).load_collection().tasks
+    assert [t.id for t in archived] == [other.id]
+    repo.archive_task(str(task.id))
+    with pytest.raises(TaskAlreadyArchivedError):
+        repo.archive_task(str(task.id))
+    assert [t.id for t in repo.export_tasks()] == [other.id, task.id]
+
+
+def test_archived_tasks_left_in_the_store_still_work(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    legacy = _sample_collection()
+    TaskRepository(storage).save_collection(legacy)
+    repo = TaskRepository(storage)
+    archived = next(t for t in legacy.tasks if t.is_archived)
+
+    assert archived.id not in [t.id for t in repo.list_tasks(include_completed=True)]
+    with pytest.raises(TaskAlreadyArchivedError):
+        repo.archive_task(str(archived.id))
+    assert repo.restore_task(str(archived.id)).is_archived is False
+    assert not archive_path(storage).exists()
+
+
+def test_archive_and_restore_in_batch(tmp_path: Path) -> None:
+    storage = tmp_path / "tasks.json"
+    repo = TaskRepository(storage)
+    tasks = [repo.add_task(f"task{i}") for i in range(3)]
+    with repo.batch():
+        repo.archive_task(str(tasks[0].id))
+        repo.archive_task(str(tasks[1].id))
+        # The archive is written right away, before the store is.
+        assert len(TaskRepository(archive_path(storage)).load_collection().tasks) == 2
+        assert len(TaskRepository(storage).load_collection().tasks) == 3
+        repo.restore_task(str(tasks[0].id))
+        repo.archive_task(str(tasks[2].id))
+    assert [t.id for t in repo.list_tasks()] == [tasks[0].id]
+    assert [t.id for t in repo.export_tasks()] == [tasks[0].id, tasks[1].id, tasks[2].id]
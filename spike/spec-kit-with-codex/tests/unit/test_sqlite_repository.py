@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from todo_cli.app import create_repository
+from todo_cli.models import Task, TaskCollection
+from todo_cli.repository import (
+    InvalidTaskIdError,
+    TaskAlreadyArchivedError,
+    TaskEditArchivedError,
+    TaskNotArchivedError,
+    TaskNotFoundError,
+    TaskRepository,
+    TaskValidationError,
+)
+from todo_cli.sqlite_repository import SqliteTaskRepository
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> SqliteTaskRepository:
+    return SqliteTaskRepository(tmp_path / "tasks.db")
+
+
+def test_create_repository_infers_backend_from_suffix(tmp_path: Path) -> None:
+    assert isinstance(create_repository(tmp_path / "tasks.db"), SqliteTaskRepository)
+    assert isinstance(create_repository(tmp_path / "tasks.sqlite3"), SqliteTaskRepository)
+    json_repo = create_repository(tmp_path / "tasks.json")
+    assert type(json_repo) is TaskRepository
+    assert isinstance(
+        create_repository(tmp_path / "tasks.json", backend="sqlite"), SqliteTaskRepository
+    )
+    with pytest.raises(ValueError):
+        create_repository(tmp_path / "tasks.json", backend="csv")
+
+
+def test_schema_has_primary_key_and_status_index(repo: SqliteTaskRepository) -> None:
+    repo.add_task("task")
+    with sqlite3.connect(repo.storage_path) as conn:
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(tasks)")}
+        plan = " ".join(
+            str(row[3])
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM tasks "
+                "WHERE is_archived = 0 AND is_completed = 0"
+            )
+        )
+    assert "idx_tasks_active" in indexes
+    assert "idx_tasks_active" in plan
+
+
+def test_empty_store_loads_empty_collection(repo: SqliteTaskRepository) -> None:
+    assert repo.load_collection().tasks == []
+    assert repo.list_tasks() == []
+
+
+def test_add_and_list_preserve_insertion_order(repo: SqliteTaskRepository) -> None:
+    t1 = repo.add_task("task1")
+    t2 = repo.add_task("task2")
+    t3 = repo.add_task("task3")
+    repo.complete_task(str(t2.id))
+    repo.archive_task(str(t3.id))
+
+    assert [t.id for t in repo.list_tasks()] == [t1.id]
+    assert [t.id for t in repo.list_tasks(include_completed=True)] == [t1.id, t2.id]
+    assert [t.id for t in repo.load_collection().tasks] == [t1.id, t2.id, t3.id]
+
+
+def test_state_transitions_match_json_backend(repo: SqliteTaskRepository) -> None:
+    task = repo.add_task("task")
+    assert repo.complete_task(str(task.id)).is_completed is True
+    assert repo.reopen_task(str(task.id)).is_completed is False
+    repo.complete_task(str(task.id))
+    assert repo.archive_task(str(task.id)).is_archived is True
+    with pytest.raises(TaskAlreadyArchivedError):
+        repo.archive_task(str(task.id))
+    with pytest.raises(TaskEditArchivedError):
+        repo.edit_task_title(str(task.id), "new")
+
+    restored = repo.restore_task(str(task.id))
+    assert restored.is_archived is False
+    assert restored.is_completed is False
+    with pytest.raises(TaskNotArchivedError):
+        repo.restore_task(str(task.id))
+
+    edited = repo.edit_task_title(str(task.id), "  new  ")
+    assert edited.title == "new"
+    assert edited.created_at == task.created_at
+    assert repo.load_collection().tasks == [edited]
+
+
+def test_errors(repo: SqliteTaskRepository) -> None:
+    task = repo.add_task("task")
+    with pytest.raises(TaskValidationError):
+        repo.add_task(" ")
+    with pytest.raises(TaskValidationError):
+        repo.edit_task_title(str(task.id), "x" * 256)
+    with pytest.raises(InvalidTaskIdError):
+        repo.complete_task("not-uuid")
+    with pytest.raises(TaskNotFoundError):
+        repo.complete_task("cb5f4da4-8ba6-4ce9-9b58-849534f4f5d3")
+    assert repo.load_collection().tasks[0].title == "task"
+
+
+def test_invalid_row_raises_validation(repo: SqliteTaskRepository) -> None:
+    task = repo.add_task("task")
+    with sqlite3.connect(repo.storage_path) as conn:
+        conn.execute("UPDATE tasks SET title = ' ' WHERE id = ?", (str(task.id),))
+    with pytest.raises(TaskValidationError):
+        repo.list_tasks()
+
+
+def test_save_collection_replaces_contents(repo: SqliteTaskRepository) -> None:
+    repo.add_task("old")
+    new = Task.model_validate({"id": "cb5f4da4-8ba6-4ce9-9b58-849534f4f5d3", "title": "new"})
+    repo.save_collection(TaskCollection(tasks=[new]))
+    assert repo.load_collection().tasks == [new]
+
+
+def test_import_tasks_from_json_is_idempotent(tmp_path: Path, repo: SqliteTaskRepository) -> None:
+    json_repo = TaskRepository(tmp_path / "tasks.json")
+    t1 = json_repo.add_task("task1")
+    t2 = json_repo.add_task("task2")
+    json_repo.archive_task(str(t2.id))
+    source = json_repo.export_tasks()
+
+    assert repo.import_tasks(source) == 2
+    assert repo.import_tasks(source) == 0
+    assert repo.load_collection().tasks == source
+    assert [t.id for t in repo.list_tasks()] == [t1.id]
+
+
+def test_json_import_tasks_skips_known_ids(tmp_path: Path) -> None:
+    json_repo = TaskRepository(tmp_path / "tasks.json")
+    existing = json_repo.add_task("existing")
+    other = Task.model_validate({"id": "cb5f4da4-8ba6-4ce9-9b58-849534f4f5d3", "title": "other"})
+    assert json_repo.import_tasks([existing, other, other]) == 1
+    assert [t.id for t in json_repo.load_collection().tasks] == [existing.id, other.id]
+
+
+def test_batch_commits_on_exit(repo: SqliteTaskRepository) -> None:
+    with repo.batch():
+        task = repo.add_task("task")
+        repo.complete_task(str(task.id))
+        assert [t.id for t in repo.list_tasks(include_completed=True)] == [task.id]
+        assert SqliteTaskRepository(repo.storage_path).load_collection().tasks == []
+    assert SqliteTaskRepository(repo.storage_path).list_tasks(include_completed=True)[0].is_completed
+
+
+def test_batch_flush_every_commits_periodically(repo: SqliteTaskRepository) -> None:
+    with repo.batch(flush_every=2):
+        repo.add_task("task1")
+        repo.add_task("task2")
+        repo.add_task("task3")
+        assert len(SqliteTaskRepository(repo.storage_path).load_collection().tasks) == 2
+    assert len(repo.load_collection().tasks) == 3